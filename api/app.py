@@ -1,13 +1,17 @@
 """
 Flask 서버: 트랜잭션 스코어링 API
 """
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, Response, jsonify, send_from_directory
 from flask_cors import CORS
 from flasgger import Swagger
 from pathlib import Path
 from api.routes.scoring import scoring_bp
 from api.routes.address_analysis import address_analysis_bp
-from api.routes.demo_analysis import demo_analysis_bp  # 데모 페이지
+from api.routes.demo_analysis import demo_analysis_bp, warm_up_models, readiness  # 데모 페이지
+from api.routes.hybrid_address_analysis import hybrid_address_analysis_bp
+from api.routes.jobs import jobs_bp
+from core.scoring.result_cache import get_result_cache
+import threading
 
 app = Flask(__name__)
 CORS(app)  # CORS 허용 (프론트엔드에서 호출 가능)
@@ -64,10 +68,18 @@ swagger_template = {
             "name": "Manual Analysis",
             "description": "수동 탐지 - 주소 기반 리스크 분석"
         },
+        {
+            "name": "Hybrid Analysis",
+            "description": "Rule-based + MPOCryptoML 주소 분석"
+        },
         {
             "name": "Transaction Scoring",
             "description": "단일 트랜잭션 리스크 스코어링"
         },
+        {
+            "name": "Jobs",
+            "description": "비동기 분석 작업 - advanced/3-hop 분석 진행 상황과 결과 조회"
+        },
         {
             "name": "Health",
             "description": "서버 상태 확인"
@@ -80,7 +92,9 @@ swagger = Swagger(app, config=swagger_config, template=swagger_template)
 # Blueprint 등록
 app.register_blueprint(scoring_bp, url_prefix="/api/score")
 app.register_blueprint(address_analysis_bp, url_prefix="/api/analyze")
+app.register_blueprint(hybrid_address_analysis_bp, url_prefix="/api/analyze")  # Rule-based + MPOCryptoML
 app.register_blueprint(demo_analysis_bp, url_prefix="/api/analyze")  # 데모 분석
+app.register_blueprint(jobs_bp, url_prefix="/api/jobs")  # 비동기 분석 작업
 
 
 @app.route('/health', methods=['GET'])
@@ -108,6 +122,92 @@ def health_check():
     return jsonify({"status": "ok", "service": "aml-risk-engine"}), 200
 
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """
+    준비 상태 확인
+    ---
+    tags:
+      - Health
+    summary: 준비 상태 확인 (readiness probe)
+    description: Stage 1 스코어러와 워밍업 대상 모델(models/manifest.json)이 모두 로드되면 200, 아니면 503
+    responses:
+      200:
+        description: 트래픽 처리 준비 완료
+      503:
+        description: 워밍업 중이거나 모델 로드 실패 (models에 모델별 상태)
+    """
+    status = readiness()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    메트릭 (Prometheus 텍스트 형식)
+    ---
+    tags:
+      - Health
+    summary: 분석 결과 캐시 메트릭
+    description: |
+      주소 분석 결과 캐시(/api/analyze/address, /api/analyze/address/hybrid)의 적중률과 절약 시간
+      - aml_result_cache_requests_total{result="memory_hit|disk_hit|miss"}
+      - aml_result_cache_hit_ratio, aml_result_cache_saved_seconds_total, aml_result_cache_compute_seconds_total
+      - aml_result_cache_entries, aml_result_cache_invalidations_total
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Prometheus 텍스트 형식 메트릭
+    """
+    stats = get_result_cache().stats()
+    lines = [
+        "# HELP aml_result_cache_requests_total Address analysis result cache lookups",
+        "# TYPE aml_result_cache_requests_total counter",
+        f'aml_result_cache_requests_total{{result="memory_hit"}} {stats["memory_hits"]}',
+        f'aml_result_cache_requests_total{{result="disk_hit"}} {stats["disk_hits"]}',
+        f'aml_result_cache_requests_total{{result="miss"}} {stats["misses"]}',
+        "# HELP aml_result_cache_hit_ratio Share of lookups served from the cache",
+        "# TYPE aml_result_cache_hit_ratio gauge",
+        f'aml_result_cache_hit_ratio {stats["hit_rate"]:.6f}',
+        "# HELP aml_result_cache_saved_seconds_total Analysis time skipped by cache hits",
+        "# TYPE aml_result_cache_saved_seconds_total counter",
+        f'aml_result_cache_saved_seconds_total {stats["saved_seconds"]:.6f}',
+        "# HELP aml_result_cache_compute_seconds_total Analysis time spent on cache misses",
+        "# TYPE aml_result_cache_compute_seconds_total counter",
+        f'aml_result_cache_compute_seconds_total {stats["compute_seconds"]:.6f}',
+        "# HELP aml_result_cache_entries In-memory cache entries",
+        "# TYPE aml_result_cache_entries gauge",
+        f'aml_result_cache_entries {stats["entries"]}',
+        "# HELP aml_result_cache_invalidations_total Cache flushes caused by rules/lists/model version changes",
+        "# TYPE aml_result_cache_invalidations_total counter",
+        f'aml_result_cache_invalidations_total {stats["invalidations"]}',
+        "# HELP aml_result_cache_version_info Current rules/lists/model versions in cache keys",
+        "# TYPE aml_result_cache_version_info gauge",
+        "aml_result_cache_version_info{{{}}} 1".format(
+            ",".join(f'{name}="{version}"' for name, version in sorted(stats["versions"].items()))
+        ),
+    ]
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+
+_warm_up_thread = None
+
+
+def start_warm_up() -> threading.Thread:
+    """
+    모델 워밍업 시작 (요청 처리를 막지 않도록 백그라운드 실행, 여러 번 호출해도 한 번만 실행)
+    
+    모듈 import만으로는 실행하지 않으므로 서버 시작 시점(__main__, run_server.py, WSGI 엔트리)에서 호출한다.
+    워밍업이 끝나기 전까지 /ready는 503이다.
+    """
+    global _warm_up_thread
+    if _warm_up_thread is None:
+        _warm_up_thread = threading.Thread(target=warm_up_models, name="model-warmup", daemon=True)
+        _warm_up_thread.start()
+    return _warm_up_thread
+
+
 if __name__ == '__main__':
     print("=" * 70)
     print("🚀 AML Risk Engine API 서버 시작")
@@ -115,10 +215,16 @@ if __name__ == '__main__':
     print()
     print("📍 엔드포인트:")
     print("   POST http://localhost:5000/api/score/transaction")
+    print("   POST http://localhost:5000/api/score/transactions (JSON 배열 / NDJSON 배치)")
     print("   POST http://localhost:5000/api/analyze/address")
     print("      - analysis_type: 'basic' (기본 스코어링, 빠름, 기본값)")
     print("      - analysis_type: 'advanced' (심층 분석, 느림)")
+    print("      - async: true (작업 큐에 제출, 202 + job_id)")
+    print("   POST http://localhost:5000/api/analyze/address/hybrid (Rule-based + MPOCryptoML)")
+    print("   GET  http://localhost:5000/api/jobs/<job_id> (비동기 분석 진행 상황/결과)")
     print("   GET  http://localhost:5000/health")
+    print("   GET  http://localhost:5000/ready")
+    print("   GET  http://localhost:5000/metrics (분석 결과 캐시 적중률/절약 시간)")
     print()
     print("🌐 웹 데모:")
     print("   GET  http://localhost:5000/")
@@ -127,5 +233,6 @@ if __name__ == '__main__':
     print("📚 API 문서:")
     print("   GET  http://localhost:5000/api-docs")
     print()
+    start_warm_up()
     app.run(host='0.0.0.0', port=5000, debug=True)
 
@@ -0,0 +1,435 @@
+"""
+비동기 분석 작업 큐 (프로세스 내 스레드 풀)
+
+advanced 주소 분석, Etherscan 3-hop 데모 분석처럼 수십 초 걸리는 분석을 Flask 워커 밖에서 실행한다.
+제출하면 작업 ID를 바로 돌려주고, 작업은 동시 실행 수가 제한된 풀에서 실행되므로
+느린 분석이 몰려도 basic 요청을 처리할 Flask 워커가 묶이지 않는다.
+
+마감 시간은 협조적으로 적용한다: 대기 중에 마감이 지나면 실행하지 않고,
+실행 중에는 작업 함수가 job.report()를 호출할 때 마감이 지났으면 JobDeadlineExceeded로 중단한다.
+
+환경 변수:
+    AML_JOB_WORKERS        동시에 실행할 작업 수 (기본 2)
+    AML_JOB_MAX_PENDING    대기 + 실행 중 작업 최대 개수, 넘으면 제출 거부 (기본 32)
+    AML_JOB_DEADLINE       작업 기본 마감 시간(초) (기본 300)
+    AML_JOB_MAX_DEADLINE   요청으로 지정할 수 있는 최대 마감 시간(초) (기본 1800)
+    AML_JOB_RETENTION      완료된 작업 보관 시간(초) (기본 3600)
+    AML_JOB_CALLBACK_ALLOWED_HOSTS
+                           callback_url로 허용할 호스트 (쉼표 구분, 기본 없음 = 콜백 비활성화, 상태 조회만 가능)
+
+콜백은 허용 목록의 호스트로만 보내고, 호스트가 루프백/링크 로컬/사설 주소로 해석되면 거부한다
+(제출 시와 전송 직전에 모두 확인, 리다이렉트는 따라가지 않음).
+전송은 직전 검증에서 확인한 IP로 직접 연결하고 Host 헤더/SNI/인증서 검증은 원래 호스트 이름으로 하므로,
+검증과 연결 사이에 DNS 응답이 바뀌어도(DNS rebinding) 다른 주소로 보내지 않는다.
+
+사용법:
+    queue = get_job_queue()
+    job = queue.submit("address_advanced", lambda job: run(job), callback_url="https://...")
+    queue.get(job.job_id).to_dict()
+"""
+import ipaddress
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+EXPIRED = "expired"
+FINISHED_STATUSES = (DONE, FAILED, EXPIRED)
+
+# 완료된 작업 최대 보관 개수 (보관 시간과 별개로 메모리 상한)
+MAX_FINISHED_JOBS = 1000
+# 웹훅 콜백 타임아웃(초)
+CALLBACK_TIMEOUT = 10
+
+
+class JobDeadlineExceeded(Exception):
+    """작업 마감 시간 초과"""
+    pass
+
+
+class JobQueueFull(Exception):
+    """대기 중인 작업이 너무 많아 제출 거부"""
+    pass
+
+
+def _parse_hosts(value: Optional[str]) -> List[str]:
+    """쉼표 구분 호스트 목록 파싱 (환경 변수용)"""
+    return [host.strip() for host in (value or "").split(",") if host.strip()]
+
+
+def _is_public_address(address: str) -> bool:
+    """콜백을 보내도 되는 공인 주소인지 (루프백/링크 로컬/사설/예약 주소 제외)"""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return not (
+        ip.is_loopback or ip.is_link_local or ip.is_private or ip.is_reserved
+        or ip.is_multicast or ip.is_unspecified
+    )
+
+
+def validate_callback_url(callback_url: str, allowed_hosts: Iterable[str]) -> List[str]:
+    """
+    콜백 URL 검증 (SSRF 방지)
+
+    Args:
+        callback_url: 콜백 URL
+        allowed_hosts: 허용 호스트 목록 (비어 있으면 콜백 비활성화)
+
+    Returns:
+        검증한 호스트 IP 목록 (getaddrinfo 순서, 모두 공인 주소)
+
+    Raises:
+        ValueError: 콜백이 비활성화됐거나, http(s)가 아니거나, 허용 목록에 없거나,
+            호스트가 루프백/링크 로컬/사설 주소로 해석되는 경우
+    """
+    allowed = {host.lower() for host in allowed_hosts}
+    if not allowed:
+        raise ValueError("callback_url is disabled on this server; poll status_url instead")
+
+    parts = urlsplit(callback_url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http(s) URL")
+    host = parts.hostname.lower()
+    if host not in allowed:
+        raise ValueError(f"callback_url host is not allowed: {host}")
+
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        addresses = list(dict.fromkeys(
+            info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+        ))
+    except (socket.gaierror, ValueError) as e:
+        raise ValueError(f"callback_url host cannot be resolved: {host} ({e})")
+    if not addresses:
+        raise ValueError(f"callback_url host cannot be resolved: {host}")
+    for address in addresses:
+        if not _is_public_address(address):
+            raise ValueError(f"callback_url host resolves to a non-public address: {host} ({address})")
+    return addresses
+
+
+class _PinnedAddressAdapter(HTTPAdapter):
+    """
+    IP로 고친 URL에 연결하면서 TLS SNI와 인증서 호스트 이름 검증은 원래 호스트 이름으로 하는 어댑터
+    """
+
+    def __init__(self, hostname: str, **kwargs):
+        """
+        Args:
+            hostname: 원래 URL의 호스트 이름 (SNI / 인증서 검증용)
+        """
+        self.hostname = hostname
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        # http 연결 풀에서는 urllib3가 TLS 인자를 무시함
+        kwargs["server_hostname"] = self.hostname
+        kwargs["assert_hostname"] = self.hostname
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _pinned_request(callback_url: str, address: str) -> Tuple[str, str]:
+    """
+    콜백 URL의 호스트를 검증한 IP로 바꾼 URL과 원래 Host 헤더 값
+
+    Args:
+        callback_url: 콜백 URL
+        address: 연결할 IP (validate_callback_url 결과)
+
+    Returns:
+        (IP로 바꾼 URL, Host 헤더)
+    """
+    parts = urlsplit(callback_url)
+    host_header = parts.netloc.rpartition("@")[2]
+    ip_host = f"[{address}]" if ":" in address else address
+    netloc = f"{ip_host}:{parts.port}" if parts.port else ip_host
+    return parts._replace(netloc=netloc).geturl(), host_header
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    """Unix 시각 → ISO8601 UTC 문자열"""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+@dataclass
+class Job:
+    """분석 작업 상태"""
+    job_id: str
+    kind: str
+    deadline_seconds: float
+    callback_url: Optional[str] = None
+    status: str = QUEUED
+    stage: Optional[str] = None
+    done: int = 0
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    callback_status: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def deadline_at(self) -> float:
+        return self.submitted_at + self.deadline_seconds
+
+    def deadline_passed(self) -> bool:
+        """마감 시간이 지났는지"""
+        return time.time() > self.deadline_at
+
+    def report(self, stage: Optional[str] = None, done: Optional[int] = None, total: Optional[int] = None) -> None:
+        """
+        진행 상황 기록 (작업 함수가 단계/항목마다 호출)
+
+        Raises:
+            JobDeadlineExceeded: 마감 시간이 지난 경우
+        """
+        if stage is not None:
+            self.stage = stage
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+        if self.deadline_passed():
+            raise JobDeadlineExceeded(f"Job deadline exceeded ({self.deadline_seconds:g}s)")
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        """작업 상태 응답 JSON (결과는 완료된 경우에만)"""
+        data = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": {
+                "stage": self.stage,
+                "done": self.done,
+                "total": self.total,
+            },
+            "submitted_at": _iso(self.submitted_at),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+            "deadline_at": _iso(self.deadline_at),
+        }
+        if self.callback_url:
+            data["callback_status"] = self.callback_status
+        if self.error is not None:
+            data["error"] = self.error
+        if include_result and self.status == DONE:
+            data["result"] = self.result
+        return data
+
+
+class JobQueue:
+    """
+    동시 실행 수가 제한된 분석 작업 큐
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 32,
+        default_deadline: float = 300.0,
+        max_deadline: float = 1800.0,
+        retention: float = 3600.0,
+        callback_allowed_hosts: Optional[Iterable[str]] = None
+    ):
+        """
+        Args:
+            workers: 동시에 실행할 작업 수
+            max_pending: 대기 + 실행 중 작업 최대 개수
+            default_deadline: 작업 기본 마감 시간(초)
+            max_deadline: 요청으로 지정할 수 있는 최대 마감 시간(초)
+            retention: 완료된 작업 보관 시간(초)
+            callback_allowed_hosts: callback_url로 허용할 호스트 (None/빈 목록이면 콜백 거부)
+        """
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.default_deadline = default_deadline
+        self.max_deadline = max_deadline
+        self.retention = retention
+        self.callback_allowed_hosts = [host.lower() for host in (callback_allowed_hosts or [])]
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        """환경 변수(AML_JOB_*) 설정으로 생성"""
+        return cls(
+            workers=int(os.getenv("AML_JOB_WORKERS", "2")),
+            max_pending=int(os.getenv("AML_JOB_MAX_PENDING", "32")),
+            default_deadline=float(os.getenv("AML_JOB_DEADLINE", "300")),
+            max_deadline=float(os.getenv("AML_JOB_MAX_DEADLINE", "1800")),
+            retention=float(os.getenv("AML_JOB_RETENTION", "3600")),
+            callback_allowed_hosts=_parse_hosts(os.getenv("AML_JOB_CALLBACK_ALLOWED_HOSTS")),
+        )
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[[Job], Dict[str, Any]],
+        callback_url: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> Job:
+        """
+        작업 제출
+
+        Args:
+            kind: 작업 종류 (응답에 그대로 표시)
+            fn: 작업 함수 fn(job) -> 결과 dict (진행 상황은 job.report()로 기록)
+            callback_url: 완료 시 작업 상태를 POST할 URL (허용 목록의 http/https 호스트)
+            deadline: 마감 시간(초, None이면 기본값, max_deadline으로 제한)
+
+        Returns:
+            대기 중인 Job
+
+        Raises:
+            ValueError: 마감 시간이나 콜백 URL이 잘못된 경우
+            JobQueueFull: 대기 + 실행 중 작업이 max_pending개 이상인 경우
+        """
+        if deadline is None:
+            deadline = self.default_deadline
+        deadline = float(deadline)
+        if deadline <= 0:
+            raise ValueError("deadline must be positive")
+        if callback_url is not None:
+            validate_callback_url(callback_url, self.callback_allowed_hosts)
+
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            kind=kind,
+            deadline_seconds=min(deadline, self.max_deadline),
+            callback_url=callback_url,
+        )
+        with self._lock:
+            self._prune()
+            if self._pending_count() >= self.max_pending:
+                raise JobQueueFull(f"Too many pending jobs ({self.max_pending})")
+            self._jobs[job.job_id] = job
+        print(f"📥 작업 제출: {job.kind} {job.job_id}")
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """작업 조회 (없거나 보관 기간이 지나면 None)"""
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """큐 상태 (설정과 상태별 작업 수)"""
+        with self._lock:
+            self._prune()
+            counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED_STATUSES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "default_deadline": self.default_deadline,
+            "max_deadline": self.max_deadline,
+            "callbacks_enabled": bool(self.callback_allowed_hosts),
+            "jobs": counts,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """워커 스레드 종료"""
+        self._executor.shutdown(wait=wait)
+
+    def _pending_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status not in FINISHED_STATUSES)
+
+    def _prune(self) -> None:
+        """보관 시간이 지났거나 보관 개수를 넘은 완료 작업 삭제 (lock 안에서 호출)"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.status in FINISHED_STATUSES]
+        excess = len(finished) - MAX_FINISHED_JOBS
+        for job in finished:  # 제출 순서
+            if excess > 0 or now - (job.finished_at or now) > self.retention:
+                del self._jobs[job.job_id]
+                excess -= 1
+
+    def _run(self, job: Job, fn: Callable[[Job], Dict[str, Any]]) -> None:
+        """워커 스레드: 작업 실행 후 상태 기록, 콜백 전송"""
+        job.started_at = time.time()
+        try:
+            if job.deadline_passed():
+                raise JobDeadlineExceeded(f"Job deadline exceeded while queued ({job.deadline_seconds:g}s)")
+            job.status = RUNNING
+            result = fn(job)
+            job.result = result
+            job.status = DONE
+        except JobDeadlineExceeded as e:
+            job.error = str(e)
+            job.status = EXPIRED
+        except Exception as e:
+            job.error = f"Analysis failed: {str(e)}"
+            job.status = FAILED
+            traceback.print_exc()
+        job.finished_at = time.time()
+        print(f"{'✅' if job.status == DONE else '⚠️ '} 작업 {job.status}: {job.kind} {job.job_id} "
+              f"({job.finished_at - job.submitted_at:.1f}s)")
+
+        if job.callback_url:
+            self._send_callback(job)
+
+    def _send_callback(self, job: Job) -> None:
+        """
+        완료된 작업 상태를 콜백 URL로 POST (실패해도 작업 결과는 유지)
+
+        제출 이후 DNS가 바뀌었을 수 있으므로 전송 직전에 다시 검증하고, 검증한 IP로 직접 연결한다
+        (Host 헤더/SNI/인증서 검증은 원래 호스트 이름, 프록시 환경 변수와 리다이렉트는 따르지 않음).
+        """
+        try:
+            address = validate_callback_url(job.callback_url, self.callback_allowed_hosts)[0]
+            url, host_header = _pinned_request(job.callback_url, address)
+            parts = urlsplit(job.callback_url)
+            with requests.Session() as session:
+                session.trust_env = False
+                session.mount(f"{parts.scheme}://", _PinnedAddressAdapter(parts.hostname))
+                response = session.post(
+                    url,
+                    json=job.to_dict(),
+                    headers={"Host": host_header},
+                    timeout=CALLBACK_TIMEOUT,
+                    allow_redirects=False
+                )
+            job.callback_status = f"HTTP {response.status_code}"
+        except Exception as e:
+            job.callback_status = f"failed: {e}"
+            print(f"⚠️  작업 콜백 실패 ({job.job_id}): {e}")
+
+
+# 프로세스 공용 작업 큐 (지연 생성)
+job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """공용 작업 큐 (첫 호출 시 환경 변수 설정으로 생성)"""
+    global job_queue
+    with _job_queue_lock:
+        if job_queue is None:
+            job_queue = JobQueue.from_env()
+    return job_queue
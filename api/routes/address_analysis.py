@@ -3,11 +3,20 @@
 
 수동 탐지용: 주소의 거래 히스토리를 분석하여 리스크 스코어 계산
 """
-from flask import Blueprint, request, jsonify
+from typing import Dict, Any, Iterator, List, Optional
+
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from core.scoring.address_analyzer import AddressAnalyzer, AddressAnalysisResult
+from core.scoring.result_cache import get_result_cache
+from api.job_queue import Job
+from api.routes.jobs import submit_analysis_job, wants_async
 
 address_analysis_bp = Blueprint("address_analysis", __name__)
 
+# 스트리밍 모드: 타임라인 항목을 이 개수만큼 모아서 내보냄
+NDJSON_MIMETYPE = "application/x-ndjson"
+TIMELINE_CHUNK_SIZE = 200
+
 
 def _convert_chain_id_to_chain(chain_id: int) -> str:
     """체인 ID(숫자)를 체인 이름으로 변환"""
@@ -43,11 +52,21 @@ def analyze_address():
     tags:
       - Manual Analysis
     summary: 주소를 분석합니다
-    description: 주소의 거래 히스토리를 분석하여 리스크 스코어 계산
+    description: |
+      주소의 거래 히스토리를 분석하여 리스크 스코어 계산
+      stream=true (또는 Accept: application/x-ndjson)이면 NDJSON으로 스트리밍한다.
+      첫 줄 {"type": "start", ...} 다음에 거래를 평가하는 대로 {"type": "timeline", timestamp, tx_hash, risk_score, fired_rules} 줄을 보내고,
+      마지막 줄 {"type": "summary", ...}에 일반 응답과 같은 필드(최종 점수, 집계 룰, 태그 등)를 담는다.
+      스트리밍 중 실패하면 마지막 줄이 {"type": "error", "error": "..."}이다.
+      async=true (또는 callback_url 지정)이면 작업 큐에 제출하고 202와 job_id를 바로 돌려준다 (advanced 분석용).
+      결과는 GET /api/jobs/{job_id}로 조회하며, callback_url이 있으면 완료 시 작업 상태를 POST한다.
+      같은 주소/거래/analysis_type/룰·리스트·모델 버전의 결과는 캐시에서 응답한다 (X-Cache: HIT|MISS 헤더).
+      캐시 적중 시 본문은 처음 분석한 결과 그대로이고(completed_at 포함), X-Cache-Age 헤더에 저장 후 지난 초를 준다.
     consumes:
       - application/json
     produces:
       - application/json
+      - application/x-ndjson
     parameters:
       - in: body
         name: body
@@ -157,6 +176,24 @@ def analyze_address():
               enum: [basic, advanced]
               description: "분석 타입 - basic: 기본 룰만 평가 (빠름, 1-2초), advanced: 모든 룰 평가 (느림, 5-30초, 그래프 구조 분석 포함)"
               example: "basic"
+            stream:
+              type: boolean
+              description: "선택 필드 - true면 거래별 타임라인과 최종 요약을 NDJSON으로 스트리밍 (대량 거래 주소용)"
+              example: false
+            async:
+              type: boolean
+              description: "선택 필드 - true면 비동기 작업으로 제출 (202, GET /api/jobs/{job_id}로 결과 조회)"
+              example: false
+            callback_url:
+              type: string
+              description: "선택 필드 - 작업 완료 시 작업 상태(JSON)를 POST할 URL (지정하면 비동기 작업, AML_JOB_CALLBACK_ALLOWED_HOSTS의 공인 호스트만 허용, 설정이 없으면 400)"
+            deadline_seconds:
+              type: number
+              description: "선택 필드 - 비동기 작업 마감 시간(초), 넘으면 expired (기본 AML_JOB_DEADLINE)"
+            cache:
+              type: boolean
+              description: "선택 필드 - false면 분석 결과 캐시를 사용하지 않음 (기본 true, 스트리밍 모드는 캐시 안 함)"
+              example: true
     responses:
       200:
         description: 분석 성공
@@ -203,7 +240,7 @@ def analyze_address():
             completed_at:
               type: string
               format: date-time
-              description: 스코어링 완료 시각 (ISO8601 UTC)
+              description: 스코어링 완료 시각 (ISO8601 UTC, 캐시 적중 시 처음 분석한 시각)
               example: "2025-11-17T12:34:56Z"
             timestamp:
               type: string
@@ -218,6 +255,8 @@ def analyze_address():
               type: number
               description: 거래 금액 (USD, amount_usd와 동일)
               example: 500000.0
+      202:
+        description: 비동기 작업 제출됨 (job_id, status_url, Location 헤더)
       400:
         description: 잘못된 요청
         schema:
@@ -234,6 +273,8 @@ def analyze_address():
             error:
               type: string
               example: "Analysis failed: ..."
+      503:
+        description: 비동기 작업 큐가 가득 참
     """
     try:
         data = request.get_json()
@@ -313,60 +354,164 @@ def analyze_address():
         analysis_type = data.get("analysis_type", "basic")  # 기본값: "basic"
         
         # 주소 분석 수행
-        analyzer = AddressAnalyzer()
-        result = analyzer.analyze_address(
-            address=address,
-            chain=chain,
-            transactions=processed_transactions,
-            time_range=time_range,
-            analysis_type=analysis_type
-        )
-        
-        # chain을 chain_id(숫자)로 변환
-        chain_to_id_map = {
-            "ethereum": 1,
-            "arbitrum": 42161,
-            "avalanche": 43114,
-            "base": 8453,
-            "polygon": 137,
-            "bsc": 56,
-            "fantom": 250,
-            "optimism": 10,
-            "blast": 81457
-        }
-        chain_id = chain_to_id_map.get(chain.lower(), 1)  # 기본값: Ethereum (1)
+        if wants_async(data):
+            cache_key = _cache_key(data, address, chain, processed_transactions, time_range, analysis_type)
+            return submit_analysis_job(
+                f"address_{analysis_type}",
+                lambda job: get_result_cache().get_or_compute(
+                    cache_key,
+                    lambda: _run_analysis_job(
+                        job, AddressAnalyzer(), address, chain, processed_transactions, time_range, analysis_type
+                    )
+                )[0],
+                data
+            )
+        if data.get("stream") or request.accept_mimetypes.best == NDJSON_MIMETYPE:
+            return _stream_analysis(AddressAnalyzer(), address, chain, processed_transactions, time_range, analysis_type)
         
-        # 최신 트랜잭션의 timestamp와 총 value 계산
-        latest_timestamp = ""
-        total_value = 0.0
-        if transactions:
-            # 시간순 정렬된 마지막 트랜잭션
-            sorted_txs = sorted(
-                transactions,
-                key=lambda tx: tx.get("timestamp", ""),
-                reverse=True
+        def compute() -> Dict[str, Any]:
+            result = AddressAnalyzer().analyze_address(
+                address=address,
+                chain=chain,
+                transactions=processed_transactions,
+                time_range=time_range,
+                analysis_type=analysis_type
             )
-            if sorted_txs:
-                latest_tx = sorted_txs[0]
-                latest_timestamp = latest_tx.get("timestamp", "")
-                # 모든 트랜잭션의 총 value 계산
-                total_value = sum(float(tx.get("amount_usd", 0)) for tx in transactions)
+            # 기존 JSON 포맷에 맞춰 응답 생성
+            return _response_fields(result, chain, transactions)
         
-        # 기존 JSON 포맷에 맞춰 응답 생성
-        return jsonify({
-            "target_address": result.address,  # 기존 포맷에 맞춤
-            "risk_score": int(result.risk_score),  # 정수로 변환
-            "risk_level": result.risk_level,
-            "risk_tags": result.risk_tags,
-            "fired_rules": result.fired_rules,  # {rule_id, score} 형태
-            "explanation": result.explanation,
-            "completed_at": result.completed_at,
-            # 백엔드 요구 필드
-            "timestamp": latest_timestamp,
-            "chain_id": chain_id,
-            "value": float(total_value)
-        }), 200
+        # 같은 주소/거래/버전으로 분석한 결과가 있으면 캐시에서 응답
+        cache_key = _cache_key(data, address, chain, processed_transactions, time_range, analysis_type)
+        payload, cache_age = get_result_cache().get_or_compute(cache_key, compute)
+        response = jsonify(payload)
+        if cache_age is None:
+            response.headers["X-Cache"] = "MISS"
+        else:
+            # 본문(completed_at 포함)은 처음 분석한 결과 그대로이므로 저장 후 지난 시간을 함께 알려 줌
+            response.headers["X-Cache"] = "HIT"
+            response.headers["X-Cache-Age"] = str(int(cache_age))
+        return response, 200
     
     except Exception as e:
         return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
 
+
+def _cache_key(
+    data: Dict[str, Any],
+    address: str,
+    chain: str,
+    transactions: List[Dict[str, Any]],
+    time_range: Any,
+    analysis_type: str
+) -> Optional[str]:
+    """분석 결과 캐시 키 (요청 본문에 cache=false면 None - 캐시 사용 안 함)"""
+    if data.get("cache", True) is False:
+        return None
+    return get_result_cache().key(
+        "address", address, transactions, analysis_type, chain=chain, time_range=time_range
+    )
+
+
+def _response_fields(
+    result: AddressAnalysisResult,
+    chain: str,
+    transactions: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """분석 결과 응답 JSON (기존 포맷, 스트리밍 모드의 summary 줄과 같음)"""
+    # chain을 chain_id(숫자)로 변환
+    chain_to_id_map = {
+        "ethereum": 1,
+        "arbitrum": 42161,
+        "avalanche": 43114,
+        "base": 8453,
+        "polygon": 137,
+        "bsc": 56,
+        "fantom": 250,
+        "optimism": 10,
+        "blast": 81457
+    }
+    chain_id = chain_to_id_map.get(chain.lower(), 1)  # 기본값: Ethereum (1)
+    
+    # 최신 트랜잭션의 timestamp와 총 value 계산
+    latest_timestamp = ""
+    total_value = 0.0
+    if transactions:
+        # 가장 최근 트랜잭션
+        latest_tx = max(transactions, key=lambda tx: tx.get("timestamp", ""))
+        latest_timestamp = latest_tx.get("timestamp", "")
+        # 모든 트랜잭션의 총 value 계산
+        total_value = sum(float(tx.get("amount_usd", 0)) for tx in transactions)
+    
+    return {
+        "target_address": result.address,  # 기존 포맷에 맞춤
+        "risk_score": int(result.risk_score),  # 정수로 변환
+        "risk_level": result.risk_level,
+        "risk_tags": result.risk_tags,
+        "fired_rules": result.fired_rules,  # {rule_id, score} 형태
+        "explanation": result.explanation,
+        "completed_at": result.completed_at,
+        # 백엔드 요구 필드
+        "timestamp": latest_timestamp,
+        "chain_id": chain_id,
+        "value": float(total_value)
+    }
+
+
+def _stream_analysis(
+    analyzer: AddressAnalyzer,
+    address: str,
+    chain: str,
+    transactions: List[Dict[str, Any]],
+    time_range: Any,
+    analysis_type: str
+) -> Response:
+    """
+    주소 분석 NDJSON 스트리밍 응답
+    
+    타임라인은 거래를 평가하는 대로 TIMELINE_CHUNK_SIZE개씩 내보내고 응답 객체에 모으지 않는다.
+    """
+    dumps = current_app.json.dumps
+    
+    def generate() -> Iterator[str]:
+        yield dumps({"type": "start", "target_address": address, "total_transactions": len(transactions)}) + "\n"
+        lines = []
+        try:
+            for item in analyzer.iter_analysis(address, chain, transactions, time_range, analysis_type):
+                if isinstance(item, AddressAnalysisResult):
+                    lines.append(dumps({"type": "summary", **_response_fields(item, chain, transactions)}))
+                    break
+                lines.append(dumps({"type": "timeline", **item}))
+                if len(lines) >= TIMELINE_CHUNK_SIZE:
+                    yield "\n".join(lines) + "\n"
+                    lines = []
+        except Exception as e:
+            lines.append(dumps({"type": "error", "error": f"Analysis failed: {str(e)}"}))
+        yield "\n".join(lines) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def _run_analysis_job(
+    job: Job,
+    analyzer: AddressAnalyzer,
+    address: str,
+    chain: str,
+    transactions: List[Dict[str, Any]],
+    time_range: Any,
+    analysis_type: str
+) -> Dict[str, Any]:
+    """
+    비동기 작업: 주소 분석 (타임라인 항목마다 진행 상황 기록, 마감 시간이 지나면 중단)
+    
+    Returns:
+        동기 요청과 같은 응답 JSON
+    """
+    job.report(stage="rules", done=0, total=len(transactions))
+    done = 0
+    for item in analyzer.iter_analysis(address, chain, transactions, time_range, analysis_type):
+        if isinstance(item, AddressAnalysisResult):
+            job.report(stage="summary")
+            return _response_fields(item, chain, transactions)
+        done += 1
+        job.report(done=done)
+    raise RuntimeError("Analysis ended without a result")
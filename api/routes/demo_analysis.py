@@ -2,7 +2,7 @@
 데모용 주소 분석 API (Stage 1 + Stage 2 통합)
 """
 from flask import Blueprint, request, jsonify
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Callable
 import sys
 from pathlib import Path
 
@@ -11,8 +11,12 @@ sys.path.insert(0, str(project_root))
 
 from core.scoring.stage1_scorer import Stage1Scorer
 from core.scoring.stage2_scorer import Stage2Scorer
+from core.scoring.model_registry import ModelRegistry
 from core.data.etherscan_client import EtherscanClient, RealDataCollector
-from core.data.lists import ListLoader
+from core.data.lists import ListLoader, KNOWN_SERVICE_ADDRESSES
+from core.aggregation.supernode import SupernodePolicy
+from api.job_queue import Job
+from api.routes.jobs import submit_analysis_job, wants_async
 import pandas as pd
 import networkx as nx
 import time
@@ -86,11 +90,7 @@ def _calculate_address_stats(address: str, transactions: List[Dict[str, Any]], g
     entity_type = "Unknown"
     
     # 알려진 주소 체크
-    known_addresses = {
-        "0x7a250d5630b4cf539739df2c5dacb4c659f2488d": {"name": "Uniswap", "type": "DEX"},
-        "0xe592427a0aece92de3edee1f18e0157c05861564": {"name": "Uniswap V3", "type": "DEX"},
-        "0x3f5ce5fbfe3e9af3971dd833d26ba9b5c936f0be": {"name": "Binance", "type": "Exchange"},
-    }
+    known_addresses = KNOWN_SERVICE_ADDRESSES
     
     if address_lower in known_addresses:
         entity_info = known_addresses[address_lower]
@@ -197,9 +197,14 @@ def _build_3hop_graph_data(
     max_hops: int = 3,
     chain: str = "ethereum",
     etherscan_api_key: str = None,
-    use_etherscan: bool = False
+    use_etherscan: bool = False,
+    should_stop: Optional[Callable[[], bool]] = None
 ) -> Dict[str, Any]:
-    """3-hop 그래프 데이터 생성 (인터랙티브 확장 가능)"""
+    """
+    3-hop 그래프 데이터 생성 (인터랙티브 확장 가능)
+    
+    should_stop이 True를 돌려주면 남은 2-hop/3-hop 주소는 확장하지 않는다 (비동기 작업 마감 시간).
+    """
     main_address_lower = main_address.lower()
     
     # NetworkX 그래프 구축
@@ -312,10 +317,17 @@ def _build_3hop_graph_data(
     if max_hops > 1 and use_etherscan and etherscan_api_key:
         try:
             collector = RealDataCollector(api_key=etherscan_api_key, chain=chain)
+            policy = load_supernode_policy()
             
-            # 2-hop: 1-hop 주소들의 거래 수집
+            # 2-hop: 1-hop 주소들의 거래 수집 (슈퍼노드는 확장하지 않음)
             hop2_addresses = set()
-            for hop1_addr in list(hop1_addresses)[:10]:  # 최대 10개만 (Rate limit 고려)
+            expandable_hop1 = [
+                addr for addr in hop1_addresses
+                if not policy.is_supernode(addr, graph.degree(addr))
+            ]
+            for hop1_addr in expandable_hop1[:10]:  # 최대 10개만 (Rate limit 고려)
+                if should_stop is not None and should_stop():
+                    break
                 try:
                     hop1_txs = collector.collect_address_transactions(
                         address=hop1_addr,
@@ -353,7 +365,13 @@ def _build_3hop_graph_data(
             
             # 3-hop: 2-hop 주소들의 거래 수집 (선택적, 더 제한적)
             if max_hops >= 3:
-                for hop2_addr in list(hop2_addresses)[:5]:  # 최대 5개만
+                expandable_hop2 = [
+                    addr for addr in hop2_addresses
+                    if not policy.is_supernode(addr, graph.degree(addr))
+                ]
+                for hop2_addr in expandable_hop2[:5]:  # 최대 5개만
+                    if should_stop is not None and should_stop():
+                        break
                     try:
                         hop2_txs = collector.collect_address_transactions(
                             address=hop2_addr,
@@ -390,11 +408,7 @@ def _build_3hop_graph_data(
     # 메인 주소의 엔티티 정보 확인
     main_entity_name = None
     main_entity_type = "Unknown"
-    known_addresses = {
-        "0x7a250d5630b4cf539739df2c5dacb4c659f2488d": {"name": "Uniswap", "type": "DEX", "icon": "🦄"},
-        "0xe592427a0aece92de3edee1f18e0157c05861564": {"name": "Uniswap V3", "type": "DEX", "icon": "🦄"},
-        "0x3f5ce5fbfe3e9af3971dd833d26ba9b5c936f0be": {"name": "Binance", "type": "Exchange", "icon": "🏦"},
-    }
+    known_addresses = KNOWN_SERVICE_ADDRESSES
     if main_address_lower in known_addresses:
         main_entity_info = known_addresses[main_address_lower]
         main_entity_name = main_entity_info["name"]
@@ -678,32 +692,353 @@ def _build_3hop_graph_data(
         }
     }
 
-# Stage 1 + Stage 2 스코어러 초기화
-stage1_scorer = Stage1Scorer(rule_weight=0.9, graph_weight=0.1)
-stage2_scorer = None  # 필요시 로드
+# Stage 1 + Stage 2 스코어러 (지연 로딩, Stage 2 모델은 models/manifest.json 기준)
+stage1_scorer = None  # 필요시 로드
+model_registry = ModelRegistry(project_root / "models")
+supernode_policy = None  # 필요시 로드
 
 
-def load_stage2_scorer():
-    """Stage 2 스코어러 로드 (지연 로딩)"""
-    global stage2_scorer
-    if stage2_scorer is None:
-        try:
-            # 최적화된 모델 우선 사용, 없으면 기존 모델 사용
-            model_path = project_root / "models" / "improved_stage2_model.pkl"
-            if not model_path.exists():
-                model_path = project_root / "models" / "stage2_scorer_gradient_boosting.pkl"
-            if not model_path.exists():
-                model_path = project_root / "data" / "dataset" / "stage2_scorer_gradient_boosting.pkl"
-            
-            if model_path.exists():
-                stage2_scorer = Stage2Scorer()
-                stage2_scorer.load_model(model_path)
-                print(f"✅ Stage 2 모델 로드 완료: {model_path.name}")
-            else:
-                print("⚠️  Stage 2 모델 파일을 찾을 수 없습니다. Stage 1만 사용합니다.")
-        except Exception as e:
-            print(f"⚠️  Stage 2 모델 로드 실패: {e}. Stage 1만 사용합니다.")
-    return stage2_scorer
+def load_supernode_policy() -> SupernodePolicy:
+    """슈퍼노드 정책 로드 (지연 로딩, CEX/브릿지/알려진 서비스 주소)"""
+    global supernode_policy
+    if supernode_policy is None:
+        supernode_policy = SupernodePolicy.from_list_loader()
+    return supernode_policy
+
+
+def load_stage1_scorer() -> Stage1Scorer:
+    """Stage 1 스코어러 로드 (지연 로딩, 룰북/리스트 로드)"""
+    global stage1_scorer
+    if stage1_scorer is None:
+        stage1_scorer = Stage1Scorer(rule_weight=0.9, graph_weight=0.1)
+    return stage1_scorer
+
+
+def load_stage2_scorer() -> Optional[Stage2Scorer]:
+    """Stage 2 스코어러 로드 (레지스트리의 primary 버전, 지연 로딩)"""
+    try:
+        scorer = model_registry.get("stage2")
+        if scorer is None:
+            print("⚠️  Stage 2 모델이 매니페스트에 없습니다. Stage 1만 사용합니다.")
+        return scorer
+    except Exception as e:
+        print(f"⚠️  Stage 2 모델 로드 실패: {e}. Stage 1만 사용합니다.")
+        return None
+
+
+def warm_up_models() -> Dict[str, Any]:
+    """Stage 1 스코어러와 매니페스트의 워밍업 대상 모델을 미리 로드 (서버 시작 시 백그라운드 실행)"""
+    try:
+        load_stage1_scorer()
+    except Exception as e:
+        print(f"⚠️  Stage 1 스코어러 로드 실패: {e}")
+    return model_registry.warm_up()
+
+
+def readiness() -> Dict[str, Any]:
+    """준비 상태 (Stage 1 로드 여부 + 모델 레지스트리 상태)"""
+    status = model_registry.status()
+    status["stage1_loaded"] = stage1_scorer is not None
+    status["ready"] = status["ready"] and status["stage1_loaded"]
+    return status
+
+
+def _report(job: Optional[Job], stage: str, total: Optional[int] = None) -> None:
+    """비동기 작업이면 진행 단계 기록 (마감 시간이 지나면 JobDeadlineExceeded)"""
+    if job is not None:
+        job.report(stage=stage, total=total)
+
+
+def _run_demo_analysis(data: Dict[str, Any], job: Optional[Job] = None) -> Tuple[Dict[str, Any], int]:
+    """
+    데모 주소 분석 실행 (동기 요청과 비동기 작업 공용)
+    
+    Args:
+        data: 요청 본문 (address는 검증된 상태)
+        job: 비동기 작업 (단계마다 진행 상황 기록, None이면 동기 요청)
+    
+    Returns:
+        (응답 JSON, 상태 코드)
+    """
+    address = data.get("address") or data.get("target_address")
+    chain = data.get("chain", "ethereum")
+    transactions = data.get("transactions", [])
+    analysis_type = data.get("analysis_type", "advanced")
+    use_etherscan = data.get("use_etherscan", False)  # Etherscan API 사용 여부
+    etherscan_api_key = data.get("etherscan_api_key") or "91FZVKNIX7GYPESECU5PHPZIMKD72REX43"  # 사용자 제공 API 키 또는 기본값
+    max_hops = data.get("max_hops", 3)  # 기본 3-hop
+    
+    _report(job, "collect")
+    
+    # 거래 데이터가 없으면 자동으로 수집
+    if not transactions:
+        # 1. 레거시 데이터에서 먼저 시도
+        transactions = _load_transactions_from_legacy(address, chain)
+        
+        # 2. 레거시 데이터가 없고 Etherscan 사용이 활성화되어 있으면 API 호출
+        if not transactions and use_etherscan:
+            try:
+                etherscan_client = EtherscanClient(api_key=etherscan_api_key, chain=chain)
+                # 최근 100개 거래만 가져오기 (Rate limit 고려)
+                raw_txs = etherscan_client.get_transactions(
+                    address=address,
+                    page=1,
+                    offset=100,  # 최대 100개
+                    sort="desc"  # 최신순
+                )
+                
+                # Etherscan 응답을 표준 형식으로 변환
+                transactions = []
+                for raw_tx in raw_txs:
+                    normalized = etherscan_client.normalize_transaction(raw_tx, chain)
+                    
+                    # 타임스탬프 변환 (ISO -> Unix timestamp)
+                    timestamp_str = normalized.get("timestamp", "")
+                    timestamp = 0
+                    if timestamp_str:
+                        try:
+                            from datetime import datetime
+                            if timestamp_str.endswith("Z"):
+                                timestamp_str = timestamp_str[:-1] + "+00:00"
+                            dt = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+                            timestamp = int(dt.timestamp())
+                        except:
+                            pass
+                    
+                    # SDN/Mixer/Bridge 리스트 확인
+                    list_loader = ListLoader()
+                    sdn_list = list_loader.get_sdn_list()
+                    mixer_list = list_loader.get_mixer_list()
+                    bridge_list = list_loader.get_bridge_list()
+                    
+                    from_addr = normalized.get("from", "").lower()
+                    to_addr = normalized.get("to", "").lower()
+                    
+                    # 표준 형식으로 변환
+                    tx = {
+                        "tx_hash": normalized.get("tx_hash", ""),
+                        "from": normalized.get("from", ""),
+                        "to": normalized.get("to", ""),
+                        "timestamp": timestamp,
+                        "usd_value": normalized.get("amount_usd", 0.0),
+                        "value": normalized.get("value_wei", 0),
+                        "chain": chain,
+                        "block_height": normalized.get("block_height", 0),
+                        "is_sanctioned": (from_addr in sdn_list or to_addr in sdn_list),
+                        "is_mixer": (from_addr in mixer_list or to_addr in mixer_list),
+                        "is_bridge": (from_addr in bridge_list or to_addr in bridge_list),
+                    }
+                    transactions.append(tx)
+                
+                print(f"✅ Etherscan에서 {len(transactions)}개 거래 수집: {address}")
+            except Exception as e:
+                print(f"⚠️  Etherscan API 호출 실패: {e}")
+                # Etherscan 실패해도 레거시 데이터가 있으면 계속 진행
+                if not transactions:
+                    return {
+                        "error": f"거래 데이터를 찾을 수 없습니다. 레거시 데이터와 Etherscan API 모두 실패했습니다.",
+                        "details": str(e)
+                    }, 404
+        elif not transactions:
+            # 거래 데이터가 없으면 경고 메시지와 함께 기본 분석 진행
+            print(f"⚠️  거래 데이터 없음: {address} (레거시 데이터와 Etherscan 모두 사용 안 함)")
+    
+    # Stage 1 분석
+    _report(job, "stage1", total=len(transactions))
+    # 거래 데이터를 Stage 1 형식으로 변환
+    tx_data_list = []
+    ml_features_list = []
+    tx_context_list = []
+    
+    for tx in transactions:
+        # Stage 1용 거래 데이터
+        tx_data = {
+            "from": tx.get("from", ""),
+            "to": tx.get("to", ""),
+            "usd_value": tx.get("usd_value", tx.get("amount_usd", 0)),
+            "timestamp": tx.get("timestamp", 0),
+            "tx_hash": tx.get("tx_hash", ""),
+            "chain": chain,
+            "is_sanctioned": tx.get("is_sanctioned", False),
+            "is_mixer": tx.get("is_mixer", False),
+            "is_bridge": tx.get("is_bridge", False),
+        }
+        tx_data_list.append(tx_data)
+        
+        # ML features (간단한 버전)
+        ml_features = {
+            "fan_in_count": 0,
+            "fan_out_count": 0,
+            "pattern_score": 0.0,
+            "ppr_score": 0.0,
+            "sdn_ppr": 0.0,
+            "mixer_ppr": 0.0,
+            "n_theta": 0.0,
+            "n_omega": 0.0,
+        }
+        ml_features_list.append(ml_features)
+        
+        # Transaction context
+        tx_context = {
+            "num_transactions": len(transactions),
+            "graph_nodes": 0,
+            "graph_edges": 0,
+            "is_sanctioned": tx.get("is_sanctioned", False),
+            "is_mixer": tx.get("is_mixer", False),
+        }
+        tx_context_list.append(tx_context)
+    
+    # Stage 1 점수 계산 (첫 번째 거래 기준 또는 전체 평균)
+    if tx_data_list:
+        # 거래 전체를 한 번에 계산 (응답에는 평균만 쓰므로 거래별 설명은 만들지 않음)
+        stage1_results = load_stage1_scorer().calculate_risk_scores(
+            list(zip(tx_data_list, ml_features_list, tx_context_list))
+        )
+        if any(result is None for result in stage1_results):
+            raise ValueError("Stage 1 점수 계산 실패")
+        
+        # 평균 점수 계산
+        rule_score = sum(r["rule_score"] for r in stage1_results) / len(stage1_results)
+        graph_score = sum(r["graph_score"] for r in stage1_results) / len(stage1_results)
+        stage1_score = sum(r["risk_score"] for r in stage1_results) / len(stage1_results)
+        
+        # 발동된 룰 수집
+        all_fired_rules = []
+        for result in stage1_results:
+            all_fired_rules.extend(result.get("fired_rules", []))
+        
+        # 중복 제거
+        unique_rules = {}
+        for rule in all_fired_rules:
+            rule_id = rule.get("rule_id", "")
+            if rule_id and rule_id not in unique_rules:
+                unique_rules[rule_id] = rule
+        
+        fired_rules = list(unique_rules.values())
+    else:
+        # 거래 데이터가 없을 때
+        rule_score = 0.0
+        graph_score = 0.0
+        stage1_score = 0.0
+        fired_rules = []
+    
+    # Stage 2 점수 계산 (선택적)
+    _report(job, "stage2")
+    stage2_score = None
+    stage2_version = None
+    shadow_scores = {}
+    if tx_data_list and stage1_results:
+        stage2_scorer_obj = load_stage2_scorer()
+        if stage2_scorer_obj:
+            try:
+                # Stage 2: 주소의 전체 거래를 한 번에 예측 (1단계 결과 재사용)
+                samples = [
+                    {**tx_data, "ml_features": ml_features, "tx_context": tx_context}
+                    for tx_data, ml_features, tx_context in zip(tx_data_list, ml_features_list, tx_context_list)
+                ]
+                stage2_batch = stage2_scorer_obj.score_batch(
+                    samples,
+                    stage1_results=stage1_results,
+                    return_components=True
+                )
+                stage2_score = float(stage2_batch["ml_score"].mean())  # 거래별 Fraud 확률 점수의 평균
+                stage2_version = model_registry.entry("stage2").version
+                
+                # 그림자 채점: 같은 입력으로 다른 버전을 채점해 비교용으로 기록 (응답 점수에는 미반영)
+                for shadow_entry, shadow_scorer in model_registry.shadows("stage2"):
+                    try:
+                        shadow_batch = shadow_scorer.score_batch(
+                            samples,
+                            stage1_results=stage1_results,
+                            return_components=True
+                        )
+                        shadow_scores[shadow_entry.version] = round(float(shadow_batch["ml_score"].mean()), 2)
+                    except Exception as e:
+                        print(f"⚠️  그림자 채점 실패 ({shadow_entry.key}): {e}")
+                if shadow_scores:
+                    print(f"🔍 그림자 채점 {address}: {stage2_version}={stage2_score:.2f}, {shadow_scores}")
+                
+                # Stage 1 + Stage 2 결합 (가중치: 0.6, 0.4)
+                final_score = 0.6 * stage1_score + 0.4 * stage2_score
+            except Exception as e:
+                print(f"⚠️  Stage 2 예측 실패: {e}")
+                final_score = stage1_score
+        else:
+            final_score = stage1_score
+    else:
+        final_score = stage1_score
+    
+    # Risk Level 결정
+    if final_score >= 80:
+        risk_level = "critical"
+    elif final_score >= 60:
+        risk_level = "high"
+    elif final_score >= 30:
+        risk_level = "medium"
+    else:
+        risk_level = "low"
+    
+    # Risk Tags 생성
+    risk_tags = []
+    if any(r.get("rule_id", "").startswith("E-101") for r in fired_rules):
+        risk_tags.append("mixer_inflow")
+    if any(r.get("rule_id", "").startswith("C-001") for r in fired_rules):
+        risk_tags.append("sanction_exposure")
+    if any(r.get("rule_id", "").startswith("C-003") for r in fired_rules):
+        risk_tags.append("high_value_transfer")
+    if any(r.get("rule_id", "").startswith("B-501") for r in fired_rules):
+        risk_tags.append("high_value_buckets")
+    
+    # Explanation 생성
+    if fired_rules:
+        top_rule = max(fired_rules, key=lambda r: r.get("score", 0))
+        explanation = f"{top_rule.get('rule_id', 'Unknown')} 룰이 발동되어 {risk_level} 리스크로 분류됨."
+    else:
+        explanation = "발동된 룰이 없어 낮은 리스크로 분류됨."
+    
+    # 3-hop 그래프 구축 및 그래프 데이터 생성
+    _report(job, "graph")
+    graph_data = _build_3hop_graph_data(
+        address, transactions, fired_rules, risk_tags, max_hops=max_hops, 
+        chain=chain, etherscan_api_key=etherscan_api_key, use_etherscan=use_etherscan,
+        should_stop=job.deadline_passed if job is not None else None
+    )
+    _report(job, "stats")
+    
+    # IKNA 스타일 상세 정보 계산
+    address_stats = _calculate_address_stats(address, transactions, graph_data)
+    
+    return {
+        "target_address": address,
+        "risk_score": round(final_score, 2),
+        "risk_level": risk_level,
+        "rule_score": round(rule_score, 2),
+        "graph_score": round(graph_score, 2),
+        "stage1_score": round(stage1_score, 2),
+        "stage2_score": round(stage2_score, 2) if stage2_score is not None else None,
+        "stage2_model_version": stage2_version,
+        "shadow_scores": shadow_scores,
+        "risk_tags": risk_tags,
+        "fired_rules": [
+            {
+                "rule_id": r.get("rule_id", ""),
+                "score": r.get("score", 0)
+            }
+            for r in fired_rules
+        ],
+        "explanation": explanation,
+        "graph": graph_data,  # 그래프 데이터 추가
+        "transactions": transactions,  # 거래 목록 추가 (오른쪽 패널용)
+        "address_stats": address_stats  # IKNA 스타일 상세 정보
+    }, 200
+
+
+def _run_demo_job(job: Job, data: Dict[str, Any]) -> Dict[str, Any]:
+    """비동기 작업: 데모 주소 분석 (실패 응답이면 작업 실패로 기록)"""
+    payload, status = _run_demo_analysis(data, job=job)
+    if status != 200:
+        raise RuntimeError(payload.get("error", f"HTTP {status}"))
+    return payload
 
 
 @demo_analysis_bp.route("/address/demo", methods=["POST"])
@@ -715,7 +1050,10 @@ def analyze_address_demo():
     tags:
       - Demo
     summary: 주소 리스크 분석 (데모용)
-    description: Stage 1 (Rule-based + Graph) + Stage 2 (AI) 통합 분석
+    description: |
+      Stage 1 (Rule-based + Graph) + Stage 2 (AI) 통합 분석
+      async=true (또는 callback_url 지정)이면 작업 큐에 제출하고 202와 job_id를 바로 돌려준다 (use_etherscan 3-hop 분석용).
+      결과는 GET /api/jobs/{job_id}로 조회한다.
     consumes:
       - application/json
     produces:
@@ -747,6 +1085,20 @@ def analyze_address_demo():
               type: string
               description: 분석 타입 (basic/advanced)
               example: "advanced"
+            use_etherscan:
+              type: boolean
+              description: 거래 데이터가 없으면 Etherscan에서 수집하고 2-hop/3-hop까지 확장
+              example: false
+            async:
+              type: boolean
+              description: true면 비동기 작업으로 제출 (202, GET /api/jobs/{job_id}로 결과 조회)
+              example: false
+            callback_url:
+              type: string
+              description: 작업 완료 시 작업 상태(JSON)를 POST할 URL (지정하면 비동기 작업, AML_JOB_CALLBACK_ALLOWED_HOSTS의 공인 호스트만 허용, 설정이 없으면 400)
+            deadline_seconds:
+              type: number
+              description: 비동기 작업 마감 시간(초), 넘으면 남은 hop 확장을 멈추고 expired
     responses:
       200:
         description: 분석 성공
@@ -767,6 +1119,12 @@ def analyze_address_demo():
               type: number
             stage2_score:
               type: number
+            stage2_model_version:
+              type: string
+              description: Stage 2 점수를 낸 모델 버전 (models/manifest.json)
+            shadow_scores:
+              type: object
+              description: 그림자 채점 버전별 Stage 2 점수 (최종 점수에는 미반영)
             risk_tags:
               type: array
               items:
@@ -777,10 +1135,14 @@ def analyze_address_demo():
                 type: object
             explanation:
               type: string
+      202:
+        description: 비동기 작업 제출됨 (job_id, status_url, Location 헤더)
       400:
         description: 잘못된 요청
       500:
         description: 서버 오류
+      503:
+        description: 비동기 작업 큐가 가득 참
     """
     try:
         data = request.get_json()
@@ -789,252 +1151,16 @@ def analyze_address_demo():
             return jsonify({"error": "Request body is required"}), 400
         
         address = data.get("address") or data.get("target_address")
-        chain = data.get("chain", "ethereum")
-        transactions = data.get("transactions", [])
-        analysis_type = data.get("analysis_type", "advanced")
-        use_etherscan = data.get("use_etherscan", False)  # Etherscan API 사용 여부
-        etherscan_api_key = data.get("etherscan_api_key") or "91FZVKNIX7GYPESECU5PHPZIMKD72REX43"  # 사용자 제공 API 키 또는 기본값
-        max_hops = data.get("max_hops", 3)  # 기본 3-hop
-        
         if not address:
             return jsonify({"error": "Missing required field: address"}), 400
         
-        # 거래 데이터가 없으면 자동으로 수집
-        if not transactions:
-            # 1. 레거시 데이터에서 먼저 시도
-            transactions = _load_transactions_from_legacy(address, chain)
-            
-            # 2. 레거시 데이터가 없고 Etherscan 사용이 활성화되어 있으면 API 호출
-            if not transactions and use_etherscan:
-                try:
-                    etherscan_client = EtherscanClient(api_key=etherscan_api_key, chain=chain)
-                    # 최근 100개 거래만 가져오기 (Rate limit 고려)
-                    raw_txs = etherscan_client.get_transactions(
-                        address=address,
-                        page=1,
-                        offset=100,  # 최대 100개
-                        sort="desc"  # 최신순
-                    )
-                    
-                    # Etherscan 응답을 표준 형식으로 변환
-                    transactions = []
-                    for raw_tx in raw_txs:
-                        normalized = etherscan_client.normalize_transaction(raw_tx, chain)
-                        
-                        # 타임스탬프 변환 (ISO -> Unix timestamp)
-                        timestamp_str = normalized.get("timestamp", "")
-                        timestamp = 0
-                        if timestamp_str:
-                            try:
-                                from datetime import datetime
-                                if timestamp_str.endswith("Z"):
-                                    timestamp_str = timestamp_str[:-1] + "+00:00"
-                                dt = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-                                timestamp = int(dt.timestamp())
-                            except:
-                                pass
-                        
-                        # SDN/Mixer/Bridge 리스트 확인
-                        list_loader = ListLoader()
-                        sdn_list = list_loader.get_sdn_list()
-                        mixer_list = list_loader.get_mixer_list()
-                        bridge_list = list_loader.get_bridge_list()
-                        
-                        from_addr = normalized.get("from", "").lower()
-                        to_addr = normalized.get("to", "").lower()
-                        
-                        # 표준 형식으로 변환
-                        tx = {
-                            "tx_hash": normalized.get("tx_hash", ""),
-                            "from": normalized.get("from", ""),
-                            "to": normalized.get("to", ""),
-                            "timestamp": timestamp,
-                            "usd_value": normalized.get("amount_usd", 0.0),
-                            "value": normalized.get("value_wei", 0),
-                            "chain": chain,
-                            "block_height": normalized.get("block_height", 0),
-                            "is_sanctioned": (from_addr in sdn_list or to_addr in sdn_list),
-                            "is_mixer": (from_addr in mixer_list or to_addr in mixer_list),
-                            "is_bridge": (from_addr in bridge_list or to_addr in bridge_list),
-                        }
-                        transactions.append(tx)
-                    
-                    print(f"✅ Etherscan에서 {len(transactions)}개 거래 수집: {address}")
-                except Exception as e:
-                    print(f"⚠️  Etherscan API 호출 실패: {e}")
-                    # Etherscan 실패해도 레거시 데이터가 있으면 계속 진행
-                    if not transactions:
-                        return jsonify({
-                            "error": f"거래 데이터를 찾을 수 없습니다. 레거시 데이터와 Etherscan API 모두 실패했습니다.",
-                            "details": str(e)
-                        }), 404
-            elif not transactions:
-                # 거래 데이터가 없으면 경고 메시지와 함께 기본 분석 진행
-                print(f"⚠️  거래 데이터 없음: {address} (레거시 데이터와 Etherscan 모두 사용 안 함)")
-        
-        # Stage 1 분석
-        # 거래 데이터를 Stage 1 형식으로 변환
-        tx_data_list = []
-        ml_features_list = []
-        tx_context_list = []
+        # Etherscan 3-hop 수집은 수십 초 걸릴 수 있으므로 async=true면 작업 큐에서 실행
+        if wants_async(data):
+            kind = "demo_etherscan" if data.get("use_etherscan") else "demo"
+            return submit_analysis_job(kind, lambda job: _run_demo_job(job, data), data)
         
-        for tx in transactions:
-            # Stage 1용 거래 데이터
-            tx_data = {
-                "from": tx.get("from", ""),
-                "to": tx.get("to", ""),
-                "usd_value": tx.get("usd_value", tx.get("amount_usd", 0)),
-                "timestamp": tx.get("timestamp", 0),
-                "tx_hash": tx.get("tx_hash", ""),
-                "chain": chain,
-                "is_sanctioned": tx.get("is_sanctioned", False),
-                "is_mixer": tx.get("is_mixer", False),
-                "is_bridge": tx.get("is_bridge", False),
-            }
-            tx_data_list.append(tx_data)
-            
-            # ML features (간단한 버전)
-            ml_features = {
-                "fan_in_count": 0,
-                "fan_out_count": 0,
-                "pattern_score": 0.0,
-                "ppr_score": 0.0,
-                "sdn_ppr": 0.0,
-                "mixer_ppr": 0.0,
-                "n_theta": 0.0,
-                "n_omega": 0.0,
-            }
-            ml_features_list.append(ml_features)
-            
-            # Transaction context
-            tx_context = {
-                "num_transactions": len(transactions),
-                "graph_nodes": 0,
-                "graph_edges": 0,
-                "is_sanctioned": tx.get("is_sanctioned", False),
-                "is_mixer": tx.get("is_mixer", False),
-            }
-            tx_context_list.append(tx_context)
-        
-        # Stage 1 점수 계산 (첫 번째 거래 기준 또는 전체 평균)
-        if tx_data_list:
-            stage1_results = []
-            for tx_data, ml_features, tx_context in zip(tx_data_list, ml_features_list, tx_context_list):
-                result = stage1_scorer.calculate_risk_score(tx_data, ml_features, tx_context)
-                stage1_results.append(result)
-            
-            # 평균 점수 계산
-            rule_score = sum(r["rule_score"] for r in stage1_results) / len(stage1_results)
-            graph_score = sum(r["graph_score"] for r in stage1_results) / len(stage1_results)
-            stage1_score = sum(r["risk_score"] for r in stage1_results) / len(stage1_results)
-            
-            # 발동된 룰 수집
-            all_fired_rules = []
-            for result in stage1_results:
-                all_fired_rules.extend(result.get("fired_rules", []))
-            
-            # 중복 제거
-            unique_rules = {}
-            for rule in all_fired_rules:
-                rule_id = rule.get("rule_id", "")
-                if rule_id and rule_id not in unique_rules:
-                    unique_rules[rule_id] = rule
-            
-            fired_rules = list(unique_rules.values())
-        else:
-            # 거래 데이터가 없을 때
-            rule_score = 0.0
-            graph_score = 0.0
-            stage1_score = 0.0
-            fired_rules = []
-        
-        # Stage 2 점수 계산 (선택적)
-        stage2_score = None
-        if tx_data_list and stage1_results:
-            stage2_scorer_obj = load_stage2_scorer()
-            if stage2_scorer_obj:
-                try:
-                    # Stage 2용 feature 추출
-                    features = stage2_scorer_obj._extract_features(
-                        stage1_results[0],  # 첫 번째 결과 사용
-                        ml_features_list[0] if ml_features_list else {},
-                        tx_context_list[0] if tx_context_list else {}
-                    )
-                    
-                    # Stage 2 예측
-                    ml_proba = stage2_scorer_obj.model.predict_proba(
-                        stage2_scorer_obj.scaler.transform(features.reshape(1, -1))
-                    )[0]
-                    stage2_score = ml_proba[1] * 100.0  # Fraud 확률을 점수로 변환
-                    
-                    # Stage 1 + Stage 2 결합 (가중치: 0.6, 0.4)
-                    final_score = 0.6 * stage1_score + 0.4 * stage2_score
-                except Exception as e:
-                    print(f"⚠️  Stage 2 예측 실패: {e}")
-                    final_score = stage1_score
-            else:
-                final_score = stage1_score
-        else:
-            final_score = stage1_score
-        
-        # Risk Level 결정
-        if final_score >= 80:
-            risk_level = "critical"
-        elif final_score >= 60:
-            risk_level = "high"
-        elif final_score >= 30:
-            risk_level = "medium"
-        else:
-            risk_level = "low"
-        
-        # Risk Tags 생성
-        risk_tags = []
-        if any(r.get("rule_id", "").startswith("E-101") for r in fired_rules):
-            risk_tags.append("mixer_inflow")
-        if any(r.get("rule_id", "").startswith("C-001") for r in fired_rules):
-            risk_tags.append("sanction_exposure")
-        if any(r.get("rule_id", "").startswith("C-003") for r in fired_rules):
-            risk_tags.append("high_value_transfer")
-        if any(r.get("rule_id", "").startswith("B-501") for r in fired_rules):
-            risk_tags.append("high_value_buckets")
-        
-        # Explanation 생성
-        if fired_rules:
-            top_rule = max(fired_rules, key=lambda r: r.get("score", 0))
-            explanation = f"{top_rule.get('rule_id', 'Unknown')} 룰이 발동되어 {risk_level} 리스크로 분류됨."
-        else:
-            explanation = "발동된 룰이 없어 낮은 리스크로 분류됨."
-        
-        # 3-hop 그래프 구축 및 그래프 데이터 생성
-        graph_data = _build_3hop_graph_data(
-            address, transactions, fired_rules, risk_tags, max_hops=max_hops, 
-            chain=chain, etherscan_api_key=etherscan_api_key, use_etherscan=use_etherscan
-        )
-        
-        # IKNA 스타일 상세 정보 계산
-        address_stats = _calculate_address_stats(address, transactions, graph_data)
-        
-        return jsonify({
-            "target_address": address,
-            "risk_score": round(final_score, 2),
-            "risk_level": risk_level,
-            "rule_score": round(rule_score, 2),
-            "graph_score": round(graph_score, 2),
-            "stage1_score": round(stage1_score, 2),
-            "stage2_score": round(stage2_score, 2) if stage2_score is not None else None,
-            "risk_tags": risk_tags,
-            "fired_rules": [
-                {
-                    "rule_id": r.get("rule_id", ""),
-                    "score": r.get("score", 0)
-                }
-                for r in fired_rules
-            ],
-            "explanation": explanation,
-            "graph": graph_data,  # 그래프 데이터 추가
-            "transactions": transactions,  # 거래 목록 추가 (오른쪽 패널용)
-            "address_stats": address_stats  # IKNA 스타일 상세 정보
-        }), 200
+        payload, status = _run_demo_analysis(data)
+        return jsonify(payload), status
     
     except Exception as e:
         import traceback
@@ -4,8 +4,11 @@
 Rule-based + MPOCryptoML 통합 분석
 """
 
+from typing import Dict, Any
+
 from flask import Blueprint, request, jsonify
 from core.scoring.hybrid_address_analyzer import HybridAddressAnalyzer
+from core.scoring.result_cache import get_result_cache
 
 hybrid_address_analysis_bp = Blueprint("hybrid_address_analysis", __name__)
 
@@ -28,6 +31,9 @@ def analyze_address_hybrid():
       - MPOCryptoML: 그래프 패턴 분석 점수 (30%)
       
       **3-hop 데이터가 제공되면 MPOCryptoML 분석이 활성화됩니다.**
+      
+      같은 주소/거래/analysis_type/룰·리스트·모델 버전의 결과는 캐시에서 응답합니다 (X-Cache: HIT|MISS 헤더).
+      캐시 적중 시 본문은 처음 분석한 결과 그대로이고(completed_at 포함), X-Cache-Age 헤더에 저장 후 지난 초를 줍니다.
     consumes:
       - application/json
     produces:
@@ -70,6 +76,10 @@ def analyze_address_hybrid():
                 - rule_only: Rule-based만 사용
                 - hybrid: Rule-based + MPOCryptoML (기본값)
               example: "hybrid"
+            cache:
+              type: boolean
+              description: false면 분석 결과 캐시를 사용하지 않음 (기본 true)
+              example: true
     responses:
       200:
         description: 분석 성공
@@ -132,39 +142,56 @@ def analyze_address_hybrid():
                 "explanation": "No transactions provided"
             }), 200
         
-        # 하이브리드 분석기 초기화
-        analyzer = HybridAddressAnalyzer(use_ml=(analysis_type == "hybrid"))
+        def compute() -> Dict[str, Any]:
+            # 하이브리드 분석기 초기화
+            analyzer = HybridAddressAnalyzer(use_ml=(analysis_type == "hybrid"))
+            
+            # 분석 수행
+            result = analyzer.analyze_address(
+                address=address,
+                chain=chain,
+                transactions=transactions,
+                transactions_3hop=transactions_3hop,
+                analysis_type=analysis_type
+            )
+            
+            # 결과 반환
+            return {
+                "target_address": result.address,
+                "chain": result.chain,
+                "risk_score": round(result.risk_score, 2),
+                "risk_level": result.risk_level,
+                "rule_score": round(result.rule_score, 2),
+                "ml_score": round(result.ml_score, 2),
+                "ml_details": result.ml_details,
+                "risk_tags": result.risk_tags,
+                "fired_rules": [
+                    {
+                        "rule_id": rule.get("rule_id", ""),
+                        "score": rule.get("score", 0)
+                    }
+                    for rule in result.fired_rules
+                ],
+                "explanation": result.explanation,
+                "completed_at": result.completed_at,
+                "analysis_summary": result.analysis_summary
+            }
         
-        # 분석 수행
-        result = analyzer.analyze_address(
-            address=address,
-            chain=chain,
-            transactions=transactions,
-            transactions_3hop=transactions_3hop,
-            analysis_type=analysis_type
-        )
-        
-        # 결과 반환
-        return jsonify({
-            "target_address": result.address,
-            "chain": result.chain,
-            "risk_score": round(result.risk_score, 2),
-            "risk_level": result.risk_level,
-            "rule_score": round(result.rule_score, 2),
-            "ml_score": round(result.ml_score, 2),
-            "ml_details": result.ml_details,
-            "risk_tags": result.risk_tags,
-            "fired_rules": [
-                {
-                    "rule_id": rule.get("rule_id", ""),
-                    "score": rule.get("score", 0)
-                }
-                for rule in result.fired_rules
-            ],
-            "explanation": result.explanation,
-            "completed_at": result.completed_at,
-            "analysis_summary": result.analysis_summary
-        }), 200
+        # 같은 주소/거래/버전으로 분석한 결과가 있으면 캐시에서 응답 (cache=false면 사용 안 함)
+        cache = get_result_cache()
+        cache_key = cache.key(
+            "address_hybrid", address, transactions, analysis_type,
+            chain=chain, transactions_3hop=transactions_3hop
+        ) if data.get("cache", True) is not False else None
+        payload, cache_age = cache.get_or_compute(cache_key, compute)
+        response = jsonify(payload)
+        if cache_age is None:
+            response.headers["X-Cache"] = "MISS"
+        else:
+            # 본문(completed_at 포함)은 처음 분석한 결과 그대로이므로 저장 후 지난 시간을 함께 알려 줌
+            response.headers["X-Cache"] = "HIT"
+            response.headers["X-Cache-Age"] = str(int(cache_age))
+        return response, 200
     
     except Exception as e:
         import traceback
@@ -0,0 +1,131 @@
+"""
+비동기 분석 작업 API 라우트
+
+async=true로 제출된 분석(advanced 주소 분석, Etherscan 3-hop 데모 분석)의 진행 상황과 결과 조회
+"""
+from typing import Dict, Any, Callable
+
+from flask import Blueprint, jsonify, url_for
+
+from api.job_queue import Job, JobQueueFull, get_job_queue
+
+jobs_bp = Blueprint("jobs", __name__)
+
+
+def wants_async(data: Dict[str, Any]) -> bool:
+    """요청 본문이 비동기 작업 제출인지 (async=true 또는 callback_url 지정)"""
+    return bool(data.get("async") or data.get("callback_url"))
+
+
+def submit_analysis_job(kind: str, fn: Callable[[Job], Dict[str, Any]], data: Dict[str, Any]):
+    """
+    분석 작업 제출 후 202 응답 (callback_url, deadline_seconds는 요청 본문에서 읽음)
+
+    Returns:
+        (응답, 상태 코드) - 202 제출됨, 400 잘못된 callback_url/deadline_seconds, 503 큐가 가득 참
+    """
+    try:
+        job = get_job_queue().submit(
+            kind,
+            fn,
+            callback_url=data.get("callback_url"),
+            deadline=data.get("deadline_seconds")
+        )
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    status_url = url_for("jobs.get_job", job_id=job.job_id)
+    response = jsonify({**job.to_dict(include_result=False), "status_url": status_url})
+    response.headers["Location"] = status_url
+    return response, 202
+
+
+@jobs_bp.route("/<job_id>", methods=["GET"])
+def get_job(job_id: str):
+    """
+    분석 작업 조회
+    ---
+    tags:
+      - Jobs
+    summary: 비동기 분석 작업의 진행 상황과 결과 조회
+    description: |
+      status는 queued → running → done / failed / expired 순서로 바뀐다.
+      done이면 result에 동기 요청과 같은 응답 본문이 들어 있고, failed/expired이면 error에 사유가 있다.
+      완료된 작업은 보관 시간(AML_JOB_RETENTION, 기본 1시간)이 지나면 삭제된다.
+    produces:
+      - application/json
+    parameters:
+      - in: path
+        name: job_id
+        type: string
+        required: true
+    responses:
+      200:
+        description: 작업 상태
+        schema:
+          type: object
+          properties:
+            job_id:
+              type: string
+            kind:
+              type: string
+              example: "address_advanced"
+            status:
+              type: string
+              enum: [queued, running, done, failed, expired]
+            progress:
+              type: object
+              properties:
+                stage:
+                  type: string
+                done:
+                  type: integer
+                total:
+                  type: integer
+            deadline_at:
+              type: string
+              format: date-time
+            callback_status:
+              type: string
+              description: 웹훅 전송 결과 (callback_url을 지정한 경우)
+            result:
+              type: object
+            error:
+              type: string
+      404:
+        description: 없는 작업 (또는 보관 시간이 지남)
+    """
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job not found: {job_id}"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@jobs_bp.route("", methods=["GET"])
+def job_queue_stats():
+    """
+    작업 큐 상태
+    ---
+    tags:
+      - Jobs
+    summary: 작업 큐 설정과 상태별 작업 수
+    responses:
+      200:
+        description: 큐 상태
+        schema:
+          type: object
+          properties:
+            workers:
+              type: integer
+            max_pending:
+              type: integer
+            callbacks_enabled:
+              type: boolean
+              description: callback_url 허용 여부 (AML_JOB_CALLBACK_ALLOWED_HOSTS 설정 시 true)
+            jobs:
+              type: object
+              example: {"queued": 1, "running": 2, "done": 10, "failed": 0, "expired": 0}
+    """
+    return jsonify(get_job_queue().stats()), 200
@@ -1,11 +1,22 @@
 """
 스코어링 API 라우트
 """
-from flask import Blueprint, request, jsonify
+import json
+from typing import Dict, Any, Iterable, Iterator, List
+
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from core.scoring.engine import TransactionScorer, TransactionInput, ScoringResult
 
 scoring_bp = Blueprint("scoring", __name__)
 
+# 배치 스코어링: 한 번에 파싱/스코어링해서 내보내는 트랜잭션 수
+BATCH_CHUNK_SIZE = 256
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+class InvalidTransaction(ValueError):
+    """잘못된 트랜잭션 입력 (400 응답)"""
+
 
 def _convert_chain_id_to_chain(chain_id: int) -> str:
     """체인 ID(숫자)를 체인 이름으로 변환"""
@@ -32,6 +43,89 @@ def _convert_chain_id_to_chain(chain_id: int) -> str:
     return chain_id_map.get(chain_id, "ethereum")  # 기본값: ethereum
 
 
+def _parse_transaction(data: Any) -> TransactionInput:
+    """
+    요청 JSON을 TransactionInput으로 변환
+    
+    Raises:
+        InvalidTransaction: 필수 필드가 없거나 chain_id가 잘못된 경우
+    """
+    if not data:
+        raise InvalidTransaction("Request body is required")
+    if not isinstance(data, dict):
+        raise InvalidTransaction("Transaction must be a JSON object")
+    
+    # chain_id를 chain으로 변환
+    chain_id = data.get("chain_id")
+    if chain_id is None:
+        # 하위 호환성: chain 문자열도 지원
+        chain_str = data.get("chain", "")
+        if chain_str:
+            # 문자열을 숫자로 변환 시도
+            chain_id_map_str = {
+                "ethereum": 1,
+                "arbitrum": 42161,
+                "avalanche": 43114,
+                "base": 8453,
+                "polygon": 137,
+                "bsc": 56,
+                "fantom": 250,
+                "optimism": 10,
+                "blast": 81457
+            }
+            chain_id = chain_id_map_str.get(chain_str.lower())
+    
+    if chain_id is None:
+        raise InvalidTransaction("Missing required field: chain_id")
+    
+    # chain_id를 정수로 변환
+    try:
+        chain_id = int(chain_id)
+    except (ValueError, TypeError):
+        raise InvalidTransaction("chain_id must be an integer")
+    
+    chain = _convert_chain_id_to_chain(chain_id)
+    
+    try:
+        return TransactionInput(
+            tx_hash=data["tx_hash"],
+            chain=chain,
+            timestamp=data["timestamp"],
+            block_height=data["block_height"],
+            target_address=data["target_address"],
+            counterparty_address=data["counterparty_address"],
+            label=data.get("label", data.get("entity_type", "unknown")),  # label로 변경, 하위 호환성 유지
+            is_sanctioned=data["is_sanctioned"],
+            is_known_scam=data["is_known_scam"],
+            is_mixer=data["is_mixer"],
+            is_bridge=data["is_bridge"],
+            amount_usd=float(data["amount_usd"]),
+            asset_contract=data["asset_contract"]
+        )
+    except KeyError as e:
+        raise InvalidTransaction(f"Missing required field: {e}")
+
+
+def _result_to_dict(result: ScoringResult) -> Dict[str, Any]:
+    """스코어링 결과 응답 JSON (입출력 포맷에 맞춤)"""
+    return {
+        "target_address": result.target_address,
+        "risk_score": int(result.risk_score),  # 정수로 변환
+        "risk_level": result.risk_level,
+        "risk_tags": result.risk_tags,
+        "fired_rules": [
+            {"rule_id": rule.rule_id, "score": int(rule.score)}  # 정수로 변환
+            for rule in result.fired_rules
+        ],
+        "explanation": result.explanation,
+        "completed_at": result.completed_at,
+        # 백엔드 요구 필드
+        "timestamp": result.timestamp,
+        "chain_id": result.chain_id,
+        "value": float(result.value)
+    }
+
+
 @scoring_bp.route("/transaction", methods=["POST"])
 def score_transaction():
     """
@@ -199,84 +293,141 @@ def score_transaction():
               example: "Scoring failed: ..."
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({"error": "Request body is required"}), 400
-        
-        # 입력 데이터 검증 및 변환
         try:
-            # chain_id를 chain으로 변환
-            chain_id = data.get("chain_id")
-            if chain_id is None:
-                # 하위 호환성: chain 문자열도 지원
-                chain_str = data.get("chain", "")
-                if chain_str:
-                    # 문자열을 숫자로 변환 시도
-                    chain_id_map_str = {
-                        "ethereum": 1,
-                        "arbitrum": 42161,
-                        "avalanche": 43114,
-                        "base": 8453,
-                        "polygon": 137,
-                        "bsc": 56,
-                        "fantom": 250,
-                        "optimism": 10,
-                        "blast": 81457
-                    }
-                    chain_id = chain_id_map_str.get(chain_str.lower())
-            
-            if chain_id is None:
-                return jsonify({"error": "Missing required field: chain_id"}), 400
-            
-            # chain_id를 정수로 변환
-            try:
-                chain_id = int(chain_id)
-            except (ValueError, TypeError):
-                return jsonify({"error": "chain_id must be an integer"}), 400
-            
-            chain = _convert_chain_id_to_chain(chain_id)
-            
-            tx_input = TransactionInput(
-                tx_hash=data["tx_hash"],
-                chain=chain,
-                timestamp=data["timestamp"],
-                block_height=data["block_height"],
-                target_address=data["target_address"],
-                counterparty_address=data["counterparty_address"],
-                label=data.get("label", data.get("entity_type", "unknown")),  # label로 변경, 하위 호환성 유지
-                is_sanctioned=data["is_sanctioned"],
-                is_known_scam=data["is_known_scam"],
-                is_mixer=data["is_mixer"],
-                is_bridge=data["is_bridge"],
-                amount_usd=float(data["amount_usd"]),
-                asset_contract=data["asset_contract"]
-            )
-        except KeyError as e:
-            return jsonify({"error": f"Missing required field: {e}"}), 400
+            tx_input = _parse_transaction(request.get_json())
+        except InvalidTransaction as e:
+            return jsonify({"error": str(e)}), 400
         
         # 스코어링 수행
         scorer = TransactionScorer()
         result = scorer.score_transaction(tx_input)
         
         # JSON 응답 생성 (입출력 포맷에 맞춤)
-        return jsonify({
-            "target_address": result.target_address,
-            "risk_score": int(result.risk_score),  # 정수로 변환
-            "risk_level": result.risk_level,
-            "risk_tags": result.risk_tags,
-            "fired_rules": [
-                {"rule_id": rule.rule_id, "score": int(rule.score)}  # 정수로 변환
-                for rule in result.fired_rules
-            ],
-            "explanation": result.explanation,
-            "completed_at": result.completed_at,
-            # 백엔드 요구 필드
-            "timestamp": result.timestamp,
-            "chain_id": result.chain_id,
-            "value": float(result.value)
-        }), 200
+        return jsonify(_result_to_dict(result)), 200
     
     except Exception as e:
         return jsonify({"error": f"Scoring failed: {str(e)}"}), 500
 
+
+def _iter_ndjson(stream) -> Iterator[Any]:
+    """NDJSON 본문을 줄 단위로 읽어 파싱 (빈 줄은 건너뜀, 잘못된 줄은 InvalidTransaction)"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield InvalidTransaction(f"Invalid JSON line: {e}")
+
+
+def _iter_chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """size개씩 묶어서 반환"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _score_batch_item(scorer: TransactionScorer, index: int, item: Any) -> Dict[str, Any]:
+    """배치 항목 하나 스코어링 (실패하면 error 필드, 배치는 계속 진행)"""
+    try:
+        if isinstance(item, InvalidTransaction):
+            raise item
+        result = scorer.score_transaction(_parse_transaction(item))
+        return {"index": index, **_result_to_dict(result)}
+    except InvalidTransaction as e:
+        return {"index": index, "error": str(e)}
+    except Exception as e:
+        return {"index": index, "error": f"Scoring failed: {str(e)}"}
+
+
+@scoring_bp.route("/transactions", methods=["POST"])
+def score_transactions():
+    """
+    여러 트랜잭션을 한 번에 스코어링합니다
+    JSON 배열 또는 NDJSON 스트림을 받아 결과를 NDJSON으로 스트리밍
+    ---
+    tags:
+      - Transaction Scoring
+    summary: 여러 트랜잭션을 한 번에 스코어링합니다
+    description: |
+      본문은 트랜잭션 JSON 배열(application/json) 또는 한 줄에 트랜잭션 하나인 NDJSON(application/x-ndjson)입니다.
+      NDJSON 본문은 스트리밍으로 읽으며, 256개씩 파싱/스코어링해서 청크가 끝날 때마다 결과 줄을 내보냅니다.
+      배치 전체가 하나의 스코어링 엔진을 공유하므로 윈도우 룰(C-004, B-101 등)은 배치 안의 앞선 거래를 히스토리로 사용합니다.
+      결과는 입력 순서대로 한 줄에 하나씩이며, 각 줄에는 입력 위치(index)와 /api/score/transaction과 같은 필드가 들어갑니다.
+      실패한 트랜잭션은 {"index": ..., "error": "..."} 줄로 표시하고 나머지는 계속 처리합니다.
+    consumes:
+      - application/json
+      - application/x-ndjson
+    produces:
+      - application/x-ndjson
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            description: /api/score/transaction 요청 본문과 같은 트랜잭션
+    responses:
+      200:
+        description: 스코어링 결과 (NDJSON, 입력 순서)
+        schema:
+          type: object
+          properties:
+            index:
+              type: integer
+              description: 입력에서의 위치 (0부터)
+              example: 0
+            risk_score:
+              type: integer
+              example: 78
+            risk_level:
+              type: string
+              example: "high"
+            error:
+              type: string
+              description: 실패한 트랜잭션만
+              example: "Missing required field: 'tx_hash'"
+      400:
+        description: 잘못된 요청 (JSON 본문이 배열이 아님)
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: "JSON body must be an array of transactions"
+      500:
+        description: 서버 오류
+    """
+    try:
+        if request.mimetype == "application/json":
+            items = request.get_json(silent=True)
+            if not isinstance(items, list):
+                return jsonify({"error": "JSON body must be an array of transactions"}), 400
+        else:
+            items = _iter_ndjson(request.stream)
+        
+        # 배치 전체가 같은 엔진 (룰북, 리스트, 윈도우 히스토리) 사용
+        scorer = TransactionScorer()
+    except Exception as e:
+        return jsonify({"error": f"Scoring failed: {str(e)}"}), 500
+    
+    dumps = current_app.json.dumps
+    
+    def generate() -> Iterator[str]:
+        index = 0
+        for chunk in _iter_chunks(items, BATCH_CHUNK_SIZE):
+            lines = []
+            for item in chunk:
+                lines.append(dumps(_score_batch_item(scorer, index, item)))
+                index += 1
+            yield "\n".join(lines) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
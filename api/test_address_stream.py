@@ -0,0 +1,126 @@
+"""
+주소 분석 NDJSON 스트리밍 테스트
+
+/api/analyze/address의 스트리밍 모드(stream=true 또는 Accept: application/x-ndjson)가
+start → timeline(TIMELINE_CHUNK_SIZE개씩) → summary 순서로 내보내는지, 타임라인이 analyze_address와 같고
+summary가 일반 JSON 응답과 같은지, 분석 중 실패하면 마지막 줄이 error인지 확인
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+from api.app import app
+from api.routes.address_analysis import TIMELINE_CHUNK_SIZE
+from core.scoring.address_analyzer import AddressAnalyzer
+
+TARGET = "0x" + "ab" * 20
+# 윈도우 룰이 발동하도록 현재 시각 근처, 호출마다 같은 거래가 되도록 고정
+START = datetime.now(timezone.utc) - timedelta(hours=2)
+
+
+def _transactions(n: int):
+    """믹서/제재/고액 유입과 유출이 섞인 거래 (입력은 시간 역순)"""
+    txs = []
+    for i in range(n):
+        counterparty = f"0x{(i % 9) + 100:040x}"
+        incoming = i % 3 != 0
+        txs.append({
+            "tx_hash": f"0xtx{i}",
+            "chain_id": 1,
+            "timestamp": (START + timedelta(seconds=20 * i)).isoformat().replace("+00:00", "Z"),
+            "block_height": 21000000 + i,
+            "from": counterparty if incoming else TARGET,
+            "to": TARGET if incoming else counterparty,
+            "amount_usd": [50.0, 1200.0, 9000.0, 150000.0][i % 4],
+            "label": "mixer" if i % 7 == 0 else "unknown",
+            "is_sanctioned": i % 13 == 0,
+            "is_known_scam": False,
+            "is_mixer": i % 7 == 0,
+            "is_bridge": False,
+            "asset_contract": "0xETH",
+        })
+    return list(reversed(txs))
+
+
+def _request(n: int, **extra):
+    return {"address": TARGET, "chain_id": 1, "transactions": _transactions(n), "cache": False, **extra}
+
+
+def _records(response):
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def _without_time(record):
+    return {k: v for k, v in record.items() if k not in ("completed_at", "type")}
+
+
+def test_stream_matches_json_response():
+    """timeline = analyze_address의 타임라인(시간순), summary = 일반 JSON 응답"""
+    n = TIMELINE_CHUNK_SIZE + 50
+    client = app.test_client()
+    records = _records(client.post("/api/analyze/address", json=_request(n, stream=True)))
+
+    assert records[0] == {"type": "start", "target_address": TARGET, "total_transactions": n}
+    assert [r["type"] for r in records[1:]] == ["timeline"] * n + ["summary"]
+
+    expected = AddressAnalyzer().analyze_address(TARGET, "ethereum", _transactions(n))
+    timeline = [{k: v for k, v in r.items() if k != "type"} for r in records[1:-1]]
+    assert timeline == json.loads(json.dumps(expected.timeline))
+    assert any(entry["fired_rules"] for entry in timeline)
+
+    response = client.post("/api/analyze/address", json=_request(n))
+    assert response.status_code == 200
+    assert _without_time(records[-1]) == _without_time(response.get_json())
+    assert records[-1]["fired_rules"]
+
+
+def test_accept_header_streams_in_chunks():
+    """Accept: application/x-ndjson이면 스트리밍, start 다음부터 TIMELINE_CHUNK_SIZE줄씩 나뉘어 전송"""
+    n = TIMELINE_CHUNK_SIZE * 2 + 10
+    client = app.test_client()
+    response = client.post(
+        "/api/analyze/address",
+        json=_request(n),
+        headers={"Accept": "application/x-ndjson"},
+        buffered=False
+    )
+    chunks = [chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk for chunk in response.response]
+    response.close()
+
+    line_counts = [chunk.count("\n") for chunk in chunks]
+    assert line_counts == [1, TIMELINE_CHUNK_SIZE, TIMELINE_CHUNK_SIZE, 10 + 1]
+    records = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert records[-1]["type"] == "summary" and len(records) == n + 2
+
+
+def test_stream_empty_transactions():
+    """거래가 없으면 start와 summary만"""
+    records = _records(app.test_client().post("/api/analyze/address", json=_request(0, stream=True)))
+    assert [r["type"] for r in records] == ["start", "summary"]
+    assert records[-1]["risk_score"] == 0 and records[-1]["fired_rules"] == []
+
+
+def test_stream_error_is_last_record(monkeypatch):
+    """분석 중 예외가 나면 이미 보낸 타임라인 뒤에 error 줄로 끝남"""
+    original = AddressAnalyzer.iter_analysis
+
+    def failing(self, *args, **kwargs):
+        for i, item in enumerate(original(self, *args, **kwargs)):
+            if i == 3:
+                raise RuntimeError("boom")
+            yield item
+
+    monkeypatch.setattr(AddressAnalyzer, "iter_analysis", failing)
+    records = _records(app.test_client().post("/api/analyze/address", json=_request(10, stream=True)))
+    assert [r["type"] for r in records] == ["start", "timeline", "timeline", "timeline", "error"]
+    assert "boom" in records[-1]["error"]
+
+
+def test_incremental_aggregation_matches_timeline():
+    """거래마다 누적한 룰 집계(첫 발동 순서)와 burst 패턴 수 = 타임라인의 발동 룰로 다시 센 값"""
+    result = AddressAnalyzer().analyze_address(TARGET, "ethereum", _transactions(120))
+    fired = [rule_id for entry in result.timeline for rule_id in entry["fired_rules"]]
+    assert [rule["rule_id"] for rule in result.fired_rules] == list(dict.fromkeys(fired))
+    burst = sum(1 for rule_id in fired if "B-101" in rule_id or "B-102" in rule_id)
+    assert result.transaction_patterns["burst_patterns"] == burst > 0
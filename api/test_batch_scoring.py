@@ -0,0 +1,110 @@
+"""
+배치 스코어링 API 테스트
+
+/api/score/transactions가 JSON 배열과 NDJSON 본문을 같은 결과로 스트리밍하는지,
+결과가 입력 순서이고 한 엔진으로 차례로 스코어링한 값과 같은지, 실패 항목만 error 줄이 되는지 확인
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+from api.app import app
+from api.routes.scoring import BATCH_CHUNK_SIZE, _parse_transaction
+from core.scoring.engine import TransactionScorer
+
+
+def _transactions(n: int):
+    """믹서/제재/고액 거래가 섞인 트랜잭션 (윈도우 룰이 발동하도록 같은 주소에 몰림)"""
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    return [
+        {
+            "tx_hash": f"0xtx{i}",
+            "chain_id": 1,
+            "timestamp": (start + timedelta(seconds=10 * i)).isoformat().replace("+00:00", "Z"),
+            "block_height": 21000000 + i,
+            "target_address": f"0x{i % 4:040x}",
+            "counterparty_address": f"0x{(i % 7) + 100:040x}",
+            "label": "mixer" if i % 5 == 0 else "unknown",
+            "is_sanctioned": i % 11 == 0,
+            "is_known_scam": False,
+            "is_mixer": i % 5 == 0,
+            "is_bridge": False,
+            "amount_usd": [50.0, 1200.0, 9000.0, 150000.0][i % 4],
+            "asset_contract": "0xETH",
+        }
+        for i in range(n)
+    ]
+
+
+def _read_ndjson(response):
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def _without_time(results):
+    return [{k: v for k, v in result.items() if k != "completed_at"} for result in results]
+
+
+def test_batch_matches_sequential_scoring():
+    """청크 경계를 넘는 배치 결과 == 한 엔진으로 차례로 score_transaction한 결과 (입력 순서)"""
+    transactions = _transactions(BATCH_CHUNK_SIZE + 20)
+    client = app.test_client()
+    results = _read_ndjson(client.post("/api/score/transactions", json=transactions))
+
+    scorer = TransactionScorer()
+    expected = []
+    for index, tx in enumerate(transactions):
+        result = scorer.score_transaction(_parse_transaction(tx))
+        expected.append({
+            "index": index,
+            "target_address": result.target_address,
+            "risk_score": int(result.risk_score),
+            "risk_level": result.risk_level,
+            "risk_tags": result.risk_tags,
+            "fired_rules": [{"rule_id": r.rule_id, "score": int(r.score)} for r in result.fired_rules],
+            "explanation": result.explanation,
+            "timestamp": result.timestamp,
+            "chain_id": result.chain_id,
+            "value": float(result.value),
+        })
+    assert [r["index"] for r in results] == list(range(len(transactions)))
+    assert _without_time(results) == expected
+
+
+def test_ndjson_body_matches_json_array():
+    """NDJSON 본문 (빈 줄 포함) == JSON 배열 본문"""
+    transactions = _transactions(30)
+    client = app.test_client()
+    from_json = _read_ndjson(client.post("/api/score/transactions", json=transactions))
+
+    body = "\n".join(json.dumps(tx) for tx in transactions[:10]) + "\n\n" + \
+        "\n".join(json.dumps(tx) for tx in transactions[10:]) + "\n"
+    from_ndjson = _read_ndjson(client.post(
+        "/api/score/transactions", data=body, content_type="application/x-ndjson"
+    ))
+    assert _without_time(from_ndjson) == _without_time(from_json)
+
+
+def test_invalid_items_reported_per_line():
+    """잘못된 항목은 error 줄이 되고 나머지는 계속 스코어링"""
+    transactions = _transactions(3)
+    del transactions[1]["tx_hash"]
+    body = json.dumps(transactions[0]) + "\n{not json\n" + json.dumps(transactions[1]) + "\n" + \
+        json.dumps(transactions[2]) + "\n"
+    client = app.test_client()
+    results = _read_ndjson(client.post(
+        "/api/score/transactions", data=body, content_type="application/x-ndjson"
+    ))
+
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert "risk_score" in results[0] and "risk_score" in results[3]
+    assert results[1]["error"].startswith("Invalid JSON line")
+    assert results[2]["error"] == "Missing required field: 'tx_hash'"
+
+
+def test_json_body_must_be_array():
+    """JSON 본문이 배열이 아니면 400"""
+    client = app.test_client()
+    response = client.post("/api/score/transactions", json=_transactions(1)[0])
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "JSON body must be an array of transactions"
@@ -0,0 +1,250 @@
+"""
+비동기 분석 작업 큐 테스트
+
+마감 시간 초과(대기 중/실행 중), 대기 작업 상한, 콜백 URL 검증(허용 목록, 사설 주소 거부),
+검증한 IP로 고정해 전송하는지(DNS rebinding 방지) 확인
+(DNS 조회는 monkeypatch로 대체, 콜백은 127.0.0.1의 임시 서버로 받음, 외부 네트워크를 사용하지 않음)
+"""
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from api import job_queue as job_queue_module
+from api.job_queue import (
+    DONE,
+    EXPIRED,
+    FAILED,
+    FINISHED_STATUSES,
+    JobQueue,
+    JobQueueFull,
+    validate_callback_url,
+)
+
+
+def _wait(job, timeout: float = 5.0):
+    """작업이 끝날 때까지 대기"""
+    end = time.time() + timeout
+    while job.status not in FINISHED_STATUSES:
+        assert time.time() < end, f"job did not finish: {job.status}"
+        time.sleep(0.01)
+    return job
+
+
+def _wait_callback(job, timeout: float = 5.0):
+    """콜백 전송(또는 실패)이 기록될 때까지 대기 (작업 완료 후 전송)"""
+    end = time.time() + timeout
+    while not job.callback_status:
+        assert time.time() < end, "callback was not attempted"
+        time.sleep(0.01)
+    return job
+
+
+def _resolve_to(monkeypatch, *addresses):
+    """socket.getaddrinfo가 지정한 주소만 돌려주도록 대체"""
+    def getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (address, port)) for address in addresses]
+    monkeypatch.setattr(job_queue_module.socket, "getaddrinfo", getaddrinfo)
+
+
+def test_job_runs_and_reports_progress():
+    """작업 결과와 진행 상황이 상태 응답에 기록됨"""
+    queue = JobQueue(workers=1)
+    try:
+        def run(job):
+            job.report(stage="scoring", done=3, total=3)
+            return {"risk_score": 42}
+
+        job = _wait(queue.submit("test", run))
+        data = queue.get(job.job_id).to_dict()
+        assert data["status"] == DONE
+        assert data["result"] == {"risk_score": 42}
+        assert data["progress"] == {"stage": "scoring", "done": 3, "total": 3}
+
+        failed = _wait(queue.submit("test", lambda job: 1 / 0))
+        assert failed.status == FAILED
+        assert failed.error.startswith("Analysis failed")
+    finally:
+        queue.shutdown()
+
+
+def test_deadline_expires_while_running():
+    """실행 중 마감이 지나면 다음 report()에서 중단되고 expired"""
+    queue = JobQueue(workers=1)
+    try:
+        reached = []
+
+        def run(job):
+            time.sleep(0.2)
+            job.report(stage="after_sleep")
+            reached.append(True)
+            return {}
+
+        job = _wait(queue.submit("test", run, deadline=0.05))
+        assert job.status == EXPIRED
+        assert "deadline exceeded" in job.error
+        assert "result" not in job.to_dict()
+        assert reached == []
+    finally:
+        queue.shutdown()
+
+
+def test_deadline_expires_while_queued():
+    """대기 중 마감이 지난 작업은 실행하지 않음"""
+    queue = JobQueue(workers=1)
+    try:
+        release = threading.Event()
+        blocker = queue.submit("test", lambda job: release.wait(5) and {})
+        called = []
+        queued = queue.submit("test", lambda job: called.append(True) or {}, deadline=0.05)
+        time.sleep(0.1)
+        release.set()
+
+        assert _wait(blocker).status == DONE
+        assert _wait(queued).status == EXPIRED
+        assert "while queued" in queued.error
+        assert called == []
+    finally:
+        queue.shutdown()
+
+
+def test_deadline_limits():
+    """마감 시간은 양수여야 하고 max_deadline으로 제한됨"""
+    queue = JobQueue(workers=1, default_deadline=30, max_deadline=60)
+    try:
+        with pytest.raises(ValueError):
+            queue.submit("test", lambda job: {}, deadline=0)
+        assert queue.submit("test", lambda job: {}, deadline=600).deadline_seconds == 60
+        assert queue.submit("test", lambda job: {}).deadline_seconds == 30
+    finally:
+        queue.shutdown()
+
+
+def test_queue_full_rejected():
+    """대기 + 실행 중 작업이 max_pending개면 제출 거부"""
+    queue = JobQueue(workers=1, max_pending=2)
+    release = threading.Event()
+    try:
+        queue.submit("test", lambda job: release.wait(5) and {})
+        queue.submit("test", lambda job: release.wait(5) and {})
+        with pytest.raises(JobQueueFull):
+            queue.submit("test", lambda job: {})
+    finally:
+        release.set()
+        queue.shutdown()
+
+
+def test_callback_url_validation(monkeypatch):
+    """허용 목록이 비었거나, http(s)가 아니거나, 목록에 없는 호스트는 거부"""
+    _resolve_to(monkeypatch, "93.184.216.34")
+    with pytest.raises(ValueError, match="disabled"):
+        validate_callback_url("https://hooks.example.com/aml", [])
+    with pytest.raises(ValueError, match="http"):
+        validate_callback_url("ftp://hooks.example.com/aml", ["hooks.example.com"])
+    with pytest.raises(ValueError, match="not allowed"):
+        validate_callback_url("https://evil.example.net/aml", ["hooks.example.com"])
+    validate_callback_url("https://HOOKS.example.com:8443/aml", ["hooks.example.com"])
+
+
+@pytest.mark.parametrize("address", ["127.0.0.1", "10.0.0.5", "192.168.1.10", "169.254.169.254", "::1", "::ffff:10.0.0.1"])
+def test_callback_url_rejects_non_public_address(monkeypatch, address):
+    """허용된 호스트라도 루프백/사설/링크 로컬 주소로 해석되면 거부"""
+    _resolve_to(monkeypatch, "93.184.216.34", address)
+    with pytest.raises(ValueError, match="non-public"):
+        validate_callback_url("https://hooks.example.com/aml", ["hooks.example.com"])
+
+
+class _CallbackHandler(BaseHTTPRequestHandler):
+    """콜백 수신 서버 (요청 경로, Host 헤더, 본문 기록)"""
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.received.append((self.path, self.headers["Host"], json.loads(body)))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def callback_server():
+    """127.0.0.1의 임시 포트에서 도는 콜백 수신 서버"""
+    _CallbackHandler.received = []
+    server = HTTPServer(("127.0.0.1", 0), _CallbackHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _rebinding_resolver(monkeypatch, answers):
+    """hooks.example.com 조회마다 answers의 다음 주소를 돌려주고 조회 기록 (IP 리터럴은 그대로)"""
+    lookups = []
+    real_getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host != "hooks.example.com":
+            return real_getaddrinfo(host, port, *args, **kwargs)
+        lookups.append(host)
+        address = answers[min(len(lookups), len(answers)) - 1]
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (address, port))]
+
+    monkeypatch.setattr(job_queue_module.socket, "getaddrinfo", getaddrinfo)
+    # 테스트 서버(127.0.0.1)만 공인 주소로 취급
+    is_public = job_queue_module._is_public_address
+    monkeypatch.setattr(job_queue_module, "_is_public_address", lambda a: a == "127.0.0.1" or is_public(a))
+    return lookups
+
+
+def test_callback_pinned_to_validated_address(monkeypatch, callback_server):
+    """전송 직전 검증한 IP로 직접 연결하고 Host 헤더는 원래 호스트 (검증 후 DNS가 바뀌어도 다시 조회하지 않음)"""
+    port = callback_server.server_address[1]
+    # 제출 시 검증 → 전송 직전 검증 → 그 이후 조회는 모두 다른 주소 (rebinding)
+    lookups = _rebinding_resolver(monkeypatch, ["127.0.0.1", "127.0.0.1", "10.255.255.1"])
+    queue = JobQueue(workers=1, callback_allowed_hosts=["hooks.example.com"])
+    try:
+        callback_url = f"http://hooks.example.com:{port}/aml?token=1"
+        job = _wait_callback(queue.submit("test", lambda job: {"ok": True}, callback_url=callback_url))
+        assert job.callback_status == "HTTP 204"
+        assert len(lookups) == 2
+        (path, host, body), = _CallbackHandler.received
+        assert path == "/aml?token=1"
+        assert host == f"hooks.example.com:{port}"
+        assert body["result"] == {"ok": True}
+    finally:
+        queue.shutdown()
+
+
+def test_callback_revalidated_before_send(monkeypatch, callback_server):
+    """제출 후 호스트가 사설 주소로 바뀌면 콜백을 보내지 않음"""
+    port = callback_server.server_address[1]
+    _rebinding_resolver(monkeypatch, ["127.0.0.1", "10.0.0.5"])
+    queue = JobQueue(workers=1, callback_allowed_hosts=["hooks.example.com"])
+    try:
+        with pytest.raises(ValueError):
+            queue.submit("test", lambda job: {}, callback_url="https://other.example.com/aml")
+
+        job = _wait_callback(queue.submit("test", lambda job: {}, callback_url=f"http://hooks.example.com:{port}/aml"))
+        assert job.callback_status.startswith("failed: callback_url host resolves to a non-public address")
+        assert _CallbackHandler.received == []
+    finally:
+        queue.shutdown()
+
+
+def test_pinned_request_keeps_hostname_for_tls():
+    """IP로 바꾼 URL (IPv6 괄호, 포트 유지)과 Host 헤더, TLS SNI/인증서 검증 호스트 이름"""
+    assert job_queue_module._pinned_request("https://hooks.example.com/aml?x=1", "93.184.216.34") == (
+        "https://93.184.216.34/aml?x=1", "hooks.example.com"
+    )
+    assert job_queue_module._pinned_request("https://user@Hooks.example.com:8443/aml", "2606:2800::1") == (
+        "https://[2606:2800::1]:8443/aml", "Hooks.example.com:8443"
+    )
+    adapter = job_queue_module._PinnedAddressAdapter("hooks.example.com")
+    pool_kw = adapter.poolmanager.connection_pool_kw
+    assert (pool_kw["server_hostname"], pool_kw["assert_hostname"]) == ("hooks.example.com", "hooks.example.com")
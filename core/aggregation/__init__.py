@@ -6,17 +6,29 @@ AI 집계 모듈
 
 from .window import WindowEvaluator, TransactionHistory
 from .bucket import BucketEvaluator
+from .csr_graph import CSRGraph, ColumnarGraph
+from .graph_features import GraphFeatureExtractor
 from .mpocryptml_patterns import MPOCryptoMLPatternDetector
-from .ppr_connector import PPRConnector
+from .ppr_connector import PPRConnector, RandomWalkIndex
+from .proximity_index import SanctionProximityIndex
 from .stats import StatisticsCalculator
+from .supernode import SupernodePolicy
+from .temporal_paths import TemporalPathIndex
 from .topology import TopologyEvaluator
 
 __all__ = [
     "WindowEvaluator",
     "TransactionHistory",
     "BucketEvaluator",
+    "CSRGraph",
+    "ColumnarGraph",
+    "GraphFeatureExtractor",
     "MPOCryptoMLPatternDetector",
     "PPRConnector",
+    "RandomWalkIndex",
+    "SanctionProximityIndex",
     "StatisticsCalculator",
+    "SupernodePolicy",
+    "TemporalPathIndex",
     "TopologyEvaluator"
 ]
@@ -53,6 +53,10 @@ class BucketEvaluator:
         # 오래된 버킷 정리
         self._cleanup_old_buckets(group_key, bucket_key, size_sec)
     
+    def clear(self) -> None:
+        """전체 버킷 히스토리 삭제"""
+        self._buckets.clear()
+    
     def _get_group_key(self, tx: Dict[str, Any], group_fields: List[str]) -> Optional[str]:
         """그룹 키 생성"""
         if not group_fields:
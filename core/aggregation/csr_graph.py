@@ -0,0 +1,529 @@
+"""
+CSR (Compressed Sparse Row) 그래프 모듈
+
+networkx 그래프를 한 번 정수 인덱스 배열로 변환해 두고, 이웃 탐색/레이어 검사 같은
+반복 연산은 서브그래프나 무방향 복사본을 만들지 않고 배열 슬라이스로 처리한다.
+
+- indptr[i]:indptr[i+1] 구간의 indices/weights = 노드 i의 나가는 엣지
+- rev_indptr/rev_indices/rev_weights = 들어오는 엣지 (역방향 CSR)
+"""
+
+from typing import Callable, Dict, List, Optional, Any, Sequence, Tuple
+import numpy as np
+import networkx as nx
+
+
+class CSRGraph:
+    """
+    방향 가중 그래프의 CSR 표현 (정/역방향)
+
+    노드는 0..n-1 정수 인덱스로 매핑되며 nodes[i]가 원래 주소
+    """
+
+    def __init__(
+        self,
+        nodes: List[str],
+        src: np.ndarray,
+        dst: np.ndarray,
+        weights: Optional[np.ndarray] = None
+    ):
+        """
+        Args:
+            nodes: 인덱스 → 주소 리스트
+            src: 엣지 출발 노드 인덱스 배열
+            dst: 엣지 도착 노드 인덱스 배열
+            weights: 엣지 가중치 배열 (None이면 1.0)
+        """
+        self.nodes = list(nodes)
+        self.node_index: Dict[str, int] = {node: i for i, node in enumerate(self.nodes)}
+
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        if weights is None:
+            weights = np.ones(len(src), dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+
+        n = len(self.nodes)
+        self._layer: Optional[np.ndarray] = None
+        self.indptr, self.indices, self.weights = self._compress(n, src, dst, weights)
+        self.rev_indptr, self.rev_indices, self.rev_weights = self._compress(n, dst, src, weights)
+
+    @staticmethod
+    def _compress(
+        n: int,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        weights: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(rows, cols, weights) 엣지 리스트를 CSR 배열로 변환"""
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr, cols[order], weights[order]
+
+    @classmethod
+    def from_networkx(cls, graph: nx.DiGraph, weight: str = "weight") -> "CSRGraph":
+        """
+        networkx DiGraph로부터 CSR 생성 (엣지 1회 순회)
+
+        Args:
+            graph: 방향 그래프
+            weight: 가중치 속성 이름
+        """
+        nodes = list(graph.nodes())
+        node_index = {node: i for i, node in enumerate(nodes)}
+        num_edges = graph.number_of_edges()
+
+        src = np.empty(num_edges, dtype=np.int64)
+        dst = np.empty(num_edges, dtype=np.int64)
+        weights = np.empty(num_edges, dtype=np.float64)
+        for i, (u, v, data) in enumerate(graph.edges(data=True)):
+            src[i] = node_index[u]
+            dst[i] = node_index[v]
+            weights[i] = data.get(weight, 1.0) or 0.0
+
+        return cls(nodes, src, dst, weights)
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def number_of_edges(self) -> int:
+        return len(self.indices)
+
+    def out_degree(self) -> np.ndarray:
+        """모든 노드의 out-degree"""
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        """모든 노드의 in-degree"""
+        return np.diff(self.rev_indptr)
+
+    @staticmethod
+    def gather(indptr: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        rows 노드들의 CSR 구간을 한 번에 모으기 (파이썬 루프 없음)
+
+        Returns:
+            (엣지 위치 배열, 각 엣지의 출발 row 배열)
+        """
+        starts = indptr[rows]
+        counts = indptr[rows + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        # 구간별 시작 위치를 반복한 뒤 구간 내 오프셋을 더함
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        positions = offsets + np.arange(total, dtype=np.int64)
+        return positions, np.repeat(rows, counts)
+
+    def _layer_scratch(self) -> np.ndarray:
+        """BFS용 노드별 레이어 배열 (-1로 초기화, 사용 후 방문 노드만 되돌림)"""
+        if self._layer is None:
+            self._layer = np.full(self.number_of_nodes, -1, dtype=np.int64)
+        return self._layer
+
+    def _bfs(
+        self,
+        layer: np.ndarray,
+        source: int,
+        max_hops: int,
+        direction: str,
+        expandable: Optional[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """layer 배열에 레이어를 기록하며 BFS (방문 노드와 레이어 반환)"""
+        indptr, indices = self._arrays(direction)
+        layer[source] = 0
+        frontier = np.array([source], dtype=np.int64)
+        visited = [frontier]
+        hops = [np.zeros(1, dtype=np.int64)]
+
+        for hop in range(1, max_hops + 1):
+            if hop > 1 and expandable is not None:
+                frontier = frontier[expandable[frontier]]
+            positions, _ = self.gather(indptr, frontier)
+            if len(positions) == 0:
+                break
+            neighbors = indices[positions]
+            neighbors = np.unique(neighbors[layer[neighbors] < 0])
+            if len(neighbors) == 0:
+                break
+            layer[neighbors] = hop
+            visited.append(neighbors)
+            hops.append(np.full(len(neighbors), hop, dtype=np.int64))
+            frontier = neighbors
+
+        return np.concatenate(visited), np.concatenate(hops)
+
+    def bfs_layers(
+        self,
+        source: int,
+        max_hops: int,
+        direction: str = "out",
+        expandable: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        source에서 max_hops 이내 BFS 레이어
+
+        비용은 방문한 이웃 영역 크기에 비례한다 (노드마다 반복 호출해도
+        전체 노드 수 크기의 배열을 새로 만들지 않음, 스레드 간 공유 불가).
+
+        Args:
+            source: 시작 노드 인덱스
+            max_hops: 최대 홉 수
+            direction: "out" (나가는 엣지) 또는 "in" (들어오는 엣지)
+            expandable: 노드별 확장 가능 여부 (False인 노드는 레이어에 포함되지만
+                        더 확장하지 않음, 시작 노드는 항상 확장, None이면 모두 확장)
+
+        Returns:
+            (방문 노드 인덱스 배열, 각 노드의 레이어 배열) - 레이어 오름차순
+        """
+        layer = self._layer_scratch()
+        members, member_layers = self._bfs(layer, source, max_hops, direction, expandable)
+        layer[members] = -1
+        return members, member_layers
+
+    def _arrays(self, direction: str) -> Tuple[np.ndarray, np.ndarray]:
+        if direction == "out":
+            return self.indptr, self.indices
+        if direction == "in":
+            return self.rev_indptr, self.rev_indices
+        raise ValueError(f"Unknown direction: {direction}")
+
+    def layered_flow(
+        self,
+        source: int,
+        max_hops: int = 3,
+        direction: str = "out",
+        expandable: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
+        """
+        레이어 흐름 검사: BFS 레이어를 매긴 뒤 이웃 영역의 모든 엣지가
+        레이어 l → l+1 로만 향하는지 한 번의 선형 패스로 확인
+
+        마지막 레이어에서 영역 밖으로 나가는 엣지와 확장하지 않는 노드(expandable=False)의
+        엣지는 경계로 보고 검사하지 않는다.
+
+        Args:
+            source: 시작 노드 인덱스
+            max_hops: BFS 최대 홉 수 (2~3 권장)
+            direction: "out" (유출 흐름) 또는 "in" (유입 흐름)
+            expandable: 노드별 확장 가능 여부 (bfs_layers 참고)
+
+        Returns:
+            {
+                "members": 방문 노드 인덱스 배열,
+                "member_layers": 각 방문 노드의 레이어,
+                "layer_sizes": List[int],
+                "edges_checked": int,
+                "forward_edges": int,     # l → l+1
+                "same_layer_edges": int,  # l → l
+                "backward_edges": int,    # l → l-k
+                "violations": int
+            }
+        """
+        indptr, indices = self._arrays(direction)
+        layer = self._layer_scratch()
+        members, member_layers = self._bfs(layer, source, max_hops, direction, expandable)
+
+        try:
+            checked = members
+            if expandable is not None:
+                checked = members[expandable[members] | (members == source)]
+            positions, rows = self.gather(indptr, checked)
+            targets = indices[positions]
+
+            # 영역 안 엣지만 검사 (마지막 레이어 → 영역 밖은 경계)
+            inside = layer[targets] >= 0
+            delta = layer[targets[inside]] - layer[rows[inside]]
+        finally:
+            layer[members] = -1
+
+        forward = int(np.count_nonzero(delta == 1))
+        same_layer = int(np.count_nonzero(delta == 0))
+        backward = int(np.count_nonzero(delta < 0))
+        # BFS 최단 거리 레이어에서는 l → l+2 이상 엣지가 생기지 않음
+        violations = int(len(delta) - forward)
+
+        return {
+            "members": members,
+            "member_layers": member_layers,
+            "layer_sizes": np.bincount(member_layers).tolist(),
+            "edges_checked": int(len(delta)),
+            "forward_edges": forward,
+            "same_layer_edges": same_layer,
+            "backward_edges": backward,
+            "violations": violations
+        }
+
+    def personalized_pagerank(
+        self,
+        personalization: np.ndarray,
+        alpha: float = 0.85,
+        max_iter: int = 100,
+        tol: float = 1.0e-6,
+        edge_mask: Optional[np.ndarray] = None
+    ) -> Optional[np.ndarray]:
+        """
+        가중 Personalized PageRank (power iteration, nx.pagerank와 같은 정의)
+
+        나가는 가중치 합이 0인 노드(dangling)의 질량은 personalization 분포로 되돌린다.
+
+        Args:
+            personalization: 노드별 재시작 확률 (합이 1이 아니어도 정규화)
+            alpha: damping factor
+            max_iter: 최대 반복 횟수
+            tol: 수렴 허용 오차 (노드당)
+            edge_mask: 사용할 엣지 (indices 순서, None이면 전체)
+
+        Returns:
+            노드별 PPR 배열 (수렴하지 않으면 None)
+        """
+        n = self.number_of_nodes
+        if n == 0:
+            return np.zeros(0, dtype=np.float64)
+
+        p = np.asarray(personalization, dtype=np.float64)
+        p = p / p.sum()
+
+        rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.indptr))
+        weights = self.weights if edge_mask is None else np.where(edge_mask, self.weights, 0.0)
+        out_weight = np.bincount(rows, weights=weights, minlength=n)
+        dangling = out_weight == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            transition = np.where(dangling[rows], 0.0, weights / out_weight[rows])
+
+        x = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            x_last = x
+            x = alpha * (
+                np.bincount(self.indices, weights=x[rows] * transition, minlength=n) +
+                x[dangling].sum() * p
+            ) + (1 - alpha) * p
+            if np.abs(x - x_last).sum() < n * tol:
+                return x
+        return None
+
+
+class ColumnarGraph:
+    """
+    거래 단위 컬럼형 그래프
+
+    - edges: 집계 엣지 CSRGraph (엣지 가중치 = 누적 금액)
+    - tx_out_*: 노드별 나가는 거래 (timestamp int64, weight float64), 출발 노드 기준 CSR
+    - tx_in_*: 노드별 들어오는 거래, 도착 노드 기준 CSR
+
+    타임스탬프는 구축 시 한 번만 파싱하고, 노드별 통계는 CSR 구간에 대한
+    NumPy 리덕션으로 계산한다.
+    """
+
+    def __init__(
+        self,
+        edges: CSRGraph,
+        tx_out: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        tx_in: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    ):
+        """
+        Args:
+            edges: 집계 엣지 CSR
+            tx_out: (출발 노드 인덱스, timestamp, weight) 거래 배열
+            tx_in: (도착 노드 인덱스, timestamp, weight) 거래 배열
+        """
+        self.edges = edges
+        self.nodes = edges.nodes
+        self.node_index = edges.node_index
+
+        n = len(self.nodes)
+        self.tx_out_indptr, self.tx_out_timestamp, self.tx_out_weight = self._compress(n, *tx_out)
+        self.tx_in_indptr, self.tx_in_timestamp, self.tx_in_weight = self._compress(n, *tx_in)
+
+    @staticmethod
+    def _compress(
+        n: int,
+        rows: np.ndarray,
+        timestamps: np.ndarray,
+        weights: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr, timestamps[order], weights[order]
+
+    @classmethod
+    def from_networkx(
+        cls,
+        graph: nx.DiGraph,
+        parse_timestamp: Callable[[Any], int]
+    ) -> "ColumnarGraph":
+        """
+        엣지 속성 "weight", "transactions"를 가진 그래프로부터 생성
+
+        Args:
+            graph: MPOCryptoMLPatternDetector 형식의 거래 그래프
+            parse_timestamp: 타임스탬프 → Unix 초 변환 함수 (실패 시 0)
+        """
+        edges = CSRGraph.from_networkx(graph)
+        node_index = edges.node_index
+
+        src, dst, timestamps, weights = [], [], [], []
+        for u, v, data in graph.edges(data=True):
+            u_index, v_index = node_index[u], node_index[v]
+            for tx in data.get("transactions", ()):
+                src.append(u_index)
+                dst.append(v_index)
+                timestamps.append(parse_timestamp(tx.get("timestamp")))
+                weights.append(tx.get("usd_value", 0) or 0)
+
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        return cls(edges, (src, timestamps, weights), (dst, timestamps, weights))
+
+    @classmethod
+    def from_arrays(
+        cls,
+        from_addresses: Sequence[str],
+        to_addresses: Sequence[str],
+        timestamps: np.ndarray,
+        weights: np.ndarray
+    ) -> "ColumnarGraph":
+        """
+        거래 컬럼 배열로 집계 엣지와 거래 컬럼을 함께 생성 (networkx 그래프 없이)
+
+        MPOCryptoMLPatternDetector.add_transaction을 차례로 호출한 그래프의 from_networkx와 같은 결과:
+        주소는 소문자로 바꾸고, 주소가 비었거나 가중치가 0 이하인 거래는 제외하며,
+        노드/엣지 순서는 처음 등장한 순서, 엣지 가중치는 거래 순서대로 누적한다.
+
+        Args:
+            from_addresses: 거래별 출발 주소
+            to_addresses: 거래별 도착 주소
+            timestamps: 거래별 Unix 초 (해석할 수 없으면 0)
+            weights: 거래별 가중치 (USD 금액, 없으면 Wei / 1e18)
+        """
+        from_addresses = np.array([address.lower() for address in from_addresses], dtype=object)
+        to_addresses = np.array([address.lower() for address in to_addresses], dtype=object)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        keep = (from_addresses != "") & (to_addresses != "") & (weights > 0)
+        from_addresses, to_addresses = from_addresses[keep], to_addresses[keep]
+        timestamps, weights = timestamps[keep], weights[keep]
+        m = len(weights)
+        if m == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(CSRGraph([], empty, empty), (empty, empty, weights), (empty, empty, weights))
+
+        # 노드: 거래마다 from, to 순으로 처음 등장한 순서
+        interleaved = np.empty(2 * m, dtype=object)
+        interleaved[0::2] = from_addresses
+        interleaved[1::2] = to_addresses
+        unique_nodes, first_seen, inverse = np.unique(interleaved, return_index=True, return_inverse=True)
+        node_order = np.argsort(first_seen, kind="stable")
+        rank = np.empty(len(unique_nodes), dtype=np.int64)
+        rank[node_order] = np.arange(len(unique_nodes), dtype=np.int64)
+        nodes = unique_nodes[node_order].tolist()
+        src = rank[inverse[0::2]]
+        dst = rank[inverse[1::2]]
+
+        # 엣지: networkx DiGraph.edges 순서 (출발 노드 순서, 같은 출발 노드 안에서는 처음 등장한 순서)
+        n = len(nodes)
+        edge_keys, edge_first, tx_edge = np.unique(src * n + dst, return_index=True, return_inverse=True)
+        edge_order = np.lexsort((edge_first, src[edge_first]))
+        edge_position = np.empty(len(edge_keys), dtype=np.int64)
+        edge_position[edge_order] = np.arange(len(edge_keys), dtype=np.int64)
+        tx_edge = edge_position[tx_edge]
+        # 가중치는 거래 순서대로 누적 (bincount는 입력 순서로 더함)
+        edge_weights = np.bincount(tx_edge, weights=weights, minlength=len(edge_keys))
+        edges = CSRGraph(nodes, src[edge_first[edge_order]], dst[edge_first[edge_order]], edge_weights)
+
+        # 거래 컬럼: from_networkx와 같은 엣지 순서, 엣지 안에서는 거래 순서
+        tx_order = np.argsort(tx_edge, kind="stable")
+        src, dst = src[tx_order], dst[tx_order]
+        timestamps, weights = timestamps[tx_order], weights[tx_order]
+        return cls(edges, (src, timestamps, weights), (dst, timestamps, weights))
+
+    @classmethod
+    def from_transactions(
+        cls,
+        transactions: List[Dict[str, Any]],
+        parse_timestamp: Callable[[Any], int]
+    ) -> "ColumnarGraph":
+        """
+        거래 리스트로부터 생성 (집계 엣지 없이 거래 컬럼만)
+
+        거래는 도착 주소의 유입으로 집계되고, 자기 자신에게 보낸 거래는
+        유출로 다시 세지 않는다.
+
+        Args:
+            transactions: 거래 리스트 ("from"/"counterparty_address", "to"/"target_address",
+                          "usd_value"/"amount_usd"/"value", "timestamp")
+            parse_timestamp: 타임스탬프 → Unix 초 변환 함수 (실패 시 0)
+        """
+        node_index: Dict[str, int] = {}
+        src, dst, timestamps, weights = [], [], [], []
+        for tx in transactions:
+            from_addr = (tx.get("from") or tx.get("counterparty_address", "")).lower()
+            to_addr = (tx.get("to") or tx.get("target_address", "")).lower()
+
+            # USD 값 우선, 없으면 Wei 값 사용 (정규화를 위해 1e18로 나눔)
+            weight = float(tx.get("usd_value", tx.get("amount_usd", 0)) or 0)
+            if weight <= 0:
+                weight = float(tx.get("value", 0) or 0) / 1e18
+
+            src.append(node_index.setdefault(from_addr, len(node_index)))
+            dst.append(node_index.setdefault(to_addr, len(node_index)))
+            timestamps.append(parse_timestamp(tx.get("timestamp")))
+            weights.append(weight)
+
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+
+        empty = np.empty(0, dtype=np.int64)
+        edges = CSRGraph(list(node_index), empty, empty)
+        outgoing = src != dst
+        return cls(
+            edges,
+            (src[outgoing], timestamps[outgoing], weights[outgoing]),
+            (dst, timestamps, weights)
+        )
+
+    @staticmethod
+    def segment_stats(
+        indptr: np.ndarray,
+        values: np.ndarray,
+        valid: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        CSR 구간별 count/sum/min/max (valid가 False인 값은 제외)
+
+        Returns:
+            {"count", "sum", "min", "max"} - 노드별 배열 (값이 없는 노드의 min/max는 0)
+        """
+        n = len(indptr) - 1
+        values = values.astype(np.float64)
+        if valid is None:
+            valid = np.ones(len(values), dtype=bool)
+
+        stats = {
+            "count": np.zeros(n, dtype=np.int64),
+            "sum": np.zeros(n, dtype=np.float64),
+            "min": np.zeros(n, dtype=np.float64),
+            "max": np.zeros(n, dtype=np.float64)
+        }
+        nonempty = np.flatnonzero(np.diff(indptr) > 0)
+        if len(nonempty) == 0:
+            return stats
+
+        starts = indptr[nonempty]
+        stats["count"][nonempty] = np.add.reduceat(valid.astype(np.int64), starts)
+        stats["sum"][nonempty] = np.add.reduceat(np.where(valid, values, 0.0), starts)
+        mins = np.minimum.reduceat(np.where(valid, values, np.inf), starts)
+        maxs = np.maximum.reduceat(np.where(valid, values, -np.inf), starts)
+        has_values = stats["count"][nonempty] > 0
+        stats["min"][nonempty] = np.where(has_values, mins, 0.0)
+        stats["max"][nonempty] = np.where(has_values, maxs, 0.0)
+        return stats
@@ -0,0 +1,499 @@
+"""
+그래프 전체 MPOCryptoML 피처 추출 모듈
+
+주소마다 PPRConnector/MPOCryptoMLPatternDetector/MPOCryptoMLNormalizer를 새로 만들어
+PageRank 세 번과 패턴 탐색을 따로 돌리는 대신, 그래프 하나에 대해 모든 노드의
+피처를 한 번에 계산한다.
+
+- fan-in/out 합계·개수, gather-scatter: CSR 구간 리덕션
+- 패턴 플래그: fan-in/out/gather-scatter는 벡터화, stack은 2-hop 하한/최대 경로 상한으로
+  판정하고 애매한 노드만 탐색, layered flow는 CSR BFS
+- Nθ/Nω: MPOCryptoMLNormalizer.normalize_all
+- PPR: 소스/SDN/믹서 personalization별 PageRank 한 번씩 (전체 노드 점수)
+
+결과는 컬럼별 NumPy 배열 테이블이며 Parquet 또는 npz로 저장할 수 있다.
+"""
+
+from typing import Dict, List, Optional, Any, Iterable
+from pathlib import Path
+import numpy as np
+import networkx as nx
+
+from .csr_graph import ColumnarGraph, CSRGraph
+from .mpocryptml_normalizer import MPOCryptoMLNormalizer
+from .supernode import SupernodePolicy
+
+
+# build_mpocryptml_dataset.py의 패턴 점수 가중치
+PATTERN_SCORES = {
+    "fan_in": 15.0,
+    "fan_out": 15.0,
+    "gather_scatter": 10.0,
+    "stack": 20.0,
+    "bipartite": 15.0
+}
+
+
+class GraphFeatureExtractor:
+    """
+    그래프 전체 노드의 MPOCryptoML 피처 추출기
+
+    패턴 임계값은 MPOCryptoMLPatternDetector의 기본값과 같다.
+    """
+
+    # detect_fan_in_pattern / detect_fan_out_pattern 기본값
+    FAN_MIN_COUNT = 5
+    FAN_MIN_TOTAL_VALUE = 0.01
+    FAN_MIN_EACH_VALUE = 0.001
+
+    # find_stack_path 기본값 (경로 최대 10 노드)
+    STACK_MIN_LENGTH = 3
+    STACK_MIN_PATH_VALUE = 100.0
+    STACK_MAX_NODES = 10
+
+    COLUMNS = [
+        "address",
+        "fan_in", "fan_in_count", "fan_out", "fan_out_count",
+        "gather_scatter", "gather_scatter_count",
+        "fan_in_detected", "fan_out_detected", "gather_scatter_detected",
+        "stack_detected", "bipartite_detected", "pattern_score",
+        "n_theta", "n_omega",
+        "ppr_score", "sdn_ppr", "mixer_ppr"
+    ]
+
+    def __init__(
+        self,
+        damping_factor: float = 0.85,
+        max_iter: int = 100,
+        layered_max_hops: int = 3,
+        supernode_policy: Optional[SupernodePolicy] = None
+    ):
+        """
+        Args:
+            damping_factor: PPR damping factor (PPRConnector 기본값과 동일)
+            max_iter: PPR 최대 반복 횟수
+            layered_max_hops: layered flow(bipartite) 검사 BFS 홉 수
+            supernode_policy: 슈퍼노드 정책 (None이면 제한 없음)
+        """
+        self.damping_factor = damping_factor
+        self.max_iter = max_iter
+        self.layered_max_hops = layered_max_hops
+        self.supernode_policy = supernode_policy
+        self.normalizer = MPOCryptoMLNormalizer()
+
+    def extract(
+        self,
+        graph: nx.DiGraph,
+        transactions: Optional[List[Dict[str, Any]]] = None,
+        sdn_addresses: Optional[Iterable[str]] = None,
+        mixer_addresses: Optional[Iterable[str]] = None,
+        addresses: Optional[Iterable[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        그래프의 모든 노드(또는 지정한 주소)에 대한 피처 테이블
+
+        Args:
+            graph: MPOCryptoMLPatternDetector 형식의 거래 그래프
+            transactions: Nθ/Nω fallback용 거래 리스트
+            sdn_addresses: SDN 리스트
+            mixer_addresses: 믹서 리스트
+            addresses: 행이 필요한 주소 (None이면 전체). 지정하면 노드별 탐색(stack, layered flow)을
+                이 주소들로 제한하고 그래프에 있는 주소의 행만 반환
+
+        Returns:
+            컬럼명 → 배열 (COLUMNS 순서, "address"는 object 배열)
+        """
+        if not graph or graph.number_of_nodes() == 0:
+            return self.empty_table()
+
+        columns = ColumnarGraph.from_networkx(graph, self.normalizer._extract_timestamp)
+        return self.extract_columns(columns, transactions, sdn_addresses, mixer_addresses, addresses)
+
+    def extract_columns(
+        self,
+        columns: ColumnarGraph,
+        transactions: Optional[List[Dict[str, Any]]] = None,
+        sdn_addresses: Optional[Iterable[str]] = None,
+        mixer_addresses: Optional[Iterable[str]] = None,
+        addresses: Optional[Iterable[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        ColumnarGraph로 피처 테이블 계산 (networkx 그래프 없이)
+
+        대용량 거래는 ColumnarGraph.from_arrays로 바로 만들어 넘기면 된다.
+        결과는 같은 거래로 만든 그래프의 extract()와 같다.
+
+        Args:
+            columns: 거래 컬럼 그래프 (집계 엣지 + 거래별 timestamp/weight)
+            transactions: Nθ/Nω fallback용 거래 리스트
+            sdn_addresses: SDN 리스트
+            mixer_addresses: 믹서 리스트
+            addresses: 행이 필요한 주소 (None이면 전체, extract()와 같음)
+
+        Returns:
+            컬럼명 → 배열 (COLUMNS 순서, "address"는 object 배열)
+        """
+        csr = columns.edges
+        if csr.number_of_nodes == 0:
+            return self.empty_table()
+        focus = None
+        if addresses is not None:
+            focus = self._membership(csr, addresses)
+            if not focus.any():
+                return self.empty_table()
+        expandable = None
+        if self.supernode_policy is not None:
+            expandable = self.supernode_policy.expandable_mask(
+                csr.nodes, csr.out_degree() + csr.in_degree()
+            )
+
+        table: Dict[str, np.ndarray] = {"address": np.array(csr.nodes, dtype=object)}
+
+        # Fan-in / Fan-out / Gather-Scatter
+        stats_in = ColumnarGraph.segment_stats(csr.rev_indptr, csr.rev_weights)
+        stats_out = ColumnarGraph.segment_stats(csr.indptr, csr.weights)
+        table["fan_in"] = stats_in["sum"]
+        table["fan_in_count"] = csr.in_degree()
+        table["fan_out"] = stats_out["sum"]
+        table["fan_out_count"] = csr.out_degree()
+        table["gather_scatter"] = table["fan_in"] + table["fan_out"]
+        table["gather_scatter_count"] = table["fan_in_count"] + table["fan_out_count"]
+
+        # 패턴 플래그
+        table["fan_in_detected"] = self._fan_detected(csr.rev_indptr, csr.rev_weights)
+        table["fan_out_detected"] = self._fan_detected(csr.indptr, csr.weights)
+        table["gather_scatter_detected"] = (
+            (table["fan_in_detected"] & table["fan_out_detected"]) |
+            ((table["gather_scatter"] > 0) & (table["gather_scatter_count"] >= 5))
+        )
+        table["stack_detected"] = self._stack_detected(csr, expandable, focus)
+        table["bipartite_detected"] = self._layered_detected(csr, expandable, focus)
+        table["pattern_score"] = np.minimum(100.0, sum(
+            score * table[f"{name}_detected"] for name, score in PATTERN_SCORES.items()
+        ))
+
+        # Nθ / Nω
+        normalized = self.normalizer.normalize_all(None, transactions, columns=columns)
+        table["n_theta"] = normalized["n_theta"]
+        table["n_omega"] = normalized["n_omega"]
+
+        # PPR (personalization별 PageRank 한 번씩)
+        edge_mask = self._policy_edge_mask(csr, expandable)
+        sources = (csr.out_degree() > 0) & (csr.in_degree() == 0)
+        table["ppr_score"] = self._ppr(csr, sources, edge_mask)
+        table["sdn_ppr"] = self._ppr(csr, self._membership(csr, sdn_addresses), edge_mask)
+        table["mixer_ppr"] = self._ppr(csr, self._membership(csr, mixer_addresses), edge_mask)
+
+        if focus is not None:
+            return {name: table[name][focus] for name in self.COLUMNS}
+        return {name: table[name] for name in self.COLUMNS}
+
+    def empty_table(self) -> Dict[str, np.ndarray]:
+        """빈 피처 테이블"""
+        table = {name: np.zeros(0, dtype=np.float64) for name in self.COLUMNS}
+        table["address"] = np.zeros(0, dtype=object)
+        return table
+
+    # ------------------------------------------------------------------
+    # 패턴 플래그
+    # ------------------------------------------------------------------
+
+    def _fan_detected(self, indptr: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """min_each 이상 엣지가 FAN_MIN_COUNT개 이상이고 합계가 FAN_MIN_TOTAL_VALUE 이상"""
+        stats = ColumnarGraph.segment_stats(indptr, weights, weights >= self.FAN_MIN_EACH_VALUE)
+        return (stats["count"] >= self.FAN_MIN_COUNT) & (stats["sum"] >= self.FAN_MIN_TOTAL_VALUE)
+
+    def _stack_detected(
+        self,
+        csr: CSRGraph,
+        expandable: Optional[np.ndarray],
+        focus: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Stack 경로 존재 여부 (focus가 있으면 그 노드만 탐색, 나머지는 False)
+
+        - 하한: 서로 다른 세 노드로 된 최대 2-hop 경로 가치 (≥ 기준이면 확정)
+        - 상한: STACK_MAX_NODES 이내 walk의 최대 가치 (< 기준이면 불가능 확정)
+        - 둘 사이의 노드만 _find_stack_path(find_stack_path와 같은 DFS)로 탐색
+        """
+        n = csr.number_of_nodes
+        rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(csr.indptr))
+        simple = rows != csr.indices
+        threshold = self.STACK_MIN_PATH_VALUE
+
+        # 상한: max-plus walk (자기 루프 제외, 2 ~ STACK_MAX_NODES-1 hop)
+        best = self._max_plus(csr.indptr, np.where(simple, csr.weights, -np.inf))
+        upper = np.full(n, -np.inf)
+        for _ in range(self.STACK_MAX_NODES - 2):
+            best = self._max_plus(csr.indptr, np.where(simple, csr.weights + best[csr.indices], -np.inf))
+            upper = np.maximum(upper, best)
+
+        # 하한: v → u → w (w ∉ {v, u}), 슈퍼노드는 확장하지 않는 것으로 보고 제외
+        top1, top1_target, top2 = self._top2_successors(csr, rows, simple)
+        second_hop = np.where(top1_target[csr.indices] != rows, top1[csr.indices], top2[csr.indices])
+        candidate = np.where(simple, csr.weights + second_hop, -np.inf)
+        if expandable is not None:
+            candidate = np.where(expandable[csr.indices] & expandable[rows], candidate, -np.inf)
+        lower = self._max_plus(csr.indptr, candidate)
+
+        detected = lower >= threshold
+        candidates = ~detected & (upper >= threshold)
+        if focus is not None:
+            candidates &= focus
+        ambiguous = np.flatnonzero(candidates)
+        if len(ambiguous):
+            ordered: Dict[tuple, List[tuple]] = {}
+            degrees = csr.out_degree() + csr.in_degree()
+            for index in ambiguous:
+                # 확장 상한에 걸린 노드(partial)는 이전과 같이 미탐지로 둠
+                detected[index] = self._find_stack_path(csr, int(index), degrees, ordered)
+        return detected
+
+    def _find_stack_path(
+        self,
+        csr: CSRGraph,
+        start: int,
+        degrees: np.ndarray,
+        ordered: Dict[tuple, List[tuple]],
+        max_expansions: int = 5000
+    ) -> bool:
+        """
+        MPOCryptoMLPatternDetector.find_stack_path와 같은 DFS를 CSR 배열 위에서 수행
+
+        후속 노드는 (가중치, 주소) 내림차순, 슈퍼노드는 정책의 limit()으로 제한 (시작 노드는 is_root),
+        경로는 최대 STACK_MAX_NODES 노드, 노드 확장이 max_expansions를 넘으면 미탐지
+
+        Args:
+            csr: 집계 엣지 CSR
+            start: 시작 노드 인덱스
+            degrees: 노드별 차수 (in + out, 슈퍼노드 판정용)
+            ordered: (노드, is_root) → 정렬된 (가중치, 주소, 인덱스) 캐시 (노드 간 공유)
+            max_expansions: 노드 확장 상한
+
+        Returns:
+            조건을 만족하는 경로 존재 여부
+        """
+        min_length = self.STACK_MIN_LENGTH
+        threshold = self.STACK_MIN_PATH_VALUE
+        state = {"expanded": 0}
+
+        def successors(node: int, is_root: bool) -> List[tuple]:
+            key = (node, is_root)
+            if key not in ordered:
+                begin, end = csr.indptr[node], csr.indptr[node + 1]
+                targets = csr.indices[begin:end].tolist()
+                weights = csr.weights[begin:end].tolist()
+                if self.supernode_policy is not None:
+                    names = [csr.nodes[target] for target in targets]
+                    kept = set(self.supernode_policy.limit(csr.nodes[node], names, int(degrees[node]), is_root))
+                    pairs = [(w, t) for w, t, name in zip(weights, targets, names) if name in kept]
+                else:
+                    pairs = list(zip(weights, targets))
+                ordered[key] = sorted(
+                    ((weight, csr.nodes[target], target) for weight, target in pairs),
+                    reverse=True
+                )
+            return ordered[key]
+
+        def dfs(current: int, length: int, visited: set, path_value: float) -> bool:
+            if length >= min_length and path_value >= threshold:
+                return True
+            if length >= self.STACK_MAX_NODES or state["expanded"] >= max_expansions:
+                return False
+            state["expanded"] += 1
+            for weight, _, successor in successors(current, current == start):
+                if successor in visited:
+                    continue
+                visited.add(successor)
+                found = dfs(successor, length + 1, visited, path_value + weight)
+                visited.remove(successor)
+                if found:
+                    return True
+            return False
+
+        return dfs(start, 1, {start}, 0.0)
+
+    @staticmethod
+    def _max_plus(indptr: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """CSR 구간별 최댓값 (빈 구간은 -inf)"""
+        result = np.full(len(indptr) - 1, -np.inf)
+        nonempty = np.flatnonzero(np.diff(indptr) > 0)
+        if len(nonempty):
+            result[nonempty] = np.maximum.reduceat(values, indptr[nonempty])
+        return result
+
+    @staticmethod
+    def _top2_successors(
+        csr: CSRGraph,
+        rows: np.ndarray,
+        simple: np.ndarray
+    ):
+        """노드별 가장 무거운 나가는 엣지 (가중치, 대상)와 두 번째 가중치 (자기 루프 제외)"""
+        n = csr.number_of_nodes
+        weights = np.where(simple, csr.weights, -np.inf)
+        order = np.lexsort((-weights, rows))
+        sorted_rows = rows[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sorted_rows[1:] != sorted_rows[:-1]
+        second = np.zeros(len(order), dtype=bool)
+        second[1:] = first[:-1] & ~first[1:]
+
+        top1 = np.full(n, -np.inf)
+        top1_target = np.full(n, -1, dtype=np.int64)
+        top2 = np.full(n, -np.inf)
+        top1[sorted_rows[first]] = weights[order][first]
+        top1_target[sorted_rows[first]] = csr.indices[order][first]
+        top2[sorted_rows[second]] = weights[order][second]
+        return top1, top1_target, top2
+
+    def _layered_detected(
+        self,
+        csr: CSRGraph,
+        expandable: Optional[np.ndarray],
+        focus: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        layered flow(bipartite) 여부 (detect_layered_flow 기본값 기준, focus가 있으면 그 노드만 검사)
+
+        2번째 레이어가 생길 수 있는 노드(확장 가능한 후속 노드 중 out-degree > 0이 있음)만
+        CSR BFS로 검사
+        """
+        n = csr.number_of_nodes
+        detected = np.zeros(n, dtype=bool)
+        if self.layered_max_hops < 2:
+            return detected
+
+        has_next = csr.out_degree()[csr.indices] > 0
+        if expandable is not None:
+            has_next &= expandable[csr.indices]
+        reach = np.zeros(n, dtype=bool)
+        nonempty = np.flatnonzero(np.diff(csr.indptr) > 0)
+        if len(nonempty):
+            reach[nonempty] = np.logical_or.reduceat(has_next, csr.indptr[nonempty])
+        if focus is not None:
+            reach &= focus
+
+        for index in np.flatnonzero(reach):
+            flow = csr.layered_flow(
+                int(index),
+                max_hops=self.layered_max_hops,
+                expandable=expandable
+            )
+            detected[index] = flow["violations"] == 0 and len(flow["layer_sizes"]) - 1 >= 2
+        return detected
+
+    # ------------------------------------------------------------------
+    # PPR
+    # ------------------------------------------------------------------
+
+    def _policy_edge_mask(
+        self,
+        csr: CSRGraph,
+        expandable: Optional[np.ndarray]
+    ) -> Optional[np.ndarray]:
+        """SupernodePolicy.restricted_view와 같은 엣지 마스크 (슈퍼노드의 제한된 나가는 엣지 숨김)"""
+        if expandable is None or expandable.all():
+            return None
+        mask = np.ones(csr.number_of_edges, dtype=bool)
+        degrees = csr.out_degree() + csr.in_degree()
+        for index in np.flatnonzero(~expandable):
+            start, end = csr.indptr[index], csr.indptr[index + 1]
+            successors = [csr.nodes[j] for j in csr.indices[start:end]]
+            kept = set(self.supernode_policy.limit(csr.nodes[index], successors, int(degrees[index])))
+            mask[start:end] = [successor in kept for successor in successors]
+        return mask
+
+    @staticmethod
+    def _membership(csr: CSRGraph, addresses: Optional[Iterable[str]]) -> np.ndarray:
+        """주소 리스트에 속한 노드 마스크"""
+        mask = np.zeros(csr.number_of_nodes, dtype=bool)
+        for address in addresses or ():
+            index = csr.node_index.get(address.lower())
+            if index is not None:
+                mask[index] = True
+        return mask
+
+    def _ppr(
+        self,
+        csr: CSRGraph,
+        seeds: np.ndarray,
+        edge_mask: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """seeds에 균등 재시작하는 PPR (시드가 없거나 수렴하지 않으면 0)"""
+        if not seeds.any():
+            return np.zeros(csr.number_of_nodes, dtype=np.float64)
+        scores = csr.personalized_pagerank(
+            seeds.astype(np.float64),
+            alpha=self.damping_factor,
+            max_iter=self.max_iter,
+            edge_mask=edge_mask
+        )
+        if scores is None:
+            return np.zeros(csr.number_of_nodes, dtype=np.float64)
+        return scores
+
+    # ------------------------------------------------------------------
+    # 테이블 변환 / 저장
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def row(table: Dict[str, np.ndarray], address: str) -> Optional[Dict[str, Any]]:
+        """
+        테이블에서 한 주소의 피처를 extract_mpocryptml_features 형식으로 변환
+
+        Returns:
+            피처 딕셔너리 (주소가 없으면 None)
+        """
+        matches = np.flatnonzero(table["address"] == address.lower())
+        if len(matches) == 0:
+            return None
+        i = int(matches[0])
+
+        detected_patterns = [
+            name for name in PATTERN_SCORES
+            if table[f"{name}_detected"][i]
+        ]
+        return {
+            "ppr_score": float(table["ppr_score"][i]),
+            "sdn_ppr": float(table["sdn_ppr"][i]),
+            "mixer_ppr": float(table["mixer_ppr"][i]),
+            "pattern_score": float(table["pattern_score"][i]),
+            "n_theta": float(table["n_theta"][i]),
+            "n_omega": float(table["n_omega"][i]),
+            "detected_patterns": detected_patterns,
+            "fan_in_count": int(table["fan_in_count"][i]),
+            "fan_out_count": int(table["fan_out_count"][i]),
+            "gather_scatter": float(table["gather_scatter"][i])
+        }
+
+    @staticmethod
+    def save(table: Dict[str, np.ndarray], path: str) -> Path:
+        """
+        피처 테이블 저장
+
+        확장자가 .parquet이면 Parquet (pyarrow/fastparquet 필요), 그 외에는 npz로 저장.
+        Parquet 엔진이 없으면 같은 이름의 .npz로 저장한다.
+
+        Returns:
+            실제로 저장한 경로
+        """
+        output_path = Path(path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if output_path.suffix == ".parquet":
+            import pandas as pd
+            try:
+                pd.DataFrame(table).to_parquet(output_path, index=False)
+                return output_path
+            except ImportError:
+                print("Warning: Parquet 엔진(pyarrow)이 없어 npz로 저장합니다.")
+                output_path = output_path.with_suffix(".npz")
+
+        if output_path.suffix != ".npz":
+            output_path = output_path.with_name(output_path.name + ".npz")
+        # 주소 컬럼은 pickle 없이 읽을 수 있도록 문자열 배열로 저장
+        np.savez_compressed(output_path, **{
+            name: values.astype(str) if values.dtype == object else values
+            for name, values in table.items()
+        })
+        return output_path
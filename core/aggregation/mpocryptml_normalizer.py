@@ -6,9 +6,26 @@ MPOCryptoML Timestamp 및 Weight 정규화 모듈
 
 from typing import Dict, List, Set, Optional, Any, Tuple
 from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
 import networkx as nx
 import numpy as np
 
+from .csr_graph import ColumnarGraph
+
+
+@lru_cache(maxsize=65536)
+def _parse_timestamp_str(timestamp: str) -> int:
+    """문자열 타임스탬프 → Unix 초 (실패 시 0, 같은 문자열은 한 번만 파싱)"""
+    try:
+        if 'T' in timestamp or ' ' in timestamp:
+            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            return int(dt.timestamp())
+        else:
+            return int(timestamp)
+    except:
+        return 0
+
 
 class MPOCryptoMLNormalizer:
     """
@@ -19,7 +36,8 @@ class MPOCryptoMLNormalizer:
     """
     
     def __init__(self):
-        pass
+        # 마지막으로 사용한 fallback 거래 리스트의 컬럼 (리스트 객체, 길이, 컬럼)
+        self._fallback_cache: Optional[Tuple[List[Dict[str, Any]], int, ColumnarGraph]] = None
     
     def normalize_timestamp(
         self,
@@ -47,62 +65,19 @@ class MPOCryptoMLNormalizer:
         
         vertex = vertex.lower()
         
-        # In-degree timestamps (들어오는 거래의 타임스탬프)
-        ts_in = []
-        for predecessor in graph.predecessors(vertex):
-            edge_data = graph[predecessor][vertex]
-            if "transactions" in edge_data:
-                for tx in edge_data["transactions"]:
-                    ts = self._extract_timestamp(tx.get("timestamp"))
-                    if ts > 0:
-                        ts_in.append(ts)
-        
-        # Out-degree timestamps (나가는 거래의 타임스탬프)
-        ts_out = []
-        for successor in graph.successors(vertex):
-            edge_data = graph[vertex][successor]
-            if "transactions" in edge_data:
-                for tx in edge_data["transactions"]:
-                    ts = self._extract_timestamp(tx.get("timestamp"))
-                    if ts > 0:
-                        ts_out.append(ts)
+        # In/Out-degree 거래 타임스탬프
+        ts_in = self._edge_timestamps(graph.in_edges(vertex, data=True))
+        ts_out = self._edge_timestamps(graph.out_edges(vertex, data=True))
+        stats_in = self._stats(ts_in[ts_in > 0])
+        stats_out = self._stats(ts_out[ts_out > 0])
         
         # 타임스탬프가 없으면 그래프의 거래에서 직접 추출
-        if not ts_in or not ts_out:
-            ts_in, ts_out = self._extract_timestamps_from_transactions(
-                vertex, transactions
+        if not stats_in["count"][0] or not stats_out["count"][0]:
+            stats_in, stats_out = self._fallback_stats(
+                vertex, transactions, "timestamp"
             )
         
-        if not ts_in or not ts_out:
-            return 0.0
-        
-        # Temporal spread 계산
-        # 논문: TS_in(vi) = max(TS_in) - min(TS_in)
-        ts_in_spread = max(ts_in) - min(ts_in) if len(ts_in) > 1 else 0
-        ts_out_spread = max(ts_out) - min(ts_out) if len(ts_out) > 1 else 0
-        
-        # 평균 타임스탬프
-        ts_in_avg = np.mean(ts_in)
-        ts_out_avg = np.mean(ts_out)
-        
-        # 시간적 비대칭성: 유입과 유출의 시간 차이
-        # 세탁 계정은 유입 후 빠르게 유출하므로 시간 차이가 작음
-        time_diff = abs(ts_out_avg - ts_in_avg)
-        
-        # 정규화: 시간 차이를 0~1 범위로 변환
-        # 논문의 정규화 방식에 따라 조정
-        if ts_in_spread + ts_out_spread > 0:
-            # 시간 분포가 넓을수록 정규화 값이 작아짐
-            normalized_diff = time_diff / (ts_in_spread + ts_out_spread + 1)
-        else:
-            # 분포가 없으면 시간 차이만 고려
-            normalized_diff = min(1.0, time_diff / 86400)  # 1일 기준 정규화
-        
-        # 세탁 계정은 시간 차이가 작으므로, 작은 값일수록 의심스러움
-        # 반대로 변환: 1 - normalized_diff (작은 시간 차이 = 높은 점수)
-        n_theta = 1.0 - min(1.0, normalized_diff)
-        
-        return n_theta
+        return float(self._theta(stats_in, stats_out)[0])
     
     def normalize_weight(
         self,
@@ -130,77 +105,228 @@ class MPOCryptoMLNormalizer:
         
         vertex = vertex.lower()
         
-        # In-degree weights (들어오는 거래의 금액)
-        weights_in = []
-        for predecessor in graph.predecessors(vertex):
-            edge_data = graph[predecessor][vertex]
-            weight = edge_data.get("weight", 0)
-            if weight > 0:
-                weights_in.append(weight)
-        
-        # Out-degree weights (나가는 거래의 금액)
-        weights_out = []
-        for successor in graph.successors(vertex):
-            edge_data = graph[vertex][successor]
-            weight = edge_data.get("weight", 0)
-            if weight > 0:
-                weights_out.append(weight)
+        # In/Out-degree 엣지 금액
+        weights_in = self._edge_weights(graph.in_edges(vertex, data=True))
+        weights_out = self._edge_weights(graph.out_edges(vertex, data=True))
+        stats_in = self._stats(weights_in[weights_in > 0])
+        stats_out = self._stats(weights_out[weights_out > 0])
         
         # 금액이 없으면 거래에서 직접 추출
-        if not weights_in or not weights_out:
-            weights_in, weights_out = self._extract_weights_from_transactions(
-                vertex, transactions
+        if not stats_in["count"][0] or not stats_out["count"][0]:
+            stats_in, stats_out = self._fallback_stats(
+                vertex, transactions, "weight"
             )
         
-        if not weights_in or not weights_out:
-            return 0.0
+        return float(self._omega(stats_in, stats_out)[0])
+    
+    def normalize_all(
+        self,
+        graph: Optional[nx.DiGraph],
+        transactions: Optional[List[Dict[str, Any]]] = None,
+        columns: Optional[ColumnarGraph] = None
+    ) -> Dict[str, Any]:
+        """
+        그래프의 모든 노드에 대한 Nθ/Nω 일괄 계산
+        
+        그래프를 ColumnarGraph로 한 번 변환한 뒤 노드별 유입/유출 구간에 대한
+        NumPy 리덕션으로 계산한다. 결과는 normalize_timestamp/normalize_weight와 같다.
         
-        # 총 금액
-        total_in = sum(weights_in)
-        total_out = sum(weights_out)
+        Args:
+            graph: 거래 그래프 (columns를 주면 사용하지 않으므로 None 가능)
+            transactions: fallback용 거래 리스트 (엣지에 타임스탬프/금액이 없는 노드)
+            columns: 이미 만든 graph의 ColumnarGraph (None이면 graph로 새로 생성)
+        
+        Returns:
+            {
+                "nodes": List[str],
+                "n_theta": np.ndarray,  # nodes와 같은 순서
+                "n_omega": np.ndarray
+            }
+        """
+        if columns is None and graph:
+            columns = ColumnarGraph.from_networkx(graph, self._extract_timestamp)
+        if columns is None or len(columns.nodes) == 0:
+            return {
+                "nodes": [],
+                "n_theta": np.zeros(0, dtype=np.float64),
+                "n_omega": np.zeros(0, dtype=np.float64)
+            }
         
-        # 평균 금액
-        avg_in = np.mean(weights_in) if weights_in else 0
-        avg_out = np.mean(weights_out) if weights_out else 0
+        edges = columns.edges
+        segment_stats = ColumnarGraph.segment_stats
         
-        # 금액 불균형 계산
-        # 논문: 유입과 유출의 금액 차이를 측정
-        if total_in + total_out > 0:
-            # 비율 차이
-            ratio_in = total_in / (total_in + total_out)
-            ratio_out = total_out / (total_in + total_out)
+        ts_in = segment_stats(columns.tx_in_indptr, columns.tx_in_timestamp, columns.tx_in_timestamp > 0)
+        ts_out = segment_stats(columns.tx_out_indptr, columns.tx_out_timestamp, columns.tx_out_timestamp > 0)
+        weights_in = segment_stats(edges.rev_indptr, edges.rev_weights, edges.rev_weights > 0)
+        weights_out = segment_stats(edges.indptr, edges.weights, edges.weights > 0)
+        
+        if transactions:
+            fallback = self._fallback_columns(transactions)
+            # fallback 컬럼 노드 → 그래프 노드 인덱스 (그래프에 없는 주소는 -1)
+            positions = np.array(
+                [fallback.node_index.get(node, -1) for node in columns.nodes],
+                dtype=np.int64
+            )
+            for kind, stats_in, stats_out in (
+                ("timestamp", ts_in, ts_out),
+                ("weight", weights_in, weights_out)
+            ):
+                missing = (stats_in["count"] == 0) | (stats_out["count"] == 0)
+                fb_in, fb_out = self._fallback_column_stats(fallback, kind)
+                for stats, fb_stats in ((stats_in, fb_in), (stats_out, fb_out)):
+                    for key, values in stats.items():
+                        replaced = np.zeros_like(values)
+                        known = positions >= 0
+                        replaced[known] = fb_stats[key][positions[known]]
+                        stats[key] = np.where(missing, replaced, values)
+        
+        return {
+            "nodes": list(columns.nodes),
+            "n_theta": self._theta(ts_in, ts_out),
+            "n_omega": self._omega(weights_in, weights_out)
+        }
+    
+    # ------------------------------------------------------------------
+    # 벡터화된 점수 계산 (노드별 통계 배열 → 점수 배열)
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _theta(
+        stats_in: Dict[str, np.ndarray],
+        stats_out: Dict[str, np.ndarray]
+    ) -> np.ndarray:
+        """유입/유출 타임스탬프 통계 → Nθ"""
+        count_in, count_out = stats_in["count"], stats_out["count"]
+        valid = (count_in > 0) & (count_out > 0)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Temporal spread 계산
+            # 논문: TS_in(vi) = max(TS_in) - min(TS_in)
+            spread = (stats_in["max"] - stats_in["min"]) + (stats_out["max"] - stats_out["min"])
             
-            # 불균형도: 비율 차이의 절댓값
-            imbalance = abs(ratio_in - ratio_out)
-        else:
-            imbalance = 0.0
+            # 시간적 비대칭성: 유입과 유출의 평균 시간 차이
+            # 세탁 계정은 유입 후 빠르게 유출하므로 시간 차이가 작음
+            time_diff = np.abs(
+                stats_out["sum"] / np.maximum(count_out, 1) -
+                stats_in["sum"] / np.maximum(count_in, 1)
+            )
+            
+            # 시간 분포가 넓을수록 정규화 값이 작아짐, 분포가 없으면 1일 기준 정규화
+            normalized_diff = np.where(
+                spread > 0,
+                time_diff / (spread + 1),
+                np.minimum(1.0, time_diff / 86400)
+            )
         
-        # 평균 금액 차이도 고려
-        if avg_in + avg_out > 0:
-            avg_imbalance = abs(avg_in - avg_out) / (avg_in + avg_out)
-        else:
-            avg_imbalance = 0.0
+        # 작은 시간 차이 = 높은 점수
+        return np.where(valid, 1.0 - np.minimum(1.0, normalized_diff), 0.0)
+    
+    @staticmethod
+    def _omega(
+        stats_in: Dict[str, np.ndarray],
+        stats_out: Dict[str, np.ndarray]
+    ) -> np.ndarray:
+        """유입/유출 금액 통계 → Nω"""
+        count_in, count_out = stats_in["count"], stats_out["count"]
+        valid = (count_in > 0) & (count_out > 0)
+        total_in, total_out = stats_in["sum"], stats_out["sum"]
+        avg_in = total_in / np.maximum(count_in, 1)
+        avg_out = total_out / np.maximum(count_out, 1)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # 불균형도: 유입/유출 비율 차이의 절댓값
+            total = total_in + total_out
+            imbalance = np.where(total > 0, np.abs(total_in - total_out) / total, 0.0)
+            
+            # 평균 금액 차이도 고려
+            avg_total = avg_in + avg_out
+            avg_imbalance = np.where(avg_total > 0, np.abs(avg_in - avg_out) / avg_total, 0.0)
         
-        # 정규화: 불균형도를 0~1 범위로 변환
-        # 논문의 정규화 방식
-        n_omega = (imbalance + avg_imbalance) / 2.0
+        return np.where(valid, np.minimum(1.0, (imbalance + avg_imbalance) / 2.0), 0.0)
+    
+    @staticmethod
+    def _stats(values: np.ndarray) -> Dict[str, np.ndarray]:
+        """단일 노드 값 배열 → 길이 1 통계 배열"""
+        values = values.astype(np.float64)
+        has_values = len(values) > 0
+        return {
+            "count": np.array([len(values)], dtype=np.int64),
+            "sum": np.array([values.sum()]),
+            "min": np.array([values.min() if has_values else 0.0]),
+            "max": np.array([values.max() if has_values else 0.0])
+        }
+    
+    def _edge_timestamps(self, edges) -> np.ndarray:
+        """엣지들의 거래 타임스탬프 배열"""
+        return np.fromiter(
+            (
+                self._extract_timestamp(tx.get("timestamp"))
+                for _, _, data in edges
+                for tx in data.get("transactions", ())
+            ),
+            dtype=np.int64
+        )
+    
+    @staticmethod
+    def _edge_weights(edges) -> np.ndarray:
+        """엣지 가중치 배열"""
+        return np.fromiter(
+            (data.get("weight", 0) for _, _, data in edges),
+            dtype=np.float64
+        )
+    
+    # ------------------------------------------------------------------
+    # 거래 리스트 fallback
+    # ------------------------------------------------------------------
+    
+    def _fallback_columns(self, transactions: List[Dict[str, Any]]) -> ColumnarGraph:
+        """
+        fallback 거래 리스트의 컬럼 (같은 리스트를 반복해서 넘기면 재사용)
         
-        return min(1.0, n_omega)
+        리스트 객체를 캐시에 보관하므로 id 재사용으로 잘못 적중하지 않으며,
+        길이가 바뀌면 다시 만든다.
+        """
+        cached = self._fallback_cache
+        if cached is not None and cached[0] is transactions and cached[1] == len(transactions):
+            return cached[2]
+        columns = ColumnarGraph.from_transactions(transactions, self._extract_timestamp)
+        self._fallback_cache = (transactions, len(transactions), columns)
+        return columns
+    
+    def _fallback_column_stats(
+        self,
+        columns: ColumnarGraph,
+        kind: str
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """fallback 컬럼의 노드별 유입/유출 통계 (kind: "timestamp" 또는 "weight")"""
+        if kind == "timestamp":
+            values_in, values_out = columns.tx_in_timestamp, columns.tx_out_timestamp
+        else:
+            values_in, values_out = columns.tx_in_weight, columns.tx_out_weight
+        return (
+            ColumnarGraph.segment_stats(columns.tx_in_indptr, values_in, values_in > 0),
+            ColumnarGraph.segment_stats(columns.tx_out_indptr, values_out, values_out > 0)
+        )
+    
+    def _fallback_stats(
+        self,
+        vertex: str,
+        transactions: List[Dict[str, Any]],
+        kind: str
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """거래 리스트에서 단일 노드의 유입/유출 통계"""
+        if not transactions:
+            empty = self._stats(np.zeros(0))
+            return empty, empty
+        values_in, values_out = self._fallback_values(vertex, transactions, kind)
+        return self._stats(values_in), self._stats(values_out)
     
     def _extract_timestamp(self, timestamp: Any) -> int:
         """타임스탬프를 정수로 변환"""
         if isinstance(timestamp, int):
             return timestamp
         elif isinstance(timestamp, str):
-            try:
-                from datetime import datetime
-                if 'T' in timestamp or ' ' in timestamp:
-                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    return int(dt.timestamp())
-                else:
-                    return int(timestamp)
-            except:
-                return 0
+            return _parse_timestamp_str(timestamp)
         return 0
     
     def _extract_timestamps_from_transactions(
@@ -209,22 +335,8 @@ class MPOCryptoMLNormalizer:
         transactions: List[Dict[str, Any]]
     ) -> Tuple[List[int], List[int]]:
         """거래 리스트에서 타임스탬프 추출"""
-        vertex = vertex.lower()
-        ts_in = []
-        ts_out = []
-        
-        for tx in transactions:
-            from_addr = (tx.get("from") or tx.get("counterparty_address", "")).lower()
-            to_addr = (tx.get("to") or tx.get("target_address", "")).lower()
-            ts = self._extract_timestamp(tx.get("timestamp"))
-            
-            if ts > 0:
-                if to_addr == vertex:
-                    ts_in.append(ts)
-                elif from_addr == vertex:
-                    ts_out.append(ts)
-        
-        return ts_in, ts_out
+        stats = self._fallback_values(vertex, transactions, "timestamp")
+        return [int(ts) for ts in stats[0]], [int(ts) for ts in stats[1]]
     
     def _extract_weights_from_transactions(
         self,
@@ -232,34 +344,28 @@ class MPOCryptoMLNormalizer:
         transactions: List[Dict[str, Any]]
     ) -> Tuple[List[float], List[float]]:
         """거래 리스트에서 금액 추출 (USD 우선, 없으면 Wei 사용)"""
-        vertex = vertex.lower()
-        weights_in = []
-        weights_out = []
-        
-        for tx in transactions:
-            from_addr = (tx.get("from") or tx.get("counterparty_address", "")).lower()
-            to_addr = (tx.get("to") or tx.get("target_address", "")).lower()
-            
-            # USD 값 우선, 없으면 Wei 값 사용 (정규화를 위해 1e18로 나눔)
-            usd_value = float(tx.get("usd_value", tx.get("amount_usd", 0)))
-            if usd_value > 0:
-                weight = usd_value
-            else:
-                # Wei 단위 값을 사용 (1 ETH = 1e18 Wei)
-                wei_value = float(tx.get("value", 0))
-                if wei_value > 0:
-                    # Wei를 ETH로 변환 (정규화)
-                    weight = wei_value / 1e18
-                else:
-                    continue  # 값이 없으면 스킵
-            
-            if weight > 0:
-                if to_addr == vertex:
-                    weights_in.append(weight)
-                elif from_addr == vertex:
-                    weights_out.append(weight)
-        
-        return weights_in, weights_out
+        stats = self._fallback_values(vertex, transactions, "weight")
+        return stats[0].tolist(), stats[1].tolist()
+    
+    def _fallback_values(
+        self,
+        vertex: str,
+        transactions: List[Dict[str, Any]],
+        kind: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """거래 리스트에서 단일 노드의 유입/유출 값 (0 이하 제외)"""
+        empty = np.zeros(0)
+        columns = self._fallback_columns(transactions)
+        index = columns.node_index.get(vertex.lower())
+        if index is None:
+            return empty, empty
+        if kind == "timestamp":
+            values_in, values_out = columns.tx_in_timestamp, columns.tx_out_timestamp
+        else:
+            values_in, values_out = columns.tx_in_weight, columns.tx_out_weight
+        values_in = values_in[columns.tx_in_indptr[index]:columns.tx_in_indptr[index + 1]]
+        values_out = values_out[columns.tx_out_indptr[index]:columns.tx_out_indptr[index + 1]]
+        return values_in[values_in > 0], values_out[values_out > 0]
     
     def calculate_feature_vector(
         self,
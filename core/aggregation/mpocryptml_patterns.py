@@ -6,14 +6,22 @@ MPOCryptoML 패턴 탐지 모듈
 - Fan-out: d_i^+(S) = Σ_{v_j ∈ M_{l+1} ∧ (v,j) ∈ E} e_{vj}
 - Gather-Scatter: fan-in(v) + fan-out(v)
 - Stack: directed path P = (v1, v2, ..., vk)
+  (temporal_stack이면 시간 순서를 지키는 경로만 인정, 타임스탬프가 없으면 집계 그래프 경로)
 - Bipartite: ∀(u, v) ∈ E, u ∈ M_l ⇒ v ∈ M_{l+1}
+  (대상 주소 기준 BFS 레이어에 대한 layered flow 검사, CSRGraph 사용)
 """
 
 from typing import Dict, List, Set, Tuple, Optional, Any
 from collections import defaultdict
 from datetime import datetime
+import heapq
+import numpy as np
 import networkx as nx
 
+from .csr_graph import CSRGraph
+from .supernode import SupernodePolicy
+from .temporal_paths import TemporalPathIndex
+
 
 class MPOCryptoMLPatternDetector:
     """
@@ -26,13 +34,39 @@ class MPOCryptoMLPatternDetector:
     - T: timestamps
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        supernode_policy: Optional[SupernodePolicy] = None,
+        temporal_stack: bool = True,
+        max_hop_delay_sec: Optional[int] = 86400
+    ):
+        """
+        Args:
+            supernode_policy: 슈퍼노드 정책 (경로 탐색 시 허브 확장 제한, None이면 제한 없음)
+            temporal_stack: analyze_address_patterns의 stack 존재 확인에 시간 순서 경로 사용
+                            (B-201 temporal: true와 같은 방식, 타임스탬프가 있는 거래가 없으면 집계 그래프로 폴백)
+            max_hop_delay_sec: 시간 순서 경로의 연속된 두 홉 사이 최대 지연 (초, None이면 제한 없음)
+        """
         self.graph: Optional[nx.DiGraph] = None
+        self.supernode_policy = supernode_policy
+        self.temporal_stack = temporal_stack
+        self.max_hop_delay_sec = max_hop_delay_sec
+        # 그래프가 바뀌기 전까지 재사용하는 시간순 인덱스 {max_delay_sec: TemporalPathIndex}
+        self._temporal_indexes: Dict[Optional[int], TemporalPathIndex] = {}
+        self._csr: Optional[CSRGraph] = None
+        self._csr_expandable: Optional[np.ndarray] = None
+        self._csr_key: Optional[Tuple[int, int, int]] = None
+        # find_stack_path용 가중치 내림차순 후속 노드 {(노드, 루트 여부): [(weight, successor), ...]}
+        self._ordered_successors: Dict[Tuple[str, bool], List[Tuple[float, str]]] = {}
+        self._ordered_key: Optional[Tuple[int, int, int]] = None
         self._build_graph()
     
     def _build_graph(self):
         """방향성 그래프 초기화"""
         self.graph = nx.DiGraph()
+        self._csr = None
+        self._ordered_successors = {}
+        self._temporal_indexes = {}
     
     def add_transaction(self, tx: Dict[str, Any]):
         """
@@ -71,6 +105,10 @@ class MPOCryptoMLPatternDetector:
         if not from_addr or not to_addr or weight <= 0:
             return
         
+        self._csr = None
+        self._ordered_successors = {}
+        self._temporal_indexes = {}
+        
         # 노드 추가
         self.graph.add_node(from_addr)
         self.graph.add_node(to_addr)
@@ -106,6 +144,53 @@ class MPOCryptoMLPatternDetector:
         for tx in transactions:
             self.add_transaction(tx)
     
+    def _expand(self, vertex: str, is_root: bool = False) -> List[str]:
+        """경로 탐색용 후속 노드 (슈퍼노드 정책 적용)"""
+        if self.supernode_policy is None:
+            return list(self.graph.successors(vertex))
+        return self.supernode_policy.successors(self.graph, vertex, is_root)
+    
+    def _successor_order_cache(self) -> Dict[Tuple[str, bool], List[Tuple[float, str]]]:
+        """
+        find_stack_path용 정렬 캐시 (add_transaction으로 바뀌거나 그래프의 (id, 노드 수, 엣지 수)가 바뀌면 비움)
+        """
+        key = (id(self.graph), self.graph.number_of_nodes(), self.graph.number_of_edges())
+        if self._ordered_key != key:
+            self._ordered_successors = {}
+            self._ordered_key = key
+        return self._ordered_successors
+    
+    def _successors_by_weight(self, vertex: str, is_root: bool = False) -> List[Tuple[float, str]]:
+        """(weight, successor) 가중치 내림차순 목록 (슈퍼노드 정책 적용)"""
+        return sorted(
+            (
+                (self.graph[vertex][successor].get("weight", 0), successor)
+                for successor in self._expand(vertex, is_root=is_root)
+            ),
+            reverse=True
+        )
+    
+    def get_csr(self) -> CSRGraph:
+        """
+        현재 그래프의 CSR 표현 (그래프가 바뀔 때만 재구축)
+        
+        그래프를 직접 교체하거나 수정한 경우에도 (그래프 id, 노드 수, 엣지 수)가
+        바뀌면 다시 만든다.
+        """
+        key = (id(self.graph), self.graph.number_of_nodes(), self.graph.number_of_edges())
+        if self._csr is None or self._csr_key != key:
+            self._csr = CSRGraph.from_networkx(self.graph)
+            self._csr_key = key
+            self._csr_expandable = None
+            if self.supernode_policy is not None:
+                # 레이어 검사에서는 sample 모드도 terminal로 취급
+                # (샘플 이웃만 보면 위반 엣지 수가 왜곡됨)
+                self._csr_expandable = self.supernode_policy.expandable_mask(
+                    self._csr.nodes,
+                    self._csr.out_degree() + self._csr.in_degree()
+                )
+        return self._csr
+    
     def fan_in(self, vertex: str) -> float:
         """
         Fan-in 계산: d_i^-(S) = Σ_{v_k ∈ M_{l-1} ∧ (k,v) ∈ E} e_{kv}
@@ -334,15 +419,24 @@ class MPOCryptoMLPatternDetector:
         self,
         start_vertex: str,
         min_length: int = 3,
-        min_path_value: float = 100.0
+        min_path_value: float = 100.0,
+        top_k: int = 10,
+        max_expansions: int = 10000,
+        max_paths: int = 1000
     ) -> List[Dict[str, Any]]:
         """
         Stack 패턴 탐지: directed path P = (v1, v2, ..., vk)
         
+        집계 그래프에서 총 가치 기준 상위 top_k 경로를 반환 (enumerate_stack_paths 참고).
+        탐지 여부만 필요하면 find_stack_path() / find_temporal_stack_path()를 사용
+        
         Args:
             start_vertex: 시작 주소
             min_length: 최소 경로 길이
             min_path_value: 최소 경로 총 가치
+            top_k: 반환할 최대 경로 수
+            max_expansions: 노드 확장 상한
+            max_paths: 조건을 만족하는 경로 수집 상한
         
         Returns:
             List of paths, each path is {
@@ -351,26 +445,180 @@ class MPOCryptoMLPatternDetector:
                 "total_value": float
             }
         """
+        return self.enumerate_stack_paths(
+            start_vertex,
+            min_length=min_length,
+            min_path_value=min_path_value,
+            top_k=top_k,
+            max_expansions=max_expansions,
+            max_paths=max_paths
+        )
+    
+    def find_stack_path(
+        self,
+        start_vertex: str,
+        min_length: int = 3,
+        min_path_value: float = 100.0,
+        max_expansions: int = 5000
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Stack 패턴 존재 확인: 조건을 만족하는 첫 경로를 찾으면 즉시 반환
+        
+        엣지 가중치가 음수가 아니므로 경로 가치는 길이에 따라 증가한다.
+        무거운 엣지부터 탐색해 빨리 조건에 도달하도록 하고 (노드별 정렬은 캐시),
+        노드 확장이 max_expansions를 넘으면 탐색을 멈춘다 (최악 지연 시간 고정)
+        
+        Args:
+            start_vertex: 시작 주소
+            min_length: 최소 경로 길이
+            min_path_value: 최소 경로 총 가치
+            max_expansions: 노드 확장 상한
+        
+        Returns:
+            (경로, partial) - 경로는 {"path", "length", "total_value"} 또는 None,
+            partial은 경로를 못 찾은 채 확장 상한에 걸렸는지 여부 (True면 "없음"이 확정이 아님)
+        """
+        if not self.graph or start_vertex.lower() not in self.graph:
+            return None, False
+        
+        start_vertex = start_vertex.lower()
+        state = {"expanded": 0, "truncated": False}
+        ordered = self._successor_order_cache()
+        
+        def dfs(current: str, path: List[str], visited: Set[str], path_value: float):
+            if len(path) >= min_length and path_value >= min_path_value:
+                return {
+                    "path": path.copy(),
+                    "length": len(path),
+                    "total_value": path_value
+                }
+            
+            if len(path) >= 10:  # 너무 긴 경로 방지
+                return None
+            
+            if state["expanded"] >= max_expansions:
+                state["truncated"] = True
+                return None
+            state["expanded"] += 1
+            
+            order_key = (current, current == start_vertex)
+            successors = ordered.get(order_key)
+            if successors is None:
+                successors = ordered[order_key] = self._successors_by_weight(current, is_root=order_key[1])
+            for edge_weight, successor in successors:
+                if successor in visited:
+                    continue
+                visited.add(successor)
+                path.append(successor)
+                found = dfs(successor, path, visited, path_value + edge_weight)
+                path.pop()
+                visited.remove(successor)
+                if found is not None:
+                    return found
+            
+            return None
+        
+        found = dfs(start_vertex, [start_vertex], {start_vertex}, 0.0)
+        return found, found is None and state["truncated"]
+    
+    def find_temporal_stack_path(
+        self,
+        start_vertex: str,
+        min_length: int = 3,
+        min_path_value: float = 100.0,
+        max_delay_sec: Optional[int] = 86400,
+        max_expansions: int = 5000
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        시간 순서를 지키는 Stack 경로 존재 확인
+        
+        엣지별 transactions 리스트를 시간순으로 정렬해, 다음 홉 거래가 이전 홉 이후
+        max_delay_sec 이내일 때만 경로를 확장 (TemporalPathIndex 참고)
+        
+        Args:
+            start_vertex: 시작 주소
+            min_length: 최소 경로 길이
+            min_path_value: 최소 경로 총 가치 (홉 거래 금액 합)
+            max_delay_sec: 연속된 두 홉 사이 최대 지연 (초, None이면 제한 없음)
+            max_expansions: 노드 확장 상한
+        
+        Returns:
+            (경로, partial) - find_stack_path와 같은 형식 (경로에 "hops" 포함)
+        """
+        if not self.graph or start_vertex.lower() not in self.graph:
+            return None, False
+        
+        return self._temporal_index(max_delay_sec).find_stack_path(
+            start_vertex,
+            min_length=min_length,
+            min_path_value=min_path_value,
+            max_expansions=max_expansions
+        )
+    
+    def _temporal_index(self, max_delay_sec: Optional[int]) -> TemporalPathIndex:
+        """그래프 엣지별 transactions로 만든 시간순 인덱스 (그래프가 바뀔 때까지 캐시)"""
+        index = self._temporal_indexes.get(max_delay_sec)
+        if index is None:
+            index = self._temporal_indexes[max_delay_sec] = TemporalPathIndex.from_graph(
+                self.graph,
+                max_delay_sec=max_delay_sec,
+                supernode_policy=self.supernode_policy
+            )
+        return index
+    
+    def enumerate_stack_paths(
+        self,
+        start_vertex: str,
+        min_length: int = 3,
+        min_path_value: float = 100.0,
+        top_k: int = 10,
+        max_expansions: int = 10000,
+        max_paths: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        Stack 경로 열거: 총 가치 기준 상위 top_k 경로
+        
+        노드 확장이 max_expansions를 넘거나 조건을 만족하는 경로를
+        max_paths개 수집하면 탐색을 중단 (최악 지연 시간 고정)
+        
+        Args:
+            start_vertex: 시작 주소
+            min_length: 최소 경로 길이
+            min_path_value: 최소 경로 총 가치
+            top_k: 반환할 최대 경로 수
+            max_expansions: 노드 확장 상한
+            max_paths: 조건을 만족하는 경로 수집 상한
+        
+        Returns:
+            총 가치 내림차순 경로 리스트 ({"path", "length", "total_value"})
+        """
         if not self.graph or start_vertex.lower() not in self.graph:
             return []
         
         start_vertex = start_vertex.lower()
-        detected_paths = []
+        # (total_value, 발견 순서, path) 최소 힙으로 상위 top_k 유지
+        top_paths: List[Tuple[float, int, List[str]]] = []
+        state = {"expanded": 0, "found": 0}
         
-        # DFS로 모든 경로 탐색
         def dfs(current: str, path: List[str], visited: Set[str], path_value: float):
-            if len(path) >= min_length:
-                if path_value >= min_path_value:
-                    detected_paths.append({
-                        "path": path.copy(),
-                        "length": len(path),
-                        "total_value": path_value
-                    })
+            if len(path) >= min_length and path_value >= min_path_value:
+                state["found"] += 1
+                entry = (path_value, -state["found"], path.copy())
+                if len(top_paths) < top_k:
+                    heapq.heappush(top_paths, entry)
+                elif entry > top_paths[0]:
+                    heapq.heapreplace(top_paths, entry)
             
             if len(path) >= 10:  # 너무 긴 경로 방지
                 return
             
-            for successor in self.graph.successors(current):
+            if state["expanded"] >= max_expansions or state["found"] >= max_paths:
+                return
+            state["expanded"] += 1
+            
+            for successor in self._expand(current, is_root=current == start_vertex):
+                if state["found"] >= max_paths:
+                    return
                 if successor not in visited:
                     edge_weight = self.graph[current][successor].get("weight", 0)
                     visited.add(successor)
@@ -379,9 +627,83 @@ class MPOCryptoMLPatternDetector:
                     path.pop()
                     visited.remove(successor)
         
-        dfs(start_vertex, [start_vertex], {start_vertex}, 0.0)
+        if top_k > 0:
+            dfs(start_vertex, [start_vertex], {start_vertex}, 0.0)
+        
+        return [
+            {
+                "path": path,
+                "length": len(path),
+                "total_value": total_value
+            }
+            for total_value, _, path in sorted(top_paths, reverse=True)
+        ]
+    
+    def detect_layered_flow(
+        self,
+        vertex: str,
+        max_hops: int = 3,
+        direction: str = "out",
+        min_layers: int = 2
+    ) -> Dict[str, Any]:
+        """
+        Layered flow 탐지: 대상 주소에서 BFS 레이어 M_0..M_max_hops를 매기고
+        이웃 영역의 모든 엣지가 M_l → M_{l+1} 인지 한 번의 선형 패스로 검사
+        
+        CSR 배열 위에서 동작하므로 서브그래프/무방향 복사본을 만들지 않는다.
+        슈퍼노드(정책 지정 시)는 레이어에 포함되지만 확장하지 않는다.
         
-        return detected_paths
+        Args:
+            vertex: 분석 대상 주소
+            max_hops: BFS 최대 홉 수 (2~3 권장)
+            direction: "out" (대상에서 나가는 흐름) 또는 "in" (대상으로 들어오는 흐름)
+            min_layers: 패턴으로 볼 최소 비어 있지 않은 레이어 수 (대상 제외)
+        
+        Returns:
+            {
+                "is_layered": bool,
+                "layer_sizes": List[int],  # [1, |M_1|, |M_2|, ...]
+                "layers": List[Set[str]],  # M_1, M_2, ...
+                "edges_checked": int,
+                "forward_edges": int,
+                "same_layer_edges": int,
+                "backward_edges": int,
+                "violations": int
+            }
+        """
+        result = {
+            "is_layered": False,
+            "layer_sizes": [],
+            "layers": [],
+            "edges_checked": 0,
+            "forward_edges": 0,
+            "same_layer_edges": 0,
+            "backward_edges": 0,
+            "violations": 0
+        }
+        if not self.graph or vertex.lower() not in self.graph:
+            return result
+        
+        csr = self.get_csr()
+        flow = csr.layered_flow(
+            csr.node_index[vertex.lower()],
+            max_hops=max_hops,
+            direction=direction,
+            expandable=self._csr_expandable
+        )
+        
+        members = flow.pop("members")
+        member_layers = flow.pop("member_layers")
+        result.update(flow)
+        result["layers"] = [
+            {csr.nodes[i] for i in members[member_layers == hop]}
+            for hop in range(1, len(flow["layer_sizes"]))
+        ]
+        result["is_layered"] = (
+            flow["violations"] == 0 and
+            len(result["layers"]) >= min_layers
+        )
+        return result
     
     def detect_bipartite_pattern(
         self,
@@ -390,7 +712,9 @@ class MPOCryptoMLPatternDetector:
         """
         Bipartite 패턴 탐지: ∀(u, v) ∈ E, u ∈ M_l ⇒ v ∈ M_{l+1}
         
-        두 개의 레이어로 나뉘어진 그래프 구조
+        주소 하나가 주어지면 그 주소 기준 layered flow 검사 결과를 돌려준다
+        (detect_layered_flow, layer1/layer2 = M_1/M_2).
+        여러 주소가 주어지면 해당 서브그래프를 두 레이어로 나눌 수 있는지 확인한다.
         
         Args:
             vertices: 분석할 주소 리스트 (None이면 전체 그래프)
@@ -400,7 +724,9 @@ class MPOCryptoMLPatternDetector:
                 "is_bipartite": bool,
                 "layer1": Set[str],
                 "layer2": Set[str],
-                "edges_between_layers": int
+                "edges_between_layers": int,
+                "layer_sizes": List[int],  # 주소 하나일 때만
+                "violations": int          # 주소 하나일 때만
             }
         """
         if not self.graph:
@@ -411,6 +737,18 @@ class MPOCryptoMLPatternDetector:
                 "edges_between_layers": 0
             }
         
+        if vertices is not None and len(vertices) == 1:
+            flow = self.detect_layered_flow(vertices[0])
+            layers = flow["layers"]
+            return {
+                "is_bipartite": flow["is_layered"],
+                "layer1": layers[0] if len(layers) > 0 else set(),
+                "layer2": layers[1] if len(layers) > 1 else set(),
+                "edges_between_layers": flow["forward_edges"],
+                "layer_sizes": flow["layer_sizes"],
+                "violations": flow["violations"]
+            }
+        
         if vertices is None:
             vertices = list(self.graph.nodes())
         else:
@@ -448,12 +786,19 @@ class MPOCryptoMLPatternDetector:
             "edges_between_layers": 0
         }
     
-    def analyze_address_patterns(self, vertex: str) -> Dict[str, Any]:
+    def analyze_address_patterns(
+        self,
+        vertex: str,
+        stack_top_k: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         주소의 모든 패턴 분석
         
         Args:
             vertex: 분석 대상 주소
+            stack_top_k: None이면 stack_paths에 존재 확인용 첫 경로만 담음
+                         (temporal_stack이고 타임스탬프가 있는 거래가 있으면 시간 순서 경로),
+                         지정하면 집계 그래프에서 총 가치 상위 stack_top_k 경로를 열거
         
         Returns:
             {
@@ -479,7 +824,17 @@ class MPOCryptoMLPatternDetector:
                 "value": self.gather_scatter(vertex),
                 "count": self.gather_scatter_count(vertex)
             },
-            "stack_paths": self.detect_stack_pattern(vertex),
+            "stack_paths": self._stack_paths(vertex, stack_top_k),
             "bipartite": self.detect_bipartite_pattern([vertex])
         }
-
+    
+    def _stack_paths(self, vertex: str, top_k: Optional[int]) -> List[Dict[str, Any]]:
+        """analyze_address_patterns용 stack 경로 (존재 확인 또는 상위 k 열거)"""
+        if top_k is not None:
+            return self.enumerate_stack_paths(vertex, top_k=top_k)
+        # 시간 순서 경로 탐색 (타임스탬프가 있는 거래가 없으면 집계 그래프로 폴백)
+        if self.temporal_stack and self.graph and self._temporal_index(self.max_hop_delay_sec).number_of_transactions:
+            path, _ = self.find_temporal_stack_path(vertex, max_delay_sec=self.max_hop_delay_sec)
+            return [path] if path is not None else []
+        path, _ = self.find_stack_path(vertex)
+        return [path] if path is not None else []
@@ -11,6 +11,7 @@ from collections import defaultdict
 from .mpocryptml_patterns import MPOCryptoMLPatternDetector
 from .ppr_connector import PPRConnector
 from .mpocryptml_normalizer import MPOCryptoMLNormalizer
+from .supernode import SupernodePolicy
 
 
 class MPOCryptoMLScorer:
@@ -30,7 +31,8 @@ class MPOCryptoMLScorer:
         damping_factor: float = 0.85,
         max_iter: int = 1000,
         rule_weight: float = 0.7,
-        ml_weight: float = 0.3
+        ml_weight: float = 0.3,
+        supernode_policy: Optional[SupernodePolicy] = None
     ):
         """
         Args:
@@ -38,9 +40,14 @@ class MPOCryptoMLScorer:
             max_iter: PPR 최대 반복 횟수
             rule_weight: Rule-based 점수 가중치 (기본 0.7)
             ml_weight: MPOCryptoML 점수 가중치 (기본 0.3)
+            supernode_policy: 슈퍼노드 정책 (패턴 탐색/PPR의 허브 확장 제한)
         """
-        self.pattern_detector = MPOCryptoMLPatternDetector()
-        self.ppr_connector = PPRConnector(damping_factor=damping_factor, max_iter=max_iter)
+        self.pattern_detector = MPOCryptoMLPatternDetector(supernode_policy=supernode_policy)
+        self.ppr_connector = PPRConnector(
+            damping_factor=damping_factor,
+            max_iter=max_iter,
+            supernode_policy=supernode_policy
+        )
         self.normalizer = MPOCryptoMLNormalizer()
         self.rule_weight = rule_weight
         self.ml_weight = ml_weight
@@ -4,9 +4,405 @@ PPR (Personalized PageRank) 연결성 분석 모듈
 MPOCryptoML 논문의 오프체인 연결성 분석을 위한 PPR 계산
 """
 
-from typing import Dict, List, Set, Optional, Any
+from typing import Dict, List, Set, Optional, Any, Iterable, Tuple
+import os
+import random
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 import networkx as nx
-from collections import defaultdict
+from collections import defaultdict, Counter
+
+from .supernode import SupernodePolicy
+
+
+# 워커 프로세스 전역 인접 리스트 (ProcessPoolExecutor initializer로 1회 전달)
+_WORKER_ADJACENCY: Dict[str, Tuple[List[str], List[float]]] = {}
+
+
+def _init_walk_worker(adjacency: Dict[str, Tuple[List[str], List[float]]]) -> None:
+    """워커 초기화: 인접 리스트 보관"""
+    global _WORKER_ADJACENCY
+    _WORKER_ADJACENCY = adjacency
+
+
+def _simulate_walk(
+    adjacency: Dict[str, Tuple[List[str], List[float]]],
+    start: str,
+    rng: random.Random,
+    damping_factor: float,
+    walk_length: int
+) -> List[str]:
+    """
+    start에서 출발하는 랜덤 워크 1개 생성
+
+    매 스텝 damping_factor 확률로 가중치 비례 이웃으로 이동, 아니면 종료
+    (나가는 엣지가 없거나 walk_length에 도달해도 종료)
+    """
+    walk = [start]
+    current = start
+    for _ in range(walk_length):
+        if rng.random() >= damping_factor:
+            break
+        neighbors = adjacency.get(current)
+        if not neighbors:
+            break
+        successors, cumulative = neighbors
+        current = successors[bisect_right(cumulative, rng.random() * cumulative[-1])]
+        walk.append(current)
+    return walk
+
+
+def _walk_rng(random_seed: int, seed_address: str, walk_no: int, generation: int = 0) -> random.Random:
+    """워크별 독립 RNG (워커 수와 무관하게 결정적)"""
+    return random.Random(f"{random_seed}:{seed_address}:{walk_no}:{generation}")
+
+
+def _simulate_seed_walks(
+    args: Tuple[List[str], int, float, int, int]
+) -> List[Tuple[str, List[List[str]]]]:
+    """워커 작업: 시드 묶음의 워크 생성"""
+    seeds, walks_per_seed, damping_factor, walk_length, random_seed = args
+    results = []
+    for seed in seeds:
+        walks = [
+            _simulate_walk(
+                _WORKER_ADJACENCY, seed, _walk_rng(random_seed, seed, i),
+                damping_factor, walk_length
+            )
+            for i in range(walks_per_seed)
+        ]
+        results.append((seed, walks))
+    return results
+
+
+class RandomWalkIndex:
+    """
+    Monte-Carlo PPR용 랜덤 워크 인덱스
+
+    시드(SDN, 믹서, 자동 탐지 소스 노드)마다 walks_per_seed개의 워크를 저장하고,
+    임의 타겟의 PPR을 방문 빈도로 계산: π(v) ≈ (1 - d) · visits(v) / (시드 수 · walks_per_seed)
+
+    엣지가 추가되면 출발 노드를 지나간 워크만 해당 지점부터 다시 생성한다.
+    (첫 방문 이전 구간은 변경된 전이 확률과 무관하므로 분포가 그대로 유지됨)
+    구축 시 그래프에 없던 SDN/믹서 주소는 엣지가 추가되어 그래프에 들어오면 그때 시드가 된다.
+
+    워크는 dangling 노드에서 종료되므로 (시드로 재시작하지 않음) nx.pagerank의
+    dangling 재분배 결과보다 시드 근처 점수가 약간 낮게 추정된다.
+    슈퍼노드 정책이 있으면 워크는 슈퍼노드에서 종료(terminal)하거나 샘플 이웃으로만 이동한다.
+    """
+
+    SEED_KINDS = ("source", "sdn", "mixer")
+
+    def __init__(
+        self,
+        damping_factor: float = 0.85,
+        walks_per_seed: int = 100,
+        walk_length: int = 10,
+        random_seed: int = 42,
+        supernode_policy: Optional[SupernodePolicy] = None
+    ):
+        """
+        Args:
+            damping_factor: 다음 스텝으로 이동할 확률 (PPRConnector와 동일 의미)
+            walks_per_seed: 시드당 워크 수
+            walk_length: 워크 최대 길이 (스텝 수)
+            random_seed: 재현성을 위한 시드
+            supernode_policy: 슈퍼노드 정책 (허브 확장 제한, None이면 제한 없음)
+        """
+        self.supernode_policy = supernode_policy
+        self.damping_factor = damping_factor
+        self.walks_per_seed = walks_per_seed
+        self.walk_length = walk_length
+        self.random_seed = random_seed
+
+        # {node: {successor: weight}}
+        self._succ: Dict[str, Dict[str, float]] = {}
+        self._in_degree: Counter = Counter()
+        # 샘플링용 {node: (successors, cumulative_weights)}
+        self._adjacency: Dict[str, Tuple[List[str], List[float]]] = {}
+
+        self.seeds: Dict[str, Set[str]] = {kind: set() for kind in self.SEED_KINDS}
+        # 리스트로 지정된 시드 후보 {"sdn": 주소 집합, "mixer": 주소 집합} (그래프에 없는 주소 포함)
+        self._listed_seeds: Dict[str, Set[str]] = {"sdn": set(), "mixer": set()}
+        self.auto_detect_sources = True
+        # {seed: [walk, ...]}
+        self.walks: Dict[str, List[List[str]]] = {}
+        # {(seed, walk_no): 재생성 횟수} - 재생성 워크의 RNG 분리용
+        self._generation: Counter = Counter()
+        # {kind: Counter(node -> visits)}
+        self.visits: Dict[str, Counter] = {kind: Counter() for kind in self.SEED_KINDS}
+        # {node: {(seed, walk_no)}}
+        self._walks_through: Dict[str, Set[Tuple[str, int]]] = defaultdict(set)
+
+    # ------------------------------------------------------------------
+    # 구축
+    # ------------------------------------------------------------------
+
+    def build(
+        self,
+        graph: nx.DiGraph,
+        sdn_addresses: Optional[Iterable[str]] = None,
+        mixer_addresses: Optional[Iterable[str]] = None,
+        auto_detect_sources: bool = True,
+        num_workers: Optional[int] = None
+    ) -> "RandomWalkIndex":
+        """
+        그래프와 시드 집합으로 워크 생성 (프로세스 풀 병렬)
+
+        Args:
+            graph: 거래 그래프
+            sdn_addresses: SDN 리스트
+            mixer_addresses: 믹서 리스트
+            auto_detect_sources: 소스 노드 (in-degree == 0, out-degree > 0) 자동 탐지 여부
+            num_workers: 워커 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 실행)
+        """
+        self._succ = {}
+        self._in_degree = Counter()
+        for u, v, data in graph.edges(data=True):
+            self._succ.setdefault(u, {})[v] = float(data.get("weight", 1.0) or 0.0)
+            self._in_degree[v] += 1
+        for node in list(self._succ):
+            self._rebuild_adjacency(node)
+
+        self.auto_detect_sources = auto_detect_sources
+        self._listed_seeds = {
+            "sdn": {a.lower() for a in (sdn_addresses or [])},
+            "mixer": {a.lower() for a in (mixer_addresses or [])},
+        }
+        self.seeds = {
+            "source": self._detect_sources(graph.nodes()) if auto_detect_sources else set(),
+            "sdn": {a for a in self._listed_seeds["sdn"] if a in graph},
+            "mixer": {a for a in self._listed_seeds["mixer"] if a in graph},
+        }
+
+        self.walks = {}
+        self._generation = Counter()
+        self.visits = {kind: Counter() for kind in self.SEED_KINDS}
+        self._walks_through = defaultdict(set)
+
+        all_seeds = sorted(set().union(*self.seeds.values()))
+        for seed, walks in self._generate_walks(all_seeds, num_workers):
+            self.walks[seed] = walks
+            for walk_no, walk in enumerate(walks):
+                self._register_walk(seed, walk_no, walk, +1)
+
+        return self
+
+    def _generate_walks(
+        self,
+        seeds: List[str],
+        num_workers: Optional[int]
+    ) -> List[Tuple[str, List[List[str]]]]:
+        """시드 목록의 워크 생성 (시드가 적으면 현재 프로세스에서 실행)"""
+        if not seeds:
+            return []
+
+        num_workers = num_workers or os.cpu_count() or 1
+        num_workers = min(num_workers, len(seeds))
+        params = (self.walks_per_seed, self.damping_factor, self.walk_length, self.random_seed)
+
+        if num_workers <= 1:
+            _init_walk_worker(self._adjacency)
+            try:
+                return _simulate_seed_walks((seeds, *params))
+            finally:
+                _init_walk_worker({})
+
+        chunk_size = max(1, len(seeds) // (num_workers * 4))
+        chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+        results: List[Tuple[str, List[List[str]]]] = []
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_walk_worker,
+            initargs=(self._adjacency,)
+        ) as executor:
+            for chunk_result in executor.map(_simulate_seed_walks, [(chunk, *params) for chunk in chunks]):
+                results.extend(chunk_result)
+        return results
+
+    def _detect_sources(self, nodes: Iterable[str]) -> Set[str]:
+        """소스 노드 탐지: out-degree > 0, in-degree == 0"""
+        return {
+            node for node in nodes
+            if self._succ.get(node) and self._in_degree.get(node, 0) == 0
+        }
+
+    def _rebuild_adjacency(self, node: str) -> None:
+        """node의 샘플링용 누적 가중치 재구성 (슈퍼노드 정책 적용)"""
+        successors = [v for v, w in self._succ.get(node, {}).items() if w > 0]
+        if self.supernode_policy is not None and successors:
+            degree = len(self._succ.get(node, {})) + self._in_degree.get(node, 0)
+            successors = self.supernode_policy.limit(node, successors, degree)
+        if not successors:
+            self._adjacency.pop(node, None)
+            return
+        cumulative = []
+        total = 0.0
+        for v in successors:
+            total += self._succ[node][v]
+            cumulative.append(total)
+        self._adjacency[node] = (successors, cumulative)
+
+    def _seed_kinds(self, seed: str) -> List[str]:
+        return [kind for kind in self.SEED_KINDS if seed in self.seeds[kind]]
+
+    def _register_walk(self, seed: str, walk_no: int, walk: List[str], sign: int) -> None:
+        """워크 방문 횟수 반영 (sign=+1 추가, -1 제거)"""
+        kinds = self._seed_kinds(seed)
+        for node in walk:
+            for kind in kinds:
+                self.visits[kind][node] += sign
+                if self.visits[kind][node] <= 0:
+                    del self.visits[kind][node]
+            if sign > 0:
+                self._walks_through[node].add((seed, walk_no))
+            else:
+                self._walks_through[node].discard((seed, walk_no))
+
+    # ------------------------------------------------------------------
+    # 증분 갱신
+    # ------------------------------------------------------------------
+
+    def add_edges(self, edges: Iterable[Tuple[str, str, float]]) -> int:
+        """
+        엣지 추가 (기존 엣지면 가중치 누적) 후 영향받는 워크만 갱신
+
+        Args:
+            edges: [(from, to, weight), ...]
+
+        Returns:
+            다시 생성된 워크 수
+        """
+        changed: Set[str] = set()
+        touched: Set[str] = set()
+        for u, v, weight in edges:
+            u, v = u.lower(), v.lower()
+            if weight <= 0 or u == v:
+                continue
+            if v not in self._succ.get(u, {}):
+                self._in_degree[v] += 1
+            self._succ.setdefault(u, {})
+            self._succ[u][v] = self._succ[u].get(v, 0.0) + weight
+            changed.add(u)
+            touched.update((u, v))
+
+        if not changed:
+            return 0
+
+        # 가중치가 바뀐 노드 + (슈퍼노드 정책이 있으면) 차수 변화로 전이가 바뀐 노드
+        rebuild = touched if self.supernode_policy is not None else set(changed)
+        for node in rebuild:
+            before = self._adjacency.get(node)
+            self._rebuild_adjacency(node)
+            if self._adjacency.get(node) != before:
+                changed.add(node)
+
+        # 자동 탐지 소스 집합 갱신 (in-edge가 생긴 노드는 소스에서 제외)
+        if self.auto_detect_sources:
+            current = self.seeds["source"]
+            updated = (current - touched) | self._detect_sources(touched | (current & touched))
+            for seed in current - updated:
+                self._drop_seed_kind(seed, "source")
+            for seed in updated - current:
+                self._add_seed_kind(seed, "source")
+
+        # 변경된 노드를 지나간 워크를 첫 방문 지점부터 재생성
+        affected: Dict[Tuple[str, int], int] = {}
+        for node in changed:
+            for key in list(self._walks_through.get(node, ())):
+                seed, walk_no = key
+                position = self.walks[seed][walk_no].index(node)
+                if key not in affected or position < affected[key]:
+                    affected[key] = position
+
+        for (seed, walk_no), position in affected.items():
+            walk = self.walks[seed][walk_no]
+            self._register_walk(seed, walk_no, walk, -1)
+            self._generation[(seed, walk_no)] += 1
+            rng = _walk_rng(self.random_seed, seed, walk_no, self._generation[(seed, walk_no)])
+            tail = _simulate_walk(
+                self._adjacency, walk[position], rng,
+                self.damping_factor, self.walk_length - position
+            )
+            new_walk = walk[:position] + tail
+            self.walks[seed][walk_no] = new_walk
+            self._register_walk(seed, walk_no, new_walk, +1)
+
+        # 새 엣지로 그래프에 들어온 SDN/믹서 주소를 시드로 추가 (워크는 갱신된 인접 리스트로 생성)
+        for kind, listed in self._listed_seeds.items():
+            for seed in sorted((touched & listed) - self.seeds[kind]):
+                self._add_seed_kind(seed, kind)
+
+        return len(affected)
+
+    def _add_seed_kind(self, seed: str, kind: str) -> None:
+        """시드에 종류 추가 (워크가 없으면 생성)"""
+        if seed not in self.walks:
+            self.seeds[kind].add(seed)
+            for _, walks in self._generate_walks([seed], 1):
+                self.walks[seed] = walks
+                for walk_no, walk in enumerate(walks):
+                    self._register_walk(seed, walk_no, walk, +1)
+            return
+        for walk in self.walks[seed]:
+            for node in walk:
+                self.visits[kind][node] += 1
+        self.seeds[kind].add(seed)
+
+    def _drop_seed_kind(self, seed: str, kind: str) -> None:
+        """시드에서 종류 제거 (더 이상 어떤 종류에도 속하지 않으면 워크 삭제)"""
+        for walk in self.walks.get(seed, []):
+            for node in walk:
+                self.visits[kind][node] -= 1
+                if self.visits[kind][node] <= 0:
+                    del self.visits[kind][node]
+        self.seeds[kind].discard(seed)
+        if not self._seed_kinds(seed):
+            for walk_no, walk in enumerate(self.walks.pop(seed, [])):
+                for node in walk:
+                    self._walks_through[node].discard((seed, walk_no))
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def ppr(self, target_address: str, kind: str = "source") -> float:
+        """
+        방문 빈도 기반 PPR 추정
+
+        Args:
+            target_address: 분석 대상 주소
+            kind: 시드 종류 ("source", "sdn", "mixer")
+
+        Returns:
+            PPR 점수 (0~1)
+        """
+        num_seeds = len(self.seeds[kind])
+        if not num_seeds:
+            return 0.0
+        visits = self.visits[kind].get(target_address.lower(), 0)
+        return (1.0 - self.damping_factor) * visits / (num_seeds * self.walks_per_seed)
+
+    def score_targets(self, target_addresses: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """
+        여러 타겟을 같은 시드 집합에 대해 일괄 스코어링
+
+        Returns:
+            {address: {"ppr_score", "sdn_ppr", "mixer_ppr", "total_ppr"}}
+            (MPOCryptoMLScorer.calculate_ppr_score 와 같은 구성)
+        """
+        results = {}
+        for address in target_addresses:
+            ppr_score = self.ppr(address, "source")
+            sdn_ppr = self.ppr(address, "sdn")
+            mixer_ppr = self.ppr(address, "mixer")
+            results[address] = {
+                "ppr_score": ppr_score,
+                "sdn_ppr": sdn_ppr,
+                "mixer_ppr": mixer_ppr,
+                "total_ppr": ppr_score * 0.4 + sdn_ppr * 0.4 + mixer_ppr * 0.2
+            }
+        return results
 
 
 class PPRConnector:
@@ -16,14 +412,91 @@ class PPRConnector:
     오프체인 거래 그래프에서 제재 주소, 믹서 등과의 연결성을 측정
     """
     
-    def __init__(self, damping_factor: float = 0.85, max_iter: int = 100):
+    def __init__(
+        self,
+        damping_factor: float = 0.85,
+        max_iter: int = 100,
+        supernode_policy: Optional[SupernodePolicy] = None
+    ):
         """
         Args:
             damping_factor: PPR damping factor (기본 0.85)
             max_iter: 최대 반복 횟수
+            supernode_policy: 슈퍼노드 정책 (슈퍼노드의 나가는 전이 제한, None이면 제한 없음)
         """
         self.damping_factor = damping_factor
         self.max_iter = max_iter
+        self.supernode_policy = supernode_policy
+    
+    def build_walk_index(
+        self,
+        graph: nx.DiGraph,
+        sdn_addresses: Optional[Iterable[str]] = None,
+        mixer_addresses: Optional[Iterable[str]] = None,
+        auto_detect_sources: bool = True,
+        walks_per_seed: int = 100,
+        walk_length: int = 10,
+        num_workers: Optional[int] = None,
+        random_seed: int = 42
+    ) -> RandomWalkIndex:
+        """
+        Monte-Carlo PPR용 랜덤 워크 인덱스 구축
+        
+        대규모 이웃 그래프에서 power iteration 대신 사용. 한 번 구축하면
+        같은 시드 집합에 대한 여러 타겟의 PPR을 방문 빈도 조회로 계산할 수 있음
+        
+        Args:
+            graph: 거래 그래프
+            sdn_addresses: SDN 리스트
+            mixer_addresses: 믹서 리스트
+            auto_detect_sources: 소스 노드 자동 탐지 여부 (calculate_multi_source_ppr과 동일 기준)
+            walks_per_seed: 시드당 워크 수
+            walk_length: 워크 최대 길이
+            num_workers: 워커 프로세스 수 (None이면 CPU 수)
+            random_seed: 재현성을 위한 시드
+        
+        Returns:
+            RandomWalkIndex
+        """
+        walk_index = RandomWalkIndex(
+            damping_factor=self.damping_factor,
+            walks_per_seed=walks_per_seed,
+            walk_length=walk_length,
+            random_seed=random_seed,
+            supernode_policy=self.supernode_policy
+        )
+        return walk_index.build(
+            graph,
+            sdn_addresses=sdn_addresses,
+            mixer_addresses=mixer_addresses,
+            auto_detect_sources=auto_detect_sources,
+            num_workers=num_workers
+        )
+    
+    def calculate_ppr_monte_carlo(
+        self,
+        target_address: str,
+        walk_index: RandomWalkIndex,
+        kind: str = "source"
+    ) -> float:
+        """
+        Monte-Carlo PPR 계산 (저장된 워크의 방문 빈도)
+        
+        Args:
+            target_address: 분석 대상 주소
+            walk_index: build_walk_index()로 만든 인덱스
+            kind: 시드 종류 ("source", "sdn", "mixer")
+        
+        Returns:
+            PPR 점수 (0~1)
+        """
+        return walk_index.ppr(target_address, kind)
+    
+    def _policy_view(self, graph: nx.DiGraph) -> nx.DiGraph:
+        """슈퍼노드 정책을 적용한 그래프 뷰 (정책이 없으면 원본)"""
+        if self.supernode_policy is None:
+            return graph
+        return self.supernode_policy.restricted_view(graph)
     
     def calculate_ppr(
         self,
@@ -71,7 +544,7 @@ class PPRConnector:
             # Multi-source PPR 계산
             # 논문: α = 0.5 (damping_factor), 하지만 기본값 0.85도 사용 가능
             ppr_scores = nx.pagerank(
-                graph,
+                self._policy_view(graph),
                 alpha=self.damping_factor,
                 personalization=personalization,
                 max_iter=self.max_iter
@@ -146,7 +619,7 @@ class PPRConnector:
                     personalization[node] = 0.0
             
             ppr_scores = nx.pagerank(
-                graph,
+                self._policy_view(graph),
                 alpha=self.damping_factor,
                 personalization=personalization,
                 max_iter=self.max_iter
@@ -0,0 +1,576 @@
+"""
+제재 근접도 인덱스 (Sanction Proximity Index)
+
+주소별로 SDN/믹서 노드까지의 최소 홉 거리와 근사 PPR 노출도를 미리 계산해 두고,
+새 거래가 들어올 때마다 변경된 엣지 주변만 제한된 BFS로 갱신
+
+- 홉 거리: 방향 무시 (SDN → X, X → SDN 모두 1홉, legacy precompute_sdn_hops.py와 동일)
+- PPR 노출도: 시드(SDN/믹서)에서 출발하는 max_hops 길이 이하의 랜덤 워크로 근사한
+  Truncated Personalized PageRank (PPRConnector.calculate_ppr 과 같은 damping 의미)
+
+E-102 같은 간접 노출 룰은 요청마다 그래프를 만들 필요 없이 lookup() 한 번으로 평가 가능
+
+엣지는 거래 시각 기준 max_age_days(기본 365일, TransactionHistory와 같은 보관 기간)가 지나면 만료되어
+그래프에서 빠진다. 기존 E-102가 보던 윈도우 히스토리와 같은 기간의 거래만 노출도에 반영되고,
+인덱스 메모리도 보관 기간 안의 거래 수로 제한된다.
+"""
+
+import heapq
+import time
+from datetime import datetime
+from typing import Dict, List, Set, Optional, Any, Callable, Iterable, Tuple
+from collections import defaultdict, deque
+
+from .supernode import SupernodePolicy
+
+
+class SanctionProximityIndex:
+    """
+    SDN/믹서 근접도 인덱스
+
+    삽입 시 홉 거리는 감소만 하므로 증분 BFS로 정확히 유지되고,
+    PPR 노출도는 변경된 엣지의 출발 노드에서 max_hops 이내 하류 노드만 다시 계산한다.
+    보관 기간이 지난 거래는 add_transactions()/expire_old_edges() 때 빠지며, 이때는 제거된 엣지
+    양 끝점에서 max_hops 이내 노드의 홉 거리만 다시 계산하고 양 끝점의 하류 노드 질량을 다시 계산한다.
+
+    슈퍼노드 정책이 있으면 슈퍼노드(시드 제외)는 홉 거리는 부여받지만 더 전파하지 않고
+    (sample 모드면 샘플 이웃으로만 전파), 워크 질량도 같은 규칙으로 흘려보낸다.
+    차수 기준 판정은 전파 시점의 차수로 한다.
+    """
+
+    SEED_KINDS = ("sdn", "mixer")
+
+    def __init__(
+        self,
+        sdn_addresses: Optional[Iterable[str]] = None,
+        mixer_addresses: Optional[Iterable[str]] = None,
+        max_hops: int = 3,
+        damping_factor: float = 0.85,
+        supernode_policy: Optional[SupernodePolicy] = None,
+        max_age_days: Optional[int] = 365,
+        clock: Optional[Callable[[], float]] = None
+    ):
+        """
+        Args:
+            sdn_addresses: SDN 주소 리스트
+            mixer_addresses: 믹서 주소 리스트
+            max_hops: 추적할 최대 홉 수 (PPR 워크 길이 상한도 동일)
+            damping_factor: PPR damping factor (PPRConnector 기본값과 동일 0.85)
+            supernode_policy: 슈퍼노드 정책 (허브 확장 제한, None이면 제한 없음)
+            max_age_days: 엣지 보관 기간 (일, 거래 시각 기준, None이면 만료 없음)
+            clock: 현재 시각 함수 (기본 time.time, TransactionHistory와 같이 실제 시각 기준)
+        """
+        self.max_hops = max_hops
+        self.damping_factor = damping_factor
+        self.supernode_policy = supernode_policy
+        self.max_age_days = max_age_days
+        self._clock = clock or time.time
+
+        # 인접 리스트 {from: {to: weight}}, {to: {from: weight}}
+        self._succ: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._pred: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._out_weight: Dict[str, float] = defaultdict(float)
+        # 엣지별 반영된 거래 수 (마지막 거래가 만료되면 엣지 삭제)
+        self._edge_count: Dict[Tuple[str, str], int] = defaultdict(int)
+        # 만료 대기열 (거래 시각, 순번, from, to, weight) - 최소 힙
+        self._expiry: List[Tuple[int, int, str, str, float]] = []
+        self._expiry_seq = 0
+
+        self._seeds: Dict[str, Set[str]] = {
+            "sdn": {addr.lower() for addr in (sdn_addresses or [])},
+            "mixer": {addr.lower() for addr in (mixer_addresses or [])},
+        }
+        # 그래프에 등장한 시드 수 (PPR 정규화용)
+        self._present_seeds: Dict[str, Set[str]] = {kind: set() for kind in self.SEED_KINDS}
+
+        # {kind: {address: hop}}
+        self._hops: Dict[str, Dict[str, int]] = {kind: {} for kind in self.SEED_KINDS}
+        # {kind: {address: [level_0, ..., level_max_hops]}} - 정규화 전 워크 질량
+        self._mass: Dict[str, Dict[str, List[float]]] = {kind: {} for kind in self.SEED_KINDS}
+        # {kind: {address: Σ mass}} - 정규화 전 노출도
+        self._exposure: Dict[str, Dict[str, float]] = {kind: {} for kind in self.SEED_KINDS}
+
+        for kind in self.SEED_KINDS:
+            for seed in self._seeds[kind]:
+                self._hops[kind][seed] = 0
+
+    @classmethod
+    def from_list_loader(cls, list_loader, **kwargs) -> "SanctionProximityIndex":
+        """
+        ListLoader의 SDN/믹서 리스트로 인덱스 생성
+
+        supernode_policy를 주지 않으면 같은 ListLoader로 만든 기본 정책을 사용한다
+        (RuleEvaluator의 그래프 기반 E-102 평가와 같은 허브 확장 제한).
+        """
+        if "supernode_policy" not in kwargs:
+            kwargs["supernode_policy"] = SupernodePolicy.from_list_loader(list_loader)
+        return cls(
+            sdn_addresses=list_loader.get_sdn_list(),
+            mixer_addresses=list_loader.get_mixer_list(),
+            **kwargs
+        )
+
+    # ------------------------------------------------------------------
+    # 갱신
+    # ------------------------------------------------------------------
+
+    def add_transaction(self, tx: Dict[str, Any]) -> None:
+        """
+        트랜잭션 1건 반영
+
+        Args:
+            tx: {"from": str, "to": str, "usd_value": float, ...}
+        """
+        self.add_transactions([tx])
+
+    def add_transactions(self, transactions: Iterable[Dict[str, Any]]) -> int:
+        """
+        트랜잭션 묶음 반영 (스트리밍 배치)
+
+        보관 기간이 지난 엣지를 먼저 만료시키고, 모든 엣지를 추가한 뒤,
+        변경된 출발 노드들(과 만료된 엣지의 양 끝점)을 루트로 한 번만 PPR을 갱신
+
+        Returns:
+            반영된 엣지 수 (이미 보관 기간이 지난 거래는 반영하지 않음)
+        """
+        cutoff = self._cutoff()
+        changed_sources = self._expire(cutoff)
+        expired = bool(changed_sources)
+        new_seed_nodes: Dict[str, Set[str]] = {kind: set() for kind in self.SEED_KINDS}
+        added = 0
+
+        for tx in transactions:
+            edge = self._extract_edge(tx)
+            if edge is None:
+                continue
+            from_addr, to_addr, weight = edge
+            timestamp = self._timestamp(tx)
+            if cutoff is not None and timestamp < cutoff:
+                continue
+
+            for addr in (from_addr, to_addr):
+                for kind in self.SEED_KINDS:
+                    if addr in self._seeds[kind] and addr not in self._present_seeds[kind]:
+                        self._present_seeds[kind].add(addr)
+                        new_seed_nodes[kind].add(addr)
+
+            self._succ[from_addr][to_addr] = self._succ[from_addr].get(to_addr, 0.0) + weight
+            self._pred[to_addr][from_addr] = self._pred[to_addr].get(from_addr, 0.0) + weight
+            self._out_weight[from_addr] += weight
+            self._edge_count[(from_addr, to_addr)] += 1
+            if cutoff is not None:
+                heapq.heappush(self._expiry, (timestamp, self._expiry_seq, from_addr, to_addr, weight))
+                self._expiry_seq += 1
+            changed_sources.add(from_addr)
+            if self.supernode_policy is not None:
+                # 차수 증가로 to_addr가 슈퍼노드가 되면 나가는 전이도 바뀜
+                changed_sources.add(to_addr)
+            added += 1
+
+            # 홉 거리: 삽입 시 감소만 하므로 양 끝점에서 증분 전파
+            for kind in self.SEED_KINDS:
+                self._relax_hops(kind, from_addr, to_addr)
+
+        if not added and not expired:
+            return 0
+
+        for kind in self.SEED_KINDS:
+            roots = changed_sources | new_seed_nodes[kind]
+            if self._present_seeds[kind] or self._mass[kind]:
+                self._refresh_mass(kind, roots)
+
+        return added
+
+    def expire_old_edges(self) -> int:
+        """
+        보관 기간이 지난 거래를 그래프에서 제거 (add_transactions()도 매번 먼저 수행)
+
+        Returns:
+            제거된 거래 수
+        """
+        before = len(self._expiry)
+        endpoints = self._expire(self._cutoff())
+        if endpoints:
+            for kind in self.SEED_KINDS:
+                if self._present_seeds[kind] or self._mass[kind]:
+                    self._refresh_mass(kind, endpoints)
+        return before - len(self._expiry)
+
+    def _cutoff(self) -> Optional[int]:
+        """이 시각보다 오래된 거래는 만료 (만료 없음이면 None)"""
+        if self.max_age_days is None:
+            return None
+        return int(self._clock()) - self.max_age_days * 86400
+
+    def _timestamp(self, tx: Dict[str, Any]) -> int:
+        """거래 시각 (Unix timestamp, 해석할 수 없으면 0 - TransactionHistory와 같은 규칙)"""
+        timestamp = tx.get("timestamp", 0)
+        if isinstance(timestamp, str):
+            try:
+                return int(datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp())
+            except ValueError:
+                try:
+                    return int(float(timestamp))
+                except ValueError:
+                    return 0
+        try:
+            return int(timestamp) if timestamp else 0
+        except (ValueError, TypeError):
+            return 0
+
+    def _expire(self, cutoff: Optional[int]) -> Set[str]:
+        """
+        cutoff보다 오래된 거래 제거 후 시드 등장 여부와 홉 거리 갱신 (PPR 질량은 호출한 쪽에서 갱신)
+
+        Returns:
+            제거된 엣지의 양 끝점 (PPR 질량 갱신 루트)
+        """
+        endpoints: Set[str] = set()
+        if cutoff is None:
+            return endpoints
+        while self._expiry and self._expiry[0][0] < cutoff:
+            _, _, from_addr, to_addr, weight = heapq.heappop(self._expiry)
+            self._remove_edge_weight(from_addr, to_addr, weight)
+            endpoints.add(from_addr)
+            endpoints.add(to_addr)
+        if not endpoints:
+            return endpoints
+
+        for kind in self.SEED_KINDS:
+            for addr in endpoints:
+                if addr in self._present_seeds[kind] and addr not in self:
+                    self._present_seeds[kind].discard(addr)
+            self._recompute_hops(kind, endpoints)
+        return endpoints
+
+    def _remove_edge_weight(self, from_addr: str, to_addr: str, weight: float) -> None:
+        """거래 1건만큼 엣지 가중치 차감 (마지막 거래면 엣지와 빈 노드 삭제)"""
+        key = (from_addr, to_addr)
+        self._edge_count[key] -= 1
+        if self._edge_count[key] > 0:
+            self._succ[from_addr][to_addr] -= weight
+            self._pred[to_addr][from_addr] -= weight
+            self._out_weight[from_addr] -= weight
+            return
+
+        del self._edge_count[key]
+        self._out_weight[from_addr] -= self._succ[from_addr].pop(to_addr)
+        del self._pred[to_addr][from_addr]
+        if not self._succ[from_addr]:
+            del self._succ[from_addr]
+            del self._out_weight[from_addr]
+        if not self._pred[to_addr]:
+            del self._pred[to_addr]
+
+    def _recompute_hops(self, kind: str, endpoints: Set[str]) -> None:
+        """
+        엣지 제거 후 홉 거리 재계산
+
+        제거된 엣지를 지나던 최단 경로는 양 끝점에서 max_hops 이내 노드에만 영향을 주므로,
+        그 범위(방향/정책 무시)의 홉 거리를 지우고 경계 노드에서 레벨 순서로 다시 전파한다.
+        """
+        hops = self._hops[kind]
+        seeds = self._seeds[kind]
+
+        stale: Set[str] = set()
+        visited = set(endpoints)
+        frontier = list(endpoints)
+        for depth in range(self.max_hops + 1):
+            stale.update(node for node in frontier if node in hops and node not in seeds)
+            if depth == self.max_hops:
+                break
+            next_frontier = []
+            for node in frontier:
+                for neighbor in self._neighbors(node):
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        if not stale:
+            return
+
+        for node in stale:
+            del hops[node]
+        buckets: List[List[str]] = [[] for _ in range(self.max_hops + 1)]
+        for node in stale:
+            for neighbor in self._neighbors(node):
+                if neighbor in hops:
+                    buckets[hops[neighbor]].append(neighbor)
+
+        for level in range(self.max_hops):
+            for node in buckets[level]:
+                if hops.get(node) != level:
+                    continue
+                for neighbor in self._expandable_neighbors(node, kind):
+                    if level + 1 < hops.get(neighbor, self.max_hops + 1):
+                        hops[neighbor] = level + 1
+                        buckets[level + 1].append(neighbor)
+
+    def clear(self) -> None:
+        """반영된 거래 전체 삭제 (시드 리스트는 유지)"""
+        self._succ.clear()
+        self._pred.clear()
+        self._out_weight.clear()
+        self._edge_count.clear()
+        self._expiry.clear()
+        for kind in self.SEED_KINDS:
+            self._present_seeds[kind].clear()
+            self._mass[kind].clear()
+            self._exposure[kind].clear()
+            self._hops[kind] = {seed: 0 for seed in self._seeds[kind]}
+
+    def add_seed(self, address: str, kind: str = "sdn") -> None:
+        """
+        시드 주소 추가 (새로 제재된 주소 등)
+
+        Args:
+            address: 주소
+            kind: "sdn" 또는 "mixer"
+        """
+        address = address.lower()
+        if address in self._seeds[kind]:
+            return
+        self._seeds[kind].add(address)
+
+        self._hops[kind][address] = 0
+        self._propagate_hops(kind, address)
+
+        if address in self._succ or address in self._pred:
+            self._present_seeds[kind].add(address)
+            self._refresh_mass(kind, {address})
+
+    def _extract_edge(self, tx: Dict[str, Any]) -> Optional[Tuple[str, str, float]]:
+        """트랜잭션에서 (from, to, weight) 추출 (MPOCryptoMLPatternDetector와 동일 규칙)"""
+        from_addr = (tx.get("from") or tx.get("counterparty_address", "") or "").lower()
+        to_addr = (tx.get("to") or tx.get("target_address", "") or "").lower()
+        if not from_addr or not to_addr or from_addr == to_addr:
+            return None
+
+        # USD 값 우선, 없으면 Wei 값 사용 (정규화를 위해 1e18로 나눔)
+        try:
+            usd_value = float(tx.get("usd_value", tx.get("amount_usd", 0)) or 0)
+        except (ValueError, TypeError):
+            usd_value = 0.0
+        if usd_value > 0:
+            weight = usd_value
+        else:
+            try:
+                weight = float(tx.get("value", 0) or 0) / 1e18
+            except (ValueError, TypeError):
+                weight = 0.0
+
+        if weight <= 0:
+            return None
+        return from_addr, to_addr, weight
+
+    def _relax_hops(self, kind: str, u: str, v: str) -> None:
+        """엣지 u-v 추가 후 홉 거리 완화 (방향 무시)"""
+        hops = self._hops[kind]
+        for a, b in ((u, v), (v, u)):
+            if a not in hops:
+                continue
+            if self._is_limited(a, kind) and b not in self._expandable_neighbors(a, kind):
+                continue
+            candidate = hops[a] + 1
+            if candidate <= self.max_hops and candidate < hops.get(b, self.max_hops + 1):
+                hops[b] = candidate
+                self._propagate_hops(kind, b)
+
+    def _propagate_hops(self, kind: str, start: str) -> None:
+        """start의 홉 거리가 줄었을 때 max_hops 이내로 BFS 전파"""
+        hops = self._hops[kind]
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            next_hop = hops[node] + 1
+            if next_hop > self.max_hops:
+                continue
+            for neighbor in self._expandable_neighbors(node, kind):
+                if next_hop < hops.get(neighbor, self.max_hops + 1):
+                    hops[neighbor] = next_hop
+                    queue.append(neighbor)
+
+    def _neighbors(self, node: str) -> Iterable[str]:
+        """방향 무시 이웃"""
+        succ = self._succ.get(node, {})
+        pred = self._pred.get(node, {})
+        yield from succ
+        for neighbor in pred:
+            if neighbor not in succ:
+                yield neighbor
+
+    def _degree(self, node: str) -> int:
+        return len(self._succ.get(node, {})) + len(self._pred.get(node, {}))
+
+    def _is_limited(self, node: str, kind: Optional[str] = None) -> bool:
+        """슈퍼노드 정책으로 확장이 제한되는 노드인지 (시드는 항상 확장)"""
+        if self.supernode_policy is None:
+            return False
+        if kind is not None and node in self._seeds[kind]:
+            return False
+        return self.supernode_policy.is_supernode(node, self._degree(node))
+
+    def _expandable_neighbors(self, node: str, kind: str) -> Iterable[str]:
+        """홉 전파용 이웃 (슈퍼노드 정책 적용)"""
+        if not self._is_limited(node, kind):
+            return self._neighbors(node)
+        return self.supernode_policy.limit(node, self._neighbors(node), self._degree(node))
+
+    def _expandable_successors(self, node: str, kind: Optional[str] = None) -> Dict[str, float]:
+        """질량 전파용 후속 노드 {successor: weight} (슈퍼노드 정책 적용)"""
+        succ = self._succ.get(node, {})
+        if not self._is_limited(node, kind):
+            return succ
+        allowed = self.supernode_policy.limit(node, succ, self._degree(node))
+        return {successor: succ[successor] for successor in allowed}
+
+    def _refresh_mass(self, kind: str, roots: Set[str]) -> None:
+        """
+        roots에서 max_hops 이내 하류 노드의 워크 질량 재계산
+
+        mass_0(x) = 1 (x가 시드일 때)
+        mass_k(x) = d · Σ_{y→x} mass_{k-1}(y) · w(y,x) / W_out(y)
+
+        노드 x의 mass_k는 k홉 이내 상류에만 의존하므로, 출발 노드 u의 W_out 변경은
+        u에서 max_hops 이내 하류 노드에만 영향을 준다.
+        """
+        affected = self._downstream(roots, self.max_hops, kind)
+        if not affected:
+            return
+
+        present = self._present_seeds[kind]
+        mass = self._mass[kind]
+        levels = self.max_hops + 1
+        d = self.damping_factor
+
+        # 확장이 제한된 선행 노드의 (허용 후속 노드, 허용 가중치 합)
+        limited_out: Dict[str, Tuple[Dict[str, float], float]] = {}
+
+        def transition(pred: str, node: str, weight: float) -> float:
+            if not self._is_limited(pred, kind):
+                out_weight = self._out_weight.get(pred, 0.0)
+                return weight / out_weight if out_weight > 0 else 0.0
+            if pred not in limited_out:
+                allowed = self._expandable_successors(pred, kind)
+                limited_out[pred] = (allowed, sum(allowed.values()))
+            allowed, out_weight = limited_out[pred]
+            if node not in allowed or out_weight <= 0:
+                return 0.0
+            return weight / out_weight
+
+        # 레벨 순서로 갱신: 레벨 k 계산 시 이전 레벨 값은 이미 최신
+        new_mass = {node: [0.0] * levels for node in affected}
+        for node in affected:
+            if node in present:
+                new_mass[node][0] = 1.0
+
+        for k in range(1, levels):
+            for node in affected:
+                total = 0.0
+                for pred, weight in self._pred.get(node, {}).items():
+                    pred_mass = new_mass[pred] if pred in new_mass else mass.get(pred)
+                    if not pred_mass or pred_mass[k - 1] == 0.0:
+                        continue
+                    total += pred_mass[k - 1] * transition(pred, node, weight)
+                new_mass[node][k] = d * total
+
+        exposure = self._exposure[kind]
+        for node, values in new_mass.items():
+            if any(values):
+                mass[node] = values
+                exposure[node] = sum(values)
+            else:
+                mass.pop(node, None)
+                exposure.pop(node, None)
+
+    def _downstream(self, roots: Set[str], depth: int, kind: Optional[str] = None) -> Set[str]:
+        """roots에서 depth 홉 이내로 도달 가능한 노드 (roots 포함)"""
+        visited = set(roots)
+        frontier = list(roots)
+        for _ in range(depth):
+            next_frontier = []
+            for node in frontier:
+                for successor in self._expandable_successors(node, kind):
+                    if successor not in visited:
+                        visited.add(successor)
+                        next_frontier.append(successor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return visited
+
+    # ------------------------------------------------------------------
+    # 조회 (O(1))
+    # ------------------------------------------------------------------
+
+    def get_hop_distance(self, address: str, kind: str = "sdn") -> Optional[int]:
+        """
+        최소 홉 거리
+
+        Returns:
+            홉 수 (시드 자신은 0), max_hops 안에 시드가 없으면 None
+        """
+        return self._hops[kind].get(address.lower())
+
+    def get_exposure(self, address: str, kind: str = "sdn") -> float:
+        """
+        근사 PPR 노출도
+
+        Returns:
+            PPR 점수 (0~1, 그래프에 등장한 시드에 균등 분배한 personalization 기준)
+        """
+        num_seeds = len(self._present_seeds[kind])
+        if not num_seeds:
+            return 0.0
+        raw = self._exposure[kind].get(address.lower(), 0.0)
+        return (1.0 - self.damping_factor) * raw / num_seeds
+
+    def lookup(self, address: str) -> Dict[str, Any]:
+        """
+        주소의 근접도 정보 조회
+
+        PPRConnector.calculate_connection_risk 와 같은 키 구성 + 홉 거리
+
+        Returns:
+            {
+                "sdn_hops": Optional[int],
+                "mixer_hops": Optional[int],
+                "sdn_ppr": float,
+                "mixer_ppr": float,
+                "total_ppr": float,
+                "risk_level": str  # low | medium | high
+            }
+        """
+        sdn_ppr = self.get_exposure(address, "sdn")
+        mixer_ppr = self.get_exposure(address, "mixer")
+        total_ppr = sdn_ppr * 0.6 + mixer_ppr * 0.4  # SDN이 더 중요
+
+        if total_ppr >= 0.1:
+            risk_level = "high"
+        elif total_ppr >= 0.05:
+            risk_level = "medium"
+        else:
+            risk_level = "low"
+
+        return {
+            "sdn_hops": self.get_hop_distance(address, "sdn"),
+            "mixer_hops": self.get_hop_distance(address, "mixer"),
+            "sdn_ppr": sdn_ppr,
+            "mixer_ppr": mixer_ppr,
+            "total_ppr": total_ppr,
+            "risk_level": risk_level
+        }
+
+    def get_hop_set(self, hops: int, kind: str = "sdn") -> Set[str]:
+        """
+        정확히 hops 홉 거리에 있는 주소 집합 (legacy sdn_hop1.json / sdn_hop2.json 대체)
+        """
+        return {addr for addr, hop in self._hops[kind].items() if hop == hops}
+
+    def __contains__(self, address: str) -> bool:
+        address = address.lower()
+        return address in self._succ or address in self._pred
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(set(self._succ) | set(self._pred))
@@ -0,0 +1,175 @@
+"""
+슈퍼노드 정책 모듈
+
+CEX 핫월렛, DEX 라우터, 브릿지 컨트랙트처럼 차수가 매우 큰 주소를 지나는 탐색은
+경로 수가 폭발한다. 이 모듈은 그래프 알고리즘이 공통으로 사용하는 정책을 정의한다.
+
+- terminal: 슈퍼노드는 경로에 포함(카운트)되지만 더 이상 확장하지 않음
+- sample: 슈퍼노드의 이웃 중 sample_size개만 결정적으로 샘플링해 확장
+
+샘플링은 (노드, 이웃) 해시가 가장 작은 k개를 고르는 bottom-k 방식이라
+실행마다 같은 결과를 내고, 이웃이 추가되어도 샘플이 크게 바뀌지 않는다.
+"""
+
+from typing import List, Set, Optional, Iterable
+import hashlib
+import heapq
+import networkx as nx
+import numpy as np
+
+from core.data.lists import KNOWN_SERVICE_ADDRESSES
+
+
+class SupernodePolicy:
+    """
+    슈퍼노드 판정 및 확장 제한 정책
+
+    degree_threshold를 넘는 노드, 또는 서비스 주소 리스트(CEX/브릿지/알려진 DEX 라우터 등)에
+    있는 노드를 슈퍼노드로 본다.
+    """
+
+    MODES = ("terminal", "sample")
+
+    def __init__(
+        self,
+        degree_threshold: int = 1000,
+        service_addresses: Optional[Iterable[str]] = None,
+        mode: str = "terminal",
+        sample_size: int = 25
+    ):
+        """
+        Args:
+            degree_threshold: 이 차수(in + out)를 넘으면 슈퍼노드
+            service_addresses: 항상 슈퍼노드로 취급할 주소 리스트
+            mode: "terminal" (확장하지 않음) 또는 "sample" (이웃 샘플링)
+            sample_size: sample 모드에서 확장할 이웃 수
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown supernode mode: {mode}")
+
+        self.degree_threshold = degree_threshold
+        self.service_addresses: Set[str] = {addr.lower() for addr in (service_addresses or [])}
+        self.mode = mode
+        self.sample_size = sample_size
+
+    @classmethod
+    def from_list_loader(cls, list_loader=None, **kwargs) -> "SupernodePolicy":
+        """
+        CEX_LIST, BRIDGE_LIST, 알려진 서비스 주소(KNOWN_SERVICE_ADDRESSES)로 정책 생성
+
+        Args:
+            list_loader: ListLoader (None이면 새로 생성)
+            **kwargs: SupernodePolicy 생성 인자
+        """
+        if list_loader is None:
+            from core.data.lists import ListLoader
+            list_loader = ListLoader()
+
+        service_addresses = set(kwargs.pop("service_addresses", None) or [])
+        service_addresses |= list_loader.get_cex_list()
+        service_addresses |= list_loader.get_bridge_list()
+        service_addresses |= set(KNOWN_SERVICE_ADDRESSES)
+
+        return cls(service_addresses=service_addresses, **kwargs)
+
+    def is_supernode(self, node: str, degree: int = 0) -> bool:
+        """
+        슈퍼노드 여부
+
+        Args:
+            node: 주소
+            degree: 현재 그래프에서의 차수 (in + out)
+        """
+        return node in self.service_addresses or degree > self.degree_threshold
+
+    def expandable_mask(self, nodes: List[str], degrees: np.ndarray) -> np.ndarray:
+        """
+        노드별 확장 가능 여부 배열 (CSR 기반 알고리즘용, 슈퍼노드는 False)
+
+        Args:
+            nodes: 인덱스 순서의 주소 리스트
+            degrees: 같은 순서의 차수 (in + out) 배열
+        """
+        return np.array([
+            not self.is_supernode(node, int(degree))
+            for node, degree in zip(nodes, degrees)
+        ], dtype=bool)
+
+    def limit(
+        self,
+        node: str,
+        neighbors: Iterable[str],
+        degree: Optional[int] = None,
+        is_root: bool = False
+    ) -> List[str]:
+        """
+        정책을 적용한 확장 대상 이웃
+
+        탐색의 시작 노드(is_root)는 terminal 모드에서도 샘플링해 확장한다
+        (슈퍼노드 자체를 분석하는 경우 결과가 비지 않도록).
+
+        Args:
+            node: 확장할 노드
+            neighbors: node의 이웃 (방향은 호출 측 기준)
+            degree: node의 차수 (None이면 이웃 수)
+            is_root: 탐색 시작 노드 여부
+
+        Returns:
+            확장할 이웃 리스트
+        """
+        if degree is None:
+            neighbors = list(neighbors)
+            degree = len(neighbors)
+        if not self.is_supernode(node, degree):
+            return list(neighbors)
+        if self.mode == "terminal" and not is_root:
+            return []
+        neighbors = list(neighbors)
+        sample = self.sample(node, neighbors)
+        return [neighbor for neighbor in neighbors if neighbor in sample]
+
+    def sample(self, node: str, neighbors: List[str]) -> frozenset:
+        """결정적 bottom-k 해시 샘플"""
+        if len(neighbors) <= self.sample_size:
+            return frozenset(neighbors)
+        return frozenset(heapq.nsmallest(
+            self.sample_size,
+            neighbors,
+            key=lambda neighbor: self._hash(node, neighbor)
+        ))
+
+    @staticmethod
+    def _hash(node: str, neighbor: str) -> bytes:
+        return hashlib.blake2b(f"{node}:{neighbor}".encode(), digest_size=8).digest()
+
+    # ------------------------------------------------------------------
+    # networkx 그래프 헬퍼
+    # ------------------------------------------------------------------
+
+    def successors(self, graph: nx.DiGraph, node: str, is_root: bool = False) -> List[str]:
+        """정책을 적용한 후속 노드"""
+        return self.limit(node, graph.successors(node), graph.degree(node), is_root)
+
+    def predecessors(self, graph: nx.DiGraph, node: str, is_root: bool = False) -> List[str]:
+        """정책을 적용한 선행 노드"""
+        return self.limit(node, graph.predecessors(node), graph.degree(node), is_root)
+
+    def restricted_view(self, graph: nx.DiGraph) -> nx.DiGraph:
+        """
+        슈퍼노드의 확장하지 않는 나가는 엣지를 숨긴 그래프 뷰 (복사 없음)
+
+        PageRank처럼 그래프 전체를 입력받는 알고리즘용. terminal 슈퍼노드는
+        dangling 노드가 되어 질량이 더 퍼지지 않는다.
+        """
+        hidden_edges = []
+        for node in graph.nodes():
+            if not self.is_supernode(node, graph.degree(node)):
+                continue
+            kept = set(self.successors(graph, node))
+            hidden_edges.extend(
+                (node, successor) for successor in graph.successors(node)
+                if successor not in kept
+            )
+        if not hidden_edges:
+            return graph
+        return nx.restricted_view(graph, [], hidden_edges)
@@ -0,0 +1,414 @@
+"""
+시간 순서 경로 (temporal path) 탐색 모듈
+
+집계 그래프는 엣지별 거래를 합쳐 버리므로 경로가 시간을 거슬러 "흐를" 수 있다.
+여기서는 엣지별 거래를 시간순으로 보관하고, 다음 홉의 거래가 이전 홉 이후이면서
+max_delay_sec 이내일 때만 경로를 확장한다.
+
+- Layering Chain (B-201): 각 홉 금액이 첫 홉 금액 대비 허용 오차 이내
+- Stack: 홉 금액 합이 최소 경로 가치 이상
+"""
+
+from typing import Dict, List, Set, Optional, Any, Tuple, Iterable
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime
+import math
+import networkx as nx
+
+from .supernode import SupernodePolicy
+
+
+# (timestamp, amount, token, tx_hash)
+TemporalHop = Tuple[int, float, str, str]
+
+
+class TemporalPathIndex:
+    """
+    시간순 엣지 거래 인덱스와 시간 제약 경로 탐색기
+
+    _out[u][v]는 (timestamp, amount, token, tx_hash) 리스트를 시간순으로 유지하고,
+    _out_ts[u][v]는 같은 순서의 timestamp 리스트 (bisect용)
+
+    add_transaction()은 한 건씩 정렬 위치에 삽입하고, build_from_transactions()/from_graph()는
+    엣지별로 모은 뒤 한 번에 정렬한다.
+    """
+
+    def __init__(
+        self,
+        max_delay_sec: Optional[int] = 86400,
+        supernode_policy: Optional[SupernodePolicy] = None
+    ):
+        """
+        Args:
+            max_delay_sec: 연속된 두 홉 사이 최대 지연 (초, None이면 제한 없음)
+            supernode_policy: 슈퍼노드 정책 (허브 확장 제한, None이면 제한 없음)
+        """
+        self.max_delay_sec = max_delay_sec
+        self.supernode_policy = supernode_policy
+        self._out: Dict[str, Dict[str, List[TemporalHop]]] = defaultdict(dict)
+        self._out_ts: Dict[str, Dict[str, List[int]]] = defaultdict(dict)
+        self._in_degree: Dict[str, int] = defaultdict(int)
+        # keep_sorted=False로 추가되어 아직 정렬하지 않은 엣지 (from, to)
+        self._unsorted: Set[Tuple[str, str]] = set()
+        self.number_of_transactions = 0
+
+    @classmethod
+    def from_graph(
+        cls,
+        graph: nx.DiGraph,
+        max_delay_sec: Optional[int] = 86400,
+        supernode_policy: Optional[SupernodePolicy] = None
+    ) -> "TemporalPathIndex":
+        """
+        MPOCryptoMLPatternDetector 그래프의 엣지별 transactions 리스트로 구축
+
+        Args:
+            graph: 엣지 속성 "transactions"를 가진 그래프
+            max_delay_sec: 연속된 두 홉 사이 최대 지연 (초)
+            supernode_policy: 슈퍼노드 정책
+        """
+        index = cls(max_delay_sec=max_delay_sec, supernode_policy=supernode_policy)
+        for u, v, data in graph.edges(data=True):
+            for tx in data.get("transactions", []):
+                index._insert(
+                    u, v,
+                    index._parse_timestamp(tx.get("timestamp")),
+                    index._parse_amount(tx.get("usd_value", 0)),
+                    "",
+                    tx.get("tx_hash", ""),
+                    keep_sorted=False
+                )
+        index._sort_pending()
+        return index
+
+    def build_from_transactions(self, transactions: Iterable[Dict[str, Any]]) -> "TemporalPathIndex":
+        """거래 리스트로부터 인덱스 구축 (엣지별로 모은 뒤 한 번에 정렬)"""
+        for tx in transactions:
+            self.add_transaction(tx, keep_sorted=False)
+        self._sort_pending()
+        return self
+
+    def add_transaction(self, tx: Dict[str, Any], keep_sorted: bool = True) -> bool:
+        """
+        트랜잭션 추가 (타임스탬프가 없거나 해석할 수 없거나, 금액이 0 이하면 무시)
+
+        Args:
+            tx: {"from"/"counterparty_address", "to"/"target_address",
+                 "usd_value"/"amount_usd"/"value", "timestamp", "asset_contract", "tx_hash"}
+            keep_sorted: False면 엣지 리스트 끝에 붙이기만 함 (묶음 구축용, _sort_pending()으로 정렬)
+
+        Returns:
+            추가 여부
+        """
+        from_addr = (tx.get("from") or tx.get("counterparty_address", "") or "").lower()
+        to_addr = (tx.get("to") or tx.get("target_address", "") or "").lower()
+
+        # USD 값 우선, 없으면 Wei 값 사용 (MPOCryptoMLPatternDetector와 동일)
+        amount = self._parse_amount(tx.get("usd_value", tx.get("amount_usd", 0)))
+        if amount <= 0:
+            amount = self._parse_amount(tx.get("value", 0)) / 1e18
+
+        return self._insert(
+            from_addr,
+            to_addr,
+            self._parse_timestamp(tx.get("timestamp")),
+            amount,
+            (tx.get("asset_contract") or "").lower(),
+            tx.get("tx_hash", ""),
+            keep_sorted=keep_sorted
+        )
+
+    def _insert(
+        self,
+        from_addr: str,
+        to_addr: str,
+        timestamp: int,
+        amount: float,
+        token: str,
+        tx_hash: str,
+        keep_sorted: bool = True
+    ) -> bool:
+        """엣지 거래 리스트에 시간순으로 삽입 (keep_sorted=False면 끝에 붙이고 정렬 대기)"""
+        if not from_addr or not to_addr or from_addr == to_addr:
+            return False
+        if timestamp <= 0 or amount <= 0:
+            return False
+
+        if to_addr not in self._out[from_addr]:
+            self._in_degree[to_addr] += 1
+        hops = self._out[from_addr].setdefault(to_addr, [])
+        timestamps = self._out_ts[from_addr].setdefault(to_addr, [])
+        if keep_sorted:
+            position = bisect_right(timestamps, timestamp)
+            hops.insert(position, (timestamp, amount, token, tx_hash))
+            timestamps.insert(position, timestamp)
+        else:
+            hops.append((timestamp, amount, token, tx_hash))
+            timestamps.append(timestamp)
+            self._unsorted.add((from_addr, to_addr))
+        self.number_of_transactions += 1
+        return True
+
+    def _sort_pending(self) -> None:
+        """keep_sorted=False로 추가된 엣지 리스트를 시간순 정렬 (같은 시각은 추가 순서 유지)"""
+        for from_addr, to_addr in self._unsorted:
+            hops = self._out[from_addr][to_addr]
+            hops.sort(key=lambda hop: hop[0])
+            self._out_ts[from_addr][to_addr] = [hop[0] for hop in hops]
+        self._unsorted.clear()
+
+    @staticmethod
+    def _parse_amount(value: Any) -> float:
+        """금액을 float로 변환 (해석할 수 없거나 유한하지 않으면 0)"""
+        try:
+            amount = float(value or 0)
+        except (ValueError, TypeError):
+            return 0.0
+        return amount if math.isfinite(amount) else 0.0
+
+    def _parse_timestamp(self, timestamp: Any) -> int:
+        """타임스탬프를 Unix 초로 변환 (해석할 수 없으면 0 → 해당 거래는 무시)"""
+        if isinstance(timestamp, bool):
+            return 0
+        try:
+            if isinstance(timestamp, (int, float)):
+                return int(timestamp)
+            if isinstance(timestamp, str) and timestamp:
+                if "T" in timestamp or " " in timestamp:
+                    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+                    return int(dt.timestamp())
+                return int(float(timestamp))
+        except (ValueError, TypeError, OverflowError):
+            return 0
+        return 0
+
+    def next_hops(
+        self,
+        node: str,
+        after: Optional[int] = None
+    ) -> List[Tuple[str, TemporalHop]]:
+        """
+        node에서 나가는 거래 중 시간 조건을 만족하는 것
+
+        슈퍼노드 정책이 있으면 첫 홉(after=None)의 시작 노드를 제외한
+        슈퍼노드는 확장하지 않거나 샘플링한 후속 노드만 확장
+
+        Args:
+            node: 현재 노드
+            after: 이전 홉의 타임스탬프 (None이면 첫 홉, 시간 제약 없음)
+
+        Returns:
+            [(successor, (timestamp, amount, token, tx_hash)), ...]
+        """
+        out = self._out.get(node, {})
+        if self.supernode_policy is not None:
+            degree = len(out) + self._in_degree.get(node, 0)
+            if self.supernode_policy.is_supernode(node, degree):
+                allowed = self.supernode_policy.limit(node, out, degree, is_root=after is None)
+                out = {successor: out[successor] for successor in allowed}
+
+        candidates = []
+        for successor, hops in out.items():
+            if after is None:
+                candidates.extend((successor, hop) for hop in hops)
+                continue
+            timestamps = self._out_ts[node][successor]
+            position = bisect_right(timestamps, after)
+            for hop in hops[position:]:
+                if self.max_delay_sec is not None and hop[0] - after > self.max_delay_sec:
+                    break
+                candidates.append((successor, hop))
+        return candidates
+
+    def find_layering_chain(
+        self,
+        start_address: str,
+        min_hops: int = 3,
+        max_amount_delta_pct: float = 5,
+        min_usd_value: float = 100,
+        same_token: bool = True,
+        max_expansions: int = 20000
+    ) -> Dict[str, Any]:
+        """
+        시간 순서를 지키는 레이어링 체인 탐색
+
+        각 홉은 개별 거래이며, 이전 홉 이후 max_delay_sec 이내여야 한다.
+        금액은 첫 홉 금액 기준으로, 토큰은 (same_token이면) 첫 홉 토큰과 같아야 한다.
+
+        Args:
+            start_address: 시작 주소
+            min_hops: 최소 홉 수
+            max_amount_delta_pct: 최대 금액 차이 (%)
+            min_usd_value: 최소 거래액
+            same_token: 동일 토큰 여부
+            max_expansions: 노드 확장 상한
+
+        Returns:
+            {
+                "found": 체인 발견 여부,
+                "partial": 확장 상한에 걸려 탐색이 중단되었는지 여부,
+                "expanded_nodes": 확장한 노드 수,
+                "chain": 발견된 체인 주소 리스트,
+                "hops": 체인을 이루는 거래 [{"tx_hash", "timestamp", "usd_value"}, ...]
+            }
+        """
+        start_address = start_address.lower()
+        result = {"found": False, "partial": False, "expanded_nodes": 0, "chain": [], "hops": []}
+        state = {"expanded": 0, "truncated": False}
+
+        def admissible(hop: TemporalHop, first: Optional[TemporalHop]) -> bool:
+            if hop[1] < min_usd_value:
+                return False
+            if first is None:
+                return True
+            if same_token and hop[2] != first[2]:
+                return False
+            if first[1] == 0:
+                return False
+            return abs(hop[1] - first[1]) / first[1] * 100 <= max_amount_delta_pct
+
+        chain = self._search(
+            start_address,
+            min_hops,
+            admissible,
+            lambda hops: True,
+            max_expansions,
+            state,
+            memoize=True
+        )
+
+        result["expanded_nodes"] = state["expanded"]
+        if chain is not None:
+            result["found"] = True
+            result["chain"], result["hops"] = chain
+        else:
+            result["partial"] = state["truncated"]
+        return result
+
+    def find_stack_path(
+        self,
+        start_vertex: str,
+        min_length: int = 3,
+        min_path_value: float = 100.0,
+        max_expansions: int = 5000
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        시간 순서를 지키는 Stack 경로 존재 확인
+
+        Args:
+            start_vertex: 시작 주소
+            min_length: 최소 경로 길이 (노드 수)
+            min_path_value: 최소 경로 총 가치 (홉 거래 금액 합)
+            max_expansions: 노드 확장 상한
+
+        Returns:
+            (경로, partial) - 경로는 {"path", "length", "total_value", "hops"} 또는 None,
+            partial은 경로를 못 찾은 채 확장 상한에 걸렸는지 여부
+        """
+        state = {"expanded": 0, "truncated": False}
+        found = self._search(
+            start_vertex.lower(),
+            max(min_length - 1, 0),
+            lambda hop, first: True,
+            lambda hops: sum(hop[1] for hop in hops) >= min_path_value,
+            max_expansions,
+            state
+        )
+        if found is None:
+            return None, state["truncated"]
+
+        path, hops = found
+        return {
+            "path": path,
+            "length": len(path),
+            "total_value": sum(hop["usd_value"] for hop in hops),
+            "hops": hops
+        }, False
+
+    def _search(
+        self,
+        start_address: str,
+        min_hops: int,
+        admissible,
+        accept,
+        max_expansions: int,
+        state: Dict[str, Any],
+        memoize: bool = False
+    ) -> Optional[Tuple[List[str], List[Dict[str, Any]]]]:
+        """
+        시간 제약 DFS (깊이는 경로 길이 10 노드로 제한)
+
+        admissible(hop, first_hop): 홉 추가 가능 여부 (즉시 가지치기)
+        accept(hops): min_hops 이상일 때 경로 채택 여부
+        memoize: accept가 경로와 무관할 때(레이어링 체인) 실패한 상태를 메모
+          (TopologyEvaluator._search_layering_chain과 같은 방식)
+          상태 = (첫 홉 금액, 첫 홉 토큰, 노드, 도착 시각). 남은 홉 r에서 실패하면 r 이상에서도 실패.
+          현재 경로 노드에 막혀 실패했거나 확장 상한에 걸린 경우는 메모하지 않음
+        """
+        if start_address not in self._out and min_hops > 0:
+            return None
+
+        path: List[str] = [start_address]
+        hops: List[TemporalHop] = []
+        visited: Set[str] = {start_address}
+
+        def to_result() -> Tuple[List[str], List[Dict[str, Any]]]:
+            return path.copy(), [
+                {"tx_hash": hop[3], "timestamp": hop[0], "usd_value": hop[1]}
+                for hop in hops
+            ]
+
+        # {(첫 홉 금액, 첫 홉 토큰, 노드, 도착 시각): 실패가 확인된 최소 남은 홉 수}
+        failed: Dict[Tuple[float, str, str, int], int] = {}
+
+        def dfs(current: str) -> Tuple[bool, bool]:
+            """(발견 여부, 경로 노드에 막혔거나 확장 상한에 걸린 적 있는지) 반환"""
+            if len(hops) >= min_hops and accept(hops):
+                return True, False
+
+            if len(path) >= 10:  # 너무 긴 경로 방지
+                return False, False
+
+            key = None
+            remaining = min_hops - len(hops)
+            if memoize and hops:
+                key = (hops[0][1], hops[0][2], current, hops[-1][0])
+                if failed.get(key, remaining + 1) <= remaining:
+                    return False, False
+
+            if state["expanded"] >= max_expansions:
+                state["truncated"] = True
+                return False, True
+            state["expanded"] += 1
+
+            after = hops[-1][0] if hops else None
+            first = hops[0] if hops else None
+            blocked = False
+            for successor, hop in self.next_hops(current, after):
+                if not admissible(hop, first):
+                    continue
+                if successor in visited:
+                    # 시작 주소는 항상 제외되므로 경로 의존적이지 않음
+                    blocked = blocked or successor != start_address
+                    continue
+                visited.add(successor)
+                path.append(successor)
+                hops.append(hop)
+                found, sub_blocked = dfs(successor)
+                if found:
+                    return True, False
+                hops.pop()
+                path.pop()
+                visited.remove(successor)
+                blocked = blocked or sub_blocked
+                if state["truncated"]:
+                    return False, True
+
+            if key is not None and not blocked:
+                failed[key] = min(failed.get(key, remaining), remaining)
+            return False, blocked
+
+        if dfs(start_address)[0]:
+            return to_result()
+        return None
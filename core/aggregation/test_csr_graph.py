@@ -0,0 +1,102 @@
+"""
+CSR 그래프 레이어 흐름 테스트
+
+bfs_layers / layered_flow가 networkx 최단 거리 BFS로 계산한 레이어와 엣지 분류(l → l+1 / 같은 레이어 / 역방향)와
+같은지(방향, 확장 불가 노드 포함), 반복 호출해도 결과가 같은지, detect_layered_flow가 층 구조를 판정하는지 확인
+"""
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from core.aggregation.csr_graph import CSRGraph
+from core.aggregation.mpocryptml_patterns import MPOCryptoMLPatternDetector
+
+
+def _random_graph(seed: int, n: int = 30, m: int = 70):
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(f"0x{i:040x}" for i in range(n))
+    for _ in range(m):
+        u, v = rng.sample(list(graph.nodes), 2)
+        graph.add_edge(u, v, weight=rng.random())
+    return graph
+
+
+def _reference(graph, source, max_hops, expandable):
+    """networkx BFS 레이어 (확장 불가 노드는 시작 노드가 아니면 확장하지 않음)와 엣지 delta 집계"""
+    layers = {source: 0}
+    frontier = [source]
+    for hop in range(1, max_hops + 1):
+        next_frontier = []
+        for node in frontier:
+            if node != source and not expandable[node]:
+                continue
+            for neighbor in graph.successors(node):
+                if neighbor not in layers:
+                    layers[neighbor] = hop
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+
+    deltas = [
+        layers[v] - layers[u]
+        for u in layers if u == source or expandable[u]
+        for v in graph.successors(u) if v in layers
+    ]
+    return layers, deltas
+
+
+@pytest.mark.parametrize("direction", ["out", "in"])
+@pytest.mark.parametrize("restricted", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_layered_flow_matches_networkx(direction, restricted, seed):
+    """모든 시작 노드에서 레이어/엣지 분류가 networkx 참조와 같고, 반복 호출해도 같은 결과"""
+    graph = _random_graph(seed)
+    csr = CSRGraph.from_networkx(graph)
+    rng = np.random.default_rng(seed)
+    expandable = rng.random(csr.number_of_nodes) > 0.3 if restricted else None
+    reference_graph = graph if direction == "out" else graph.reverse(copy=True)
+    node_expandable = {
+        node: True if expandable is None else bool(expandable[i]) for i, node in enumerate(csr.nodes)
+    }
+
+    for index, node in enumerate(csr.nodes):
+        for max_hops in (2, 3):
+            layers, deltas = _reference(reference_graph, node, max_hops, node_expandable)
+            flow = csr.layered_flow(index, max_hops=max_hops, direction=direction, expandable=expandable)
+            members, member_layers = csr.bfs_layers(index, max_hops, direction, expandable)
+
+            assert {csr.nodes[i]: int(l) for i, l in zip(flow["members"], flow["member_layers"])} == layers
+            assert np.array_equal(members, flow["members"]) and np.array_equal(member_layers, flow["member_layers"])
+            assert flow["layer_sizes"] == np.bincount(list(layers.values())).tolist()
+            assert flow["edges_checked"] == len(deltas)
+            assert flow["forward_edges"] == deltas.count(1)
+            assert flow["same_layer_edges"] == deltas.count(0)
+            assert flow["backward_edges"] == sum(delta < 0 for delta in deltas)
+            assert flow["violations"] == len(deltas) - deltas.count(1)
+    # 스크래치 레이어 배열은 호출 후 초기 상태
+    assert (csr._layer_scratch() == -1).all()
+
+
+def test_detect_layered_flow():
+    """A → {B, C} → D 는 2-레이어 흐름, 같은 레이어 엣지나 되돌아가는 엣지가 있으면 아님"""
+    a, b, c, d = (f"0x{i:040x}" for i in range(1, 5))
+    detector = MPOCryptoMLPatternDetector()
+    detector.build_from_transactions([
+        {"from": u, "to": v, "usd_value": 100.0, "timestamp": 1_700_000_000}
+        for u, v in ((a, b), (a, c), (b, d), (c, d))
+    ])
+    result = detector.detect_layered_flow(a)
+    assert result["is_layered"]
+    assert result["layer_sizes"] == [1, 2, 1]
+    assert result["layers"] == [{b, c}, {d}]
+    assert detector.detect_layered_flow(d, direction="in")["is_layered"]
+
+    detector.add_transaction({"from": b, "to": c, "usd_value": 100.0, "timestamp": 1_700_000_000})
+    result = detector.detect_layered_flow(a)
+    assert not result["is_layered"] and result["same_layer_edges"] == 1
+
+    detector.add_transaction({"from": d, "to": a, "usd_value": 100.0, "timestamp": 1_700_000_000})
+    assert detector.detect_layered_flow(a)["backward_edges"] == 1
+    assert not detector.detect_layered_flow("0xmissing")["is_layered"]
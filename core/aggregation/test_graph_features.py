@@ -0,0 +1,110 @@
+"""
+그래프 전체 피처 추출기 테스트
+
+거래 배열로 만든 ColumnarGraph.from_arrays가 add_transaction으로 만든 그래프의 from_networkx와
+같은 배열인지, extract_columns가 extract와 같은 테이블을 내는지(슈퍼노드 정책 포함),
+CSR stack 탐색이 MPOCryptoMLPatternDetector.find_stack_path와 같은지 확인
+"""
+import random
+
+import numpy as np
+import pytest
+
+from core.aggregation.csr_graph import ColumnarGraph
+from core.aggregation.graph_features import GraphFeatureExtractor
+from core.aggregation.mpocryptml_patterns import MPOCryptoMLPatternDetector
+from core.aggregation.mpocryptml_normalizer import MPOCryptoMLNormalizer
+from core.aggregation.supernode import SupernodePolicy
+
+T0 = 1_700_000_000
+
+
+def _transactions(n: int = 400, seed: int = 0):
+    """대소문자 섞인 주소, 빈 주소, 0 이하 금액, 반복 엣지, 자기 루프, 타임스탬프 0이 섞인 거래"""
+    rng = random.Random(seed)
+    nodes = [f"0x{i:040x}" for i in range(50)] + [f"0xABC{i:037x}" for i in range(5)] + [""]
+    txs = []
+    for i in range(n):
+        txs.append({
+            "from": rng.choice(nodes),
+            "to": rng.choice(nodes),
+            "usd_value": rng.choice([0.0, -1.0, 0.5, 7.0, 20.0, 35.0, 60.0, 150.0]) * rng.random(),
+            "timestamp": rng.choice([0, T0 + rng.randrange(30 * 86400)]),
+            "tx_hash": f"0xtx{i}",
+        })
+    return txs
+
+
+def _both(txs):
+    detector = MPOCryptoMLPatternDetector()
+    for tx in txs:
+        detector.add_transaction(tx)
+    parse = MPOCryptoMLNormalizer()._extract_timestamp
+    from_graph = ColumnarGraph.from_networkx(detector.graph, parse)
+    from_arrays = ColumnarGraph.from_arrays(
+        [tx["from"] for tx in txs],
+        [tx["to"] for tx in txs],
+        np.array([tx["timestamp"] for tx in txs]),
+        np.array([tx["usd_value"] for tx in txs])
+    )
+    return detector, from_graph, from_arrays
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_from_arrays_matches_from_networkx(seed):
+    """노드/엣지 순서, 누적 가중치, 거래 컬럼이 비트 단위로 같음"""
+    _, expected, actual = _both(_transactions(seed=seed))
+    assert actual.nodes == expected.nodes
+    for name in ("indptr", "indices", "weights", "rev_indptr", "rev_indices", "rev_weights"):
+        assert np.array_equal(getattr(actual.edges, name), getattr(expected.edges, name)), name
+    for name in ("tx_out_indptr", "tx_out_timestamp", "tx_out_weight", "tx_in_indptr", "tx_in_timestamp", "tx_in_weight"):
+        assert np.array_equal(getattr(actual, name), getattr(expected, name)), name
+
+
+def test_from_arrays_empty():
+    """남는 거래가 없으면 빈 그래프, extract_columns는 빈 테이블"""
+    columns = ColumnarGraph.from_arrays(["", "0xa"], ["0xb", "0xc"], np.array([T0, T0]), np.array([5.0, 0.0]))
+    assert columns.nodes == []
+    table = GraphFeatureExtractor().extract_columns(columns)
+    assert all(len(values) == 0 for values in table.values())
+
+
+@pytest.mark.parametrize("policy", [
+    None,
+    SupernodePolicy(degree_threshold=12),
+    SupernodePolicy(degree_threshold=12, mode="sample", sample_size=3),
+])
+def test_extract_columns_matches_extract(policy):
+    """extract_columns(from_arrays)가 extract(networkx 그래프)와 같은 테이블 (전체/지정 주소)"""
+    txs = _transactions(n=150, seed=7)
+    detector, _, columns = _both(txs)
+    extractor = GraphFeatureExtractor(supernode_policy=policy)
+    sdn, mixer = [columns.nodes[0]], [columns.nodes[3].upper()]
+    focus = [columns.nodes[5], columns.nodes[9], "0xmissing"]
+    for addresses in (None, focus):
+        expected = extractor.extract(detector.graph, txs, sdn, mixer, addresses=addresses)
+        actual = extractor.extract_columns(columns, txs, sdn, mixer, addresses=addresses)
+        assert list(actual) == GraphFeatureExtractor.COLUMNS
+        for name in GraphFeatureExtractor.COLUMNS:
+            assert np.array_equal(actual[name], expected[name]), name
+        if addresses is None:
+            assert actual["stack_detected"].any() and not actual["stack_detected"].all()
+
+
+@pytest.mark.parametrize("policy", [None, SupernodePolicy(degree_threshold=12, mode="sample", sample_size=3)])
+@pytest.mark.parametrize("max_expansions", [5000, 15])
+def test_csr_stack_search_matches_detector(policy, max_expansions):
+    """모든 노드에서 CSR stack 탐색 결과 = find_stack_path가 경로를 찾았는지 (확장 상한에 걸리면 미탐지)"""
+    detector, _, columns = _both(_transactions(n=150, seed=11))
+    detector.supernode_policy = policy
+    extractor = GraphFeatureExtractor(supernode_policy=policy)
+    csr = columns.edges
+    degrees = csr.out_degree() + csr.in_degree()
+    ordered = {}
+    found = []
+    for index, node in enumerate(csr.nodes):
+        path, _ = detector.find_stack_path(node, max_expansions=max_expansions)
+        actual = extractor._find_stack_path(csr, index, degrees, ordered, max_expansions=max_expansions)
+        assert actual == (path is not None), node
+        found.append(actual)
+    assert any(found) and not all(found)
@@ -0,0 +1,104 @@
+"""
+MPOCryptoML Nθ/Nω 일괄 계산 테스트
+
+normalize_all이 노드별 normalize_timestamp/normalize_weight와 같은 값을 내는지(엣지에 타임스탬프가 없어
+거래 리스트 fallback을 쓰는 노드, 그래프에 없는 fallback 주소, 문자열 타임스탬프 포함),
+fallback 거래 리스트가 바뀌면 캐시된 컬럼을 다시 만드는지 확인
+"""
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from core.aggregation.csr_graph import ColumnarGraph
+from core.aggregation.mpocryptml_normalizer import MPOCryptoMLNormalizer
+from core.aggregation.mpocryptml_patterns import MPOCryptoMLPatternDetector
+
+T0 = 1_700_000_000
+
+
+def _transactions(n: int, seed: int, nodes):
+    """타임스탬프 0/ISO 문자열/정수, 0 금액이 섞인 거래"""
+    rng = random.Random(seed)
+    txs = []
+    for _ in range(n):
+        ts = T0 + rng.randrange(10 * 86400)
+        txs.append({
+            "from": rng.choice(nodes),
+            "to": rng.choice(nodes),
+            "usd_value": rng.choice([0.0, 5.0, 40.0, 300.0]),
+            "timestamp": rng.choice([0, ts, str(ts), "2023-11-15T10:00:00Z"]),
+        })
+    return txs
+
+
+def _graph(txs):
+    detector = MPOCryptoMLPatternDetector()
+    for tx in txs:
+        detector.add_transaction(tx)
+    return detector.graph
+
+
+def _per_node(normalizer, graph, transactions):
+    nodes = list(graph.nodes)
+    return (
+        np.array([normalizer.normalize_timestamp(node, graph, transactions) for node in nodes]),
+        np.array([normalizer.normalize_weight(node, graph, transactions) for node in nodes])
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("with_fallback", [False, True])
+def test_normalize_all_matches_per_node(seed, with_fallback):
+    """모든 노드에서 normalize_all = normalize_timestamp / normalize_weight"""
+    nodes = [f"0x{i:040x}" for i in range(20)] + [f"0xABC{i:037x}" for i in range(3)]
+    txs = _transactions(80, seed, nodes)
+    graph = _graph(txs)
+    # fallback 거래 리스트에는 그래프에 없는 주소와 추가 거래가 섞임
+    fallback = txs + _transactions(30, seed + 100, nodes + ["0x" + "dd" * 20]) if with_fallback else []
+
+    normalizer = MPOCryptoMLNormalizer()
+    result = normalizer.normalize_all(graph, fallback)
+    assert result["nodes"] == list(graph.nodes)
+    expected_theta, expected_omega = _per_node(MPOCryptoMLNormalizer(), graph, fallback)
+    assert np.allclose(result["n_theta"], expected_theta, rtol=0, atol=1e-12)
+    assert np.allclose(result["n_omega"], expected_omega, rtol=0, atol=1e-12)
+    assert (result["n_theta"] > 0).any() and (result["n_omega"] > 0).any()
+
+    columns = ColumnarGraph.from_networkx(graph, normalizer._extract_timestamp)
+    from_columns = MPOCryptoMLNormalizer().normalize_all(None, fallback, columns=columns)
+    assert np.array_equal(from_columns["n_theta"], result["n_theta"])
+    assert np.array_equal(from_columns["n_omega"], result["n_omega"])
+
+
+def test_fallback_used_only_for_nodes_without_edge_values():
+    """엣지에 타임스탬프가 없는 노드만 거래 리스트로 계산, 리스트에 거래가 추가되면 다시 계산"""
+    a, b, c = (f"0x{i:040x}" for i in range(1, 4))
+    graph = nx.DiGraph()
+    graph.add_edge(a, b, weight=100.0, transactions=[{"timestamp": 0}])
+    graph.add_edge(b, c, weight=100.0, transactions=[{"timestamp": 0}])
+    transactions = [
+        {"from": a, "to": b, "usd_value": 100.0, "timestamp": T0},
+        {"from": b, "to": c, "usd_value": 100.0, "timestamp": T0 + 60},
+    ]
+
+    normalizer = MPOCryptoMLNormalizer()
+    assert normalizer.normalize_all(graph)["n_theta"].tolist() == [0.0, 0.0, 0.0]
+    result = normalizer.normalize_all(graph, transactions)
+    theta = dict(zip(result["nodes"], result["n_theta"]))
+    assert theta[b] == normalizer.normalize_timestamp(b, graph, transactions) > 0
+    assert theta[a] == theta[c] == 0.0
+
+    # 같은 리스트 객체에 거래를 추가하면 캐시된 fallback 컬럼을 다시 만듦
+    transactions.append({"from": b, "to": c, "usd_value": 100.0, "timestamp": T0 + 86400})
+    result = normalizer.normalize_all(graph, transactions)
+    updated = dict(zip(result["nodes"], result["n_theta"]))
+    assert updated[b] == MPOCryptoMLNormalizer().normalize_timestamp(b, graph, transactions) != theta[b]
+
+
+def test_normalize_all_empty():
+    """빈 그래프/컬럼 없음은 빈 결과"""
+    for graph in (None, nx.DiGraph()):
+        result = MPOCryptoMLNormalizer().normalize_all(graph, [])
+        assert result["nodes"] == [] and len(result["n_theta"]) == len(result["n_omega"]) == 0
@@ -0,0 +1,158 @@
+"""
+MPOCryptoML 패턴 탐지기 stack 경로 테스트
+
+find_stack_path(존재 여부)와 enumerate_stack_paths(상위 k)가 단순 경로 전수 탐색과 같은지,
+확장 상한에 걸리면 partial을 보고하는지, 거래가 추가되면 정렬 캐시를 비우는지,
+analyze_address_patterns가 타임스탬프가 있으면 시간 순서 경로만 stack으로 인정하고,
+타임스탬프가 없거나 temporal_stack=False면 집계 그래프 경로를 쓰는지,
+그래프가 바뀌면 시간순 인덱스를 다시 만드는지 확인
+"""
+import random
+
+import pytest
+
+from core.aggregation.mpocryptml_patterns import MPOCryptoMLPatternDetector
+
+A, B, C, D = (f"0x{i:040x}" for i in range(1, 5))
+T0 = 1_700_000_000
+
+
+def _tx(from_addr, to_addr, timestamp, usd_value=500.0, tx_hash=""):
+    return {"from": from_addr, "to": to_addr, "usd_value": usd_value, "timestamp": timestamp, "tx_hash": tx_hash}
+
+
+def _random_detector(seed: int, n_nodes: int = 8, n_txs: int = 12):
+    """가중치가 작은 엣지로 된 작은 그래프 (경로 가치 100을 넘으려면 여러 홉 필요)"""
+    rng = random.Random(seed)
+    nodes = [f"0x{i:040x}" for i in range(n_nodes)]
+    detector = MPOCryptoMLPatternDetector()
+    detector.build_from_transactions([
+        _tx(*rng.sample(nodes, 2), T0, usd_value=rng.choice([5.0, 15.0, 30.0, 45.0])) for _ in range(n_txs)
+    ])
+    return detector
+
+
+def _all_stack_values(graph, start, min_length=3, min_path_value=100.0):
+    """조건을 만족하는 모든 단순 경로(최대 10 노드)의 총 가치"""
+    values = []
+
+    def extend(path, value):
+        if len(path) >= min_length and value >= min_path_value:
+            values.append(value)
+        if len(path) >= 10:
+            return
+        for successor, data in graph.succ[path[-1]].items():
+            if successor not in path:
+                extend(path + [successor], value + data["weight"])
+
+    extend([start], 0.0)
+    return values
+
+
+def _assert_valid_path(graph, found, min_length=3, min_path_value=100.0):
+    path = found["path"]
+    assert len(set(path)) == len(path) == found["length"] >= min_length
+    assert found["total_value"] == pytest.approx(sum(graph[u][v]["weight"] for u, v in zip(path, path[1:])))
+    assert found["total_value"] >= min_path_value
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_find_stack_path_matches_exhaustive_search(seed):
+    """모든 시작 주소에서 경로 존재 여부 = 전수 탐색, 찾은 경로는 조건을 만족"""
+    detector = _random_detector(seed)
+    graph = detector.graph
+    outcomes = []
+    for node in graph:
+        found, partial = detector.find_stack_path(node, max_expansions=10**6)
+        assert not partial
+        outcomes.append(found is not None)
+        assert outcomes[-1] == bool(_all_stack_values(graph, node)), node
+        if found is not None:
+            _assert_valid_path(graph, found)
+    assert any(outcomes) and not all(outcomes)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_enumerate_stack_paths_top_k(seed):
+    """예산이 충분하면 상위 k개 경로 가치 = 전수 탐색 상위 k개 (내림차순)"""
+    detector = _random_detector(seed)
+    graph = detector.graph
+    for node in graph:
+        paths = detector.enumerate_stack_paths(node, top_k=4, max_expansions=10**6, max_paths=10**6)
+        expected = sorted(_all_stack_values(graph, node), reverse=True)[:4]
+        assert [path["total_value"] for path in paths] == pytest.approx(expected)
+        for path in paths:
+            _assert_valid_path(graph, path)
+    assert detector.detect_stack_pattern(node, top_k=0) == []
+
+
+def test_find_stack_path_budget():
+    """확장 상한에 걸려 못 찾으면 partial, 경로가 없음이 확정이면 partial 아님"""
+    chain = [f"0x{i:040x}" for i in range(6)]
+    detector = MPOCryptoMLPatternDetector()
+    detector.build_from_transactions([_tx(u, v, T0, usd_value=30.0) for u, v in zip(chain, chain[1:])])
+
+    assert detector.find_stack_path(chain[0], max_expansions=2) == (None, True)
+    found, partial = detector.find_stack_path(chain[0])
+    assert found["path"] == chain[:5] and not partial
+    assert detector.find_stack_path(chain[3]) == (None, False)
+    assert detector.find_stack_path("0xmissing") == (None, False)
+
+
+def test_successor_order_refreshed_after_add_transaction():
+    """거래 추가로 엣지 가중치 순서가 바뀌면 다음 탐색은 새 순서 (캐시된 정렬을 쓰지 않음)"""
+    detector = MPOCryptoMLPatternDetector()
+    detector.build_from_transactions([_tx(A, B, T0, 60.0), _tx(A, C, T0, 50.0), _tx(B, D, T0, 60.0), _tx(C, D, T0, 60.0)])
+    found, _ = detector.find_stack_path(A)
+    assert found["path"] == [A, B, D]
+
+    detector.add_transaction(_tx(A, C, T0, 20.0))
+    found, _ = detector.find_stack_path(A)
+    assert found["path"] == [A, C, D]
+
+
+def _stack_paths(transactions, **kwargs):
+    detector = MPOCryptoMLPatternDetector(**kwargs)
+    detector.build_from_transactions(transactions)
+    return detector.analyze_address_patterns(A)["stack_paths"]
+
+
+def test_time_ordered_chain_detected():
+    """A→B→C가 시간 순서대로 하루 이내에 이어지면 stack (홉 거래 포함)"""
+    paths = _stack_paths([_tx(A, B, T0, tx_hash="0x1"), _tx(B, C, T0 + 3600, tx_hash="0x2")])
+    assert [path["path"] for path in paths] == [[A, B, C]]
+    assert [hop["tx_hash"] for hop in paths[0]["hops"]] == ["0x1", "0x2"]
+    assert paths[0]["total_value"] == 1000.0
+
+
+def test_time_reversed_chain_rejected():
+    """다음 홉 거래가 이전 홉보다 앞서거나 지연이 너무 길면 stack이 아님 (집계 그래프로는 경로)"""
+    reversed_chain = [_tx(A, B, T0 + 3600), _tx(B, C, T0)]
+    assert _stack_paths(reversed_chain) == []
+    assert [path["path"] for path in _stack_paths(reversed_chain, temporal_stack=False)] == [[A, B, C]]
+
+    slow_chain = [_tx(A, B, T0), _tx(B, C, T0 + 2 * 86400)]
+    assert _stack_paths(slow_chain) == []
+    assert [path["path"] for path in _stack_paths(slow_chain, max_hop_delay_sec=None)] == [[A, B, C]]
+
+
+def test_without_timestamps_falls_back_to_graph():
+    """타임스탬프가 있는 거래가 없으면 집계 그래프 경로 (B-201 temporal 폴백과 같음)"""
+    paths = _stack_paths([_tx(A, B, ""), _tx(B, C, None)])
+    assert [path["path"] for path in paths] == [[A, B, C]]
+    assert "hops" not in paths[0]
+
+
+def test_temporal_index_rebuilt_after_new_transaction():
+    """분석 후 거래가 추가되면 시간순 인덱스를 다시 만들어 새 경로를 찾음"""
+    detector = MPOCryptoMLPatternDetector()
+    detector.build_from_transactions([_tx(A, B, T0 + 3600), _tx(B, C, T0)])
+    assert detector.analyze_address_patterns(A)["stack_paths"] == []
+
+    detector.add_transaction(_tx(B, D, T0 + 7200))
+    paths = detector.analyze_address_patterns(A)["stack_paths"]
+    assert [path["path"] for path in paths] == [[A, B, D]]
+
+    # 상위 k 열거는 집계 그래프 기준
+    top = detector.analyze_address_patterns(A, stack_top_k=5)["stack_paths"]
+    assert sorted(path["path"][-1] for path in top) == [C, D]
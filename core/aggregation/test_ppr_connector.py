@@ -0,0 +1,126 @@
+"""
+Monte-Carlo PPR 랜덤 워크 인덱스 테스트
+
+워커 수와 무관하게 같은 워크를 만드는지, add_edges 증분 갱신 후에도 방문 횟수/시드/워크 색인이
+처음부터 센 값과 같고 모든 워크가 현재 그래프의 엣지만 따라가는지,
+방문 빈도 추정이 워크 종료 규칙으로 계산한 기대 방문 수에 수렴하는지 확인
+"""
+import random
+from collections import Counter
+
+import networkx as nx
+import numpy as np
+
+from core.aggregation.ppr_connector import PPRConnector, RandomWalkIndex
+
+NODES = [f"0x{i:040x}" for i in range(16)]
+SDN = [NODES[0], NODES[15]]
+MIXER = [NODES[3]]
+
+
+def _edges(n: int, seed: int):
+    """NODES 사이의 (from, to, weight) 엣지 (자기 루프 없음)"""
+    rng = random.Random(seed)
+    return [(*rng.sample(NODES, 2), rng.choice([1.0, 5.0, 20.0])) for _ in range(n)]
+
+
+def _graph(edges):
+    graph = nx.DiGraph()
+    for u, v, weight in edges:
+        if graph.has_edge(u, v):
+            graph[u][v]["weight"] += weight
+        else:
+            graph.add_edge(u, v, weight=weight)
+    return graph
+
+
+def _expected_ppr(graph, seeds, damping: float = 0.85, walk_length: int = 10):
+    """워크 규칙(매 스텝 damping 확률로 가중치 비례 이동, dangling/길이 상한에서 종료)의 기대 방문 수 → PPR"""
+    nodes = sorted(graph.nodes())
+    mass = {node: float(node in seeds) for node in nodes}
+    visits = dict(mass)
+    for _ in range(walk_length):
+        step = dict.fromkeys(nodes, 0.0)
+        for u in nodes:
+            total = sum(data["weight"] for data in graph.succ[u].values())
+            for v, data in graph.succ[u].items():
+                step[v] += damping * mass[u] * data["weight"] / total
+        mass = step
+        for node in nodes:
+            visits[node] += mass[node]
+    return {node: (1 - damping) * visits[node] / len(seeds) for node in nodes}
+
+
+def _assert_consistent(index: RandomWalkIndex, graph: nx.DiGraph):
+    """증분 상태가 저장된 워크/현재 그래프로 처음부터 계산한 값과 같음"""
+    assert index.seeds["source"] == {
+        node for node in graph if graph.out_degree(node) > 0 and graph.in_degree(node) == 0
+    }
+    assert index.seeds["sdn"] == {a for a in SDN if a in graph}
+    assert index.seeds["mixer"] == {a for a in MIXER if a in graph}
+    assert set(index.walks) == set().union(*index.seeds.values())
+
+    through = {}
+    for kind in RandomWalkIndex.SEED_KINDS:
+        counts = Counter()
+        for seed in index.seeds[kind]:
+            for walk in index.walks[seed]:
+                counts.update(walk)
+        assert index.visits[kind] == counts, kind
+    for seed, walks in index.walks.items():
+        assert len(walks) == index.walks_per_seed
+        for walk_no, walk in enumerate(walks):
+            assert walk[0] == seed and len(walk) <= index.walk_length + 1
+            for u, v in zip(walk, walk[1:]):
+                assert graph.has_edge(u, v), (seed, walk)
+            for node in walk:
+                through.setdefault(node, set()).add((seed, walk_no))
+    assert {node: keys for node, keys in index._walks_through.items() if keys} == through
+
+
+def test_walks_independent_of_worker_count():
+    """워커 1개/여러 개로 만든 워크가 같음"""
+    graph = _graph(_edges(40, seed=1))
+    connector = PPRConnector()
+    single = connector.build_walk_index(graph, SDN, MIXER, walks_per_seed=20, num_workers=1)
+    pooled = connector.build_walk_index(graph, SDN, MIXER, walks_per_seed=20, num_workers=2)
+    assert single.walks == pooled.walks
+    assert single.visits == pooled.visits
+    _assert_consistent(single, graph)
+
+
+def test_add_edges_keeps_index_consistent():
+    """엣지를 묶음으로 추가할 때마다 시드/방문 횟수/워크가 현재 그래프와 일치 (나중에 들어온 SDN 포함)"""
+    edges = _edges(60, seed=2)
+    initial = [edge for edge in edges[:20] if SDN[1] not in edge[:2]]
+    index = RandomWalkIndex(walks_per_seed=15).build(_graph(initial), SDN, MIXER, num_workers=1)
+    assert SDN[1] not in index.seeds["sdn"]
+    _assert_consistent(index, _graph(initial))
+
+    added = list(initial)
+    for start in range(20, len(edges), 10):
+        batch = edges[start:start + 10]
+        index.add_edges(batch)
+        added += batch
+        _assert_consistent(index, _graph(added))
+    assert SDN[1] in index.seeds["sdn"]
+    assert index.add_edges([(NODES[1], NODES[1], 5.0), (NODES[1], NODES[2], 0.0)]) == 0
+
+
+def test_ppr_estimate_converges():
+    """방문 빈도 추정이 기대 방문 수로 계산한 PPR에 가까움 (증분으로 만든 인덱스 포함)"""
+    edges = _edges(50, seed=3)
+    graph = _graph(edges)
+    built = RandomWalkIndex(walks_per_seed=3000).build(graph, SDN, MIXER, num_workers=1)
+
+    incremental = RandomWalkIndex(walks_per_seed=3000).build(_graph(edges[:25]), SDN, MIXER, num_workers=1)
+    incremental.add_edges(edges[25:])
+
+    for index in (built, incremental):
+        for kind in ("sdn", "mixer", "source"):
+            expected = _expected_ppr(graph, index.seeds[kind])
+            estimate = np.array([index.ppr(node, kind) for node in sorted(graph)])
+            assert np.allclose(estimate, [expected[node] for node in sorted(graph)], atol=0.005), kind
+
+    scores = built.score_targets([NODES[4]])[NODES[4]]
+    assert scores["total_ppr"] == scores["ppr_score"] * 0.4 + scores["sdn_ppr"] * 0.4 + scores["mixer_ppr"] * 0.2
@@ -0,0 +1,159 @@
+"""
+제재 근접도 인덱스 테스트
+
+거래를 하나씩/묶음으로 넣고 보관 기간이 지난 거래를 만료시킬 때마다, 증분 갱신한 홉 거리와 PPR 노출도가
+남아 있는 거래로 처음부터 계산한 값(방향 무시 BFS, 레벨별 워크 질량)과 같은지 확인
+"""
+import random
+from collections import defaultdict, deque
+
+import numpy as np
+
+from core.aggregation.proximity_index import SanctionProximityIndex
+
+DAY = 86400
+NOW = 1_750_000_000
+SDN = [f"0xsdn{i}" for i in range(3)]
+MIXER = [f"0xmix{i}" for i in range(2)]
+
+
+class _Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _transactions(n: int, seed: int, span_days: int = 400):
+    """SDN/믹서가 섞인 작은 그래프의 거래 (시각은 NOW - span_days ~ NOW)"""
+    rng = random.Random(seed)
+    nodes = SDN + MIXER + [f"0x{i:040x}" for i in range(40)]
+    txs = []
+    for i in range(n):
+        from_addr, to_addr = rng.sample(nodes, 2)
+        txs.append({
+            "from": from_addr,
+            "to": to_addr,
+            "usd_value": rng.choice([10.0, 250.0, 4000.0, 90000.0]),
+            "timestamp": NOW - rng.randrange(span_days * DAY),
+            "tx_hash": f"0xtx{i}",
+        })
+    return txs
+
+
+def _scratch(txs, max_hops: int = 3, damping: float = 0.85):
+    """남은 거래로 처음부터 계산한 (홉 거리, 노출도) - kind별"""
+    succ = defaultdict(lambda: defaultdict(float))
+    pred = defaultdict(lambda: defaultdict(float))
+    for tx in txs:
+        succ[tx["from"]][tx["to"]] += tx["usd_value"]
+        pred[tx["to"]][tx["from"]] += tx["usd_value"]
+    nodes = set(succ) | set(pred)
+
+    hops, exposure = {}, {}
+    for kind, seeds in (("sdn", SDN), ("mixer", MIXER)):
+        dist = {seed: 0 for seed in seeds}
+        queue = deque(seeds)
+        while queue:
+            node = queue.popleft()
+            if dist[node] == max_hops:
+                continue
+            for neighbor in set(succ.get(node, {})) | set(pred.get(node, {})):
+                if neighbor not in dist:
+                    dist[neighbor] = dist[node] + 1
+                    queue.append(neighbor)
+        hops[kind] = dist
+
+        present = [seed for seed in seeds if seed in nodes]
+        mass = {node: [1.0 if node in present else 0.0] for node in nodes}
+        for k in range(1, max_hops + 1):
+            for node in nodes:
+                total = 0.0
+                for p, weight in pred.get(node, {}).items():
+                    total += mass[p][k - 1] * weight / sum(succ[p].values())
+                mass[node].append(damping * total)
+        exposure[kind] = {
+            node: (1 - damping) * sum(values) / len(present) if present else 0.0
+            for node, values in mass.items()
+        }
+    return hops, exposure
+
+
+def _assert_matches(index, txs):
+    hops, exposure = _scratch(txs)
+    nodes = {tx["from"] for tx in txs} | {tx["to"] for tx in txs}
+    for kind in ("sdn", "mixer"):
+        for node in nodes | set(SDN) | set(MIXER):
+            assert index.get_hop_distance(node, kind) == hops[kind].get(node), (kind, node)
+        for node in nodes:
+            assert np.isclose(index.get_exposure(node, kind), exposure[kind][node], rtol=1e-9, atol=1e-12), (kind, node)
+    assert index.number_of_nodes == len(nodes)
+
+
+def _index(clock=None, max_age_days=None):
+    return SanctionProximityIndex(
+        sdn_addresses=SDN, mixer_addresses=MIXER, max_age_days=max_age_days, clock=clock
+    )
+
+
+def test_incremental_inserts_match_scratch():
+    """한 건씩 넣을 때와 묶음으로 넣을 때 모두 처음부터 계산한 홉/PPR과 같음"""
+    txs = _transactions(300, seed=1)
+    single = _index()
+    for i, tx in enumerate(txs, start=1):
+        single.add_transaction(tx)
+        if i % 25 == 0:
+            _assert_matches(single, txs[:i])
+
+    batched = _index()
+    for start in range(0, len(txs), 60):
+        batched.add_transactions(txs[start:start + 60])
+        _assert_matches(batched, txs[:start + 60])
+
+
+def test_expiry_matches_scratch():
+    """시계가 흐르며 거래가 만료될 때마다 남은 거래로 계산한 홉/PPR과 같음"""
+    txs = sorted(_transactions(400, seed=2, span_days=800), key=lambda tx: tx["timestamp"])
+    clock = _Clock(NOW - 400 * DAY)
+    index = _index(clock, max_age_days=365)
+
+    def alive():
+        cutoff = int(clock.now) - 365 * DAY
+        return [tx for tx in txs if cutoff <= tx["timestamp"] <= clock.now]
+
+    added = 0
+    while clock.now < NOW:
+        clock.now += 20 * DAY
+        batch = [tx for tx in txs[added:] if tx["timestamp"] <= clock.now]
+        added += len(batch)
+        index.add_transactions(batch)
+        _assert_matches(index, alive())
+
+    # 새 거래 없이 만료만
+    for _ in range(5):
+        clock.now += 80 * DAY
+        index.expire_old_edges()
+        _assert_matches(index, alive())
+    assert index.number_of_nodes == 0
+    assert index.lookup(SDN[0])["total_ppr"] == 0.0
+
+
+def test_stale_transactions_not_indexed():
+    """보관 기간이 지난 거래는 넣어도 반영하지 않음 (시각이 없는 거래 포함, TransactionHistory와 같은 규칙)"""
+    clock = _Clock(NOW)
+    index = _index(clock, max_age_days=365)
+    target = "0x" + "ab" * 20
+    index.add_transaction({"from": SDN[0], "to": target, "usd_value": 100.0, "timestamp": NOW - 400 * DAY})
+    assert index.get_hop_distance(target) is None
+    index.add_transaction({"from": SDN[0], "to": target, "usd_value": 100.0})
+    assert target not in index
+
+    iso = "2025-06-15T12:00:00Z"
+    clock.now = 1_750_000_000  # 2025-06-15T15:06:40Z
+    index.add_transaction({"from": SDN[0], "to": target, "usd_value": 100.0, "timestamp": iso})
+    assert index.get_hop_distance(target) == 1
+    clock.now += 366 * DAY
+    assert index.expire_old_edges() == 1
+    assert index.get_hop_distance(target) is None
+    assert index.lookup(target)["total_ppr"] == 0.0
@@ -0,0 +1,108 @@
+"""
+슈퍼노드 정책 테스트
+
+슈퍼노드 판정(차수/서비스 주소), terminal/sample 모드의 확장 제한과 결정적 샘플링,
+restricted_view가 슈퍼노드의 제한된 엣지만 숨기는지, 경로 탐색/PPR/CSR 엣지 마스크가 같은 정책을 따르는지 확인
+"""
+import networkx as nx
+import numpy as np
+import pytest
+
+from core.aggregation.csr_graph import CSRGraph
+from core.aggregation.graph_features import GraphFeatureExtractor
+from core.aggregation.mpocryptml_patterns import MPOCryptoMLPatternDetector
+from core.aggregation.ppr_connector import PPRConnector
+from core.aggregation.supernode import SupernodePolicy
+from core.data.lists import KNOWN_SERVICE_ADDRESSES
+
+HUB = "0x" + "ee" * 20
+LEAVES = [f"0x{i:040x}" for i in range(40)]
+
+
+class _Lists:
+    """ListLoader 대체"""
+
+    def get_cex_list(self):
+        return {"0xcex"}
+
+    def get_bridge_list(self):
+        return {"0xbridge"}
+
+
+def _hub_graph():
+    """HUB가 40개 주소로 보내고, 앞 주소 하나가 HUB로 보내는 그래프 (leaf끼리 체인)"""
+    graph = nx.DiGraph()
+    graph.add_edge(LEAVES[0], HUB, weight=60.0)
+    for leaf in LEAVES:
+        graph.add_edge(HUB, leaf, weight=60.0)
+    for u, v in zip(LEAVES[1:], LEAVES[2:]):
+        graph.add_edge(u, v, weight=10.0)
+    return graph
+
+
+def test_supernode_detection():
+    """차수 기준을 넘거나 서비스 주소 리스트에 있으면 슈퍼노드"""
+    policy = SupernodePolicy.from_list_loader(_Lists(), degree_threshold=10)
+    assert policy.is_supernode("0xcex") and policy.is_supernode("0xbridge")
+    assert all(policy.is_supernode(address.lower()) for address in KNOWN_SERVICE_ADDRESSES)
+    assert policy.is_supernode(HUB, degree=11) and not policy.is_supernode(HUB, degree=10)
+    with pytest.raises(ValueError):
+        SupernodePolicy(mode="unknown")
+
+
+def test_limit_modes_and_deterministic_sample():
+    """terminal은 시작 노드만 샘플 확장, sample은 항상 bottom-k 샘플 (순서 유지, 이웃이 늘어도 안정적)"""
+    terminal = SupernodePolicy(degree_threshold=10, sample_size=5)
+    assert terminal.limit(HUB, LEAVES) == []
+    assert terminal.limit(HUB, LEAVES[:8]) == LEAVES[:8]
+    root = terminal.limit(HUB, LEAVES, is_root=True)
+    assert len(root) == 5 and root == [leaf for leaf in LEAVES if leaf in root]
+
+    sample = SupernodePolicy(degree_threshold=10, mode="sample", sample_size=5)
+    assert sample.limit(HUB, LEAVES) == root
+    assert sample.limit(HUB, list(reversed(LEAVES))) == list(reversed(root))
+    # 이웃이 추가되면 기존 샘플 일부가 새 이웃으로 바뀔 뿐 (bottom-k)
+    grown = sample.limit(HUB, LEAVES + [f"0x{i:040x}" for i in range(100, 140)])
+    assert set(grown) <= set(root) | {f"0x{i:040x}" for i in range(100, 140)}
+    assert sample.limit(HUB, LEAVES[:11], degree=5) == LEAVES[:11]
+
+
+@pytest.mark.parametrize("mode", ["terminal", "sample"])
+def test_restricted_view_and_edge_mask(mode):
+    """restricted_view는 슈퍼노드의 제한된 나가는 엣지만 숨기고, CSR 엣지 마스크와 PageRank도 같은 그래프 기준"""
+    graph = _hub_graph()
+    policy = SupernodePolicy(degree_threshold=10, mode=mode, sample_size=5)
+    view = policy.restricted_view(graph)
+    kept = set(policy.successors(graph, HUB))
+    assert set(view.successors(HUB)) == kept
+    assert view.number_of_edges() == graph.number_of_edges() - len(LEAVES) + len(kept)
+    assert graph.number_of_edges() == len(LEAVES) * 2 - 1
+
+    csr = CSRGraph.from_networkx(graph)
+    expandable = policy.expandable_mask(csr.nodes, csr.out_degree() + csr.in_degree())
+    mask = GraphFeatureExtractor(supernode_policy=policy)._policy_edge_mask(csr, expandable)
+    rows = np.repeat(np.arange(csr.number_of_nodes), np.diff(csr.indptr))
+    masked = {(csr.nodes[u], csr.nodes[v]) for u, v in zip(rows[mask], csr.indices[mask])}
+    assert masked == set(view.edges())
+
+    copy = nx.DiGraph(view)
+    personalization = {node: float(node == LEAVES[0]) for node in graph}
+    expected = nx.pagerank(copy, personalization=personalization)
+    actual = PPRConnector(supernode_policy=policy).calculate_ppr(LEAVES[5], [LEAVES[0]], graph)
+    assert actual == pytest.approx(expected[LEAVES[5]])
+
+
+def test_stack_search_does_not_expand_terminal_supernode():
+    """terminal 슈퍼노드는 경로 끝에만 올 수 있고, 시작 노드이면 샘플 이웃으로 확장"""
+    detector = MPOCryptoMLPatternDetector(supernode_policy=SupernodePolicy(degree_threshold=10, sample_size=5))
+    detector.graph = _hub_graph()
+    # LEAVES[0] → HUB → leaf → ... 는 허브를 거쳐야만 100을 넘음
+    assert detector.find_stack_path(LEAVES[0]) == (None, False)
+
+    unrestricted = MPOCryptoMLPatternDetector()
+    unrestricted.graph = detector.graph
+    found, _ = unrestricted.find_stack_path(LEAVES[0])
+    assert found["path"][1] == HUB
+
+    found, _ = detector.find_stack_path(HUB)
+    assert found is not None and found["path"][1] in detector.supernode_policy.limit(HUB, LEAVES, is_root=True)
@@ -0,0 +1,131 @@
+"""
+B-201 레이어링 체인 / B-202 순환 탐색 테스트
+
+레이어링 체인 DP가 단순 경로 전수 탐색과 같은 발동 여부와 유효한 체인을 내는지, 확장 상한에서 partial을
+보고하는지, 배치 모드(find_short_cycle_nodes)가 주소별 evaluate_cycle과 같은 노드/길이를 찾는지,
+슈퍼노드 정책이 2-순환과 3-순환의 닫는 엣지에 똑같이 적용되는지 확인
+"""
+import random
+
+import pytest
+
+from core.aggregation.mpocryptml_patterns import MPOCryptoMLPatternDetector
+from core.aggregation.supernode import SupernodePolicy
+from core.aggregation.topology import TopologyEvaluator
+
+HUB = "0x" + "ff" * 20
+X, Y = "0x" + "01" * 20, "0x" + "02" * 20
+
+
+def _tx(from_addr, to_addr, usd_value=80.0, token="0xeth"):
+    return {"from": from_addr, "to": to_addr, "usd_value": usd_value, "asset_contract": token}
+
+
+def _transactions(n: int, seed: int):
+    """주소 12개, 토큰 2개로 된 작은 그래프 (2/3-순환이 여럿 생김)"""
+    rng = random.Random(seed)
+    nodes = [f"0x{i:040x}" for i in range(12)]
+    return [
+        _tx(*rng.sample(nodes, 2), usd_value=rng.choice([10.0, 30.0, 60.0]), token=rng.choice(["0xeth", "0xusdt"]))
+        for _ in range(n)
+    ]
+
+
+def _chain_exists(graph, start, min_hops, max_delta_pct, min_usd):
+    """단순 경로 전수 탐색: 시작 주소에서 min_hops 홉, 모든 홉이 min_usd 이상이고 첫 홉 금액 대비 차이 이내"""
+    def extend(node, path, base, remaining):
+        if remaining == 0:
+            return True
+        for successor, data in graph.succ[node].items():
+            weight = data["weight"]
+            if successor in path or weight < min_usd:
+                continue
+            if base is not None and abs(weight - base) / base * 100 > max_delta_pct:
+                continue
+            if extend(successor, path | {successor}, weight if base is None else base, remaining - 1):
+                return True
+        return False
+
+    return start in graph and extend(start, {start}, None, min_hops)
+
+
+def _assert_valid_chain(graph, chain, min_hops, max_delta_pct, min_usd):
+    assert len(chain) == min_hops + 1 and len(set(chain)) == len(chain)
+    weights = [graph[u][v]["weight"] for u, v in zip(chain, chain[1:])]
+    assert min(weights) >= min_usd
+    assert all(abs(w - weights[0]) / weights[0] * 100 <= max_delta_pct for w in weights)
+
+
+@pytest.mark.parametrize("min_hops", [2, 3, 4])
+@pytest.mark.parametrize("seed", range(3))
+def test_layering_chain_matches_simple_path_search(min_hops, seed):
+    """모든 시작 주소에서 발동 여부 = 단순 경로 전수 탐색, 찾은 체인은 조건을 만족"""
+    rng = random.Random(seed)
+    nodes = [f"0x{i:040x}" for i in range(14)]
+    txs = [
+        _tx(*rng.sample(nodes, 2), usd_value=rng.choice([50.0, 100.0, 103.0, 106.0, 140.0]))
+        for _ in range(45)
+    ]
+    detector = MPOCryptoMLPatternDetector()
+    detector.build_from_transactions(txs)
+    graph = detector.graph
+    spec = {"hop_length_gte": min_hops, "hop_amount_delta_pct_lte": 5, "min_usd_value": 100}
+
+    evaluator = TopologyEvaluator()
+    found = 0
+    for node in graph:
+        result = evaluator.find_layering_chain(node, txs, spec)
+        assert not result["partial"]
+        assert result["found"] == _chain_exists(graph, node, min_hops, 5, 100), node
+        if result["found"]:
+            found += 1
+            assert result["chain"][0] == node
+            _assert_valid_chain(graph, result["chain"], min_hops, 5, 100)
+    assert 0 < found < graph.number_of_nodes()
+
+
+def test_layering_chain_budget_reports_partial():
+    """확장 상한에 걸리면 미발동 + partial, 상한을 늘리면 발동"""
+    chain = [f"0x{i:040x}" for i in range(6)]
+    txs = [_tx(u, v, usd_value=1000.0) for u, v in zip(chain, chain[1:])]
+    spec = {"hop_length_gte": 5, "hop_amount_delta_pct_lte": 5, "min_usd_value": 100}
+    evaluator = TopologyEvaluator(max_expansions=2)
+
+    result = evaluator.find_layering_chain(chain[0], txs, spec)
+    assert (result["found"], result["partial"]) == (False, True)
+    assert result["expanded_nodes"] == 2
+    assert evaluator.evaluate_layering_chain(chain[0], txs, spec) == (False, True)
+
+    result = evaluator.find_layering_chain(chain[0], txs, {**spec, "max_expansions": 100})
+    assert (result["found"], result["partial"], result["chain"]) == (True, False, chain)
+
+
+@pytest.mark.parametrize("same_token", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_matches_per_address(same_token, seed):
+    """노드별 순환 길이 = 그 노드를 대상으로 evaluate_cycle을 길이별로 돌린 결과"""
+    txs = _transactions(40, seed)
+    spec = {"same_token": same_token, "cycle_length_in": [2, 3], "cycle_total_usd_gte": 100}
+    cycle_nodes = TopologyEvaluator().find_short_cycle_nodes(txs, spec)
+    assert cycle_nodes
+
+    nodes = {tx["from"] for tx in txs} | {tx["to"] for tx in txs}
+    for node in nodes:
+        for length in (2, 3):
+            expected = TopologyEvaluator().evaluate_cycle(node, txs, {**spec, "cycle_length_in": [length]})
+            assert (length in cycle_nodes.get(node, {}).get("cycle_lengths", [])) == expected, (node, length)
+
+
+def test_supernode_closing_edge_excluded():
+    """terminal 슈퍼노드를 거쳐 닫히는 2/3-순환은 배치 모드에서도 찾지 않음 (정책이 없으면 찾음)"""
+    leaves = [f"0x{i + 100:040x}" for i in range(10)]
+    txs = [_tx(X, HUB), _tx(HUB, X), _tx(Y, X), _tx(HUB, Y)]
+    txs += [_tx(HUB, leaf, usd_value=1.0) for leaf in leaves]
+    spec = {"cycle_length_in": [2, 3], "cycle_total_usd_gte": 100}
+
+    unrestricted = TopologyEvaluator().find_short_cycle_nodes(txs, spec)
+    assert unrestricted[X]["cycle_lengths"] == [2, 3]
+    assert unrestricted[HUB]["cycle_lengths"] == [2, 3]
+
+    policy = SupernodePolicy(degree_threshold=8)
+    assert TopologyEvaluator(supernode_policy=policy).find_short_cycle_nodes(txs, spec) == {}
@@ -9,6 +9,8 @@ from collections import defaultdict
 import networkx as nx
 
 from .mpocryptml_patterns import MPOCryptoMLPatternDetector
+from .supernode import SupernodePolicy
+from .temporal_paths import TemporalPathIndex
 
 
 class TopologyEvaluator:
@@ -18,18 +20,51 @@ class TopologyEvaluator:
     B-201 (Layering Chain), B-202 (Cycle) 룰 평가
     """
     
-    def __init__(self):
-        self.pattern_detector = MPOCryptoMLPatternDetector()
+    def __init__(
+        self,
+        max_expansions: int = 20000,
+        supernode_policy: Optional[SupernodePolicy] = None
+    ):
+        """
+        Args:
+            max_expansions: 레이어링 체인 탐색 1회당 노드 확장 상한 (초과 시 partial 결과 반환)
+            supernode_policy: 슈퍼노드 정책 (허브 확장 제한, None이면 제한 없음)
+        """
+        self.pattern_detector = MPOCryptoMLPatternDetector(supernode_policy=supernode_policy)
+        self.supernode_policy = supernode_policy
+        self.max_expansions = max_expansions
     
     def evaluate_layering_chain(
         self,
         target_address: str,
         transactions: List[Dict[str, Any]],
         rule_spec: Dict[str, Any]
-    ) -> bool:
+    ) -> Tuple[bool, bool]:
         """
         B-201: Layering Chain 룰 평가
         
+        find_layering_chain()의 발동 여부와 partial 여부만 반환 (상세 결과는 find_layering_chain)
+        
+        Args:
+            target_address: 분석 대상 주소
+            transactions: 거래 히스토리 (3홉까지 포함 가능)
+            rule_spec: 룰 설정
+        
+        Returns:
+            (룰 발동 여부, 확장 상한에 걸려 탐색이 중단되었는지 여부)
+        """
+        result = self.find_layering_chain(target_address, transactions, rule_spec)
+        return result["found"], result["partial"]
+    
+    def find_layering_chain(
+        self,
+        target_address: str,
+        transactions: List[Dict[str, Any]],
+        rule_spec: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        B-201: Layering Chain 탐색
+        
         조건:
         - same_token: true (동일 토큰)
         - hop_length_gte: 3 (3홉 이상)
@@ -39,15 +74,41 @@ class TopologyEvaluator:
         Args:
             target_address: 분석 대상 주소
             transactions: 거래 히스토리 (3홉까지 포함 가능)
-            rule_spec: 룰 설정
+            rule_spec: 룰 설정 (max_expansions로 확장 상한 재정의 가능,
+                       temporal: true면 max_hop_delay_sec 이내 시간 순서 경로만 인정)
         
         Returns:
-            룰 발동 여부
+            {
+                "found": 체인 발견 여부,
+                "partial": 확장 상한에 걸려 탐색이 중단되었는지 여부,
+                "expanded_nodes": 확장한 노드 수,
+                "chain": 발견된 체인 주소 리스트 (없으면 [])
+            }
         """
         same_token = rule_spec.get("same_token", False)
         hop_length_gte = rule_spec.get("hop_length_gte", 3)
         hop_amount_delta_pct_lte = rule_spec.get("hop_amount_delta_pct_lte", 5)
         min_usd_value = rule_spec.get("min_usd_value", 100)
+        max_expansions = rule_spec.get("max_expansions", self.max_expansions)
+        
+        result = {"found": False, "partial": False, "expanded_nodes": 0, "chain": []}
+        
+        # 시간 순서 경로 탐색 (타임스탬프가 있는 거래가 없으면 집계 그래프로 폴백)
+        if rule_spec.get("temporal", False):
+            temporal_index = TemporalPathIndex(
+                max_delay_sec=rule_spec.get("max_hop_delay_sec", 86400),
+                supernode_policy=self.supernode_policy
+            ).build_from_transactions(transactions)
+            if temporal_index.number_of_transactions:
+                result = temporal_index.find_layering_chain(
+                    target_address,
+                    min_hops=hop_length_gte,
+                    max_amount_delta_pct=hop_amount_delta_pct_lte,
+                    min_usd_value=min_usd_value,
+                    same_token=same_token,
+                    max_expansions=max_expansions
+                )
+                return result
         
         # 그래프 구축
         self.pattern_detector._build_graph()
@@ -55,35 +116,36 @@ class TopologyEvaluator:
             self.pattern_detector.add_transaction(tx)
         
         if not self.pattern_detector.graph:
-            return False
+            return result
         
         target_address = target_address.lower()
         
         # 토큰별로 그래프 분리 (same_token이 true인 경우)
         if same_token:
             # asset_contract별로 그래프 분리
-            token_graphs = self._build_token_graphs(transactions)
-            for token, graph in token_graphs.items():
-                if self._find_layering_chain_in_graph(
-                    target_address,
-                    graph,
-                    hop_length_gte,
-                    hop_amount_delta_pct_lte,
-                    min_usd_value
-                ):
-                    return True
+            graphs = list(self._build_token_graphs(transactions).values())
         else:
             # 토큰 구분 없이 전체 그래프에서 탐색
-            if self._find_layering_chain_in_graph(
+            graphs = [self.pattern_detector.graph]
+        
+        # 확장 상한은 토큰 그래프 전체에 걸쳐 공유
+        for graph in graphs:
+            search = self._search_layering_chain(
                 target_address,
-                self.pattern_detector.graph,
+                graph,
                 hop_length_gte,
                 hop_amount_delta_pct_lte,
-                min_usd_value
-            ):
-                return True
-        
-        return False
+                min_usd_value,
+                max_expansions - result["expanded_nodes"]
+            )
+            result["expanded_nodes"] += search["expanded_nodes"]
+            result["partial"] = result["partial"] or search["partial"]
+            if search["found"]:
+                result["found"] = True
+                result["chain"] = search["chain"]
+                break
+        
+        return result
     
     def evaluate_cycle(
         self,
@@ -111,31 +173,12 @@ class TopologyEvaluator:
         cycle_length_in = rule_spec.get("cycle_length_in", [2, 3])
         cycle_total_usd_gte = rule_spec.get("cycle_total_usd_gte", 100)
         
-        # 그래프 구축
-        self.pattern_detector._build_graph()
-        for tx in transactions:
-            self.pattern_detector.add_transaction(tx)
-        
-        if not self.pattern_detector.graph:
-            return False
-        
         target_address = target_address.lower()
         
-        # 토큰별로 그래프 분리
-        if same_token:
-            token_graphs = self._build_token_graphs(transactions)
-            for token, graph in token_graphs.items():
-                if self._find_cycle_in_graph(
-                    target_address,
-                    graph,
-                    cycle_length_in,
-                    cycle_total_usd_gte
-                ):
-                    return True
-        else:
+        for graph in self._build_cycle_graphs(transactions, same_token):
             if self._find_cycle_in_graph(
                 target_address,
-                self.pattern_detector.graph,
+                graph,
                 cycle_length_in,
                 cycle_total_usd_gte
             ):
@@ -143,6 +186,111 @@ class TopologyEvaluator:
         
         return False
     
+    def find_short_cycle_nodes(
+        self,
+        transactions: List[Dict[str, Any]],
+        rule_spec: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        B-202 배치 모드: 조건을 만족하는 2/3-홉 순환 위에 있는 모든 노드 찾기
+        
+        2-순환은 엣지 u→v 중 v→u가 있는 것, 3-순환은 엣지 u→v마다
+        succ(v) ∩ pred(u)로 닫히는 w를 찾음 (그래프 전체 1회 순회).
+        닫는 엣지는 두 경우 모두 슈퍼노드 정책을 적용한 succ(v)/pred(u)에서 찾음
+        
+        Args:
+            transactions: 거래 리스트
+            rule_spec: 룰 설정 (B-202 topology)
+        
+        Returns:
+            {address: {"cycle_lengths": [2, 3], "max_total_usd": float}}
+        """
+        same_token = rule_spec.get("same_token", False)
+        cycle_lengths = set(rule_spec.get("cycle_length_in", [2, 3]))
+        min_total_usd = rule_spec.get("cycle_total_usd_gte", 100)
+        
+        cycle_nodes: Dict[str, Dict[str, Any]] = {}
+        
+        def mark(nodes: Tuple[str, ...], total_usd: float):
+            for node in nodes:
+                info = cycle_nodes.setdefault(node, {"cycle_lengths": [], "max_total_usd": 0.0})
+                if len(nodes) not in info["cycle_lengths"]:
+                    info["cycle_lengths"].append(len(nodes))
+                    info["cycle_lengths"].sort()
+                info["max_total_usd"] = max(info["max_total_usd"], total_usd)
+        
+        for graph in self._build_cycle_graphs(transactions, same_token):
+            for u, v, data in graph.edges(data=True):
+                # u < v로 한 번만 처리 (자기 루프 제외)
+                if u >= v:
+                    continue
+                w_uv = data.get("weight", 0)
+                # 닫는 엣지는 v의 후속 노드 / u의 선행 노드 (슈퍼노드 정책 적용)
+                succ_v = self._succ_map(graph, v)
+                pred_u = self._pred_map(graph, u)
+                
+                # 2-순환: u→v→u
+                if 2 in cycle_lengths and u in succ_v and v in pred_u:
+                    total_usd = w_uv + succ_v[u].get("weight", 0)
+                    if total_usd >= min_total_usd:
+                        mark((u, v), total_usd)
+                
+                # 3-순환: u→v→w→u (u가 사전순 최소인 회전만 처리)
+                if 3 in cycle_lengths:
+                    for w in self._intersect(succ_v, pred_u):
+                        if w <= u or w == v:
+                            continue
+                        total_usd = w_uv + succ_v[w].get("weight", 0) + pred_u[w].get("weight", 0)
+                        if total_usd >= min_total_usd:
+                            mark((u, v, w), total_usd)
+        
+        return cycle_nodes
+    
+    def _build_cycle_graphs(
+        self,
+        transactions: List[Dict[str, Any]],
+        same_token: bool
+    ) -> List[nx.DiGraph]:
+        """
+        순환 탐색 대상 그래프 목록
+        
+        same_token이면 토큰별 그래프 (거래 1회 순회로 전체 토큰 구축),
+        아니면 토큰 구분 없는 전체 그래프
+        """
+        if same_token:
+            return list(self._build_token_graphs(transactions).values())
+        
+        self.pattern_detector._build_graph()
+        for tx in transactions:
+            self.pattern_detector.add_transaction(tx)
+        
+        if not self.pattern_detector.graph:
+            return []
+        return [self.pattern_detector.graph]
+    
+    def _succ_map(self, graph: nx.DiGraph, node: str, is_root: bool = False):
+        """후속 노드 {successor: edge_data} (슈퍼노드 정책 적용)"""
+        succ = graph.succ[node]
+        policy = self.supernode_policy
+        if policy is None or not policy.is_supernode(node, graph.degree(node)):
+            return succ
+        return {successor: succ[successor] for successor in policy.successors(graph, node, is_root)}
+    
+    def _pred_map(self, graph: nx.DiGraph, node: str, is_root: bool = False):
+        """선행 노드 {predecessor: edge_data} (슈퍼노드 정책 적용)"""
+        pred = graph.pred[node]
+        policy = self.supernode_policy
+        if policy is None or not policy.is_supernode(node, graph.degree(node)):
+            return pred
+        return {predecessor: pred[predecessor] for predecessor in policy.predecessors(graph, node, is_root)}
+    
+    @staticmethod
+    def _intersect(a, b) -> Set[str]:
+        """인접 딕셔너리 키 교집합 (작은 쪽을 순회)"""
+        if len(a) > len(b):
+            a, b = b, a
+        return {node for node in a if node in b}
+    
     def _build_token_graphs(
         self,
         transactions: List[Dict[str, Any]]
@@ -199,41 +347,125 @@ class TopologyEvaluator:
         Returns:
             레이어링 체인 발견 여부
         """
+        return self._search_layering_chain(
+            start_address,
+            graph,
+            min_hops,
+            max_amount_delta_pct,
+            min_usd_value,
+            self.max_expansions
+        )["found"]
+    
+    def _search_layering_chain(
+        self,
+        start_address: str,
+        graph: nx.DiGraph,
+        min_hops: int,
+        max_amount_delta_pct: float,
+        min_usd_value: float,
+        max_expansions: int
+    ) -> Dict[str, Any]:
+        """
+        깊이 제한 DP로 레이어링 체인 탐색
+        
+        - 깊이는 min_hops로 제한 (더 긴 체인도 앞 min_hops 홉이 조건을 만족하므로 충분)
+        - 금액 조건은 첫 홉 금액 기준으로 매 홉마다 검사해 즉시 가지치기
+        - 같은 첫 홉 금액을 공유하는 탐색끼리 (node, 남은 홉 수) 실패 상태를 메모:
+          남은 홉 r에서 실패한 노드는 r 이상에서도 실패 (지배된 상태)
+          단, 현재 경로 노드에 막혀 실패한 경우는 경로 의존적이므로 메모하지 않음
+        - 노드 확장이 max_expansions를 넘으면 중단하고 partial=True 반환
+        
+        Args:
+            start_address: 시작 주소
+            graph: 그래프
+            min_hops: 최소 홉 수
+            max_amount_delta_pct: 최대 금액 차이 (%)
+            min_usd_value: 최소 거래액
+            max_expansions: 노드 확장 상한
+        
+        Returns:
+            {"found", "partial", "expanded_nodes", "chain"}
+        """
+        result = {"found": False, "partial": False, "expanded_nodes": 0, "chain": []}
+        
         if start_address not in graph:
-            return False
+            return result
+        
+        if min_hops <= 0:
+            result["found"] = True
+            result["chain"] = [start_address]
+            return result
+        
+        # 첫 홉을 금액별로 묶음 (같은 기준 금액이면 허용 엣지 집합이 같음)
+        first_hops: Dict[float, List[str]] = defaultdict(list)
+        for successor, data in self._succ_map(graph, start_address, is_root=True).items():
+            edge_weight = data.get("weight", 0)
+            if successor == start_address or edge_weight < min_usd_value:
+                continue
+            first_hops[edge_weight].append(successor)
         
-        # DFS로 경로 탐색
-        def dfs(current: str, path: List[str], path_weights: List[float], visited: Set[str]):
-            if len(path) >= min_hops + 1:  # min_hops 홉 = min_hops+1 노드
-                # 금액 차이 체크
-                if self._check_amount_delta(path_weights, max_amount_delta_pct):
-                    return True
+        state = {"expanded": 0, "truncated": False}
+        
+        for base_amount, successors in first_hops.items():
+            if base_amount == 0 and min_hops > 1:
+                continue  # 기준 금액 0이면 차이 비율 계산 불가
             
-            if len(path) >= 10:  # 너무 긴 경로 방지
-                return False
+            # {node: 실패가 확인된 최소 남은 홉 수}
+            failed: Dict[str, int] = {}
+            path: Set[str] = set()
             
-            for successor in graph.successors(current):
-                if successor in visited:
-                    continue
+            def extend(current: str, remaining: int) -> Tuple[Optional[List[str]], bool]:
+                """(체인 꼬리, 경로 노드에 막힌 적 있는지) 반환"""
+                if remaining == 0:
+                    return [current], False
+                if failed.get(current, remaining + 1) <= remaining:
+                    return None, False
+                if state["expanded"] >= max_expansions:
+                    state["truncated"] = True
+                    return None, True
+                state["expanded"] += 1
                 
-                edge_weight = graph[current][successor].get("weight", 0)
-                if edge_weight < min_usd_value:
-                    continue
-                
-                visited.add(successor)
-                path.append(successor)
-                path_weights.append(edge_weight)
+                blocked = False
+                path.add(current)
+                try:
+                    for successor, data in self._succ_map(graph, current).items():
+                        if successor == start_address:
+                            continue  # 시작 주소는 항상 제외 (경로와 무관)
+                        if successor in path:
+                            blocked = True
+                            continue
+                        edge_weight = data.get("weight", 0)
+                        if edge_weight < min_usd_value:
+                            continue
+                        if abs(edge_weight - base_amount) / base_amount * 100 > max_amount_delta_pct:
+                            continue
+                        
+                        tail, tail_blocked = extend(successor, remaining - 1)
+                        if tail is not None:
+                            return [current] + tail, False
+                        blocked = blocked or tail_blocked
+                finally:
+                    path.discard(current)
                 
-                if dfs(successor, path, path_weights, visited):
-                    return True
-                
-                path.pop()
-                path_weights.pop()
-                visited.remove(successor)
+                if not blocked:
+                    failed[current] = min(failed.get(current, remaining), remaining)
+                return None, blocked
             
-            return False
+            for successor in successors:
+                tail, _ = extend(successor, min_hops - 1)
+                if tail is not None:
+                    result["found"] = True
+                    result["chain"] = [start_address] + tail
+                    break
+                if state["truncated"]:
+                    break
+            
+            if result["found"] or state["truncated"]:
+                break
         
-        return dfs(start_address, [start_address], [], {start_address})
+        result["expanded_nodes"] = state["expanded"]
+        result["partial"] = state["truncated"] and not result["found"]
+        return result
     
     def _find_cycle_in_graph(
         self,
@@ -257,10 +489,9 @@ class TopologyEvaluator:
         if target_address not in graph:
             return False
         
-        # NetworkX의 simple_cycles 사용 (작은 그래프에만 적합)
         try:
             # target_address를 포함하는 순환만 찾기
-            # 간단한 방법: DFS로 순환 탐지
+            # 2/3-홉은 인접 집합 교집합, 그 외 길이는 DFS로 탐지
             for cycle_length in cycle_lengths:
                 if self._find_cycle_of_length(target_address, graph, cycle_length, min_total_usd):
                     return True
@@ -279,6 +510,65 @@ class TopologyEvaluator:
         """
         특정 길이의 순환 찾기
         
+        2/3-홉 순환은 인접 집합 교집합으로 직접 계산:
+        - 2-순환: succ(v) ∩ pred(v)
+        - 3-순환: u ∈ succ(v), w ∈ succ(u) ∩ pred(v) 인 엣지 u→w
+        그 외 길이는 DFS로 탐색
+        
+        Args:
+            start_address: 시작 주소
+            graph: 그래프
+            cycle_length: 순환 길이 (홉 수)
+            min_total_usd: 최소 총액
+        
+        Returns:
+            순환 발견 여부
+        """
+        if start_address not in graph:
+            return False
+        
+        v = start_address
+        succ_v = self._succ_map(graph, v, is_root=True)
+        pred_v = self._pred_map(graph, v, is_root=True)
+        
+        if cycle_length == 2:
+            for u in self._intersect(succ_v, pred_v):
+                if u == v:
+                    continue
+                total_usd = succ_v[u].get("weight", 0) + pred_v[u].get("weight", 0)
+                if total_usd >= min_total_usd:
+                    return True
+            return False
+        
+        if cycle_length == 3:
+            for u, out_data in succ_v.items():
+                if u == v:
+                    continue
+                succ_u = self._succ_map(graph, u)
+                for w in self._intersect(succ_u, pred_v):
+                    if w == v or w == u:
+                        continue
+                    total_usd = (
+                        out_data.get("weight", 0)
+                        + succ_u[w].get("weight", 0)
+                        + pred_v[w].get("weight", 0)
+                    )
+                    if total_usd >= min_total_usd:
+                        return True
+            return False
+        
+        return self._find_cycle_of_length_dfs(start_address, graph, cycle_length, min_total_usd)
+    
+    def _find_cycle_of_length_dfs(
+        self,
+        start_address: str,
+        graph: nx.DiGraph,
+        cycle_length: int,
+        min_total_usd: float
+    ) -> bool:
+        """
+        특정 길이의 순환 찾기 (DFS, 4홉 이상)
+        
         Args:
             start_address: 시작 주소
             graph: 그래프
@@ -300,7 +590,7 @@ class TopologyEvaluator:
             if len(path) > cycle_length + 1:
                 return False
             
-            for successor in graph.successors(current):
+            for successor in self._succ_map(graph, current, is_root=current == start_address):
                 # 마지막 홉이면 시작 주소로 가야 함
                 if len(path) == cycle_length:
                     if successor != start_address:
@@ -310,7 +600,9 @@ class TopologyEvaluator:
                 
                 edge_weight = graph[current][successor].get("weight", 0)
                 
-                visited.add(successor)
+                closing = successor == start_address  # 시작 주소는 항상 visited에 유지
+                if not closing:
+                    visited.add(successor)
                 path.append(successor)
                 path_weights.append(edge_weight)
                 
@@ -319,7 +611,8 @@ class TopologyEvaluator:
                 
                 path.pop()
                 path_weights.pop()
-                visited.remove(successor)
+                if not closing:
+                    visited.remove(successor)
             
             return False
         
@@ -28,6 +28,10 @@ class TransactionHistory:
         self._history[address].append(tx_data)
         self._cleanup_old_transactions(address)
     
+    def clear(self) -> None:
+        """전체 히스토리 삭제"""
+        self._history.clear()
+    
     def get_window_transactions(
         self,
         address: str,
@@ -2,7 +2,7 @@
 데이터 로더 모듈
 """
 
-from .lists import ListLoader
+from .lists import ListLoader, KNOWN_SERVICE_ADDRESSES
 
-__all__ = ["ListLoader"]
+__all__ = ["ListLoader", "KNOWN_SERVICE_ADDRESSES"]
 
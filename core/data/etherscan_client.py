@@ -361,7 +361,8 @@ class RealDataCollector:
     def collect_address_transactions(
         self,
         address: str,
-        max_transactions: Optional[int] = None
+        max_transactions: Optional[int] = None,
+        raise_errors: bool = False
     ) -> List[Dict[str, Any]]:
         """
         주소의 모든 거래 내역 수집
@@ -369,9 +370,13 @@ class RealDataCollector:
         Args:
             address: 주소
             max_transactions: 최대 거래 수 (None이면 모두 수집)
+            raise_errors: API/네트워크 에러를 그대로 던짐 (False면 출력 후 그때까지 수집한 거래 반환)
         
         Returns:
             표준화된 거래 리스트
+        
+        Raises:
+            Exception: raise_errors=True이고 API 요청이 실패한 경우
         """
         all_transactions = []
         page = 1
@@ -413,6 +418,8 @@ class RealDataCollector:
                 time.sleep(0.2)
                 
             except Exception as e:
+                if raise_errors:
+                    raise
                 print(f"Error collecting transactions: {e}")
                 break
         
@@ -10,6 +10,14 @@ from typing import Dict, Set, Optional
 import json
 
 
+# 알려진 서비스 주소 (DEX 라우터, CEX 핫월렛) - 엔티티 표시 및 슈퍼노드 판정용
+KNOWN_SERVICE_ADDRESSES: Dict[str, Dict[str, str]] = {
+    "0x7a250d5630b4cf539739df2c5dacb4c659f2488d": {"name": "Uniswap", "type": "DEX", "icon": "🦄"},
+    "0xe592427a0aece92de3edee1f18e0157c05861564": {"name": "Uniswap V3", "type": "DEX", "icon": "🦄"},
+    "0x3f5ce5fbfe3e9af3971dd833d26ba9b5c936f0be": {"name": "Binance", "type": "Exchange", "icon": "🏦"},
+}
+
+
 class ListLoader:
     """리스트 로더"""
     
@@ -4,6 +4,7 @@
 
 from .evaluator import RuleEvaluator
 from .loader import RuleLoader
+from .metadata import RuleMeta, RuleMetadataTable
 
-__all__ = ["RuleEvaluator", "RuleLoader"]
+__all__ = ["RuleEvaluator", "RuleLoader", "RuleMeta", "RuleMetadataTable"]
 
@@ -5,8 +5,9 @@ TRACE-X 룰북 기반 룰 평가
 """
 from __future__ import annotations
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from core.rules.loader import RuleLoader
+from core.rules.metadata import RuleMetadataTable
 from core.data.lists import ListLoader
 from core.aggregation.window import WindowEvaluator
 from core.aggregation.bucket import BucketEvaluator
@@ -14,27 +15,46 @@ from core.aggregation.ppr_connector import PPRConnector
 from core.aggregation.mpocryptml_patterns import MPOCryptoMLPatternDetector
 from core.aggregation.stats import StatisticsCalculator
 from core.aggregation.topology import TopologyEvaluator
+from core.aggregation.proximity_index import SanctionProximityIndex
+from core.aggregation.supernode import SupernodePolicy
 
 
 class RuleEvaluator:
     """룰 평가기"""
     
-    def __init__(self, rules_path: str = "rules/tracex_rules.yaml", window_evaluator: Optional[WindowEvaluator] = None, bucket_evaluator: Optional[BucketEvaluator] = None):
+    def __init__(self, rules_path: str = "rules/tracex_rules.yaml", window_evaluator: Optional[WindowEvaluator] = None, bucket_evaluator: Optional[BucketEvaluator] = None, proximity_index: Optional[SanctionProximityIndex] = None):
         """
         Args:
             rules_path: 룰북 YAML 파일 경로
             window_evaluator: 윈도우 평가기 (None이면 새로 생성)
             bucket_evaluator: 버킷 평가기 (None이면 새로 생성)
+            proximity_index: 제재 근접도 인덱스 (있으면 E-102를 O(1) 조회로 평가)
         """
         self.rule_loader = RuleLoader(rules_path)
         self.list_loader = ListLoader()
         self.ruleset = self.rule_loader.load()
+        # 룰별 태그/설명/가중치 메타데이터 (룰북 로드 시 한 번 계산)
+        self.rule_metadata = RuleMetadataTable.from_rules(self.rule_loader.get_rules())
         self.window_evaluator = window_evaluator or WindowEvaluator()
         self.bucket_evaluator = bucket_evaluator or BucketEvaluator()
-        self.ppr_connector = PPRConnector()
+        # CEX/브릿지/알려진 서비스 주소 및 고차수 노드는 그래프 탐색에서 확장하지 않음
+        self.supernode_policy = SupernodePolicy.from_list_loader(self.list_loader)
+        self.ppr_connector = PPRConnector(supernode_policy=self.supernode_policy)
         self.pattern_detector = None  # 필요 시 생성
         self.stats_calculator = StatisticsCalculator()
-        self.topology_evaluator = TopologyEvaluator()
+        self.topology_evaluator = TopologyEvaluator(supernode_policy=self.supernode_policy)
+        self.proximity_index = proximity_index
+    
+    def reset_history(self) -> None:
+        """
+        누적된 거래 상태 초기화 (윈도우/버킷 히스토리, 제재 근접도 인덱스)
+        
+        이후 평가 결과가 앞서 평가한 다른 주소의 거래에 의존하지 않게 할 때 사용
+        """
+        self.window_evaluator.history.clear()
+        self.bucket_evaluator.clear()
+        if self.proximity_index is not None:
+            self.proximity_index.clear()
     
     def evaluate_single_transaction(
         self,
@@ -126,28 +146,31 @@ class RuleEvaluator:
             if rule_id == "B-201":
                 if not include_topology:
                     continue  # 기본 스코어링에서는 제외
-                if self._evaluate_topology_rule(tx_data, rule, "layering_chain"):
+                hit, partial = self._evaluate_topology_rule(tx_data, rule, "layering_chain")
+                if hit:
                     # 조건 확인
                     if not self._check_conditions(tx_data, rule, lists):
                         continue
                     # 예외 확인
                     if self._check_exceptions(tx_data, rule, lists):
                         continue
-                    # 룰 발동
+                    # 룰 발동 (partial: 탐색 확장 상한에 걸려 일부 그래프만 탐색했음)
                     score = rule.get("score", 25)
                     fired_rules.append({
                         "rule_id": rule_id,
                         "score": float(score),
                         "axis": rule.get("axis", "B"),
                         "name": rule.get("name", rule_id),
-                        "severity": rule.get("severity", "HIGH")
+                        "severity": rule.get("severity", "HIGH"),
+                        "partial": partial
                     })
                 continue
             
             if rule_id == "B-202":
                 if not include_topology:
                     continue  # 기본 스코어링에서는 제외
-                if self._evaluate_topology_rule(tx_data, rule, "cycle"):
+                hit, _ = self._evaluate_topology_rule(tx_data, rule, "cycle")
+                if hit:
                     # 조건 확인
                     if not self._check_conditions(tx_data, rule, lists):
                         continue
@@ -372,6 +395,10 @@ class RuleEvaluator:
         if not target_address:
             return False
         
+        # 근접도 인덱스가 있으면 증분 갱신 후 조회만 수행
+        if self.proximity_index is not None:
+            return self._evaluate_e102_with_index(tx_data, target_address)
+        
         # 트랜잭션 히스토리에서 그래프 구축
         # window_evaluator의 history를 활용
         history = self.window_evaluator.history
@@ -385,7 +412,7 @@ class RuleEvaluator:
         
         # 그래프 구축
         if self.pattern_detector is None:
-            self.pattern_detector = MPOCryptoMLPatternDetector()
+            self.pattern_detector = MPOCryptoMLPatternDetector(supernode_policy=self.supernode_policy)
         else:
             self.pattern_detector._build_graph()  # 그래프 초기화
         
@@ -416,6 +443,37 @@ class RuleEvaluator:
         
         return ppr_result["total_ppr"] >= ppr_threshold
     
+    def _evaluate_e102_with_index(
+        self,
+        tx_data: Dict[str, Any],
+        target_address: str,
+        max_hops: int = 2,
+        ppr_threshold: float = 0.05
+    ) -> bool:
+        """
+        E-102 룰 평가: 근접도 인덱스 조회
+        
+        현재 트랜잭션을 인덱스에 반영한 뒤, 타겟 주소가 SDN에서 1~max_hops 홉 거리이거나
+        PPR 노출도가 임계값 이상이면 발동
+        
+        Args:
+            tx_data: 트랜잭션 데이터
+            target_address: 타겟 주소
+            max_hops: 간접 노출로 보는 최대 홉 수 (룰 정의: ≤2 hops)
+            ppr_threshold: PPR 임계값 (기존 그래프 기반 평가와 동일 0.05)
+        
+        Returns:
+            룰 발동 여부
+        """
+        self.proximity_index.add_transaction(tx_data)
+        proximity = self.proximity_index.lookup(target_address)
+        
+        sdn_hops = proximity["sdn_hops"]
+        if sdn_hops is not None and 1 <= sdn_hops <= max_hops:
+            return True
+        
+        return proximity["total_ppr"] >= ppr_threshold
+    
     def _evaluate_b103_with_stats(
         self,
         tx_data: Dict[str, Any],
@@ -478,7 +536,7 @@ class RuleEvaluator:
         tx_data: Dict[str, Any],
         rule: Dict[str, Any],
         rule_type: str  # "layering_chain" or "cycle"
-    ) -> bool:
+    ) -> Tuple[bool, bool]:
         """
         Topology 기반 룰 평가 (B-201, B-202)
         
@@ -488,11 +546,11 @@ class RuleEvaluator:
             rule_type: 룰 타입 ("layering_chain" or "cycle")
         
         Returns:
-            룰 발동 여부
+            (룰 발동 여부, 탐색이 확장 상한에 걸려 중단되었는지 여부 - cycle은 항상 False)
         """
         target_address = tx_data.get("to") or tx_data.get("target_address", "")
         if not target_address:
-            return False
+            return False, False
         
         # 트랜잭션 히스토리에서 그래프 구축
         # window_evaluator의 history를 활용
@@ -518,9 +576,9 @@ class RuleEvaluator:
                 target_address,
                 all_transactions,
                 topology_spec
-            )
+            ), False
         
-        return False
+        return False, False
     
     def _eval_single_condition(
         self,
@@ -0,0 +1,231 @@
+"""
+룰 메타데이터 테이블
+
+룰북을 로드할 때 룰별 메타데이터(태그 비트마스크, 설명 문구, axis, severity, 기본 점수, 가중치)를
+한 번만 계산해 두고, 리스크 태그/설명 생성과 룰 가중치 계산이 같은 테이블을 공유한다.
+태그는 발동 룰들의 비트마스크 OR, 설명은 미리 만든 문구 조합으로 만든다.
+
+사용법:
+    table = RuleMetadataTable.from_rules(RuleLoader().get_rules())
+    tags = table.tag_names(table.tag_mask(["E-101", "C-003"]))  # ["high_value_transfer", "mixer_inflow"]
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Any, Iterable, Optional
+
+from core.rules.loader import RuleLoader
+
+
+# 리스크 태그: (태그, 룰 이름(소문자)에 포함되면 해당하는 문자열, 룰 ID에 포함되면 해당하는 문자열)
+RISK_TAG_RULES = [
+    ("mixer_inflow", ("mixer",), ("E-101",)),
+    ("sanction_exposure", ("sanction",), ("C-001",)),
+    ("scam_exposure", ("scam",), ()),
+    ("high_value_transfer", ("high-value",), ("C-003", "C-004")),
+    ("bridge_large_transfer", ("bridge",), ()),
+    ("cex_inflow", ("cex",), ()),
+    ("suspicious_pattern", ("burst",), ("B-101", "B-102")),
+]
+TAG_BITS: Dict[str, int] = {tag: 1 << i for i, (tag, _, _) in enumerate(RISK_TAG_RULES)}
+
+# 설명 그룹: (그룹, 룰 ID에 포함되면 해당하는 문자열) - 설명 문구 순서
+EXPLANATION_GROUPS = [
+    ("mixer", "E-101"),
+    ("sanction", "C-001"),
+    ("high_value", "C-003"),
+    ("repeated", "C-004"),
+    ("burst", "B-101"),
+]
+EXPLAIN_BITS: Dict[str, int] = {group: 1 << i for i, (group, _) in enumerate(EXPLANATION_GROUPS)}
+
+# dynamic 점수 룰의 기본 점수 (중간값)
+DYNAMIC_BASE_SCORE = 15.0
+
+
+def _tag_mask(rule_id: str, rule_name: str) -> int:
+    """룰 ID/이름으로 태그 비트마스크 계산"""
+    name = rule_name.lower()
+    mask = 0
+    for tag, name_keywords, id_keywords in RISK_TAG_RULES:
+        if any(keyword in name for keyword in name_keywords) or any(keyword in rule_id for keyword in id_keywords):
+            mask |= TAG_BITS[tag]
+    return mask
+
+
+def _explain_mask(rule_id: str) -> int:
+    """룰 ID로 설명 그룹 비트마스크 계산"""
+    mask = 0
+    for group, id_keyword in EXPLANATION_GROUPS:
+        if id_keyword in rule_id:
+            mask |= EXPLAIN_BITS[group]
+    return mask
+
+
+def _pattern_type(rule: Dict[str, Any]) -> str:
+    """룰 패턴 유형 (single, window, bucket, topology, stats)"""
+    if "window" in rule:
+        return "window"
+    if "bucket" in rule:
+        return "bucket"
+    if "topology" in rule:
+        return "topology"
+    if "prerequisites" in rule:
+        return "stats"
+    return "single"
+
+
+def _base_score(rule: Dict[str, Any]) -> float:
+    """룰 기본 점수 (dynamic이면 DYNAMIC_BASE_SCORE)"""
+    score_value = rule.get("score", 0)
+    if isinstance(score_value, str) and score_value.lower() == "dynamic":
+        return DYNAMIC_BASE_SCORE
+    try:
+        return float(score_value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def rule_based_weight(axis: str, severity: str, pattern_type: str) -> float:
+    """규칙 기반 룰 가중치 (severity, axis, 패턴 유형)"""
+    weight = 1.0
+
+    # Severity 기반 가중치
+    if severity == "HIGH":
+        weight *= 1.2
+    elif severity == "MEDIUM":
+        weight *= 1.0
+    elif severity == "LOW":
+        weight *= 0.8
+
+    # Axis 기반 가중치
+    if axis == "C":  # Compliance는 중요
+        weight *= 1.1
+    elif axis == "E":  # Exposure도 중요
+        weight *= 1.1
+    elif axis == "B":  # Behavior는 상대적으로 덜 중요
+        weight *= 0.95
+
+    # 패턴 유형 기반 가중치
+    if pattern_type == "topology":  # 그래프 패턴은 중요
+        weight *= 1.15
+    elif pattern_type == "window":  # 시간 패턴도 중요
+        weight *= 1.05
+
+    return weight
+
+
+@dataclass(frozen=True)
+class RuleMeta:
+    """룰 메타데이터"""
+    rule_id: str
+    name: str
+    axis: str
+    severity: str
+    base_score: float
+    pattern_type: str
+    weight: float  # 규칙 기반 가중치
+    tag_mask: int
+    explain_mask: int
+    detected_text: str  # "<룰 이름> 패턴 감지"
+    fired_text: str  # "<룰 이름> 룰 발동"
+
+    @classmethod
+    def from_rule(cls, rule: Dict[str, Any]) -> "RuleMeta":
+        """룰북의 룰 정의로 메타데이터 생성"""
+        rule_id = rule["id"]
+        name = rule.get("name", rule_id)
+        axis = rule.get("axis", "B")
+        severity = rule.get("severity", "MEDIUM")
+        pattern_type = _pattern_type(rule)
+        return cls(
+            rule_id=rule_id,
+            name=name,
+            axis=axis,
+            severity=severity,
+            base_score=_base_score(rule),
+            pattern_type=pattern_type,
+            weight=rule_based_weight(axis, severity, pattern_type),
+            tag_mask=_tag_mask(rule_id, name),
+            explain_mask=_explain_mask(rule_id),
+            detected_text=f"{name} 패턴 감지",
+            fired_text=f"{name} 룰 발동",
+        )
+
+    @classmethod
+    def unknown(cls, rule_id: str) -> "RuleMeta":
+        """룰북에 없는 룰 ID (이름 없이 ID로만 태그/설명 계산)"""
+        return cls(
+            rule_id=rule_id,
+            name=rule_id,
+            axis="B",
+            severity="MEDIUM",
+            base_score=0.0,
+            pattern_type="single",
+            weight=1.0,
+            tag_mask=_tag_mask(rule_id, ""),
+            explain_mask=_explain_mask(rule_id),
+            detected_text=f"{rule_id} 패턴 감지",
+            fired_text=f"{rule_id} 룰 발동",
+        )
+
+
+class RuleMetadataTable:
+    """
+    룰 ID → RuleMeta 불변 테이블
+    """
+
+    def __init__(self, metas: Iterable[RuleMeta]):
+        """
+        Args:
+            metas: 룰 메타데이터 (룰북 순서)
+        """
+        self._metas = MappingProxyType({meta.rule_id: meta for meta in metas})
+
+    @classmethod
+    def from_rules(cls, rules: List[Dict[str, Any]]) -> "RuleMetadataTable":
+        """룰북의 룰 목록으로 테이블 생성 (id 없는 룰은 제외)"""
+        return cls(RuleMeta.from_rule(rule) for rule in rules if rule.get("id"))
+
+    @classmethod
+    def load(cls, rules_path: str = "rules/tracex_rules.yaml") -> "RuleMetadataTable":
+        """룰북 파일을 로드해 테이블 생성"""
+        return cls.from_rules(RuleLoader(rules_path).get_rules())
+
+    @property
+    def rules(self) -> MappingProxyType:
+        """룰 ID → RuleMeta (읽기 전용)"""
+        return self._metas
+
+    def __contains__(self, rule_id: str) -> bool:
+        return rule_id in self._metas
+
+    def __len__(self) -> int:
+        return len(self._metas)
+
+    def get(self, rule_id: Optional[str]) -> RuleMeta:
+        """룰 메타데이터 (룰북에 없으면 ID만으로 만든 메타데이터)"""
+        meta = self._metas.get(rule_id)
+        if meta is None:
+            meta = RuleMeta.unknown(rule_id or "")
+        return meta
+
+    def tag_mask(self, rule_ids: Iterable[Optional[str]]) -> int:
+        """발동 룰들의 태그 비트마스크 OR"""
+        mask = 0
+        for rule_id in rule_ids:
+            mask |= self.get(rule_id).tag_mask
+        return mask
+
+    def explain_mask(self, rule_ids: Iterable[Optional[str]]) -> int:
+        """발동 룰들의 설명 그룹 비트마스크 OR"""
+        mask = 0
+        for rule_id in rule_ids:
+            mask |= self.get(rule_id).explain_mask
+        return mask
+
+    @staticmethod
+    def tag_names(mask: int) -> List[str]:
+        """태그 비트마스크 → 정렬된 태그 이름 목록"""
+        return sorted(tag for tag, bit in TAG_BITS.items() if mask & bit)
@@ -0,0 +1,184 @@
+"""
+룰 메타데이터 테이블 테스트
+
+리스크 태그/설명/룰 가중치를 RuleMetadataTable로 만든 결과가 룰북을 매번 다시 읽어 룰 이름/ID 부분 문자열로
+판단하던 기존 방식과 같은지 확인 (룰북에 없는 룰 ID, ID에 키워드가 포함된 룰 ID, 이름으로만 정해지는 태그 포함)
+"""
+import random
+from pathlib import Path
+
+import pytest
+
+from core.rules.loader import RuleLoader
+from core.rules.metadata import TAG_BITS, RuleMetadataTable
+from core.scoring.address_analyzer import AddressAnalyzer
+from core.scoring.ai_weight_learner import RuleWeightLearner
+from core.scoring.engine import TransactionInput, TransactionScorer
+
+project_root = Path(__file__).parent.parent.parent
+RULES_PATH = project_root / "rules" / "tracex_rules.yaml"
+
+# 이름으로만 정해지는 태그(scam/bridge/cex/burst)와 이름 없는 룰이 섞인 룰북
+SYNTHETIC_RULES = [
+    {"id": "X-001", "name": "CEX Deposit Sweep", "axis": "E", "severity": "LOW", "window": {}},
+    {"id": "X-002", "name": "Known Scam Payout", "score": "dynamic", "topology": {}},
+    {"id": "X-003", "name": "Bridge Burst Outflow", "score": "n/a", "bucket": {}},
+    {"id": "X-C-001", "axis": "C", "severity": "HIGH", "score": 30, "prerequisites": []},
+    {"name": "no id"},
+]
+
+EXTRA_IDS = ["XE-101Y", "C-0031", "B-1020", "UNKNOWN", ""]
+
+
+def _rule_map(rules):
+    return {rule.get("id"): rule.get("name", rule.get("id")) for rule in rules if rule.get("id")}
+
+
+def _legacy_tags(rule_ids, rule_map, suspicious_pattern=True):
+    """룰 이름(소문자)/ID 부분 문자열로 태그 판단 (기존 _generate_risk_tags)"""
+    tags = set()
+    for rule_id in rule_ids:
+        rule_name = rule_map.get(rule_id, "").lower()
+        if "mixer" in rule_name or "E-101" in rule_id:
+            tags.add("mixer_inflow")
+        if "sanction" in rule_name or "C-001" in rule_id:
+            tags.add("sanction_exposure")
+        if "scam" in rule_name:
+            tags.add("scam_exposure")
+        if "high-value" in rule_name or "C-003" in rule_id or "C-004" in rule_id:
+            tags.add("high_value_transfer")
+        if "bridge" in rule_name:
+            tags.add("bridge_large_transfer")
+        if "cex" in rule_name:
+            tags.add("cex_inflow")
+        if suspicious_pattern and ("burst" in rule_name or "B-101" in rule_id or "B-102" in rule_id):
+            tags.add("suspicious_pattern")
+    return sorted(tags)
+
+
+def _legacy_address_explanation(aggregated_rules, rule_map, risk_level):
+    """점수 높은 룰 순으로 그룹별 첫 룰 이름 (기존 AddressAnalyzer._generate_explanation)"""
+    sorted_rules = sorted(aggregated_rules, key=lambda x: x.get("score", 0), reverse=True)
+    explanations = []
+    for keyword in ("E-101", "C-001", "C-003", "C-004", "B-101"):
+        matched = [r for r in sorted_rules if keyword in r.get("rule_id", "")]
+        if matched:
+            rule_id = matched[0].get("rule_id", "")
+            explanations.append(f"{rule_map.get(rule_id, rule_id)} 패턴 감지")
+    if not explanations:
+        rule_id = sorted_rules[0].get("rule_id", "")
+        explanations.append(f"{rule_map.get(rule_id, rule_id)} 룰 발동")
+    suffix = f"로 인해 {risk_level} 리스크로 분류됨." if risk_level != "low" else "로 인해 낮은 리스크로 분류됨."
+    return ", ".join(explanations) + suffix
+
+
+def _random_rule_sets(rule_ids, seed, count=200):
+    rng = random.Random(seed)
+    pool = list(rule_ids) + EXTRA_IDS
+    for _ in range(count):
+        yield [
+            {"rule_id": rule_id, "score": rng.choice([5, 10, 25, 40])}
+            for rule_id in rng.sample(pool, rng.randint(1, 5))
+        ]
+
+
+@pytest.fixture(scope="module")
+def ruleset():
+    return RuleLoader(str(RULES_PATH)).get_rules()
+
+
+@pytest.mark.parametrize("synthetic", [False, True])
+def test_tag_mask_matches_name_matching(ruleset, synthetic):
+    """태그 비트마스크 OR = 룰 이름/ID 부분 문자열 판단 (suspicious_pattern 제외 포함)"""
+    rules = SYNTHETIC_RULES if synthetic else ruleset
+    table = RuleMetadataTable.from_rules(rules)
+    rule_map = _rule_map(rules)
+    assert len(table) == len(rule_map)
+
+    seen = set()
+    for rule_set in _random_rule_sets(rule_map, seed=int(synthetic)):
+        rule_ids = [rule["rule_id"] for rule in rule_set]
+        tags = table.tag_names(table.tag_mask(rule_ids))
+        assert tags == _legacy_tags(rule_ids, rule_map), rule_ids
+        without = table.tag_names(table.tag_mask(rule_ids) & ~TAG_BITS["suspicious_pattern"])
+        assert without == _legacy_tags(rule_ids, rule_map, suspicious_pattern=False)
+        seen.update(tags)
+    expected = {"scam_exposure", "bridge_large_transfer", "cex_inflow"} if synthetic else {"mixer_inflow", "high_value_transfer"}
+    assert expected <= seen
+
+
+def test_address_analyzer_tags_and_explanations(ruleset):
+    """AddressAnalyzer의 태그/설명 = 기존 방식 (그룹별 점수 최고 룰, 그룹이 없으면 최고 점수 룰 발동)"""
+    analyzer = AddressAnalyzer(rules_path=str(RULES_PATH))
+    rule_map = _rule_map(ruleset)
+    for i, rule_set in enumerate(_random_rule_sets(rule_map, seed=2)):
+        assert analyzer._generate_risk_tags(rule_set) == _legacy_tags([r["rule_id"] for r in rule_set], rule_map)
+        risk_level = ("low", "medium", "high", "critical")[i % 4]
+        actual = analyzer._generate_explanation(rule_set, [], 50.0, risk_level)
+        assert actual == _legacy_address_explanation(rule_set, rule_map, risk_level), rule_set
+    assert analyzer._generate_risk_tags([{}]) == []
+
+
+def test_transaction_scorer_tags_and_explanations(ruleset):
+    """TransactionScorer의 태그(suspicious_pattern 없음)/설명 그룹 = 룰 ID 부분 문자열 판단"""
+    scorer = TransactionScorer(rules_path=str(RULES_PATH))
+    rule_map = _rule_map(ruleset)
+    tx = TransactionInput(
+        tx_hash="0xtx", chain="ethereum", timestamp="2025-01-01T00:00:00Z", block_height=1,
+        target_address="0x" + "11" * 20, counterparty_address="0x" + "22" * 20, label="unknown",
+        is_sanctioned=False, is_known_scam=False, is_mixer=False, is_bridge=False,
+        amount_usd=500.0, asset_contract="0xeth"
+    )
+    for rule_set in _random_rule_sets(rule_map, seed=3):
+        rule_ids = [rule["rule_id"] for rule in rule_set]
+        assert scorer._generate_risk_tags(rule_set, tx) == _legacy_tags(rule_ids, rule_map, suspicious_pattern=False)
+
+        explanation = scorer._generate_explanation(tx, rule_set, "medium")
+        assert ("mixer에서" in explanation) == any("E-101" in rule_id for rule_id in rule_ids)
+        assert ("제재 대상과 거래" in explanation) == any("C-001" in rule_id for rule_id in rule_ids)
+        assert ("고액 거래" in explanation) == any("C-003" in r or "C-004" in r for r in rule_ids)
+
+
+@pytest.mark.parametrize("synthetic", [False, True])
+def test_weight_learner_features_and_weights(ruleset, synthetic):
+    """RuleWeightLearner의 룰 특성/규칙 기반 가중치 = 룰북 정의로 직접 계산한 값"""
+    rules = SYNTHETIC_RULES if synthetic else ruleset
+    learner = RuleWeightLearner(use_ai=False, rule_metadata=RuleMetadataTable.from_rules(rules))
+    assert set(learner.rule_features) == set(_rule_map(rules))
+    for rule in rules:
+        rule_id = rule.get("id")
+        if not rule_id:
+            continue
+        pattern_type = next((key for key in ("window", "bucket", "topology") if key in rule), None)
+        pattern_type = pattern_type or ("stats" if "prerequisites" in rule else "single")
+        score = rule.get("score", 0)
+        if isinstance(score, str) and score.lower() == "dynamic":
+            base_score = 15.0
+        else:
+            try:
+                base_score = float(score)
+            except (ValueError, TypeError):
+                base_score = 0.0
+        axis, severity = rule.get("axis", "B"), rule.get("severity", "MEDIUM")
+        weight = {"HIGH": 1.2, "LOW": 0.8}.get(severity, 1.0)
+        weight *= {"C": 1.1, "E": 1.1, "B": 0.95}.get(axis, 1.0)
+        weight *= {"topology": 1.15, "window": 1.05}.get(pattern_type, 1.0)
+
+        feature = learner.rule_features[rule_id]
+        assert (feature.axis, feature.severity, feature.base_score, feature.pattern_type, feature.name) == (
+            axis, severity, base_score, pattern_type, rule.get("name", rule_id)
+        )
+        assert learner.rule_based_weights[rule_id] == pytest.approx(weight)
+
+
+def test_shared_table_and_unknown_rule():
+    """평가기가 만든 테이블을 스코어러/가중치 학습기가 공유, 룰북에 없는 ID는 ID만으로 메타데이터"""
+    scorer = TransactionScorer(rules_path=str(RULES_PATH))
+    assert scorer.rule_metadata is scorer.rule_evaluator.rule_metadata
+    with pytest.raises(TypeError):
+        scorer.rule_metadata.rules["C-001"] = None
+
+    meta = scorer.rule_metadata.get("ZZ-E-101")
+    assert "ZZ-E-101" not in scorer.rule_metadata
+    assert (meta.name, meta.weight, meta.fired_text) == ("ZZ-E-101", 1.0, "ZZ-E-101 룰 발동")
+    assert RuleMetadataTable.tag_names(meta.tag_mask) == ["mixer_inflow"]
@@ -6,12 +6,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterator, Optional, Union
 from datetime import datetime, timezone
 from collections import defaultdict
 
 from ..rules.evaluator import RuleEvaluator
+from ..rules.metadata import EXPLANATION_GROUPS, EXPLAIN_BITS
 from ..aggregation.window import WindowEvaluator, TransactionHistory
+from ..aggregation.proximity_index import SanctionProximityIndex
+from ..data.lists import ListLoader
 
 
 @dataclass
@@ -42,8 +45,12 @@ class AddressAnalyzer:
         self.history = TransactionHistory()
         window_evaluator = WindowEvaluator(self.history)
         
-        # 룰 평가기 (윈도우 평가기 포함)
-        self.rule_evaluator = RuleEvaluator(rules_path, window_evaluator)
+        # 공유 제재 근접도 인덱스 (E-102를 히스토리 그래프 재구축 없이 조회로 평가)
+        self.proximity_index = SanctionProximityIndex.from_list_loader(ListLoader())
+        
+        # 룰 평가기 (윈도우 평가기, 근접도 인덱스 포함)
+        self.rule_evaluator = RuleEvaluator(rules_path, window_evaluator, proximity_index=self.proximity_index)
+        self.rule_metadata = self.rule_evaluator.rule_metadata
     
     def analyze_address(
         self,
@@ -68,8 +75,37 @@ class AddressAnalyzer:
         Returns:
             주소 분석 결과
         """
+        timeline = []
+        for item in self.iter_analysis(address, chain, transactions, time_range, analysis_type):
+            if isinstance(item, AddressAnalysisResult):
+                item.timeline = timeline
+                return item
+            timeline.append(item)
+    
+    def iter_analysis(
+        self,
+        address: str,
+        chain: str,
+        transactions: List[Dict[str, Any]],
+        time_range: Optional[Dict[str, str]] = None,
+        analysis_type: str = "basic"
+    ) -> Iterator[Union[Dict[str, Any], AddressAnalysisResult]]:
+        """
+        analyze_address의 스트리밍 버전
+        
+        거래를 시간순으로 평가하면서 타임라인 항목을 하나씩 yield하고,
+        마지막에 timeline이 비어 있는 AddressAnalysisResult(최종 점수, 집계 룰, 태그 등)를 yield한다.
+        타임라인과 발동 룰 전체를 메모리에 모아 두지 않는다.
+        
+        Args:
+            analyze_address와 같음
+        
+        Yields:
+            타임라인 항목 {"timestamp", "tx_hash", "risk_score", "fired_rules"}, 마지막은 AddressAnalysisResult
+        """
         if not transactions:
-            return self._empty_result(address, chain)
+            yield self._empty_result(address, chain)
+            return
         
         # 1. 트랜잭션을 시간순 정렬
         sorted_txs = sorted(
@@ -77,10 +113,10 @@ class AddressAnalyzer:
             key=lambda tx: self._get_timestamp(tx)
         )
         
-        # 2. 각 트랜잭션에 대해 룰 평가
-        all_fired_rules = []
+        # 2. 각 트랜잭션에 대해 룰 평가 (룰 집계는 거래마다 누적)
+        rule_counts = self._new_rule_counts()
+        burst_rules = []
         transaction_scores = []
-        timeline = []
         
         # 그래프 구조 분석 포함 여부 결정
         include_topology = (analysis_type == "advanced")
@@ -96,32 +132,20 @@ class AddressAnalyzer:
             )
             
             # 트랜잭션별 점수 계산
-            def safe_get_score(rule: Dict[str, Any]) -> float:
-                """룰의 score를 안전하게 float로 변환"""
-                score = rule.get("score", 0)
-                if isinstance(score, (int, float)):
-                    return float(score)
-                if isinstance(score, str):
-                    # "dynamic" 같은 문자열은 0으로 처리
-                    try:
-                        return float(score)
-                    except (ValueError, TypeError):
-                        return 0.0
-                return 0.0
-            
-            tx_score = sum(safe_get_score(r) for r in fired_rules)
+            tx_score = sum(self._safe_score(r) for r in fired_rules)
             transaction_scores.append(tx_score)
             
-            # 발동된 룰 수집
-            all_fired_rules.extend(fired_rules)
+            # 발동된 룰 집계
+            self._count_rules(rule_counts, fired_rules)
+            burst_rules.extend(r for r in fired_rules if self._is_burst_rule(r))
             
-            # 타임라인 추가
-            timeline.append({
+            # 타임라인 항목
+            yield {
                 "timestamp": tx.get("timestamp"),
                 "tx_hash": tx.get("tx_hash"),
                 "risk_score": min(100.0, tx_score),
                 "fired_rules": [r["rule_id"] for r in fired_rules]
-            })
+            }
         
         # 3. 최종 리스크 스코어 계산
         final_score = self._calculate_final_score(transaction_scores, sorted_txs)
@@ -130,13 +154,13 @@ class AddressAnalyzer:
         risk_level = self._determine_risk_level(final_score)
         
         # 5. 발동된 룰 집계 (중복 제거 및 카운트)
-        aggregated_rules = self._aggregate_rules(all_fired_rules)
+        aggregated_rules = self._format_rule_counts(rule_counts)
         
         # 6. Risk Tags 생성
         risk_tags = self._generate_risk_tags(aggregated_rules)
         
         # 7. 거래 패턴 분석
-        patterns = self._analyze_patterns(sorted_txs, all_fired_rules)
+        patterns = self._analyze_patterns(sorted_txs, burst_rules)
         
         # 8. 분석 요약
         summary = self._create_summary(sorted_txs, time_range)
@@ -149,7 +173,7 @@ class AddressAnalyzer:
         # 완료 시각 생성
         completed_at = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
         
-        return AddressAnalysisResult(
+        yield AddressAnalysisResult(
             address=address,
             chain=chain,
             risk_score=final_score,
@@ -158,11 +182,31 @@ class AddressAnalyzer:
             fired_rules=aggregated_rules,
             risk_tags=risk_tags,
             transaction_patterns=patterns,
-            timeline=timeline,
+            timeline=[],
             explanation=explanation,
             completed_at=completed_at
         )
     
+    @staticmethod
+    def _safe_score(rule: Dict[str, Any]) -> float:
+        """룰의 score를 안전하게 float로 변환"""
+        score = rule.get("score", 0)
+        if isinstance(score, (int, float)):
+            return float(score)
+        if isinstance(score, str):
+            # "dynamic" 같은 문자열은 0으로 처리
+            try:
+                return float(score)
+            except (ValueError, TypeError):
+                return 0.0
+        return 0.0
+    
+    @staticmethod
+    def _is_burst_rule(rule: Dict[str, Any]) -> bool:
+        """Burst 패턴 룰 (B-101, B-102)"""
+        rule_id = rule.get("rule_id", "")
+        return "B-101" in rule_id or "B-102" in rule_id
+    
     def _convert_transaction(
         self,
         tx: Dict[str, Any],
@@ -247,24 +291,21 @@ class AddressAnalyzer:
         else:
             return "low"
     
-    def _aggregate_rules(
-        self,
-        all_fired_rules: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """
-        발동된 룰 집계 (중복 제거 및 카운트)
-        
-        기존 JSON 포맷에 맞춰 {rule_id, score} 형태로 반환
-        """
-        rule_counts = defaultdict(lambda: {
+    @staticmethod
+    def _new_rule_counts() -> Dict[str, Dict[str, Any]]:
+        """발동된 룰 집계용 빈 카운터 (중복 제거 및 카운트)"""
+        return defaultdict(lambda: {
             "count": 0,
             "score": 0,
             "axis": "",
             "name": "",
             "severity": ""
         })
-        
-        for rule in all_fired_rules:
+    
+    @staticmethod
+    def _count_rules(rule_counts: Dict[str, Dict[str, Any]], fired_rules: List[Dict[str, Any]]) -> None:
+        """발동된 룰을 카운터에 누적 (점수 등은 마지막 발동 값)"""
+        for rule in fired_rules:
             rule_id = rule.get("rule_id")
             if not rule_id:
                 continue
@@ -274,8 +315,10 @@ class AddressAnalyzer:
             rule_counts[rule_id]["axis"] = rule.get("axis", "B")
             rule_counts[rule_id]["name"] = rule.get("name", rule_id)
             rule_counts[rule_id]["severity"] = rule.get("severity", "MEDIUM")
-        
-        # 기존 JSON 포맷에 맞춰 {rule_id, score} 형태로 반환
+    
+    @staticmethod
+    def _format_rule_counts(rule_counts: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """기존 JSON 포맷에 맞춰 {rule_id, score} 형태로 반환"""
         return [
             {
                 "rule_id": rule_id,
@@ -288,35 +331,9 @@ class AddressAnalyzer:
         self,
         aggregated_rules: List[Dict[str, Any]]
     ) -> List[str]:
-        """Risk Tags 생성"""
-        tags = set()
-        
-        # 룰 로더에서 룰 이름 가져오기
-        from ..rules.loader import RuleLoader
-        rule_loader = RuleLoader()
-        rules = rule_loader.get_rules()
-        rule_map = {rule.get("id"): rule.get("name", rule.get("id")) for rule in rules if rule.get("id")}
-        
-        for rule in aggregated_rules:
-            rule_id = rule.get("rule_id", "")
-            rule_name = rule_map.get(rule_id, "").lower()
-            
-            if "mixer" in rule_name or "E-101" in rule_id:
-                tags.add("mixer_inflow")
-            if "sanction" in rule_name or "C-001" in rule_id:
-                tags.add("sanction_exposure")
-            if "scam" in rule_name:
-                tags.add("scam_exposure")
-            if "high-value" in rule_name or "C-003" in rule_id or "C-004" in rule_id:
-                tags.add("high_value_transfer")
-            if "bridge" in rule_name:
-                tags.add("bridge_large_transfer")
-            if "cex" in rule_name:
-                tags.add("cex_inflow")
-            if "burst" in rule_name or "B-101" in rule_id or "B-102" in rule_id:
-                tags.add("suspicious_pattern")
-        
-        return sorted(list(tags))
+        """Risk Tags 생성 (룰 메타데이터 태그 비트마스크 OR)"""
+        mask = self.rule_metadata.tag_mask(rule.get("rule_id", "") for rule in aggregated_rules)
+        return self.rule_metadata.tag_names(mask)
     
     def _analyze_patterns(
         self,
@@ -342,10 +359,7 @@ class AddressAnalyzer:
             patterns["total_volume_usd"] += tx.get("amount_usd", 0.0)
         
         # Burst 패턴 카운트 (B-101, B-102 룰 발동 횟수)
-        for rule in fired_rules:
-            rule_id = rule.get("rule_id", "")
-            if "B-101" in rule_id or "B-102" in rule_id:
-                patterns["burst_patterns"] += 1
+        patterns["burst_patterns"] = sum(1 for rule in fired_rules if self._is_burst_rule(rule))
         
         return patterns
     
@@ -360,63 +374,25 @@ class AddressAnalyzer:
         if not aggregated_rules:
             return "정상 거래 패턴으로 리스크가 낮습니다."
         
-        # 룰 로더에서 룰 이름 가져오기
-        from ..rules.loader import RuleLoader
-        rule_loader = RuleLoader()
-        rules = rule_loader.get_rules()
-        rule_map = {rule.get("id"): rule.get("name", rule.get("id")) for rule in rules if rule.get("id")}
-        
         # 주요 룰 추출 (점수 높은 순)
         sorted_rules = sorted(
             aggregated_rules,
             key=lambda x: x.get("score", 0),
             reverse=True
         )
+        metas = [self.rule_metadata.get(r.get("rule_id", "")) for r in sorted_rules]
         
+        # 설명 그룹 (Mixer, 제재 주소, 고액 거래, 반복 거래, Burst 패턴)마다 점수가 가장 높은 룰
         explanations = []
+        for group, _ in EXPLANATION_GROUPS:
+            bit = EXPLAIN_BITS[group]
+            meta = next((meta for meta in metas if meta.explain_mask & bit), None)
+            if meta is not None:
+                explanations.append(meta.detected_text)
         
-        # Mixer 관련
-        mixer_rules = [r for r in sorted_rules if "E-101" in r.get("rule_id", "")]
-        if mixer_rules:
-            rule_id = mixer_rules[0].get("rule_id", "")
-            rule_name = rule_map.get(rule_id, rule_id)
-            explanations.append(f"{rule_name} 패턴 감지")
-        
-        # 제재 주소 관련
-        sanction_rules = [r for r in sorted_rules if "C-001" in r.get("rule_id", "")]
-        if sanction_rules:
-            rule_id = sanction_rules[0].get("rule_id", "")
-            rule_name = rule_map.get(rule_id, rule_id)
-            explanations.append(f"{rule_name} 패턴 감지")
-        
-        # 고액 거래 관련
-        high_value_rules = [r for r in sorted_rules if "C-003" in r.get("rule_id", "")]
-        if high_value_rules:
-            rule_id = high_value_rules[0].get("rule_id", "")
-            rule_name = rule_map.get(rule_id, rule_id)
-            explanations.append(f"{rule_name} 패턴 감지")
-        
-        # 반복 거래 관련
-        repeated_rules = [r for r in sorted_rules if "C-004" in r.get("rule_id", "")]
-        if repeated_rules:
-            rule_id = repeated_rules[0].get("rule_id", "")
-            rule_name = rule_map.get(rule_id, rule_id)
-            explanations.append(f"{rule_name} 패턴 감지")
-        
-        # Burst 패턴
-        burst_rules = [r for r in sorted_rules if "B-101" in r.get("rule_id", "")]
-        if burst_rules:
-            rule_id = burst_rules[0].get("rule_id", "")
-            rule_name = rule_map.get(rule_id, rule_id)
-            explanations.append(f"{rule_name} 패턴 감지")
-        
-        if not explanations:
+        if not explanations and metas:
             # 기본 설명
-            top_rule = sorted_rules[0] if sorted_rules else None
-            if top_rule:
-                rule_id = top_rule.get("rule_id", "")
-                rule_name = rule_map.get(rule_id, rule_id)
-                explanations.append(f"{rule_name} 룰 발동")
+            explanations.append(metas[0].fired_text)
         
         # 설명 조합
         if explanations:
@@ -10,6 +10,9 @@ from dataclasses import dataclass
 import numpy as np
 from collections import defaultdict
 
+from ..rules.metadata import RuleMetadataTable
+from .feature_schema import rule_weight_feature_schema
+
 # 머신러닝 라이브러리 (선택적)
 try:
     from sklearn.linear_model import LogisticRegression
@@ -36,152 +39,90 @@ class RuleFeature:
 class RuleWeightLearner:
     """룰 가중치 학습기"""
     
-    def __init__(self, use_ai: bool = True):
+    def __init__(self, use_ai: bool = True, rule_metadata: Optional[RuleMetadataTable] = None):
         """
         Args:
             use_ai: AI 모델 사용 여부 (False면 규칙 기반 가중치 사용)
+            rule_metadata: 룰 메타데이터 테이블 (None이면 기본 룰북으로 생성, RuleEvaluator.rule_metadata 공유 가능)
         """
         self.use_ai = use_ai and SKLEARN_AVAILABLE
         self.model = None
         self.scaler = None
+        self.rule_metadata = rule_metadata if rule_metadata is not None else RuleMetadataTable.load()
         self.rule_features = self._load_rule_features()
         
+        # 룰별 스키마 행 (메타데이터 부분은 미리 계산, 조합 점수는 extract_features에서 채움)
+        self.feature_schema = rule_weight_feature_schema()
+        self._combination_column = self.feature_schema.names.index("combination_score")
+        self._rule_rows = {rule_id: i for i, rule_id in enumerate(self.rule_features)}
+        contexts = [self._rule_feature_values(feature) for feature in self.rule_features.values()]
+        self._rule_matrix = self.feature_schema.build([{}] * len(contexts), [{}] * len(contexts), contexts)
+        
         # 규칙 기반 가중치 (AI 없을 때 사용)
         self.rule_based_weights = self._calculate_rule_based_weights()
     
     def _load_rule_features(self) -> Dict[str, RuleFeature]:
-        """룰 특성 로드"""
-        from ..rules.loader import RuleLoader
-        rule_loader = RuleLoader()
-        rules = rule_loader.get_rules()
-        
-        features = {}
-        for rule in rules:
-            rule_id = rule.get("id")
-            if not rule_id:
-                continue
-            
-            # 패턴 유형 결정
-            pattern_type = "single"
-            if "window" in rule:
-                pattern_type = "window"
-            elif "bucket" in rule:
-                pattern_type = "bucket"
-            elif "topology" in rule:
-                pattern_type = "topology"
-            elif "prerequisites" in rule:
-                pattern_type = "stats"
-            
-            # score 처리 (dynamic인 경우 기본값 사용)
-            score_value = rule.get("score", 0)
-            if isinstance(score_value, str) and score_value.lower() == "dynamic":
-                # dynamic 점수는 기본값 15 사용 (중간값)
-                base_score = 15.0
-            else:
-                try:
-                    base_score = float(score_value)
-                except (ValueError, TypeError):
-                    base_score = 0.0
-            
-            features[rule_id] = RuleFeature(
+        """룰 특성 (룰 메타데이터 테이블에서)"""
+        return {
+            rule_id: RuleFeature(
                 rule_id=rule_id,
-                axis=rule.get("axis", "B"),
-                severity=rule.get("severity", "MEDIUM"),
-                base_score=base_score,
-                pattern_type=pattern_type,
-                name=rule.get("name", rule_id)
+                axis=meta.axis,
+                severity=meta.severity,
+                base_score=meta.base_score,
+                pattern_type=meta.pattern_type,
+                name=meta.name
             )
-        
-        return features
+            for rule_id, meta in self.rule_metadata.rules.items()
+        }
     
     def _calculate_rule_based_weights(self) -> Dict[str, float]:
-        """규칙 기반 가중치 계산 (AI 없을 때 사용)"""
-        weights = {}
-        
-        for rule_id, feature in self.rule_features.items():
-            weight = 1.0
-            
-            # Severity 기반 가중치
-            if feature.severity == "HIGH":
-                weight *= 1.2
-            elif feature.severity == "MEDIUM":
-                weight *= 1.0
-            elif feature.severity == "LOW":
-                weight *= 0.8
-            
-            # Axis 기반 가중치
-            if feature.axis == "C":  # Compliance는 중요
-                weight *= 1.1
-            elif feature.axis == "E":  # Exposure도 중요
-                weight *= 1.1
-            elif feature.axis == "B":  # Behavior는 상대적으로 덜 중요
-                weight *= 0.95
-            
-            # 패턴 유형 기반 가중치
-            if feature.pattern_type == "topology":  # 그래프 패턴은 중요
-                weight *= 1.15
-            elif feature.pattern_type == "window":  # 시간 패턴도 중요
-                weight *= 1.05
-            
-            weights[rule_id] = weight
-        
-        return weights
+        """규칙 기반 가중치 (AI 없을 때 사용, severity/axis/패턴 유형 - 룰 메타데이터에 미리 계산됨)"""
+        return {rule_id: meta.weight for rule_id, meta in self.rule_metadata.rules.items()}
     
     def extract_features(self, rule_results: List[Dict[str, Any]], tx_context: Optional[Dict[str, Any]] = None) -> np.ndarray:
         """
-        룰 결과에서 피처 추출
+        룰 결과에서 피처 추출 (rule_weight 스키마 행을 발동 룰마다 모아 평균)
         
         Args:
             rule_results: 발동된 룰 목록
             tx_context: 트랜잭션 컨텍스트 (선택적)
         
         Returns:
-            피처 벡터
+            피처 벡터 (feature_schema.dim차원, 메타데이터에 있는 룰이 없으면 0 벡터)
         """
-        # 각 룰에 대한 피처
-        feature_vectors = []
-        
-        for rule in rule_results:
-            rule_id = rule.get("rule_id")
-            if rule_id not in self.rule_features:
-                continue
-            
-            feature = self.rule_features[rule_id]
-            
-            # 피처 벡터 생성
-            fv = [
-                # Axis (one-hot encoding)
-                1.0 if feature.axis == "C" else 0.0,
-                1.0 if feature.axis == "E" else 0.0,
-                1.0 if feature.axis == "B" else 0.0,
-                
-                # Severity (one-hot encoding)
-                1.0 if feature.severity == "HIGH" else 0.0,
-                1.0 if feature.severity == "MEDIUM" else 0.0,
-                1.0 if feature.severity == "LOW" else 0.0,
-                
-                # Base score (정규화)
-                feature.base_score / 30.0,  # 최대 점수 30으로 정규화
-                
-                # Pattern type (one-hot encoding)
-                1.0 if feature.pattern_type == "single" else 0.0,
-                1.0 if feature.pattern_type == "window" else 0.0,
-                1.0 if feature.pattern_type == "bucket" else 0.0,
-                1.0 if feature.pattern_type == "topology" else 0.0,
-                1.0 if feature.pattern_type == "stats" else 0.0,
-                
-                # 룰 조합 피처 (다른 룰과의 조합)
-                self._get_combination_features(rule_id, rule_results),
-            ]
-            
-            feature_vectors.append(fv)
-        
-        # 여러 룰이 발동된 경우 평균 또는 합산
-        if not feature_vectors:
-            return np.zeros(15)  # 기본 피처 수
+        rule_ids = [rule.get("rule_id") for rule in rule_results]
+        rows = [self._rule_rows[rule_id] for rule_id in rule_ids if rule_id in self._rule_rows]
+        if not rows:
+            return np.zeros(self.feature_schema.dim)
+        
+        X = self._rule_matrix[rows]
+        X[:, self._combination_column] = [
+            self._get_combination_features(rule_id, rule_results)
+            for rule_id in rule_ids if rule_id in self._rule_rows
+        ]
         
-        # 룰별 가중치를 피처로 사용
-        return np.mean(feature_vectors, axis=0)
+        # 여러 룰이 발동된 경우 평균
+        return X.mean(axis=0)
+    
+    @staticmethod
+    def _rule_feature_values(feature: RuleFeature) -> Dict[str, float]:
+        """rule_weight 스키마의 ctx.<key> 값 (룰 메타데이터에서, 조합 점수 제외)"""
+        values = {
+            "axis_c": feature.axis == "C",
+            "axis_e": feature.axis == "E",
+            "axis_b": feature.axis == "B",
+            "severity_high": feature.severity == "HIGH",
+            "severity_medium": feature.severity == "MEDIUM",
+            "severity_low": feature.severity == "LOW",
+            "pattern_single": feature.pattern_type == "single",
+            "pattern_window": feature.pattern_type == "window",
+            "pattern_bucket": feature.pattern_type == "bucket",
+            "pattern_topology": feature.pattern_type == "topology",
+            "pattern_stats": feature.pattern_type == "stats",
+        }
+        values = {key: 1.0 if flag else 0.0 for key, flag in values.items()}
+        values["base_score"] = feature.base_score / 30.0  # 최대 점수 30으로 정규화
+        return values
     
     def _get_combination_features(self, rule_id: str, all_rules: List[Dict[str, Any]]) -> float:
         """룰 조합 피처 계산"""
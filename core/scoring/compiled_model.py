@@ -0,0 +1,434 @@
+"""
+트리 앙상블 모델의 NumPy 컴파일/추론
+
+학습된 RandomForestClassifier, GradientBoostingClassifier를 모든 트리의 노드를 이어 붙인
+연속 배열 (feature, threshold, children(left, right), value)로 펼쳐 .npz로 저장하고,
+배치 전체가 모든 트리를 동시에 내려가는 벡터화 평가기로 predict_proba를 계산한다.
+
+sklearn과 같은 순서로 계산해 확률이 비트 단위로 일치한다.
+    - 입력은 float32로 변환한 뒤 float64 임계값과 비교 (NaN은 missing_go_to_left 방향)
+    - RandomForest: 트리별 리프 확률을 트리 순서대로 더한 뒤 트리 수로 나눔
+    - GradientBoosting: 초기 예측값에 learning_rate × 리프 값을 단계 순서대로 더하고 expit
+
+추론 경로는 sklearn을 import하지 않으므로 (StandardScaler도 함께 저장) 서빙 워커의 시작 시간이 줄어든다.
+
+사용법:
+    compiled = CompiledTreeEnsemble.from_sklearn(model)
+    save_compiled_model("models/stage2_scorer_random_forest.npz", compiled, scaler,
+                        {"model_type": "random_forest", "use_ppr_features": True})
+    data = load_compiled_model("models/stage2_scorer_random_forest.npz")
+    proba = data["model"].predict_proba(data["scaler"].transform(X))
+"""
+
+import json
+import struct
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+
+COMPILED_FORMAT_VERSION = 2
+
+# GradientBoosting 손실별 역링크 배율 (log_loss: expit(raw), exponential: expit(2 * raw))
+_LINK_SCALES = {"LogitLink": 1.0, "HalfLogitLink": 2.0}
+
+# 한 번에 내려보내는 행 수 (행 × 트리 노드 인덱스 행렬의 메모리 제한)
+_BLOCK_ROWS = 1024
+
+
+def _expit(x: np.ndarray) -> np.ndarray:
+    """
+    sklearn과 같은 scipy.special.expit (boosting에서만 필요하므로 지연 import)
+
+    scipy가 없으면 같은 식으로 계산한다 (마지막 비트가 다를 수 있음).
+    """
+    try:
+        from scipy.special import expit
+    except ImportError:
+        return 1.0 / (1.0 + np.exp(-x))
+    return expit(x)
+
+
+class CompiledScaler:
+    """
+    StandardScaler.transform과 같은 계산을 하는 스케일러 (mean_, scale_만 보관)
+    """
+
+    def __init__(self, mean: Optional[np.ndarray], scale: Optional[np.ndarray]):
+        self.mean_ = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale_ = None if scale is None else np.asarray(scale, dtype=np.float64)
+
+    @classmethod
+    def from_sklearn(cls, scaler: Any) -> "CompiledScaler":
+        """학습된 StandardScaler에서 생성 (with_mean/with_std가 꺼진 항목은 적용하지 않음)"""
+        mean = scaler.mean_ if getattr(scaler, "with_mean", True) else None
+        scale = scaler.scale_ if getattr(scaler, "with_std", True) else None
+        return cls(mean, scale)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """
+        표준화 (float32 입력은 float32로 반환, StandardScaler와 동일)
+        """
+        X = np.asarray(X)
+        dtype = X.dtype if X.dtype in (np.float32, np.float64) else np.float64
+        X = np.array(X, dtype=dtype, copy=True)
+        if self.mean_ is not None:
+            X -= self.mean_.astype(X.dtype)
+        if self.scale_ is not None:
+            X /= self.scale_.astype(X.dtype)
+        return X
+
+
+class CompiledTreeEnsemble:
+    """
+    연속 노드 배열로 펼친 트리 앙상블
+
+    노드 배열은 모든 트리를 이어 붙인 것이며 children[i] = (left, right)는 전체 배열 기준 인덱스다.
+    리프는 left = right = 자기 자신이므로 max_depth번 내려가면 모든 행이 리프에 도달한다.
+    배열은 복사하지 않고 그대로 사용하므로 load_compiled_model(mmap=True)의 memmap이 유지된다.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        classes: np.ndarray,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        missing_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        n_features: int,
+        learning_rate: float = 1.0,
+        baseline: Optional[np.ndarray] = None,
+        link_scale: float = 1.0
+    ):
+        """
+        Args:
+            kind: "forest" (RandomForest) 또는 "boosting" (GradientBoosting, 이진 분류)
+            classes: 클래스 레이블
+            feature, threshold, missing_left: 노드별 분기 정보
+            children: 노드별 (왼쪽, 오른쪽) 자식 인덱스 (노드 수, 2)
+            value: forest는 노드별 정규화된 클래스 확률 (노드 수, 클래스 수), boosting은 리프 값 (노드 수,)
+            roots: 트리별 루트 노드 인덱스 (boosting은 단계 순서)
+            max_depth: 가장 깊은 트리의 깊이
+            n_features: 입력 feature 수
+            learning_rate: boosting 학습률
+            baseline: boosting 초기 예측값 (raw, 길이 1)
+            link_scale: boosting 역링크 배율
+        """
+        if kind not in ("forest", "boosting"):
+            raise ValueError(f"Unsupported ensemble kind: {kind}")
+        self.kind = kind
+        self.classes_ = np.asarray(classes)
+        self.feature = np.asarray(feature, dtype=np.int64)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.children = np.asarray(children, dtype=np.int64)
+        self.missing_left = np.asarray(missing_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        self.learning_rate = float(learning_rate)
+        self.baseline = np.zeros(1, dtype=np.float64) if baseline is None else np.asarray(baseline, dtype=np.float64)
+        self.link_scale = float(link_scale)
+        # 노드 i의 왼쪽/오른쪽 자식이 2i, 2i + 1에 오는 1차원 뷰 (분기 결과로 바로 인덱싱)
+        self._children = self.children.reshape(-1)
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "CompiledTreeEnsemble":
+        """
+        학습된 sklearn 트리 앙상블을 노드 배열로 펼침
+
+        Args:
+            model: RandomForestClassifier / ExtraTreesClassifier (단일 출력)
+                   또는 GradientBoostingClassifier (이진 분류)
+
+        Returns:
+            CompiledTreeEnsemble
+
+        Raises:
+            ValueError: 지원하지 않는 모델
+        """
+        estimators = getattr(model, "estimators_", None)
+        if estimators is None:
+            raise ValueError(f"Unsupported model for compilation: {type(model).__name__}")
+
+        if isinstance(estimators, np.ndarray):
+            # GradientBoosting: (단계 수, 클래스별 트리 수)
+            if estimators.shape[1] != 1:
+                raise ValueError("Only binary GradientBoostingClassifier can be compiled")
+            link_name = type(getattr(model._loss, "link", None)).__name__
+            if link_name not in _LINK_SCALES:
+                raise ValueError(f"Unsupported boosting loss: {type(model._loss).__name__}")
+            init = model.init_
+            if init != "zero" and type(init).__name__ not in ("DummyClassifier", "DummyRegressor"):
+                raise ValueError(f"Unsupported boosting init estimator: {type(init).__name__}")
+            # 초기 예측값은 입력과 무관한 상수이므로 한 행으로 계산해 둔다
+            baseline = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0]
+            trees = [stage[0].tree_ for stage in estimators]
+            kind = "boosting"
+            learning_rate = model.learning_rate
+            link_scale = _LINK_SCALES[link_name]
+        else:
+            if getattr(model, "n_outputs_", 1) != 1:
+                raise ValueError("Only single-output forests can be compiled")
+            trees = [estimator.tree_ for estimator in estimators]
+            kind = "forest"
+            learning_rate = 1.0
+            baseline = None
+            link_scale = 1.0
+            n_classes = len(model.classes_)
+            # sklearn 1.4부터 분류 트리는 리프에 클래스 비율을 저장하고 predict_proba에서 다시 정규화하지 않는다
+            import sklearn
+            normalize_leaves = tuple(int(part) for part in sklearn.__version__.split(".")[:2]) < (1, 4)
+
+        feature: List[np.ndarray] = []
+        threshold: List[np.ndarray] = []
+        children: List[np.ndarray] = []
+        missing_left: List[np.ndarray] = []
+        value: List[np.ndarray] = []
+        roots = []
+        offset = 0
+        for tree in trees:
+            node_ids = np.arange(tree.node_count, dtype=np.int64)
+            is_leaf = tree.children_left == -1
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+            children.append(np.stack([
+                np.where(is_leaf, node_ids, tree.children_left),
+                np.where(is_leaf, node_ids, tree.children_right),
+            ], axis=1) + offset)
+            missing = getattr(tree, "missing_go_to_left", None)
+            missing_left.append(np.zeros(tree.node_count, dtype=bool) if missing is None else missing.astype(bool))
+            if kind == "forest":
+                proba = tree.value[:, 0, :n_classes].copy()
+                if normalize_leaves:
+                    # sklearn < 1.4의 DecisionTreeClassifier.predict_proba는 리프의 샘플 수를 정규화
+                    normalizer = proba.sum(axis=1)[:, np.newaxis]
+                    normalizer[normalizer == 0.0] = 1.0
+                    proba /= normalizer
+                value.append(proba)
+            else:
+                value.append(tree.value[:, 0, 0].copy())
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            kind=kind,
+            classes=model.classes_,
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            children=np.concatenate(children),
+            missing_left=np.concatenate(missing_left),
+            value=np.concatenate(value),
+            roots=np.array(roots, dtype=np.int64),
+            max_depth=max(tree.max_depth for tree in trees),
+            n_features=model.n_features_in_,
+            learning_rate=learning_rate,
+            baseline=baseline,
+            link_scale=link_scale,
+        )
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        행별로 각 트리의 도달 리프 (전체 노드 배열 기준 인덱스)
+
+        Returns:
+            (행 수, 트리 수) int64 행렬
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X must have shape (n, {self.n_features_in_}), got {X.shape}")
+
+        leaves = np.empty((X.shape[0], len(self.roots)), dtype=np.int64)
+        for start in range(0, X.shape[0], _BLOCK_ROWS):
+            block = np.ascontiguousarray(X[start:start + _BLOCK_ROWS])
+            flat = block.ravel()
+            row_offsets = (np.arange(block.shape[0], dtype=np.int64) * block.shape[1])[:, np.newaxis]
+            has_nan = bool(np.isnan(flat).any())
+            nodes = np.broadcast_to(self.roots, (block.shape[0], len(self.roots))).copy()
+            for _ in range(self.max_depth):
+                values = flat[row_offsets + self.feature[nodes]]
+                go_right = ~(values <= self.threshold[nodes])
+                if has_nan:
+                    go_right = np.where(np.isnan(values), ~self.missing_left[nodes], go_right)
+                nodes = self._children[2 * nodes + go_right]
+            leaves[start:start + _BLOCK_ROWS] = nodes
+        return leaves
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """boosting의 raw 예측값 (GradientBoostingClassifier.decision_function과 동일)"""
+        if self.kind != "boosting":
+            raise ValueError("decision_function is only available for boosting ensembles")
+        leaves = self.apply(X)
+        raw = np.full(leaves.shape[0], self.baseline[0], dtype=np.float64)
+        for stage in range(leaves.shape[1]):
+            raw += self.learning_rate * self.value[leaves[:, stage]]
+        return raw
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        클래스 확률 (sklearn predict_proba와 비트 단위로 동일)
+
+        Returns:
+            (행 수, 클래스 수) float64 행렬
+        """
+        if self.kind == "boosting":
+            proba = np.empty((np.shape(X)[0], 2), dtype=np.float64)
+            proba[:, 1] = _expit(self.link_scale * self.decision_function(X))
+            proba[:, 0] = 1 - proba[:, 1]
+            return proba
+
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[0], self.value.shape[1]), dtype=np.float64)
+        for tree in range(leaves.shape[1]):
+            proba += self.value[leaves[:, tree]]
+        proba /= leaves.shape[1]
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """클래스 예측"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """저장용 배열"""
+        return {
+            "classes": self.classes_,
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "children": self.children,
+            "missing_left": self.missing_left,
+            "value": self.value,
+            "roots": self.roots,
+            "baseline": self.baseline,
+        }
+
+
+def save_compiled_model(
+    path: Path,
+    model: CompiledTreeEnsemble,
+    scaler: Optional[Any] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    컴파일된 모델을 .npz로 저장 (pickle 없이 배열 + JSON 메타데이터)
+
+    Args:
+        path: 저장 경로 (.npz)
+        model: CompiledTreeEnsemble
+        scaler: StandardScaler 또는 CompiledScaler (선택적)
+        metadata: 함께 저장할 값 (model_type, use_ppr_features 등, JSON 직렬화 가능)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if scaler is not None and not isinstance(scaler, CompiledScaler):
+        scaler = CompiledScaler.from_sklearn(scaler)
+
+    arrays = model.to_arrays()
+    header = {
+        "version": COMPILED_FORMAT_VERSION,
+        "kind": model.kind,
+        "max_depth": model.max_depth,
+        "n_features": model.n_features_in_,
+        "learning_rate": model.learning_rate,
+        "link_scale": model.link_scale,
+        "has_mean": scaler is not None and scaler.mean_ is not None,
+        "has_scale": scaler is not None and scaler.scale_ is not None,
+        "metadata": metadata or {},
+    }
+    if header["has_mean"]:
+        arrays["scaler_mean"] = scaler.mean_
+    if header["has_scale"]:
+        arrays["scaler_scale"] = scaler.scale_
+    arrays["header"] = np.frombuffer(json.dumps(header, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    tmp_path.replace(path)
+
+
+def _npz_memmap(path: Path) -> Dict[str, np.ndarray]:
+    """
+    압축하지 않은 .npz(np.savez)의 각 배열을 파일에서 바로 memory-map
+
+    zip 멤버의 로컬 헤더와 .npy 헤더를 건너뛴 위치를 offset으로 np.memmap을 만든다.
+
+    Raises:
+        ValueError: 압축된 멤버가 있는 경우 (memory-map 불가)
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as raw:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Compressed member cannot be memory-mapped: {info.filename}")
+            with archive.open(info) as member:
+                version = np.lib.format.read_magic(member)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(member)
+                else:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(member)
+                header_size = member.tell()
+            # 로컬 파일 헤더 (30바이트 + 파일 이름 + extra 필드) 다음이 멤버 데이터
+            raw.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", raw.read(4))
+            offset = info.header_offset + 30 + name_length + extra_length + header_size
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(
+                    path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                    order="F" if fortran_order else "C"
+                )
+    return arrays
+
+
+def load_compiled_model(path: Path, mmap: bool = False) -> Dict[str, Any]:
+    """
+    .npz 컴파일 모델 로드
+
+    Args:
+        path: .npz 경로
+        mmap: True면 노드 배열을 읽어 들이지 않고 memory-map (여러 워커가 페이지 캐시를 공유)
+
+    Returns:
+        {"model": CompiledTreeEnsemble, "scaler": CompiledScaler 또는 None, **metadata}
+        (pickle 모델 파일과 같은 형태)
+    """
+    path = Path(path)
+    if mmap:
+        data = _npz_memmap(path)
+    else:
+        with np.load(path, allow_pickle=False) as archive:
+            data = {name: archive[name] for name in archive.files}
+
+    header = json.loads(np.asarray(data["header"]).tobytes().decode("utf-8"))
+    if header.get("version") != COMPILED_FORMAT_VERSION:
+        raise ValueError(f"Unsupported compiled model version: {header.get('version')}")
+    model = CompiledTreeEnsemble(
+        kind=header["kind"],
+        classes=data["classes"],
+        feature=data["feature"],
+        threshold=data["threshold"],
+        children=data["children"],
+        missing_left=data["missing_left"],
+        value=data["value"],
+        roots=data["roots"],
+        max_depth=header["max_depth"],
+        n_features=header["n_features"],
+        learning_rate=header["learning_rate"],
+        baseline=data["baseline"],
+        link_scale=header["link_scale"],
+    )
+    scaler = None
+    if header["has_mean"] or header["has_scale"]:
+        scaler = CompiledScaler(
+            data["scaler_mean"] if header["has_mean"] else None,
+            data["scaler_scale"] if header["has_scale"] else None,
+        )
+    return {**header["metadata"], "model": model, "scaler": scaler}
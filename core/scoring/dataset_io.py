@@ -0,0 +1,536 @@
+"""
+데이터셋 입출력 계층
+
+학습/평가 스크립트가 데이터셋 파일을 통째로 json.load 하지 않도록 포맷별 로더를 하나의 API로 묶는다.
+
+지원 포맷 (경로 접미사 또는 fmt 인자로 지정):
+    .json   기존 포맷 (레코드 리스트 전체를 한 번에 로드)
+    .jsonl  한 줄에 레코드 하나, iter_dataset()으로 스트리밍
+    .cols   컬럼형 디렉토리 (schema.json + 컬럼별 .npy), np.load(mmap_mode="r")로 열어
+            행을 접근할 때만 dict로 복원
+
+컬럼형 포맷:
+    - 최상위 스칼라 필드는 컬럼 하나로 저장 ("usd_value", "ground_truth_label" ...)
+    - 모든 행에서 dict인 필드(ml_features, tx_context)는 한 단계 펼쳐서 "ml_features.ppr_score"처럼 저장
+    - bool/int/float 컬럼은 고정 길이 배열, str 컬럼은 UTF-8 바이트 + 오프셋 배열
+    - int와 float가 섞인 컬럼은 float64로 저장 (정수 값도 float로 복원됨)
+    - 그 밖에 타입이 섞였거나 리스트/dict 값(rule_results 등)은 JSON 문자열로 저장
+    - 일부 행에만 있는 필드는 .mask.npy로 존재 여부를 기록해 원래 dict를 그대로 복원
+
+사용법:
+    train_path = resolve_dataset_path("data/dataset/train.json", fmt="cols")   # → data/dataset/train.cols
+    train_data = load_dataset(train_path)                            # Sequence[Dict], len()/인덱싱/반복 지원
+    train_data = load_dataset(train_path, fields=["from", "to", "ml_features"])   # .cols: 이 필드만 블록 단위로 복원
+    labels = dataset_column(train_data, "ground_truth_label")        # 컬럼형이면 행 복원 없이 컬럼만 읽기
+    records = dataset_records(train_data, ["from", "to", "ml_features"])   # 필요한 필드만 컬럼 단위로 복원
+
+    for record in iter_dataset("data/dataset/full.jsonl"):           # 스트리밍
+        ...
+
+    save_dataset(records, "data/dataset/train.cols")
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Sequence, Union
+
+import numpy as np
+
+
+SCHEMA_VERSION = 1
+FORMATS = ("cols", "jsonl", "json")
+# ColumnarDataset 반복 시 한 번에 복원할 행 수 (컬럼 단위 디코딩 묶음)
+ITER_BLOCK_ROWS = 4096
+
+PathLike = Union[str, Path]
+
+
+def _suffix_format(path: Path) -> str:
+    """경로 접미사 → 포맷 이름 (알 수 없으면 json)"""
+    suffix = path.suffix.lstrip(".").lower()
+    return suffix if suffix in FORMATS else "json"
+
+
+def resolve_dataset_path(path: PathLike, fmt: Optional[str] = None) -> Optional[Path]:
+    """
+    지정한 포맷의 데이터셋 경로 확인
+
+    포맷은 호출자가 명시한다 (파일 수정 시각 등으로 다른 포맷을 몰래 고르지 않음).
+    data/dataset/train.json과 fmt="cols"를 넘기면 data/dataset/train.cols를 찾는다.
+
+    Args:
+        path: 데이터셋 경로
+        fmt: 포맷 (FORMATS 중 하나, None이면 path의 접미사 그대로)
+
+    Returns:
+        존재하는 데이터셋 경로 (없으면 None)
+
+    Raises:
+        ValueError: 지원하지 않는 포맷인 경우
+    """
+    path = Path(path)
+    if fmt is not None:
+        if fmt not in FORMATS:
+            raise ValueError(f"지원하지 않는 데이터셋 포맷: {fmt} ({', '.join(FORMATS)})")
+        path = path.with_suffix(f".{fmt}")
+    return path if path.exists() else None
+
+
+def load_dataset(path: PathLike, fields: Optional[Iterable[str]] = None) -> Sequence[Dict[str, Any]]:
+    """
+    데이터셋 로드 (포맷 자동 판별)
+
+    Args:
+        path: 데이터셋 경로 (.cols 디렉토리, .jsonl, .json)
+        fields: .cols에서 복원할 최상위 필드 (None이면 전체, 다른 포맷은 전체 레코드)
+
+    Returns:
+        레코드 시퀀스 (.cols는 mmap 기반 ColumnarDataset, 나머지는 list)
+    """
+    path = Path(path)
+    fmt = _suffix_format(path)
+    if fmt == "cols":
+        return ColumnarDataset(path, fields)
+    if fmt == "jsonl":
+        return list(_iter_jsonl(path))
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def dataset_column(data: Sequence[Dict[str, Any]], name: str, default: Any = None) -> List[Any]:
+    """
+    데이터셋에서 컬럼 하나 읽기 (포맷 무관)
+
+    ColumnarDataset이면 column()으로 행 복원 없이 읽고, list면 레코드에서 꺼낸다.
+
+    Args:
+        data: load_dataset() 결과
+        name: 컬럼 이름 (하위 필드는 "ml_features.ppr_score"처럼 점으로 구분)
+        default: 값이 없는 행에 채울 값
+
+    Returns:
+        행 순서대로의 값 리스트
+    """
+    if isinstance(data, ColumnarDataset):
+        if name not in data.columns:
+            return [default] * len(data)
+        values = data.column(name, default)
+        return values.tolist() if isinstance(values, np.ndarray) else values
+
+    parent, _, child = name.partition(".")
+    values = []
+    for record in data:
+        value = record.get(parent, default)
+        if child:
+            value = value.get(child, default) if isinstance(value, dict) else default
+        values.append(value)
+    return values
+
+
+def dataset_records(
+    data: Sequence[Dict[str, Any]],
+    fields: Optional[Iterable[str]] = None
+) -> Sequence[Dict[str, Any]]:
+    """
+    레코드 시퀀스 (필요한 최상위 필드만)
+
+    ColumnarDataset이면 지정한 필드의 컬럼만 통째로 디코딩해 dict로 조립한다 (행 단위 복원보다 빠름).
+    list면 그대로 돌려준다.
+
+    Args:
+        data: load_dataset() 결과
+        fields: 복원할 최상위 필드 (None이면 전체)
+    """
+    if isinstance(data, ColumnarDataset):
+        return data.records(fields)
+    return data
+
+
+def iter_dataset(path: PathLike) -> Iterator[Dict[str, Any]]:
+    """
+    레코드를 하나씩 스트리밍
+
+    .jsonl과 .cols는 한 번에 한 레코드만 메모리에 올린다.
+    .json은 포맷 특성상 전체를 로드한 뒤 순회한다.
+
+    Args:
+        path: 데이터셋 경로
+    """
+    path = Path(path)
+    fmt = _suffix_format(path)
+    if fmt == "jsonl":
+        return _iter_jsonl(path)
+    return iter(load_dataset(path))
+
+
+def save_dataset(records: Iterable[Dict[str, Any]], path: PathLike) -> Path:
+    """
+    데이터셋 저장 (포맷은 경로 접미사로 결정, 임시 경로에 쓴 뒤 교체)
+
+    Args:
+        records: 레코드들 (.jsonl은 제너레이터도 스트리밍으로 저장)
+        path: 저장 경로 (.cols, .jsonl, .json)
+
+    Returns:
+        저장된 경로
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    fmt = _suffix_format(path)
+
+    if fmt == "cols":
+        _write_columnar(records, tmp_path)
+    else:
+        with open(tmp_path, "w") as f:
+            if fmt == "jsonl":
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False))
+                    f.write("\n")
+            else:
+                json.dump(list(records), f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+
+    _replace(tmp_path, path)
+    return path
+
+
+def convert_dataset(src: PathLike, dst: PathLike) -> Path:
+    """
+    데이터셋 포맷 변환 (예: diverse_rules.json → diverse_rules.cols)
+
+    Args:
+        src: 원본 경로
+        dst: 대상 경로
+
+    Returns:
+        저장된 경로
+    """
+    src = Path(src)
+    if _suffix_format(src) == "jsonl" and _suffix_format(Path(dst)) == "jsonl":
+        return save_dataset(_iter_jsonl(src), dst)
+    return save_dataset(load_dataset(src), dst)
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _replace(tmp_path: Path, path: Path) -> None:
+    """tmp_path로 path를 교체 (디렉토리는 os.replace가 덮어쓰지 못하므로 기존 것을 옮긴 뒤 삭제)"""
+    if tmp_path.is_dir() and path.exists():
+        old_path = path.with_name(f".{path.name}.{os.getpid()}.old")
+        os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        if old_path.is_dir():
+            shutil.rmtree(old_path)
+        else:
+            old_path.unlink()
+    else:
+        os.replace(tmp_path, path)
+
+
+# ---------------------------------------------------------------------------
+# 컬럼형 포맷
+# ---------------------------------------------------------------------------
+
+def _value_kind(value: Any) -> str:
+    """단일 값의 저장 타입 (bool은 int의 하위 타입이므로 먼저 검사)"""
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int64" if -2 ** 63 <= value < 2 ** 63 else "json"
+    if isinstance(value, float):
+        return "float64"
+    if isinstance(value, str):
+        return "str"
+    return "json"
+
+
+def _merge_kind(current: Optional[str], kind: str) -> str:
+    """두 저장 타입을 합친 타입 (int64 + float64는 float64, 그 밖에 다르면 json)"""
+    if current is None or current == kind:
+        return kind
+    if {current, kind} == {"int64", "float64"}:
+        return "float64"
+    return "json"
+
+
+def _column_file(name: str) -> str:
+    """컬럼 이름 → 파일 이름 (경로 구분자 등 파일명에 쓸 수 없는 문자 치환)"""
+    return "".join(c if c.isalnum() or c in "._-" else "_" for c in name)
+
+
+def _infer_schema(records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    레코드들에서 컬럼 스키마 추론
+
+    Returns:
+        [{"name", "kind", "parent"}] - 펼쳐진 하위 필드는 parent에 상위 필드 이름
+    """
+    top_kinds: Dict[str, Optional[str]] = {}
+    is_struct: Dict[str, bool] = {}
+    child_kinds: Dict[str, Dict[str, Optional[str]]] = {}
+
+    for record in records:
+        for key, value in record.items():
+            if key not in top_kinds:
+                top_kinds[key] = None
+                is_struct[key] = True
+                child_kinds[key] = {}
+            if isinstance(value, dict) and all(isinstance(k, str) for k in value):
+                # 다른 행에 dict가 아닌 값이 있으면 펼치지 않으므로 dict 값도 json으로 합쳐 둔다
+                top_kinds[key] = _merge_kind(top_kinds[key], "json")
+                children = child_kinds[key]
+                for child_key, child_value in value.items():
+                    children[child_key] = _merge_kind(children.get(child_key), _value_kind(child_value))
+            else:
+                is_struct[key] = False
+                top_kinds[key] = _merge_kind(top_kinds[key], _value_kind(value))
+
+    schema = []
+    for key in top_kinds:
+        if is_struct[key]:
+            schema.append({"name": key, "kind": "struct", "parent": None})
+            for child_key, kind in child_kinds[key].items():
+                schema.append({"name": f"{key}.{child_key}", "kind": kind, "parent": key})
+        else:
+            schema.append({"name": key, "kind": top_kinds[key] or "json", "parent": None})
+    return schema
+
+
+def _write_columnar(records: Iterable[Dict[str, Any]], out_dir: Path) -> None:
+    """레코드들을 컬럼형 디렉토리로 저장 (스키마 추론과 쓰기에 두 번 순회)"""
+    if not isinstance(records, Sequence):
+        records = list(records)
+    n = len(records)
+    schema = _infer_schema(records)
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True)
+
+    columns = []
+    for column in schema:
+        name, kind, parent = column["name"], column["kind"], column["parent"]
+        child_key = name[len(parent) + 1:] if parent else None
+
+        present = np.zeros(n, dtype=bool)
+        values: List[Any] = [None] * n
+        for i, record in enumerate(records):
+            if parent is not None:
+                container = record.get(parent)
+                if not isinstance(container, dict) or child_key not in container:
+                    continue
+                values[i] = container[child_key]
+            else:
+                if name not in record:
+                    continue
+                values[i] = record[name]
+            present[i] = True
+
+        file_stem = _column_file(name)
+        entry = {"name": name, "kind": kind, "parent": parent, "file": file_stem, "masked": not present.all()}
+        if entry["masked"]:
+            np.save(out_dir / f"{file_stem}.mask.npy", present)
+
+        if kind in ("bool", "int64", "float64"):
+            fill = False if kind == "bool" else 0
+            array = np.array([v if ok else fill for v, ok in zip(values, present)], dtype=kind)
+            np.save(out_dir / f"{file_stem}.npy", array)
+        elif kind in ("str", "json"):
+            encoded = [
+                (v if kind == "str" else json.dumps(v, ensure_ascii=False)).encode("utf-8") if ok else b""
+                for v, ok in zip(values, present)
+            ]
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(b) for b in encoded])
+            np.save(out_dir / f"{file_stem}.offsets.npy", offsets)
+            np.save(out_dir / f"{file_stem}.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+        columns.append(entry)
+
+    with open(out_dir / "schema.json", "w") as f:
+        json.dump({"version": SCHEMA_VERSION, "num_rows": n, "columns": columns}, f, indent=2, ensure_ascii=False)
+
+
+class ColumnarDataset(Sequence):
+    """
+    컬럼형 데이터셋 (읽기 전용, mmap)
+
+    list처럼 len()/인덱싱/슬라이싱/반복을 지원하며, 행은 접근할 때 dict로 복원한다.
+    스코어러나 스크립트의 기존 `for item in data` 코드를 그대로 쓸 수 있다.
+    반복과 슬라이싱은 ITER_BLOCK_ROWS행씩 컬럼 단위로 디코딩한 뒤 dict를 조립하고,
+    여러 행이 필요한 코드는 column() / records()로 필요한 컬럼만 읽는 편이 빠르다.
+    fields를 지정하면 행 복원(반복/인덱싱/records)은 그 최상위 필드만 디코딩한다.
+    """
+
+    def __init__(self, path: PathLike, fields: Optional[Iterable[str]] = None):
+        """
+        Args:
+            path: .cols 디렉토리 경로
+            fields: 행 복원 시 디코딩할 최상위 필드 (None이면 전체, column()에는 적용하지 않음)
+        """
+        self.path = Path(path)
+        self.fields = None if fields is None else set(fields)
+        with open(self.path / "schema.json", "r") as f:
+            schema = json.load(f)
+        if schema.get("version") != SCHEMA_VERSION:
+            raise ValueError(f"지원하지 않는 컬럼형 스키마 버전: {schema.get('version')} ({self.path})")
+
+        self.num_rows = schema["num_rows"]
+        self.schema = schema["columns"]
+        self._data: Dict[str, np.ndarray] = {}
+        self._offsets: Dict[str, np.ndarray] = {}
+        self._masks: Dict[str, np.ndarray] = {}
+        for column in self.schema:
+            name, stem = column["name"], column["file"]
+            if column["masked"]:
+                self._masks[name] = np.load(self.path / f"{stem}.mask.npy", mmap_mode="r")
+            if column["kind"] == "struct":
+                continue
+            self._data[name] = np.load(self.path / f"{stem}.npy", mmap_mode="r")
+            if column["kind"] in ("str", "json"):
+                self._offsets[name] = np.load(self.path / f"{stem}.offsets.npy", mmap_mode="r")
+
+    @property
+    def columns(self) -> List[str]:
+        """값이 있는 컬럼 이름 (struct 컬럼 제외)"""
+        return [column["name"] for column in self.schema if column["kind"] != "struct"]
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.num_rows)
+            if step != 1:
+                return [self._row(i) for i in range(start, stop, step)]
+            return self._block(start, max(start, stop), self.fields)
+        if index < 0:
+            index += self.num_rows
+        if not 0 <= index < self.num_rows:
+            raise IndexError("ColumnarDataset index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for start in range(0, self.num_rows, ITER_BLOCK_ROWS):
+            yield from self._block(start, min(start + ITER_BLOCK_ROWS, self.num_rows), self.fields)
+
+    def records(self, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        전체 행을 dict 리스트로 복원 (컬럼 단위 디코딩)
+
+        Args:
+            fields: 복원할 최상위 필드 (None이면 생성 시 지정한 필드, 없는 필드는 무시)
+        """
+        return self._block(0, self.num_rows, self.fields if fields is None else fields)
+
+    def column(self, name: str, default: Any = None) -> Union[np.ndarray, List[Any]]:
+        """
+        컬럼 하나를 행 복원 없이 읽기
+
+        Args:
+            name: 컬럼 이름 ("ground_truth_label", "ml_features.ppr_score" ...)
+            default: 값이 없는 행에 채울 값
+
+        Returns:
+            숫자/bool 컬럼은 np.ndarray (default가 None이면 없는 행은 0/False), str/json 컬럼은 list
+        """
+        column = self._column_entry(name)
+        kind = column["kind"]
+        mask = self._masks.get(name)
+
+        if kind in ("bool", "int64", "float64"):
+            array = np.array(self._data[name])
+            if mask is not None and default is not None:
+                array = np.where(mask, array, default)
+            return array
+
+        return self._decode_range(name, kind, 0, self.num_rows, default)
+
+    def _column_entry(self, name: str) -> Dict[str, Any]:
+        for column in self.schema:
+            if column["name"] == name and column["kind"] != "struct":
+                return column
+        raise KeyError(name)
+
+    def _decode(self, name: str, kind: str, i: int) -> Any:
+        if kind in ("bool", "int64", "float64"):
+            return self._data[name][i].item()
+        offsets = self._offsets[name]
+        text = self._data[name][offsets[i]:offsets[i + 1]].tobytes().decode("utf-8")
+        return text if kind == "str" else json.loads(text)
+
+    def _decode_range(self, name: str, kind: str, start: int, stop: int, default: Any = None) -> List[Any]:
+        """[start, stop) 행의 값을 한 번에 디코딩 (값이 없는 행은 default)"""
+        mask = self._masks.get(name)
+        present = [True] * (stop - start) if mask is None else np.asarray(mask[start:stop]).tolist()
+        if kind in ("bool", "int64", "float64"):
+            values = np.asarray(self._data[name][start:stop]).tolist()
+            return [v if ok else default for v, ok in zip(values, present)]
+
+        offsets = np.asarray(self._offsets[name][start:stop + 1])
+        base = int(offsets[0])
+        text = np.asarray(self._data[name][base:int(offsets[-1])]).tobytes()
+        bounds = (offsets - base).tolist()
+        values = []
+        for j, ok in enumerate(present):
+            if not ok:
+                values.append(default)
+                continue
+            value = text[bounds[j]:bounds[j + 1]].decode("utf-8")
+            values.append(value if kind == "str" else json.loads(value))
+        return values
+
+    def _block(self, start: int, stop: int, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """[start, stop) 행을 컬럼 단위로 디코딩해 레코드 dict로 조립 (_row와 같은 결과)"""
+        wanted = None if fields is None else set(fields)
+        n = stop - start
+        records: List[Dict[str, Any]] = [{} for _ in range(n)]
+        missing = object()
+        for column in self.schema:
+            name, kind, parent = column["name"], column["kind"], column["parent"]
+            if wanted is not None and (parent or name) not in wanted:
+                continue
+            if kind == "struct":
+                mask = self._masks.get(name)
+                present = [True] * n if mask is None else np.asarray(mask[start:stop]).tolist()
+                for record, ok in zip(records, present):
+                    if ok:
+                        record[name] = {}
+                continue
+            values = self._decode_range(name, kind, start, stop, missing)
+            if parent is None:
+                for record, value in zip(records, values):
+                    if value is not missing:
+                        record[name] = value
+            else:
+                child_key = name[len(parent) + 1:]
+                for record, value in zip(records, values):
+                    if value is not missing and parent in record:
+                        record[parent][child_key] = value
+        return records
+
+    def _row(self, i: int) -> Dict[str, Any]:
+        """i번째 행을 원래 레코드 dict로 복원"""
+        record: Dict[str, Any] = {}
+        for column in self.schema:
+            name, kind, parent = column["name"], column["kind"], column["parent"]
+            if self.fields is not None and (parent or name) not in self.fields:
+                continue
+            mask = self._masks.get(name)
+            if mask is not None and not mask[i]:
+                continue
+            if kind == "struct":
+                record[name] = {}
+            elif parent is None:
+                record[name] = self._decode(name, kind, i)
+            elif parent in record:
+                record[parent][name[len(parent) + 1:]] = self._decode(name, kind, i)
+        return record
@@ -10,7 +10,9 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timezone
 
 from core.rules.evaluator import RuleEvaluator
+from core.rules.metadata import TAG_BITS, EXPLAIN_BITS
 from core.data.lists import ListLoader
+from core.aggregation.proximity_index import SanctionProximityIndex
 
 
 @dataclass
@@ -62,8 +64,11 @@ class TransactionScorer:
         Args:
             rules_path: 룰북 YAML 파일 경로
         """
-        self.rule_evaluator = RuleEvaluator(rules_path)
         self.list_loader = ListLoader()
+        # 엔진 공유 제재 근접도 인덱스 (E-102를 요청마다 그래프를 만들지 않고 조회로 평가)
+        self.proximity_index = SanctionProximityIndex.from_list_loader(self.list_loader)
+        self.rule_evaluator = RuleEvaluator(rules_path, proximity_index=self.proximity_index)
+        self.rule_metadata = self.rule_evaluator.rule_metadata
     
     def score_transaction(self, tx_input: TransactionInput) -> ScoringResult:
         """
@@ -147,7 +152,10 @@ class TransactionScorer:
         try:
             from .ai_weight_learner import RuleWeightLearner
             if not hasattr(self, '_weight_learner'):
-                self._weight_learner = RuleWeightLearner(use_ai=False)  # 규칙 기반으로 시작
+                self._weight_learner = RuleWeightLearner(
+                    use_ai=False,  # 규칙 기반으로 시작
+                    rule_metadata=self.rule_metadata
+                )
             
             # 가중치 적용 점수 계산
             return self._weight_learner.calculate_weighted_score(rule_results)
@@ -190,34 +198,9 @@ class TransactionScorer:
         rule_results: List[Dict[str, Any]],
         tx: TransactionInput
     ) -> List[str]:
-        """Risk Tags 생성"""
-        tags = set()
-        
-        # 룰 로더에서 룰 이름 가져오기
-        from ..rules.loader import RuleLoader
-        rule_loader = RuleLoader()
-        rules = rule_loader.get_rules()
-        rule_map = {rule.get("id"): rule.get("name", rule.get("id")) for rule in rules if rule.get("id")}
-        
-        # 룰 결과에서 태그 추출
-        for result in rule_results:
-            rule_id = result.get("rule_id", "")
-            rule_name = rule_map.get(rule_id, "").lower()
-            
-            if "mixer" in rule_name or "E-101" in rule_id:
-                tags.add("mixer_inflow")
-            if "sanction" in rule_name or "C-001" in rule_id:
-                tags.add("sanction_exposure")
-            if "scam" in rule_name:
-                tags.add("scam_exposure")
-            if "high-value" in rule_name or "C-003" in rule_id or "C-004" in rule_id:
-                tags.add("high_value_transfer")
-            if "bridge" in rule_name:
-                tags.add("bridge_large_transfer")
-            if "cex" in rule_name:
-                tags.add("cex_inflow")
-        
-        return sorted(list(tags))
+        """Risk Tags 생성 (룰 메타데이터 태그 비트마스크 OR, suspicious_pattern은 주소 분석 전용)"""
+        mask = self.rule_metadata.tag_mask(result.get("rule_id", "") for result in rule_results)
+        return self.rule_metadata.tag_names(mask & ~TAG_BITS["suspicious_pattern"])
     
     def _generate_explanation(
         self,
@@ -229,28 +212,21 @@ class TransactionScorer:
         if not rule_results:
             return "정상 거래 패턴으로 리스크가 낮습니다."
         
-        # 룰 로더에서 룰 이름 가져오기
-        from ..rules.loader import RuleLoader
-        rule_loader = RuleLoader()
-        rules = rule_loader.get_rules()
-        rule_map = {rule.get("id"): rule.get("name", rule.get("id")) for rule in rules if rule.get("id")}
+        explain_mask = self.rule_metadata.explain_mask(r.get("rule_id", "") for r in rule_results)
         
         parts = []
         
         # Mixer 관련
-        mixer_rules = [r for r in rule_results if "E-101" in r.get("rule_id", "")]
-        if mixer_rules or tx.is_mixer:
+        if explain_mask & EXPLAIN_BITS["mixer"] or tx.is_mixer:
             amount_text = f"{tx.amount_usd:,.0f}USD 이상" if tx.amount_usd >= 1000 else f"{tx.amount_usd:,.0f}USD"
             parts.append(f"1-hop sanctioned mixer에서 {amount_text} 유입")
         
         # 제재 주소 관련
-        sanction_rules = [r for r in rule_results if "C-001" in r.get("rule_id", "")]
-        if sanction_rules or tx.is_sanctioned:
+        if explain_mask & EXPLAIN_BITS["sanction"] or tx.is_sanctioned:
             parts.append("제재 대상과 거래")
         
         # 고액 거래 관련
-        high_value_rules = [r for r in rule_results if "C-003" in r.get("rule_id", "") or "C-004" in r.get("rule_id", "")]
-        if high_value_rules or tx.amount_usd >= 1000:
+        if explain_mask & (EXPLAIN_BITS["high_value"] | EXPLAIN_BITS["repeated"]) or tx.amount_usd >= 1000:
             parts.append(f"고액 거래 ({tx.amount_usd:,.0f}USD)")
         
         if not parts:
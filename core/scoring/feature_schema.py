@@ -0,0 +1,313 @@
+"""
+선언형 feature 스키마
+
+컬럼마다 이름, 값 출처, 기본값, 클리핑 범위, log 변환을 선언하고
+FeatureSchema.build()가 여러 샘플을 미리 할당한 행렬에 컬럼 단위로 채운다.
+스키마 해시는 선언 내용 전체로 계산하므로 모델 파일에 기록해 두면 학습/서빙 feature 불일치를 잡을 수 있다.
+
+값 출처 (source):
+    stage1.<key>             1단계 결과 값 (필수)
+    ml.<key>                 ml_features 값 (fallback으로 ctx.<key> 지정 가능)
+    ctx.<key>                tx_context 값
+    rules.count              발동 룰 개수
+    rules.axis.<A>           축별 발동 룰 개수 (axis 없으면 "B")
+    rules.severity.<HIGH>    심각도별 발동 룰 개수 (severity 없으면 "MEDIUM")
+    const                    항상 기본값 (비활성화된 feature)
+
+값 변환 순서: clip_min → log1p(양수만, 나머지 0) → clip_max
+클리핑은 Python min/max와 같게 동작한다 (NaN은 경계값 쪽으로).
+
+사용법:
+    schema = stage2_feature_schema(use_ppr_features=True)
+    X = schema.build(stage1_results, ml_features_list, tx_context_list)  # (n, 30) float32
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+
+SCHEMA_FORMAT_VERSION = 1
+
+# rules.* 출처의 기본 축/심각도 (rule_results에 값이 없을 때)
+DEFAULT_AXIS = "B"
+DEFAULT_SEVERITY = "MEDIUM"
+
+
+@dataclass(frozen=True)
+class FeatureColumn:
+    """feature 컬럼 선언"""
+    name: str
+    source: str
+    default: float = 0.0
+    fallback: Optional[str] = None  # ml.<key>가 없을 때 대신 읽을 출처 (ctx.<key>)
+    clip_min: Optional[float] = None
+    clip_max: Optional[float] = None
+    log1p: bool = False  # 양수만 log1p, 0 이하는 0
+
+
+class FeatureSchema:
+    """
+    고정 스키마 feature 행렬 빌더
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: List[FeatureColumn],
+        dtype: str = "float32",
+        nan: float = 0.0,
+        posinf: float = 100.0,
+        neginf: float = 0.0
+    ):
+        """
+        Args:
+            name: 스키마 이름
+            columns: 컬럼 선언 (순서가 feature 순서)
+            dtype: 결과 행렬 dtype
+            nan, posinf, neginf: 마지막에 np.nan_to_num으로 바꿀 값
+        """
+        names = [column.name for column in columns]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate feature names in schema {name}")
+        for column in columns:
+            kind = column.source.split(".", 1)[0]
+            if kind not in ("stage1", "ml", "ctx", "rules", "const"):
+                raise ValueError(f"Unknown feature source: {column.source}")
+        self.name = name
+        self.columns = list(columns)
+        self.dtype = np.dtype(dtype)
+        self.nan = nan
+        self.posinf = posinf
+        self.neginf = neginf
+        self._hash = None
+
+    @property
+    def names(self) -> List[str]:
+        return [column.name for column in self.columns]
+
+    @property
+    def dim(self) -> int:
+        return len(self.columns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """스키마 선언 (해시 대상)"""
+        return {
+            "format": SCHEMA_FORMAT_VERSION,
+            "name": self.name,
+            "dtype": self.dtype.name,
+            "nan_to_num": [self.nan, self.posinf, self.neginf],
+            "columns": [asdict(column) for column in self.columns],
+        }
+
+    def hash(self) -> str:
+        """스키마 해시 (컬럼 선언이 하나라도 바뀌면 달라짐)"""
+        if self._hash is None:
+            payload = json.dumps(self.to_dict(), sort_keys=True)
+            self._hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        return self._hash
+
+    def check(self, schema_hash: Optional[str], what: str = "model") -> None:
+        """
+        모델 등에 기록된 스키마 해시 확인
+
+        Raises:
+            ValueError: 해시가 다른 경우 (None이면 확인하지 않음 - 해시 기록 이전 파일)
+        """
+        if schema_hash is not None and schema_hash != self.hash():
+            raise ValueError(
+                f"Feature schema mismatch: {what} expects {schema_hash}, "
+                f"{self.name} produces {self.hash()}"
+            )
+
+    def build(
+        self,
+        stage1_results: List[Dict[str, Any]],
+        ml_features_list: List[Dict[str, Any]],
+        tx_context_list: List[Dict[str, Any]],
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        feature 행렬 계산
+
+        Args:
+            stage1_results: 1단계 결과 (None 불가)
+            ml_features_list: ml_features (샘플 순서)
+            tx_context_list: tx_context (샘플 순서)
+            out: 결과를 채울 (n, dim) 행렬 (None이면 새로 할당)
+
+        Returns:
+            (n, dim) 행렬
+
+        Raises:
+            KeyError, TypeError, ValueError: 필수 값이 없거나 숫자가 아닌 경우
+        """
+        n = len(stage1_results)
+        if out is None:
+            out = np.empty((n, self.dim), dtype=self.dtype)
+
+        rule_counts = self._rule_counts(stage1_results) if any(
+            column.source.startswith("rules.") for column in self.columns
+        ) else {}
+
+        for j, column in enumerate(self.columns):
+            kind, _, key = column.source.partition(".")
+            if kind == "const":
+                out[:, j] = column.default
+                continue
+            if kind == "rules":
+                values = rule_counts[column.source]
+            else:
+                values = self._field(kind, key, column, stage1_results, ml_features_list, tx_context_list)
+            out[:, j] = self._transform(values, column)
+
+        return np.nan_to_num(out, copy=False, nan=self.nan, posinf=self.posinf, neginf=self.neginf)
+
+    def _field(
+        self,
+        kind: str,
+        key: str,
+        column: FeatureColumn,
+        stage1_results: List[Dict[str, Any]],
+        ml_features_list: List[Dict[str, Any]],
+        tx_context_list: List[Dict[str, Any]]
+    ) -> np.ndarray:
+        """stage1/ml/ctx 값 컬럼 (float64)"""
+        n = len(stage1_results)
+        if kind == "stage1":
+            values = [result[key] for result in stage1_results]
+        else:
+            primary = ml_features_list if kind == "ml" else tx_context_list
+            if column.fallback:
+                fallback_kind, _, fallback_key = column.fallback.partition(".")
+                fallback = ml_features_list if fallback_kind == "ml" else tx_context_list
+                values = [
+                    p.get(key, f.get(fallback_key, column.default)) for p, f in zip(primary, fallback)
+                ]
+            else:
+                values = [p.get(key, column.default) for p in primary]
+        return np.array(values, dtype=np.float64).reshape(n)
+
+    def _rule_counts(self, stage1_results: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """rules.* 출처 컬럼을 rule_results 한 번 순회로 계산"""
+        n = len(stage1_results)
+        wanted = [column.source for column in self.columns if column.source.startswith("rules.")]
+        counts = {source: np.zeros(n, dtype=np.float64) for source in wanted}
+        axis_counts = {source.split(".", 2)[2]: counts[source] for source in wanted if source.startswith("rules.axis.")}
+        severity_counts = {
+            source.split(".", 2)[2]: counts[source] for source in wanted if source.startswith("rules.severity.")
+        }
+        total = counts.get("rules.count")
+
+        for i, result in enumerate(stage1_results):
+            rule_results = result.get("rule_results", [])
+            if total is not None:
+                total[i] = len(rule_results)
+            for rule in rule_results:
+                target = axis_counts.get(rule.get("axis", DEFAULT_AXIS))
+                if target is not None:
+                    target[i] += 1
+                target = severity_counts.get(rule.get("severity", DEFAULT_SEVERITY))
+                if target is not None:
+                    target[i] += 1
+        return counts
+
+    @staticmethod
+    def _transform(values: np.ndarray, column: FeatureColumn) -> np.ndarray:
+        """clip_min → log1p(양수) → clip_max (Python min/max와 같은 NaN 처리)"""
+        if column.clip_min is not None:
+            values = np.where(values > column.clip_min, values, column.clip_min)
+        if column.log1p:
+            positive = values > 0
+            logged = np.zeros(len(values), dtype=np.float64)
+            logged[positive] = np.log1p(values[positive])
+            values = logged
+        if column.clip_max is not None:
+            values = np.where(values < column.clip_max, values, column.clip_max)
+        return values
+
+
+def stage2_feature_schema(use_ppr_features: bool = True) -> FeatureSchema:
+    """
+    Stage2Scorer feature 스키마 (30차원)
+
+    Args:
+        use_ppr_features: False면 PPR 컬럼을 0으로 고정 (차원은 유지)
+    """
+    def ppr(name: str) -> FeatureColumn:
+        if use_ppr_features:
+            return FeatureColumn(name, f"ml.{name}", clip_max=1.0)
+        return FeatureColumn(name, "const")
+
+    columns = [
+        # 1. 1단계 점수
+        FeatureColumn("rule_score", "stage1.rule_score"),
+        FeatureColumn("graph_score", "stage1.graph_score"),
+        FeatureColumn("stage1_risk_score", "stage1.risk_score"),
+        # 2. 발동 룰 개수, 축별 분포 (금액/행동 패턴/연결성/시간 패턴/노출), 심각도 분포
+        FeatureColumn("rule_count", "rules.count"),
+        FeatureColumn("axis_a_count", "rules.axis.A"),
+        FeatureColumn("axis_b_count", "rules.axis.B"),
+        FeatureColumn("axis_c_count", "rules.axis.C"),
+        FeatureColumn("axis_d_count", "rules.axis.D"),
+        FeatureColumn("axis_e_count", "rules.axis.E"),
+        FeatureColumn("critical_count", "rules.severity.CRITICAL"),
+        FeatureColumn("high_count", "rules.severity.HIGH"),
+        FeatureColumn("medium_count", "rules.severity.MEDIUM"),
+        FeatureColumn("low_count", "rules.severity.LOW"),
+        # 3. 그래프 통계 (클리핑, 거래 금액은 log 변환)
+        FeatureColumn("fan_in_count", "ml.fan_in_count", clip_max=100),
+        FeatureColumn("fan_out_count", "ml.fan_out_count", clip_max=100),
+        FeatureColumn("tx_primary_fan_in_count", "ml.tx_primary_fan_in_count", clip_max=100),
+        FeatureColumn("tx_primary_fan_out_count", "ml.tx_primary_fan_out_count", clip_max=100),
+        FeatureColumn("pattern_score", "ml.pattern_score", clip_max=100.0),
+        FeatureColumn("log_avg_transaction_value", "ml.avg_transaction_value", log1p=True, clip_max=20.0),
+        FeatureColumn("log_max_transaction_value", "ml.max_transaction_value", log1p=True, clip_max=20.0),
+        FeatureColumn("graph_nodes", "ml.graph_nodes", fallback="ctx.graph_nodes", clip_max=200),
+        FeatureColumn("num_transactions", "ml.num_transactions", fallback="ctx.num_transactions", clip_max=200),
+        # 4. PPR (0~1)
+        ppr("ppr_score"),
+        ppr("sdn_ppr"),
+        ppr("mixer_ppr"),
+        # 5. 정규화 점수 (0~1)
+        FeatureColumn("n_theta", "ml.n_theta", clip_min=0.0, clip_max=1.0),
+        FeatureColumn("n_omega", "ml.n_omega", clip_min=0.0, clip_max=1.0),
+        # 6. 패턴 탐지 여부
+        FeatureColumn("fan_in_detected", "ml.fan_in_detected"),
+        FeatureColumn("fan_out_detected", "ml.fan_out_detected"),
+        FeatureColumn("gather_scatter_detected", "ml.gather_scatter_detected"),
+    ]
+    return FeatureSchema("stage2" if use_ppr_features else "stage2_no_ppr", columns)
+
+
+def rule_weight_feature_schema() -> FeatureSchema:
+    """
+    RuleWeightLearner 룰별 feature 스키마 (13차원)
+
+    한 행이 발동 룰 하나다. ctx.<key>는 tx_context 대신 룰 메타데이터에서 만든 값
+    (RuleWeightLearner._rule_feature_values)을 읽고, combination_score는 호출마다 채운다.
+    """
+    columns = [
+        # 1. Axis (one-hot)
+        FeatureColumn("axis_c", "ctx.axis_c"),
+        FeatureColumn("axis_e", "ctx.axis_e"),
+        FeatureColumn("axis_b", "ctx.axis_b"),
+        # 2. Severity (one-hot)
+        FeatureColumn("severity_high", "ctx.severity_high"),
+        FeatureColumn("severity_medium", "ctx.severity_medium"),
+        FeatureColumn("severity_low", "ctx.severity_low"),
+        # 3. 기본 점수 (최대 점수 30으로 정규화)
+        FeatureColumn("base_score", "ctx.base_score"),
+        # 4. 패턴 유형 (one-hot)
+        FeatureColumn("pattern_single", "ctx.pattern_single"),
+        FeatureColumn("pattern_window", "ctx.pattern_window"),
+        FeatureColumn("pattern_bucket", "ctx.pattern_bucket"),
+        FeatureColumn("pattern_topology", "ctx.pattern_topology"),
+        FeatureColumn("pattern_stats", "ctx.pattern_stats"),
+        # 5. 룰 조합 (다른 발동 룰과의 위험 조합 점수)
+        FeatureColumn("combination_score", "ctx.combination_score"),
+    ]
+    return FeatureSchema("rule_weight", columns, dtype="float64")
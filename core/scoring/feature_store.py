@@ -0,0 +1,329 @@
+"""
+1단계 결과 / 2단계 Feature 디스크 캐시 (Feature Store)
+
+학습·평가·최적화 스크립트가 실행할 때마다 샘플 전체에 대해 RuleEvaluator와
+Stage1Scorer, Stage2Scorer.extract_features를 다시 돌리지 않도록 결과를 디스크에 저장한다.
+
+키: (샘플 ID, 룰 버전, feature 스키마 버전)
+    - 샘플 ID: 1단계 입력(tx_data, ml_features, tx_context)의 정규화된 JSON 해시
+    - 룰 버전: 룰북 YAML 내용 + 주소 리스트 + 룰 평가기/집계(core/rules, core/aggregation) 소스 코드 해시
+    - feature 스키마 버전: FEATURE_SCHEMA_VERSION + 1단계/2단계 스코어러 소스 코드 + 가중치 설정 해시
+    룰북이나 추출기 코드가 바뀌면 버전이 달라져 새 파티션 디렉토리를 쓰므로 자동으로 무효화된다.
+
+저장 값 (샘플당):
+    - fired / rule_scores: 룰북 순서의 룰 발동 여부 / 발동 점수 벡터
+    - stage1: (rule_score, graph_score, risk_score)
+    - features: Stage2Scorer.extract_features 결과 (30차원)
+    - ok: 계산 성공 여부 (실패 시 나머지 값은 0)
+
+주의: RuleEvaluator는 윈도우 룰을 위해 거래 히스토리를 누적하므로 결과가 평가 순서에 영향을 받는다.
+캐시 값은 처음 계산할 때의 순서를 기준으로 하며, 같은 데이터셋을 같은 순서로 다시 쓰는 경우를 전제로 한다.
+
+사용법:
+    scorer = Stage2Scorer(model_type="logistic", feature_store_dir="data/dataset/.feature_store")
+    scorer.train(train_data, val_data)            # 두 번째 실행부터는 룰 평가 없이 캐시에서 읽음
+
+    store = FeatureStore("data/dataset/.feature_store", scorer)
+    batch = store.get(samples)                    # {"keys", "fired", "rule_scores", "stage1", "features", "ok"}
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Any, Sequence, Tuple
+
+import numpy as np
+
+
+FEATURE_SCHEMA_VERSION = 1
+STAGE1_COLUMNS = ("rule_score", "graph_score", "risk_score")
+KEY_DTYPE = "S40"  # sha1 hex
+# 룰 결과에 영향을 주는 코드 디렉토리 (윈도우/버킷/그래프 집계 포함, result_cache의 "model" 버전과 같은 범위)
+RULES_CODE_DIRS = ("core/rules", "core/aggregation")
+project_root = Path(__file__).resolve().parent.parent.parent
+
+# sample_inputs가 읽는 데이터셋 최상위 필드 (컬럼형 데이터셋에서 이 필드만 복원하면 됨)
+SAMPLE_FIELDS = ("from", "to", "usd_value", "timestamp", "tx_hash", "chain", "ml_features", "tx_context")
+
+
+def sample_inputs(sample: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """
+    데이터셋 샘플 → 1단계 스코어러 입력 (tx_data, ml_features, tx_context)
+
+    Stage2Scorer.train/evaluate에서 쓰던 변환과 동일하다.
+    """
+    tx_context = sample.get("tx_context", {})
+    tx_data = {
+        "from": sample.get("from", ""),
+        "to": sample.get("to", ""),
+        "usd_value": sample.get("usd_value", 0),
+        "timestamp": sample.get("timestamp", 0),
+        "tx_hash": sample.get("tx_hash", ""),
+        "chain": sample.get("chain", "ethereum"),
+        "is_sanctioned": tx_context.get("is_sanctioned", False),
+        "is_mixer": tx_context.get("is_mixer", False),
+    }
+    return tx_data, sample.get("ml_features", {}), tx_context
+
+
+def sample_key(sample: Dict[str, Any]) -> bytes:
+    """샘플 ID (1단계 입력의 정규화된 JSON sha1)"""
+    payload = json.dumps(sample_inputs(sample), sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest().encode("ascii")
+
+
+def _hash_parts(parts: List[Any]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, (bytes, str)):
+            part = json.dumps(part, sort_keys=True, default=str)
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _package_sources(dirs: Sequence[str]) -> List[Any]:
+    """디렉토리들의 .py 파일 (상대 경로, 내용) 목록 - 테스트 파일 제외, 경로 순"""
+    parts = []
+    for directory in dirs:
+        for path in sorted((project_root / directory).rglob("*.py")):
+            if not path.name.startswith("test_"):
+                parts.append([path.relative_to(project_root).as_posix(), path.read_text(encoding="utf-8")])
+    return parts
+
+
+def _source(obj: Any) -> str:
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return getattr(obj, "__qualname__", repr(obj))
+
+
+class FeatureStore:
+    """
+    샘플별 1단계 결과 / 2단계 feature 캐시
+
+    파티션 디렉토리(룰 버전 × 스키마 버전) 안에 청크 단위 .npz 파일로 저장한다.
+    """
+
+    def __init__(self, store_dir: str, stage2_scorer: Any, chunk_size: int = 5000):
+        """
+        Args:
+            store_dir: 캐시 루트 디렉토리
+            stage2_scorer: feature를 계산할 Stage2Scorer (stage1_scorer, extract_features 사용)
+            chunk_size: 청크 파일 하나에 담을 최대 샘플 수
+        """
+        self.store_dir = Path(store_dir)
+        self.scorer = stage2_scorer
+        self.stage1_scorer = stage2_scorer.stage1_scorer
+        self.chunk_size = max(1, chunk_size)
+
+        rule_evaluator = self.stage1_scorer.rule_evaluator
+        self.rule_ids = [rule["id"] for rule in rule_evaluator.rule_loader.get_rules() if rule.get("id")]
+        self._rule_index = {rule_id: i for i, rule_id in enumerate(self.rule_ids)}
+
+        self.rules_version = self._rules_version(rule_evaluator)
+        self.feature_version = self._feature_version()
+        self.partition_dir = self.store_dir / f"r{self.rules_version[:12]}-f{self.feature_version[:12]}"
+
+        self.hits = 0
+        self.misses = 0
+        self._index: Dict[bytes, Tuple[int, int]] = {}
+        self._chunks: Dict[int, Dict[str, np.ndarray]] = {}
+        self._next_chunk = 0
+        self._load_index()
+
+    def get(self, samples: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        샘플들의 캐시된 값 조회 (없는 샘플은 계산 후 저장)
+
+        Args:
+            samples: 데이터셋 샘플 시퀀스
+
+        Returns:
+            {"keys", "fired", "rule_scores", "stage1", "features", "ok"} - 행 순서는 samples와 같음
+        """
+        keys = [sample_key(sample) for sample in samples]
+        missing: Dict[bytes, Dict[str, Any]] = {}
+        for sample, key in zip(samples, keys):
+            if key not in self._index and key not in missing:
+                missing[key] = sample
+        computed = dict(zip(missing, self._compute(list(missing.values()))))
+
+        hits = sum(1 for key in keys if key not in computed)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        if computed:
+            self._append(computed)
+
+        n = len(keys)
+        batch = {
+            "keys": np.array(keys, dtype=KEY_DTYPE),
+            "fired": np.zeros((n, len(self.rule_ids)), dtype=bool),
+            "rule_scores": np.zeros((n, len(self.rule_ids)), dtype=np.float32),
+            "stage1": np.zeros((n, len(STAGE1_COLUMNS)), dtype=np.float64),
+            "features": None,
+            "ok": np.zeros(n, dtype=bool),
+        }
+        feature_rows = []
+        for i, key in enumerate(keys):
+            chunk_id, row = self._index[key]
+            chunk = self._chunk(chunk_id)
+            batch["fired"][i] = chunk["fired"][row]
+            batch["rule_scores"][i] = chunk["rule_scores"][row]
+            batch["stage1"][i] = chunk["stage1"][row]
+            batch["ok"][i] = chunk["ok"][row]
+            feature_rows.append(chunk["features"][row])
+        feature_dim = feature_rows[0].shape[0] if feature_rows else 0
+        batch["features"] = np.array(feature_rows, dtype=np.float32).reshape(n, feature_dim)
+        return batch
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        return {
+            "partition": self.partition_dir.name,
+            "samples": len(self._index),
+            "chunks": self._next_chunk,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _compute(self, samples: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        캐시에 없는 샘플들의 1단계 결과와 2단계 feature 배치 계산 (Stage2Scorer.train과 같은 에러 처리)
+
+        1단계는 Stage1Scorer.calculate_risk_scores로 계산하고 설명 문자열은 만들지 않는다.
+        """
+        inputs = [sample_inputs(sample) for sample in samples]
+        stage1_results = self.stage1_scorer.calculate_risk_scores(inputs)
+        features, ok = self.scorer._feature_rows(
+            stage1_results,
+            [ml_features for _, ml_features, _ in inputs],
+            [tx_context for _, _, tx_context in inputs]
+        )
+
+        rows = []
+        for stage1_result, feature_row, row_ok in zip(stage1_results, features, ok):
+            fired = np.zeros(len(self.rule_ids), dtype=bool)
+            rule_scores = np.zeros(len(self.rule_ids), dtype=np.float32)
+            if not row_ok:
+                rows.append({
+                    "fired": fired,
+                    "rule_scores": rule_scores,
+                    "stage1": np.zeros(len(STAGE1_COLUMNS), dtype=np.float64),
+                    "features": np.zeros(feature_row.shape[0], dtype=np.float32),
+                    "ok": False,
+                })
+                continue
+
+            for result in stage1_result.get("rule_results", []):
+                idx = self._rule_index.get(result.get("rule_id"))
+                if idx is not None:
+                    fired[idx] = True
+                    rule_scores[idx] = float(result.get("score", 0) or 0)
+            rows.append({
+                "fired": fired,
+                "rule_scores": rule_scores,
+                "stage1": np.array([stage1_result[name] for name in STAGE1_COLUMNS], dtype=np.float64),
+                "features": feature_row,
+                "ok": True,
+            })
+        return rows
+
+    def _append(self, computed: Dict[bytes, Dict[str, Any]]) -> None:
+        """새로 계산한 샘플들을 청크 파일로 저장하고 인덱스에 추가"""
+        self.partition_dir.mkdir(parents=True, exist_ok=True)
+        self._write_meta()
+
+        items = list(computed.items())
+        for start in range(0, len(items), self.chunk_size):
+            part = items[start:start + self.chunk_size]
+            chunk = {
+                "keys": np.array([key for key, _ in part], dtype=KEY_DTYPE),
+                "fired": np.array([value["fired"] for _, value in part], dtype=bool),
+                "rule_scores": np.array([value["rule_scores"] for _, value in part], dtype=np.float32),
+                "stage1": np.array([value["stage1"] for _, value in part], dtype=np.float64),
+                "features": np.array([value["features"] for _, value in part], dtype=np.float32),
+                "ok": np.array([value["ok"] for _, value in part], dtype=bool),
+            }
+            chunk_id = self._next_chunk
+            chunk_path = self._chunk_path(chunk_id)
+            tmp_path = chunk_path.with_name(f".{chunk_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **chunk)
+            os.replace(tmp_path, chunk_path)
+
+            self._chunks[chunk_id] = chunk
+            for row, key in enumerate(chunk["keys"]):
+                self._index[bytes(key)] = (chunk_id, row)
+            self._next_chunk += 1
+
+    def _chunk(self, chunk_id: int) -> Dict[str, np.ndarray]:
+        if chunk_id not in self._chunks:
+            with np.load(self._chunk_path(chunk_id)) as data:
+                self._chunks[chunk_id] = {name: data[name] for name in data.files}
+        return self._chunks[chunk_id]
+
+    def _chunk_path(self, chunk_id: int) -> Path:
+        return self.partition_dir / f"chunk-{chunk_id:05d}.npz"
+
+    def _load_index(self) -> None:
+        """파티션의 청크 파일에서 키만 읽어 인덱스 구성 (깨진 청크는 무시)"""
+        if not self.partition_dir.exists():
+            return
+        for chunk_path in sorted(self.partition_dir.glob("chunk-*.npz")):
+            chunk_id = int(chunk_path.stem.split("-")[1])
+            self._next_chunk = max(self._next_chunk, chunk_id + 1)
+            try:
+                with np.load(chunk_path) as data:
+                    keys = data["keys"]
+            except (OSError, ValueError, KeyError):
+                continue
+            for row, key in enumerate(keys):
+                self._index[bytes(key)] = (chunk_id, row)
+
+    def _write_meta(self) -> None:
+        meta_path = self.partition_dir / "meta.json"
+        if meta_path.exists():
+            return
+        meta = {
+            "rules_version": self.rules_version,
+            "feature_version": self.feature_version,
+            "feature_schema_version": FEATURE_SCHEMA_VERSION,
+            "rule_ids": self.rule_ids,
+            "stage1_columns": list(STAGE1_COLUMNS),
+        }
+        with open(meta_path, "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def _rules_version(self, rule_evaluator: Any) -> str:
+        """룰북 파일 내용 + 주소 리스트 + 룰 평가기/집계 코드 해시"""
+        rules_path = Path(rule_evaluator.rule_loader.rules_path)
+        rules_bytes = rules_path.read_bytes() if rules_path.exists() else json.dumps(
+            rule_evaluator.ruleset, sort_keys=True, default=str
+        ).encode("utf-8")
+        lists = {name: sorted(values) for name, values in rule_evaluator.list_loader.get_all_lists().items()}
+        return _hash_parts([
+            rules_bytes,
+            lists,
+            _source(inspect.getmodule(type(rule_evaluator))),
+            _package_sources(RULES_CODE_DIRS),
+        ])
+
+    def _feature_version(self) -> str:
+        """스키마 버전 + 1단계/2단계 계산 코드 + 설정 해시"""
+        stage1 = self.stage1_scorer
+        schema = self.scorer.feature_schema
+        return _hash_parts([
+            FEATURE_SCHEMA_VERSION,
+            _source(inspect.getmodule(type(stage1))),
+            _source(inspect.getmodule(type(stage1.rule_scorer))),
+            _source(type(self.scorer).extract_features),
+            _source(inspect.getmodule(type(schema))),
+            schema.hash(),
+            {"rule_weight": stage1.rule_weight, "graph_weight": stage1.graph_weight},
+            sorted(vars(stage1.rule_scorer).items()),
+            {"use_ppr_features": getattr(self.scorer, "use_ppr_features", None)},
+        ])
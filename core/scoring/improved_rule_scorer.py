@@ -5,7 +5,7 @@
 룰 점수가 0이어도 룰 발동 자체를 점수로 활용
 다양한 집계 방식과 가중치 조절 지원
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 
 
@@ -106,30 +106,47 @@ class ImprovedRuleScorer:
             base_score += ml_score
         
         # 7. 점수 역전 보정 (Normal이 더 높은 점수를 받는 문제 해결)
-        # Normal이 더 많은 룰을 발동시키므로, 룰 개수와 패턴으로 보정
+        pattern_correction, count_correction = self._calculate_corrections(rule_results)
+        base_score += pattern_correction
+        base_score += count_correction
+        
+        # 8. 최종 점수 (0~100 범위로 제한)
+        final_score = min(100.0, max(0.0, base_score + bonus_score))
+        
+        return final_score
+    
+    def _calculate_corrections(
+        self,
+        rule_results: List[Dict[str, Any]]
+    ) -> Tuple[float, float]:
+        """
+        점수 역전 보정값 (Normal이 더 많은 룰을 발동시키므로 룰 개수와 패턴으로 보정)
+        
+        Returns:
+            (Normal 다발 룰 보정, 룰 개수 보정)
+        """
         rule_count = len(rule_results)
         rule_ids = [r.get("rule_id") for r in rule_results]
         
         # Normal이 많이 발동하는 룰 (B-501, C-003)이 있으면 점수 감소 (완화)
+        pattern_correction = 0.0
         if "B-501" in rule_ids and "C-003" in rule_ids:
             # 두 룰이 동시에 발동되면 Normal일 가능성 높음
-            base_score -= 15.0  # 25 -> 15로 완화
+            pattern_correction = -15.0  # 25 -> 15로 완화
         elif "B-501" in rule_ids or "C-003" in rule_ids:
             # 하나만 발동되면 약간 감소
-            base_score -= 5.0   # 10 -> 5로 완화
+            pattern_correction = -5.0   # 10 -> 5로 완화
         
         # 룰 개수 기반 보정 (완화)
+        count_correction = 0.0
         if rule_count <= 1:
             # 룰이 적게 발동되면 fraud일 가능성 높음
-            base_score += 15.0  # 25 -> 15로 완화
+            count_correction = 15.0  # 25 -> 15로 완화
         elif rule_count >= 3:
             # 룰이 많이 발동되면 normal일 가능성 높음
-            base_score -= 10.0  # 20 -> 10으로 완화, 조건도 2 -> 3으로 완화
-        
-        # 8. 최종 점수 (0~100 범위로 제한)
-        final_score = min(100.0, max(0.0, base_score + bonus_score))
+            count_correction = -10.0  # 20 -> 10으로 완화, 조건도 2 -> 3으로 완화
         
-        return final_score
+        return pattern_correction, count_correction
     
     def _calculate_diversity_penalty(
         self,
@@ -391,101 +408,43 @@ class ImprovedRuleScorer:
 
 def optimize_rule_scorer(
     train_data: List[Dict[str, Any]],
-    val_data: List[Dict[str, Any]]
+    val_data: List[Dict[str, Any]],
+    num_workers: int = 1
 ) -> Dict[str, Any]:
     """
     Rule-based 스코어러 최적화
     
     다양한 집계 방식과 가중치 조합을 시도하여 최적의 성능 찾기
-    """
-    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+    (샘플별 항은 한 번만 계산하고 설정별 점수는 배열 연산으로 조합, rule_scorer_tuning 참고)
     
-    aggregation_methods = [
-        "simple_sum",
-        "weighted_sum",
-        "max",
-        "mean",
-        "sqrt_sum"
-    ]
+    Args:
+        train_data: 학습 데이터 (현재 미사용)
+        val_data: 검증 데이터
+        num_workers: 설정 평가에 쓸 프로세스 수
     
-    best_score = -1.0  # 음수로 시작하여 최소한 하나는 선택되도록
-    best_config = None
-    best_results = None
+    Returns:
+        {"config", "results", "scorer", "surface"} - surface는 설정별 임계값-지표 곡선 전체
+    """
+    from .rule_scorer_tuning import RuleScorerTuner
     
     print("=" * 80)
     print("Rule-based 스코어러 최적화")
     print("=" * 80)
     
-    for method in aggregation_methods:
-        for use_count in [True, False]:
-            for use_severity in [True, False]:
-                for use_axis in [True, False]:
-                    scorer = ImprovedRuleScorer(
-                        aggregation_method=method,
-                        use_rule_count_bonus=use_count,
-                        use_severity_bonus=use_severity,
-                        use_axis_bonus=use_axis
-                    )
-                    
-                    # 검증 데이터로 평가
-                    y_true = []
-                    y_pred_scores = []
-                    
-                    for item in val_data:
-                        rule_results = item.get("rule_results", [])
-                        label = item.get("ground_truth_label", "normal")
-                        
-                        # 거래 컨텍스트 전달 (ML 피처 포함)
-                        tx_context = {
-                            "num_transactions": item.get("num_transactions", 0),
-                            "graph_nodes": item.get("graph_nodes", 0),
-                            "graph_edges": item.get("graph_edges", 0),
-                            "ml_features": item.get("ml_features", {})
-                        }
-                        
-                        score = scorer.calculate_score(rule_results, tx_context)
-                        
-                        y_true.append(1 if label == "fraud" else 0)
-                        y_pred_scores.append(score)
-                    
-                    # Threshold 최적화 (F1-Score 최대화)
-                    best_threshold = 50.0
-                    best_f1 = 0.0
-                    
-                    for threshold in range(10, 90, 2):
-                        y_pred = [1 if s >= threshold else 0 for s in y_pred_scores]
-                        f1 = f1_score(y_true, y_pred, zero_division=0)
-                        if f1 > best_f1:
-                            best_f1 = f1
-                            best_threshold = threshold
-                    
-                    y_pred = [1 if s >= best_threshold else 0 for s in y_pred_scores]
-                    
-                    # 성능 평가
-                    accuracy = accuracy_score(y_true, y_pred)
-                    precision = precision_score(y_true, y_pred, zero_division=0)
-                    recall = recall_score(y_true, y_pred, zero_division=0)
-                    f1 = f1_score(y_true, y_pred, zero_division=0)
-                    
-                    # F1-Score를 기준으로 최적 선택 (최소한 하나는 선택)
-                    if f1 > best_score or best_config is None:
-                        best_score = f1
-                        best_config = {
-                            "aggregation_method": method,
-                            "use_rule_count_bonus": use_count,
-                            "use_severity_bonus": use_severity,
-                            "use_axis_bonus": use_axis,
-                            "threshold": best_threshold
-                        }
-                        best_results = {
-                            "accuracy": accuracy,
-                            "precision": precision,
-                            "recall": recall,
-                            "f1_score": f1
-                        }
-                    
-                    print(f"\n{method} | count={use_count} | severity={use_severity} | axis={use_axis} | threshold={best_threshold}")
-                    print(f"  F1: {f1:.4f}, Acc: {accuracy:.4f}, Prec: {precision:.4f}, Rec: {recall:.4f}")
+    tuner = RuleScorerTuner(val_data)
+    search = tuner.grid_search(num_workers=num_workers)
+    
+    for row in search["surface"]:
+        config = row["config"]
+        best = row["best"]
+        print(f"\n{config['aggregation_method']} | count={config['use_rule_count_bonus']} | "
+              f"severity={config['use_severity_bonus']} | axis={config['use_axis_bonus']} | "
+              f"threshold={row['best_threshold']:g}")
+        print(f"  F1: {best['f1_score']:.4f}, Acc: {best['accuracy']:.4f}, "
+              f"Prec: {best['precision']:.4f}, Rec: {best['recall']:.4f}")
+    
+    best_config = search["best"]["config"]
+    best_results = search["best"]["results"]
     
     print("\n" + "=" * 80)
     print("✅ 최적 설정:")
@@ -507,6 +466,7 @@ def optimize_rule_scorer(
     return {
         "config": best_config,
         "results": best_results,
-        "scorer": ImprovedRuleScorer(**scorer_config)
+        "scorer": ImprovedRuleScorer(**scorer_config),
+        "surface": search["surface"]
     }
 
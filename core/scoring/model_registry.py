@@ -0,0 +1,427 @@
+"""
+2단계 모델 레지스트리
+
+models/manifest.json에 모델 파일마다 이름, 버전, feature 스키마 해시, 파일 체크섬을 기록하고
+서빙할 버전(primary)과 그림자 채점용 버전(shadow)을 지정한다.
+
+    {
+        "version": 1,
+        "models": [
+            {"name": "stage2", "version": "gb-v1", "path": "stage2_scorer_gradient_boosting.pkl",
+             "sha256": "...", "feature_schema": "...", "model_type": "gradient_boosting", "metadata": {}}
+        ],
+        "serving": {"stage2": {"primary": "rf-v1", "shadow": ["gb-v1"]}},
+        "warmup": ["stage2"]
+    }
+
+- 모델은 처음 요청될 때 로드하고 (체크섬, feature 스키마 확인), .npz는 memory-map으로 로드한다.
+- warm_up()은 warmup에 지정된 모델의 primary/shadow를 미리 로드하고 더미 예측까지 수행하며,
+  status()["ready"]로 준비 여부를 알려준다 (readiness probe).
+- primary 로드/워밍업에 실패하면 같은 이름에서 마지막으로 등록된, 로드 가능한 버전으로 대체(fallback)해 서빙한다.
+- 같은 이름의 여러 버전을 동시에 올려 두고 shadows()로 그림자 채점에 사용한다.
+
+사용법:
+    registry = ModelRegistry(project_root / "models")
+    registry.register("stage2", "rf-v1", "stage2_scorer_random_forest.npz", primary=True)
+    scorer = registry.get("stage2")
+"""
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from .stage2_scorer import FEATURE_DIM, Stage2Scorer
+
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class ModelEntry:
+    """매니페스트의 모델 항목"""
+    name: str
+    version: str
+    path: str  # 레지스트리 디렉토리 기준 상대 경로
+    sha256: str
+    feature_schema: str
+    model_type: str = ""
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+
+def file_sha256(path: Path) -> str:
+    """파일 SHA-256 (청크 단위로 읽음)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    매니페스트 기반 모델 레지스트리 (스레드 안전, 지연 로딩)
+    """
+
+    def __init__(self, models_dir: Path, manifest_path: Optional[Path] = None):
+        """
+        Args:
+            models_dir: 모델 파일 디렉토리 (매니페스트 경로의 기준)
+            manifest_path: 매니페스트 경로 (기본: models_dir/manifest.json)
+        """
+        self.models_dir = Path(models_dir)
+        self.manifest_path = Path(manifest_path) if manifest_path else self.models_dir / MANIFEST_NAME
+        self._lock = threading.RLock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._loaded: Dict[str, Stage2Scorer] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._warmup_targets: Optional[List[str]] = None
+        self._warmup_done = False
+        self._fallback: Dict[str, str] = {}  # 이름 → primary 대신 서빙 중인 버전
+        self._load_manifest()
+
+    # ------------------------------------------------------------------
+    # 매니페스트
+    # ------------------------------------------------------------------
+
+    def _load_manifest(self) -> None:
+        manifest = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version", MANIFEST_VERSION) != MANIFEST_VERSION:
+                raise ValueError(f"Unsupported model manifest version: {manifest.get('version')}")
+        self.entries = [ModelEntry(**entry) for entry in manifest.get("models", [])]
+        self.serving: Dict[str, Dict[str, Any]] = manifest.get("serving", {})
+        self.warmup_names: List[str] = manifest.get("warmup", [])
+
+    def save(self) -> None:
+        """매니페스트 저장 (임시 파일에 쓴 뒤 교체)"""
+        with self._lock:
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "models": [asdict(entry) for entry in self.entries],
+                "serving": self.serving,
+                "warmup": self.warmup_names,
+            }
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+                f.write("\n")
+            tmp_path.replace(self.manifest_path)
+
+    def register(
+        self,
+        name: str,
+        version: str,
+        path: str,
+        feature_schema: Optional[str] = None,
+        model_type: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        primary: bool = False,
+        shadow: bool = False
+    ) -> ModelEntry:
+        """
+        모델 파일 등록 (같은 이름/버전이 있으면 교체) 후 매니페스트 저장
+
+        Args:
+            name: 모델 이름 (예: "stage2")
+            version: 버전 문자열
+            path: 모델 파일 경로 (models_dir 기준 상대 경로 또는 그 안의 절대 경로)
+            feature_schema: feature 스키마 해시 (None이면 모델을 로드해 계산)
+            model_type: 모델 타입 (None이면 모델을 로드해 확인)
+            metadata: 부가 정보 (학습 데이터, 지표 등)
+            primary: 이 버전을 서빙 버전으로 지정
+            shadow: 이 버전을 그림자 채점 버전으로 추가
+
+        Returns:
+            등록된 ModelEntry
+        """
+        file_path = self._resolve(path)
+        if feature_schema is None or model_type is None:
+            scorer = Stage2Scorer()
+            scorer.load_model(file_path)
+            feature_schema = feature_schema or scorer.feature_schema_hash()
+            model_type = model_type or scorer.model_type
+
+        entry = ModelEntry(
+            name=name,
+            version=version,
+            path=str(file_path.resolve().relative_to(self.models_dir.resolve())),
+            sha256=file_sha256(file_path),
+            feature_schema=feature_schema,
+            model_type=model_type,
+            metadata=metadata or {},
+        )
+        with self._lock:
+            self.entries = [e for e in self.entries if e.key != entry.key] + [entry]
+            self._loaded.pop(entry.key, None)
+            self._status.pop(entry.key, None)
+            self._fallback.pop(name, None)
+            if primary or shadow:
+                self.set_serving(name, primary=version if primary else None, add_shadow=version if shadow else None)
+            else:
+                self.save()
+        return entry
+
+    def set_serving(
+        self,
+        name: str,
+        primary: Optional[str] = None,
+        shadow: Optional[List[str]] = None,
+        add_shadow: Optional[str] = None
+    ) -> None:
+        """
+        서빙 버전 지정 후 매니페스트 저장
+
+        Args:
+            primary: 서빙 버전 (None이면 유지)
+            shadow: 그림자 채점 버전 목록 (None이면 유지)
+            add_shadow: 그림자 채점 버전 하나 추가
+        """
+        with self._lock:
+            config = dict(self.serving.get(name, {}))
+            if primary is not None:
+                config["primary"] = primary
+            if shadow is not None:
+                config["shadow"] = list(shadow)
+            if add_shadow is not None and add_shadow not in config.get("shadow", []):
+                config["shadow"] = config.get("shadow", []) + [add_shadow]
+            # primary는 그림자 목록에서 제외
+            config["shadow"] = [v for v in config.get("shadow", []) if v != config.get("primary")]
+            self.serving[name] = config
+            self._fallback.pop(name, None)
+            self.save()
+
+    def entry(self, name: str, version: Optional[str] = None) -> Optional[ModelEntry]:
+        """
+        모델 항목 조회
+
+        Args:
+            version: None이면 서빙 버전 (serving_version)
+        """
+        if version is None:
+            version = self.serving_version(name)
+        candidates = [e for e in self.entries if e.name == name and (version is None or e.version == version)]
+        return candidates[-1] if candidates else None
+
+    def serving_version(self, name: str) -> Optional[str]:
+        """
+        실제로 서빙하는 버전
+
+        primary 로드에 실패해 대체한 버전이 있으면 그 버전, 아니면 primary
+        (primary 지정이 없으면 None - entry()는 마지막으로 등록된 버전을 사용)
+        """
+        return self._fallback.get(name) or self.serving.get(name, {}).get("primary")
+
+    def _resolve(self, path: str) -> Path:
+        file_path = Path(path)
+        return file_path if file_path.is_absolute() else self.models_dir / file_path
+
+    # ------------------------------------------------------------------
+    # 로딩
+    # ------------------------------------------------------------------
+
+    def get(self, name: str, version: Optional[str] = None) -> Optional[Stage2Scorer]:
+        """
+        모델 로드 (처음 요청될 때 한 번, 이후 캐시)
+
+        Args:
+            version: None이면 서빙 버전 (로드에 실패하면 fallback 버전으로 대체)
+
+        Returns:
+            로드된 Stage2Scorer (항목이 없으면 None)
+
+        Raises:
+            ValueError: 체크섬 또는 feature 스키마가 매니페스트와 다른 경우 (fallback도 없을 때)
+        """
+        entry = self.entry(name, version)
+        if entry is None:
+            return None
+        if version is not None:
+            return self._get_entry(entry)
+        try:
+            return self._get_entry(entry)
+        except Exception as e:
+            scorer = self._fall_back(name, entry, e)
+            if scorer is None:
+                raise
+            return scorer
+
+    def _get_entry(self, entry: ModelEntry) -> Stage2Scorer:
+        scorer = self._loaded.get(entry.key)
+        if scorer is not None:
+            return scorer
+        status = self._status.get(entry.key, {})
+        if status.get("state") == "failed":
+            # 실패한 파일을 요청마다 다시 읽지 않음 (register()로 다시 등록하면 초기화)
+            raise ValueError(status["error"])
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(entry.key, threading.Lock())
+        with key_lock:
+            scorer = self._loaded.get(entry.key)
+            if scorer is None:
+                scorer = self._load(entry)
+        return scorer
+
+    def _fallback_candidates(self, name: str, failed: ModelEntry) -> List[ModelEntry]:
+        """fallback 후보 (같은 이름의 다른 버전, 마지막으로 등록된 순서, 이미 실패한 버전 제외)"""
+        return [
+            e for e in reversed(self.entries)
+            if e.name == name and e.key != failed.key and self._status.get(e.key, {}).get("state") != "failed"
+        ]
+
+    def _fall_back(self, name: str, failed: ModelEntry, error: Exception) -> Optional[Stage2Scorer]:
+        """서빙 버전 로드 실패 시 로드 가능한 다른 버전으로 대체 (없으면 None)"""
+        for candidate in self._fallback_candidates(name, failed):
+            try:
+                scorer = self._get_entry(candidate)
+            except Exception:
+                continue
+            with self._lock:
+                self._fallback[name] = candidate.version
+            print(f"⚠️  {failed.key} 로드 실패 ({error}), {candidate.key}로 대체합니다.")
+            return scorer
+        return None
+
+    def _load(self, entry: ModelEntry) -> Stage2Scorer:
+        self._status[entry.key] = {"state": "loading"}
+        start = time.time()
+        try:
+            file_path = self._resolve(entry.path)
+            checksum = file_sha256(file_path)
+            if checksum != entry.sha256:
+                raise ValueError(f"Checksum mismatch for {entry.key}: {checksum[:12]} != {entry.sha256[:12]}")
+
+            scorer = Stage2Scorer()
+            scorer.load_model(file_path, mmap=True)
+            if scorer.feature_schema_hash() != entry.feature_schema:
+                raise ValueError(
+                    f"Feature schema mismatch for {entry.key}: "
+                    f"model expects {entry.feature_schema}, code produces {scorer.feature_schema_hash()}"
+                )
+        except Exception as e:
+            self._status[entry.key] = {"state": "failed", "error": str(e)}
+            raise
+
+        self._loaded[entry.key] = scorer
+        self._status[entry.key] = {"state": "loaded", "load_seconds": round(time.time() - start, 3)}
+        return scorer
+
+    def shadows(self, name: str) -> List[Tuple[ModelEntry, Stage2Scorer]]:
+        """
+        그림자 채점 버전들 (로드에 실패한 버전은 제외)
+        """
+        result = []
+        for version in self.serving.get(name, {}).get("shadow", []):
+            try:
+                scorer = self.get(name, version)
+            except Exception as e:
+                print(f"⚠️  그림자 모델 로드 실패 ({name}@{version}): {e}")
+                continue
+            if scorer is not None:
+                result.append((self.entry(name, version), scorer))
+        return result
+
+    # ------------------------------------------------------------------
+    # 워밍업 / 준비 상태
+    # ------------------------------------------------------------------
+
+    def warm_up(self, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        지정한 모델(primary + shadow)을 로드하고 더미 예측으로 모델/스케일러 경로를 한 번 실행
+
+        memory-map된 배열도 이때 페이지가 올라온다. 실패한 모델은 status()에 기록된다.
+        primary가 실패하면 fallback 버전을 워밍업해 서빙 버전으로 사용한다.
+        준비 상태는 서빙 버전만 기준으로 한다 (그림자 버전 실패는 status()에만 기록).
+
+        Args:
+            names: 워밍업할 모델 이름 (기본: 매니페스트의 warmup)
+
+        Returns:
+            status()
+        """
+        names = self.warmup_names if names is None else names
+        targets = []
+        for name in names:
+            with self._lock:
+                self._fallback.pop(name, None)
+            primary = self.entry(name)
+            if primary is None:
+                continue
+            serving = primary
+            if not self._warm_up_entry(primary):
+                serving = None
+                for candidate in self._fallback_candidates(name, primary):
+                    if self._warm_up_entry(candidate):
+                        serving = candidate
+                        with self._lock:
+                            self._fallback[name] = candidate.version
+                        print(f"⚠️  {primary.key} 워밍업 실패, {candidate.key}로 대체합니다.")
+                        break
+            targets.append(serving.key if serving is not None else primary.key)
+
+            for version in self.serving.get(name, {}).get("shadow", []):
+                entry = self.entry(name, version)
+                if entry is not None and entry.key not in targets and entry.key != primary.key:
+                    self._warm_up_entry(entry)
+        with self._lock:
+            self._warmup_targets = targets
+            self._warmup_done = True
+        return self.status()
+
+    def _warm_up_entry(self, entry: ModelEntry) -> bool:
+        """모델 하나 로드 + 더미 예측 (성공 여부)"""
+        try:
+            scorer = self.get(entry.name, entry.version)
+            start = time.time()
+            features = np.zeros((1, FEATURE_DIM), dtype=np.float32)
+            scorer.model.predict_proba(scorer.scaler.transform(features))
+            self._status[entry.key] = {
+                **self._status.get(entry.key, {}),
+                "state": "ready",
+                "warmup_seconds": round(time.time() - start, 3),
+            }
+            return True
+        except Exception as e:
+            self._status[entry.key] = {"state": "failed", "error": str(e)}
+            print(f"⚠️  모델 워밍업 실패 ({entry.key}): {e}")
+            return False
+
+    def status(self) -> Dict[str, Any]:
+        """
+        준비 상태
+
+        Returns:
+            {
+                "ready": 워밍업이 끝났고 서빙 버전이 모두 준비됨,
+                "warmup_done": bool,
+                "serving": {"name": "서빙 버전"},
+                "fallback": {"name": "primary 대신 서빙 중인 버전"},
+                "models": {"name@version": {"state": "loading|loaded|ready|failed", ...}}
+            }
+        """
+        with self._lock:
+            targets = self._warmup_targets or []
+            ready = self._warmup_done and all(
+                self._status.get(key, {}).get("state") == "ready" for key in targets
+            )
+            return {
+                "ready": ready,
+                "warmup_done": self._warmup_done,
+                "serving": {name: self.serving_version(name) for name in self.serving},
+                "fallback": dict(self._fallback),
+                "models": {key: dict(value) for key, value in self._status.items()},
+            }
@@ -0,0 +1,263 @@
+"""
+병렬·재개 가능한 데이터셋 구축기
+
+항목(컨트랙트/주소) 리스트를 샤드로 나눠 ProcessPoolExecutor에서 처리하고,
+샤드별 결과를 JSONL 파일로 원자적으로 기록한다 (임시 파일 → os.replace).
+manifest.json에 완료된 샤드를 기록하므로 중단 후 다시 실행하면 완료된 샤드는 건너뛰고,
+항목 처리 중 예외가 난 샤드는 실패 항목과 함께 기록만 해 두고 다음 실행에서 다시 처리한다.
+모든 샤드가 끝나면 하나의 데이터셋으로 병합한다 (포맷은 output_path 접미사, dataset_io 참고).
+
+사용법:
+    builder = ParallelDatasetBuilder(work_dir="data/dataset/.shards/real", num_workers=8)
+    dataset = builder.build(
+        items,
+        process_item,          # 모듈 수준 함수 (item -> List[Dict]), 피클 가능해야 함
+        output_path="data/dataset/real.json",
+        initializer=init_worker,
+        initargs=(...)
+    )
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+from core.scoring.dataset_io import save_dataset
+
+
+MANIFEST_VERSION = 1
+# 샤드당 manifest에 남기는 실패 항목 수 상한
+MAX_RECORDED_FAILURES = 20
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    """임시 파일에 쓴 뒤 os.replace로 교체 (중단되어도 반쯤 쓴 파일이 남지 않음)"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _run_shard(
+    process_item: Callable[[Any], List[Dict[str, Any]]],
+    shard_id: int,
+    items: List[Any],
+    shard_path: str
+) -> Dict[str, Any]:
+    """
+    워커에서 샤드 하나 처리 후 JSONL로 원자적 저장
+
+    process_item이 예외를 던진 항목은 건너뛰고 에러 수와 실패 항목을 돌려준다
+    (출력은 부모 프로세스에서 샤드 단위로 한다).
+
+    Returns:
+        {"shard_id", "records", "skipped", "errors", "failures": [{"item", "error"}]}
+    """
+    lines = []
+    skipped = 0
+    failures = []
+    for item in items:
+        try:
+            records = process_item(item)
+        except Exception as e:
+            failures.append({"item": item, "error": f"{type(e).__name__}: {e}"})
+            continue
+        if not records:
+            skipped += 1
+            continue
+        lines.extend(json.dumps(record, ensure_ascii=False) for record in records)
+
+    _atomic_write_text(Path(shard_path), "".join(f"{line}\n" for line in lines))
+    return {
+        "shard_id": shard_id,
+        "records": len(lines),
+        "skipped": skipped,
+        "errors": len(failures),
+        "failures": failures[:MAX_RECORDED_FAILURES]
+    }
+
+
+class ParallelDatasetBuilder:
+    """
+    샤드 단위 병렬 데이터셋 구축기 (manifest 기반 재개)
+    """
+
+    def __init__(
+        self,
+        work_dir: str,
+        num_workers: Optional[int] = None,
+        shard_size: int = 50
+    ):
+        """
+        Args:
+            work_dir: 샤드 파일과 manifest.json을 둘 디렉토리
+            num_workers: 워커 프로세스 수 (None이면 CPU 수)
+            shard_size: 샤드당 항목 수
+        """
+        self.work_dir = Path(work_dir)
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.shard_size = max(1, shard_size)
+        self.manifest_path = self.work_dir / "manifest.json"
+        self.last_shard_ids: List[int] = []
+
+    def build(
+        self,
+        items: List[Any],
+        process_item: Callable[[Any], List[Dict[str, Any]]],
+        output_path: Optional[str] = None,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple = (),
+        config: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        전체 항목을 샤드로 처리하고 병합
+
+        Args:
+            items: 처리할 항목 리스트 (JSON 직렬화 가능해야 함, 샤드 식별에 사용)
+            process_item: 항목 → 레코드 리스트 (빈 리스트면 건너뜀)
+            output_path: 병합 결과 경로 (.json/.jsonl/.cols, None이면 저장하지 않음)
+            initializer: 워커 초기화 함수 (리스트 로드, 모델 준비 등)
+            initargs: initializer 인자
+            config: 결과에 영향을 주는 설정 (바뀌면 완료된 샤드도 다시 처리)
+
+        Returns:
+            병합된 데이터셋
+        """
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._load_manifest()
+
+        shards = self._make_shards(items, config)
+        pending = []
+        retried = 0
+        for shard_id, shard_items, items_hash in shards:
+            entry = manifest["shards"].get(str(shard_id))
+            if (
+                entry is not None and
+                entry.get("items_hash") == items_hash and
+                self._shard_path(shard_id).exists()
+            ):
+                if not entry.get("errors"):
+                    continue
+                # 실패 항목이 있던 샤드는 완료로 보지 않고 다시 처리
+                retried += 1
+            pending.append((shard_id, shard_items, items_hash))
+
+        print(f"   샤드: 총 {len(shards)}개, 완료 {len(shards) - len(pending)}개, 남은 샤드 {len(pending)}개"
+              f"{f' (실패 재시도 {retried}개)' if retried else ''}")
+        print(f"   워커: {self.num_workers}개")
+
+        if pending:
+            self._run(pending, process_item, manifest, initializer, initargs)
+
+        self.last_shard_ids = [shard_id for shard_id, _, _ in shards]
+        errors = self.stats()["errors"]
+        if errors:
+            print(f"   ⚠️  실패한 항목 {errors}개 (manifest.json의 failures 참고, 다시 실행하면 해당 샤드를 재처리)")
+        dataset = self.merge(self.last_shard_ids)
+        if output_path is not None:
+            save_dataset(dataset, output_path)
+        return dataset
+
+    def stats(self, shard_ids: Optional[List[int]] = None) -> Dict[str, int]:
+        """
+        manifest 기준 누적 통계 (records, skipped, errors - errors는 아직 재처리되지 않은 실패 항목 수)
+
+        Args:
+            shard_ids: 집계할 샤드 (None이면 마지막 build()의 샤드)
+        """
+        if shard_ids is None:
+            shard_ids = self.last_shard_ids
+        shards = self._load_manifest()["shards"]
+        totals = {"records": 0, "skipped": 0, "errors": 0}
+        for shard_id in shard_ids:
+            entry = shards.get(str(shard_id), {})
+            for key in totals:
+                totals[key] += entry.get(key, 0)
+        return totals
+
+    def merge(self, shard_ids: List[int]) -> List[Dict[str, Any]]:
+        """샤드 순서대로 JSONL 파일을 읽어 하나의 리스트로 병합"""
+        dataset = []
+        for shard_id in shard_ids:
+            with open(self._shard_path(shard_id)) as f:
+                dataset.extend(json.loads(line) for line in f if line.strip())
+        return dataset
+
+    def _run(
+        self,
+        pending: List[Tuple[int, List[Any], str]],
+        process_item: Callable[[Any], List[Dict[str, Any]]],
+        manifest: Dict[str, Any],
+        initializer: Optional[Callable[..., None]],
+        initargs: Tuple
+    ) -> None:
+        """남은 샤드를 프로세스 풀에서 처리하고 완료될 때마다 manifest 갱신"""
+        hashes = {shard_id: items_hash for shard_id, _, items_hash in pending}
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.num_workers, len(pending)),
+            initializer=initializer,
+            initargs=initargs
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _run_shard,
+                    process_item,
+                    shard_id,
+                    shard_items,
+                    str(self._shard_path(shard_id))
+                )
+                for shard_id, shard_items, _ in pending
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                shard_id = result.pop("shard_id")
+                manifest["shards"][str(shard_id)] = {
+                    "items_hash": hashes[shard_id],
+                    "path": self._shard_path(shard_id).name,
+                    **result
+                }
+                self._save_manifest(manifest)
+                if result["errors"]:
+                    print(f"   ⚠️  샤드 {shard_id} 에러 ({done}/{len(pending)}): {result['records']}개 레코드, "
+                          f"실패 {result['errors']}개 (첫 에러: {result['failures'][0]['error']})")
+                else:
+                    print(f"   샤드 {shard_id} 완료 ({done}/{len(pending)}): {result['records']}개 레코드")
+
+    def _make_shards(
+        self,
+        items: List[Any],
+        config: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[int, List[Any], str]]:
+        """(shard_id, 항목, 항목+설정 해시) 리스트 - 입력이나 설정이 바뀐 샤드는 해시로 감지"""
+        shards = []
+        for shard_id, start in enumerate(range(0, len(items), self.shard_size)):
+            shard_items = items[start:start + self.shard_size]
+            items_hash = hashlib.sha256(
+                json.dumps([config, shard_items], sort_keys=True, default=str).encode()
+            ).hexdigest()
+            shards.append((shard_id, shard_items, items_hash))
+        return shards
+
+    def _shard_path(self, shard_id: int) -> Path:
+        return self.work_dir / f"shard-{shard_id:05d}.jsonl"
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """manifest.json 로드 (없거나 버전이 다르거나 깨졌으면 새로 시작)"""
+        if self.manifest_path.exists():
+            try:
+                with open(self.manifest_path) as f:
+                    manifest = json.load(f)
+                if manifest.get("version") == MANIFEST_VERSION:
+                    return manifest
+            except (OSError, ValueError):
+                pass
+        return {"version": MANIFEST_VERSION, "shard_size": self.shard_size, "shards": {}}
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        _atomic_write_text(self.manifest_path, json.dumps(manifest, indent=2))
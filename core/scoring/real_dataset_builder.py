@@ -5,16 +5,30 @@ Etherscan API를 사용하여 실제 거래 데이터를 수집하고 라벨링
 """
 from __future__ import annotations
 
-import json
-from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 from core.data.etherscan_client import RealDataCollector
 from core.scoring.dataset_builder import DatasetBuilder
+from core.scoring.parallel_builder import ParallelDatasetBuilder
 from core.data.lists import ListLoader
 
 
+# 워커 프로세스별 RealDatasetBuilder (_init_worker에서 생성)
+_WORKER_BUILDER: Optional["RealDatasetBuilder"] = None
+
+
+def _init_worker(api_key: str, chain: str) -> None:
+    """ParallelDatasetBuilder 워커 초기화"""
+    global _WORKER_BUILDER
+    _WORKER_BUILDER = RealDatasetBuilder(api_key=api_key, chain=chain)
+
+
+def _collect_and_label(item: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """워커에서 주소 하나 처리 (RealDatasetBuilder.collect_and_label)"""
+    return _WORKER_BUILDER.collect_and_label(item)
+
+
 class RealDatasetBuilder:
     """실제 데이터로 학습 데이터셋 구축"""
     
@@ -35,123 +49,35 @@ class RealDatasetBuilder:
         self,
         addresses: List[str],
         max_transactions_per_address: int = 100,
-        output_path: str = "data/dataset/real_high_risk.json"
+        output_path: str = "data/dataset/real_high_risk.json",
+        num_workers: int = 1,
+        work_dir: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         고위험 주소의 거래 데이터로 학습 데이터셋 구축
         
+        주소 리스트를 샤드로 나눠 처리하고 샤드별 결과를 기록하므로,
+        중단 후 다시 실행하면 완료된 샤드는 건너뛴다 (ParallelDatasetBuilder).
+        
         Args:
             addresses: 고위험 주소 리스트 (OFAC, 믹서 등)
             max_transactions_per_address: 주소당 최대 거래 수
             output_path: 출력 파일 경로
+            num_workers: 워커 프로세스 수 (Etherscan rate limit을 고려해 기본 1)
+            work_dir: 샤드/manifest 디렉토리 (None이면 "{output_path}.shards")
         
         Returns:
             학습 데이터셋
         """
         print(f"고위험 주소 {len(addresses)}개에서 거래 수집 중...")
         
-        # 거래 수집
-        transactions = self.collector.collect_high_risk_addresses(
-            addresses=addresses,
-            max_transactions_per_address=max_transactions_per_address
-        )
-        
-        print(f"수집된 거래 수: {len(transactions)}")
-        
-        # 라벨링 및 데이터셋 구축
-        dataset = []
-        
-        sdn_list = self.list_loader.get_sdn_list()
-        mixer_list = self.list_loader.get_mixer_list()
-        
-        for tx in transactions:
-            # 라벨 결정
-            from_addr = tx.get("from", "").lower()
-            to_addr = tx.get("to", "").lower()
-            
-            is_sanctioned = (
-                from_addr in sdn_list or
-                to_addr in sdn_list
-            )
-            is_mixer = (
-                from_addr in mixer_list or
-                to_addr in mixer_list
-            )
-            
-            # Etherscan 태그 정보 활용
-            from_tags = self.collector.client.get_address_tags(from_addr)
-            to_tags = self.collector.client.get_address_tags(to_addr)
-            
-            # 엔티티 타입 결정 (태그 우선)
-            entity_type = "unknown"
-            if is_mixer:
-                entity_type = "mixer"
-            elif is_sanctioned:
-                entity_type = "sanctioned"
-            elif to_tags.get("is_exchange") or from_tags.get("is_exchange"):
-                entity_type = "cex"
-            elif to_tags.get("is_token") or from_tags.get("is_token"):
-                entity_type = "token"
-            elif to_tags.get("is_contract") or from_tags.get("is_contract"):
-                entity_type = "contract"
-            
-            # 고위험 라벨
-            if is_sanctioned or is_mixer:
-                label = "fraud"
-                score = 85.0
-            elif entity_type in ["cex", "dex"]:
-                # CEX/DEX는 일반적으로 정상
-                label = "normal"
-                score = 15.0
-            else:
-                # 규칙 기반으로 판단
-                label = "normal"
-                score = 15.0
-            
-            # 거래 데이터 보강
-            tx["is_sanctioned"] = is_sanctioned
-            tx["is_mixer"] = is_mixer
-            tx["is_known_scam"] = False  # 별도 리스트 필요
-            tx["is_bridge"] = False  # 별도 리스트 필요
-            tx["label"] = entity_type
-            tx["from_tags"] = from_tags
-            tx["to_tags"] = to_tags
-            
-            # 룰 평가
-            rule_results = self.dataset_builder.rule_evaluator.evaluate_single_transaction(
-                self._convert_to_rule_data(tx)
-            )
-            
-            # 컨텍스트
-            tx_context = {
-                "amount_usd": tx.get("amount_usd", 0),
-                "is_sanctioned": is_sanctioned,
-                "is_mixer": is_mixer,
-                "chain": self.chain,
-            }
-            
-            dataset.append({
-                "rule_results": rule_results,
-                "actual_risk_score": score,
-                "tx_context": tx_context,
-                "ground_truth_label": label,
-                "tx_hash": tx.get("tx_hash", ""),
-                "chain": self.chain,
-                "data_source": "etherscan_high_risk"
-            })
-        
-        # 저장
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(output_file, 'w') as f:
-            json.dump(dataset, f, indent=2, ensure_ascii=False)
-        
-        print(f"데이터셋 저장 완료: {output_path}")
-        print(f"  총 {len(dataset)}개 샘플")
-        print(f"  Fraud: {sum(1 for d in dataset if d['ground_truth_label'] == 'fraud')}개")
-        print(f"  Normal: {sum(1 for d in dataset if d['ground_truth_label'] == 'normal')}개")
+        items = [
+            {"address": address, "kind": "high_risk", "max_transactions": max_transactions_per_address}
+            for address in addresses
+        ]
+        dataset = self._build_parallel(items, output_path, num_workers, work_dir)
         
+        self._print_summary(dataset, output_path)
         return dataset
     
     def build_from_known_addresses(
@@ -159,7 +85,9 @@ class RealDatasetBuilder:
         high_risk_addresses: List[str],
         normal_addresses: List[str],
         max_transactions_per_address: int = 50,
-        output_path: str = "data/dataset/real_balanced.json"
+        output_path: str = "data/dataset/real_balanced.json",
+        num_workers: int = 1,
+        work_dir: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         알려진 주소(고위험 + 정상)로 균형잡힌 데이터셋 구축
@@ -169,121 +97,235 @@ class RealDatasetBuilder:
             normal_addresses: 정상 주소 리스트 (CEX, DEX 등)
             max_transactions_per_address: 주소당 최대 거래 수
             output_path: 출력 파일 경로
+            num_workers: 워커 프로세스 수 (Etherscan rate limit을 고려해 기본 1)
+            work_dir: 샤드/manifest 디렉토리 (None이면 "{output_path}.shards")
         
         Returns:
             학습 데이터셋
         """
-        print(f"고위험 주소 {len(high_risk_addresses)}개 수집 중...")
-        high_risk_txs = self.collector.collect_high_risk_addresses(
-            addresses=high_risk_addresses,
-            max_transactions_per_address=max_transactions_per_address
-        )
+        print(f"고위험 주소 {len(high_risk_addresses)}개, 정상 주소 {len(normal_addresses)}개 수집 중...")
         
-        print(f"정상 주소 {len(normal_addresses)}개 수집 중...")
-        normal_txs = self.collector.collect_high_risk_addresses(
-            addresses=normal_addresses,
-            max_transactions_per_address=max_transactions_per_address
+        # 고위험 거래를 먼저, 정상 거래를 뒤에 (샤드 순서대로 병합)
+        items = [
+            {"address": address, "kind": "known_fraud", "max_transactions": max_transactions_per_address}
+            for address in high_risk_addresses
+        ] + [
+            {"address": address, "kind": "known_normal", "max_transactions": max_transactions_per_address}
+            for address in normal_addresses
+        ]
+        dataset = self._build_parallel(items, output_path, num_workers, work_dir)
+        
+        self._print_summary(dataset, output_path)
+        return dataset
+    
+    def _build_parallel(
+        self,
+        items: List[Dict[str, Any]],
+        output_path: str,
+        num_workers: int,
+        work_dir: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """주소 항목을 ParallelDatasetBuilder로 수집·라벨링하고 output_path에 병합 저장"""
+        builder = ParallelDatasetBuilder(
+            work_dir=work_dir or f"{output_path}.shards",
+            num_workers=num_workers,
+            shard_size=10
         )
+        return builder.build(
+            items,
+            _collect_and_label,
+            output_path=output_path,
+            initializer=_init_worker,
+            initargs=(self.api_key, self.chain)
+        )
+    
+    def collect_and_label(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        주소 하나의 거래를 수집해 데이터셋 항목으로 변환
+        
+        룰 평가 상태(윈도우 히스토리, 제재 근접도)는 주소마다 초기화하므로, rule_results는 그 주소의
+        거래만으로 계산되고 샤드 분할, 워커 배정, 재개 순서와 무관하다.
+        
+        Args:
+            item: {"address", "kind" ("high_risk"|"known_fraud"|"known_normal"), "max_transactions"}
+        
+        Returns:
+            데이터셋 항목 리스트
         
-        # 라벨링
-        dataset = []
+        Raises:
+            Exception: Etherscan 수집 실패 (ParallelDatasetBuilder가 실패 항목으로 기록하고 재개 시 다시 처리)
+        """
+        transactions = self.collector.collect_address_transactions(
+            address=item["address"],
+            max_transactions=item["max_transactions"],
+            raise_errors=True
+        )
+        self.dataset_builder.rule_evaluator.reset_history()
         
+        kind = item["kind"]
+        if kind == "high_risk":
+            return [self._label_high_risk_transaction(tx) for tx in transactions]
+        if kind == "known_fraud":
+            return [self._label_known_fraud_transaction(tx) for tx in transactions]
+        if kind == "known_normal":
+            return [self._label_known_normal_transaction(tx) for tx in transactions]
+        raise ValueError(f"Unknown item kind: {kind}")
+    
+    def _sanction_flags(self, tx: Dict[str, Any]) -> Dict[str, Any]:
+        """SDN/믹서 여부와 Etherscan 태그 기반 엔티티 타입"""
         sdn_list = self.list_loader.get_sdn_list()
         mixer_list = self.list_loader.get_mixer_list()
         
-        # 고위험 거래
-        for tx in high_risk_txs:
-            is_sanctioned = (
-                tx.get("from", "").lower() in sdn_list or
-                tx.get("to", "").lower() in sdn_list
-            )
-            is_mixer = (
-                tx.get("from", "").lower() in mixer_list or
-                tx.get("to", "").lower() in mixer_list
-            )
-            
-            # Etherscan 태그 정보 활용
-            from_addr = tx.get("from", "").lower()
-            to_addr = tx.get("to", "").lower()
-            from_tags = self.collector.client.get_address_tags(from_addr)
-            to_tags = self.collector.client.get_address_tags(to_addr)
-            
-            # 엔티티 타입 결정
-            entity_type = "unknown"
-            if is_mixer:
-                entity_type = "mixer"
-            elif is_sanctioned:
-                entity_type = "sanctioned"
-            elif to_tags.get("is_exchange") or from_tags.get("is_exchange"):
-                entity_type = "cex"
-            elif to_tags.get("is_token") or from_tags.get("is_token"):
-                entity_type = "token"
-            elif to_tags.get("is_contract") or from_tags.get("is_contract"):
-                entity_type = "contract"
-            
-            tx["is_sanctioned"] = is_sanctioned
-            tx["is_mixer"] = is_mixer
-            tx["label"] = entity_type
-            tx["from_tags"] = from_tags
-            tx["to_tags"] = to_tags
-            
-            rule_results = self.dataset_builder.rule_evaluator.evaluate_single_transaction(
-                self._convert_to_rule_data(tx)
-            )
-            
-            dataset.append({
-                "rule_results": rule_results,
-                "actual_risk_score": 85.0,
-                "tx_context": {
-                    "amount_usd": tx.get("amount_usd", 0),
-                    "is_sanctioned": is_sanctioned,
-                    "is_mixer": is_mixer,
-                    "chain": self.chain,
-                },
-                "ground_truth_label": "fraud",
-                "tx_hash": tx.get("tx_hash", ""),
-                "chain": self.chain,
-                "data_source": "etherscan_high_risk"
-            })
+        from_addr = tx.get("from", "").lower()
+        to_addr = tx.get("to", "").lower()
         
-        # 정상 거래
-        for tx in normal_txs:
-            tx["is_sanctioned"] = False
-            tx["is_mixer"] = False
-            tx["label"] = "cex"  # 또는 "dex", "defi" 등
-            
-            rule_results = self.dataset_builder.rule_evaluator.evaluate_single_transaction(
-                self._convert_to_rule_data(tx)
-            )
-            
-            dataset.append({
-                "rule_results": rule_results,
-                "actual_risk_score": 15.0,
-                "tx_context": {
-                    "amount_usd": tx.get("amount_usd", 0),
-                    "is_sanctioned": False,
-                    "is_mixer": False,
-                    "chain": self.chain,
-                },
-                "ground_truth_label": "normal",
-                "tx_hash": tx.get("tx_hash", ""),
-                "chain": self.chain,
-                "data_source": "etherscan_normal"
-            })
+        is_sanctioned = (
+            from_addr in sdn_list or
+            to_addr in sdn_list
+        )
+        is_mixer = (
+            from_addr in mixer_list or
+            to_addr in mixer_list
+        )
+        
+        # Etherscan 태그 정보 활용
+        from_tags = self.collector.client.get_address_tags(from_addr)
+        to_tags = self.collector.client.get_address_tags(to_addr)
+        
+        # 엔티티 타입 결정 (태그 우선)
+        entity_type = "unknown"
+        if is_mixer:
+            entity_type = "mixer"
+        elif is_sanctioned:
+            entity_type = "sanctioned"
+        elif to_tags.get("is_exchange") or from_tags.get("is_exchange"):
+            entity_type = "cex"
+        elif to_tags.get("is_token") or from_tags.get("is_token"):
+            entity_type = "token"
+        elif to_tags.get("is_contract") or from_tags.get("is_contract"):
+            entity_type = "contract"
+        
+        return {
+            "is_sanctioned": is_sanctioned,
+            "is_mixer": is_mixer,
+            "entity_type": entity_type,
+            "from_tags": from_tags,
+            "to_tags": to_tags
+        }
+    
+    def _label_high_risk_transaction(self, tx: Dict[str, Any]) -> Dict[str, Any]:
+        """고위험 주소 거래 라벨링 (SDN/믹서 연관이면 fraud)"""
+        flags = self._sanction_flags(tx)
+        is_sanctioned = flags["is_sanctioned"]
+        is_mixer = flags["is_mixer"]
+        entity_type = flags["entity_type"]
+        
+        # 고위험 라벨
+        if is_sanctioned or is_mixer:
+            label = "fraud"
+            score = 85.0
+        elif entity_type in ["cex", "dex"]:
+            # CEX/DEX는 일반적으로 정상
+            label = "normal"
+            score = 15.0
+        else:
+            # 규칙 기반으로 판단
+            label = "normal"
+            score = 15.0
+        
+        # 거래 데이터 보강
+        tx["is_sanctioned"] = is_sanctioned
+        tx["is_mixer"] = is_mixer
+        tx["is_known_scam"] = False  # 별도 리스트 필요
+        tx["is_bridge"] = False  # 별도 리스트 필요
+        tx["label"] = entity_type
+        tx["from_tags"] = flags["from_tags"]
+        tx["to_tags"] = flags["to_tags"]
+        
+        # 룰 평가
+        rule_results = self.dataset_builder.rule_evaluator.evaluate_single_transaction(
+            self._convert_to_rule_data(tx)
+        )
+        
+        # 컨텍스트
+        tx_context = {
+            "amount_usd": tx.get("amount_usd", 0),
+            "is_sanctioned": is_sanctioned,
+            "is_mixer": is_mixer,
+            "chain": self.chain,
+        }
+        
+        return {
+            "rule_results": rule_results,
+            "actual_risk_score": score,
+            "tx_context": tx_context,
+            "ground_truth_label": label,
+            "tx_hash": tx.get("tx_hash", ""),
+            "chain": self.chain,
+            "data_source": "etherscan_high_risk"
+        }
+    
+    def _label_known_fraud_transaction(self, tx: Dict[str, Any]) -> Dict[str, Any]:
+        """알려진 고위험 주소 거래 라벨링 (항상 fraud)"""
+        flags = self._sanction_flags(tx)
+        is_sanctioned = flags["is_sanctioned"]
+        is_mixer = flags["is_mixer"]
+        
+        tx["is_sanctioned"] = is_sanctioned
+        tx["is_mixer"] = is_mixer
+        tx["label"] = flags["entity_type"]
+        tx["from_tags"] = flags["from_tags"]
+        tx["to_tags"] = flags["to_tags"]
         
-        # 저장
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        rule_results = self.dataset_builder.rule_evaluator.evaluate_single_transaction(
+            self._convert_to_rule_data(tx)
+        )
         
-        with open(output_file, 'w') as f:
-            json.dump(dataset, f, indent=2, ensure_ascii=False)
+        return {
+            "rule_results": rule_results,
+            "actual_risk_score": 85.0,
+            "tx_context": {
+                "amount_usd": tx.get("amount_usd", 0),
+                "is_sanctioned": is_sanctioned,
+                "is_mixer": is_mixer,
+                "chain": self.chain,
+            },
+            "ground_truth_label": "fraud",
+            "tx_hash": tx.get("tx_hash", ""),
+            "chain": self.chain,
+            "data_source": "etherscan_high_risk"
+        }
+    
+    def _label_known_normal_transaction(self, tx: Dict[str, Any]) -> Dict[str, Any]:
+        """알려진 정상 주소 거래 라벨링 (항상 normal)"""
+        tx["is_sanctioned"] = False
+        tx["is_mixer"] = False
+        tx["label"] = "cex"  # 또는 "dex", "defi" 등
         
+        rule_results = self.dataset_builder.rule_evaluator.evaluate_single_transaction(
+            self._convert_to_rule_data(tx)
+        )
+        
+        return {
+            "rule_results": rule_results,
+            "actual_risk_score": 15.0,
+            "tx_context": {
+                "amount_usd": tx.get("amount_usd", 0),
+                "is_sanctioned": False,
+                "is_mixer": False,
+                "chain": self.chain,
+            },
+            "ground_truth_label": "normal",
+            "tx_hash": tx.get("tx_hash", ""),
+            "chain": self.chain,
+            "data_source": "etherscan_normal"
+        }
+    
+    def _print_summary(self, dataset: List[Dict[str, Any]], output_path: str) -> None:
         print(f"데이터셋 저장 완료: {output_path}")
         print(f"  총 {len(dataset)}개 샘플")
         print(f"  Fraud: {sum(1 for d in dataset if d['ground_truth_label'] == 'fraud')}개")
         print(f"  Normal: {sum(1 for d in dataset if d['ground_truth_label'] == 'normal')}개")
-        
-        return dataset
     
     def _convert_to_rule_data(self, tx: Dict[str, Any]) -> Dict[str, Any]:
         """거래 데이터를 룰 평가용 형식으로 변환"""
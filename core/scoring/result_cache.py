@@ -0,0 +1,407 @@
+"""
+주소 분석 결과 캐시
+
+같은 주소를 같은 거래로 다시 분석하는 요청(케이스 관리 UI의 재조회 등)에서
+룰 엔진과 ML을 다시 돌리지 않도록 응답 JSON을 캐시한다.
+메모리 LRU를 먼저 보고, 디스크 디렉토리를 지정하면 그다음 디스크에서 찾는다.
+
+키: (엔드포인트, 주소, 제출된 거래 목록 해시, analysis_type, 기타 요청 파라미터, 버전)
+    - 룰 버전: 룰북 YAML 내용 해시
+    - 리스트 버전: 주소 리스트(data/lists, ListLoader가 대신 읽는 dataset/*.json) + 리스트 로더 코드(core/data) 해시
+    - 모델 버전: 모델 매니페스트 + 주소 분석 코드(룰 평가기, 집계, MPOCryptoML 스코어러) 해시
+    버전은 VERSION_CHECK_INTERVAL마다 확인하고 파일 (mtime, 크기)가 바뀔 때만 다시 계산하며, 하나라도 바뀌면 메모리 캐시를 비우고
+    디스크는 새 파티션 디렉토리를 쓴다 (이전 파티션은 삭제).
+
+거래 목록 해시는 순서를 포함한다 (같은 시각 거래의 평가 순서가 윈도우 룰 결과에 영향을 줄 수 있음).
+
+환경 변수:
+    AML_RESULT_CACHE_SIZE          메모리 캐시 최대 항목 수 (기본 256, 0이면 캐시 사용 안 함)
+    AML_RESULT_CACHE_DIR           디스크 캐시 디렉토리 (지정하지 않으면 메모리만 사용)
+    AML_RESULT_CACHE_DISK_ENTRIES  디스크 캐시 최대 항목 수 (기본 10000)
+
+사용법:
+    cache = get_result_cache()
+    key = cache.key("address", address, transactions, analysis_type, chain=chain)
+    payload, age = cache.get_or_compute(key, lambda: compute_response())  # age: 적중 시 저장 후 지난 초, 아니면 None
+
+캐시된 응답 본문은 처음 분석한 결과 그대로이므로 completed_at도 처음 분석한 시각이다.
+적중 여부와 저장 후 지난 시간은 라우트가 X-Cache, X-Cache-Age 헤더로 알려 준다.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+
+project_root = Path(__file__).parent.parent.parent
+
+# 버전별 입력 파일/디렉토리 (project_root 기준, 디렉토리는 *.py/*.json/*.yaml 전체)
+VERSION_SOURCES: Dict[str, List[str]] = {
+    "rules": ["rules/tracex_rules.yaml"],
+    "lists": [
+        "data/lists",
+        # ListLoader가 data/lists에 없을 때 읽는 레거시 위치
+        "dataset/sdn_addresses.json",
+        "dataset/scam_addresses.json",
+        "dataset/cex_addresses.json",
+        "dataset/bridge_contracts.json",
+        # KNOWN_SERVICE_ADDRESSES 등 코드에 들어 있는 주소와 리스트 로딩 방식
+        "core/data",
+    ],
+    "model": [
+        "models/manifest.json",
+        "core/scoring/address_analyzer.py",
+        "core/scoring/hybrid_address_analyzer.py",
+        "core/rules",
+        "core/aggregation",
+    ],
+}
+VERSION_FILE_SUFFIXES = (".py", ".json", ".yaml", ".yml")
+# 버전 파일을 다시 확인하는 최소 간격(초) - 요청마다 파일 목록을 stat하지 않도록
+VERSION_CHECK_INTERVAL = 1.0
+
+
+def _hash_json(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SourceVersion:
+    """
+    파일 묶음의 내용 해시 (파일 목록과 (mtime, 크기)가 같으면 다시 읽지 않음)
+    """
+
+    def __init__(self, paths: List[Path]):
+        """
+        Args:
+            paths: 파일 또는 디렉토리 경로 (없는 경로는 "없음"으로 해시에 반영)
+        """
+        self.paths = paths
+        self._signature = None
+        self._version = None
+
+    def _files(self) -> List[Path]:
+        files = []
+        for path in self.paths:
+            if path.is_dir():
+                files.extend(sorted(
+                    p for p in path.rglob("*")
+                    if p.is_file() and p.suffix in VERSION_FILE_SUFFIXES and "__pycache__" not in p.parts
+                ))
+            else:
+                files.append(path)
+        return files
+
+    def version(self) -> str:
+        """현재 내용 해시 (16자리)"""
+        signature = []
+        files = self._files()
+        for path in files:
+            try:
+                stat = path.stat()
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((str(path), None, None))
+        if signature != self._signature:
+            digest = hashlib.sha256()
+            for path in files:
+                digest.update(str(path.relative_to(project_root) if path.is_relative_to(project_root) else path).encode("utf-8"))
+                digest.update(b"\0")
+                try:
+                    digest.update(path.read_bytes())
+                except OSError:
+                    digest.update(b"<missing>")
+                digest.update(b"\0")
+            self._signature = signature
+            self._version = digest.hexdigest()[:16]
+        return self._version
+
+
+class AnalysisResultCache:
+    """
+    분석 응답 JSON 캐시 (메모리 LRU + 선택적 디스크)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        disk_dir: Optional[str] = None,
+        max_disk_entries: int = 10000,
+        version_sources: Optional[Dict[str, List[str]]] = None
+    ):
+        """
+        Args:
+            max_entries: 메모리 캐시 최대 항목 수 (0이면 캐시 사용 안 함)
+            disk_dir: 디스크 캐시 디렉토리 (None이면 메모리만 사용)
+            max_disk_entries: 디스크 캐시 최대 항목 수 (넘으면 오래된 파일부터 삭제)
+            version_sources: 버전 이름 → 입력 경로 목록 (None이면 VERSION_SOURCES)
+        """
+        self.max_entries = max(0, max_entries)
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_entries = max(1, max_disk_entries)
+        self._sources = {
+            name: SourceVersion([project_root / path for path in paths])
+            for name, paths in (version_sources or VERSION_SOURCES).items()
+        }
+        # 키 → (응답, 계산 시간(초), 저장 시각(epoch))
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions_hash = None
+        self._versions_checked_at = 0.0
+        self._disk_count = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.compute_seconds = 0.0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "AnalysisResultCache":
+        """환경 변수(AML_RESULT_CACHE_*) 설정으로 생성"""
+        return cls(
+            max_entries=int(os.getenv("AML_RESULT_CACHE_SIZE", "256")),
+            disk_dir=os.getenv("AML_RESULT_CACHE_DIR") or None,
+            max_disk_entries=int(os.getenv("AML_RESULT_CACHE_DISK_ENTRIES", "10000")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def versions(self) -> Dict[str, str]:
+        """현재 룰/리스트/모델 버전"""
+        return {name: source.version() for name, source in self._sources.items()}
+
+    def key(
+        self,
+        endpoint: str,
+        address: str,
+        transactions: List[Dict[str, Any]],
+        analysis_type: str,
+        **params: Any
+    ) -> str:
+        """
+        캐시 키 (버전이 바뀌면 같은 요청도 다른 키)
+
+        Args:
+            endpoint: 응답 형식 구분 (같은 입력이라도 엔드포인트마다 응답이 다름)
+            address: 분석 대상 주소
+            transactions: 제출된 거래 목록 (순서 포함)
+            analysis_type: 분석 타입
+            **params: 응답에 영향을 주는 나머지 요청 파라미터 (chain, time_range 등)
+        """
+        versions_hash = self._check_versions()
+        return _hash_json({
+            "endpoint": endpoint,
+            "address": address,
+            "transactions": _hash_json(transactions),
+            "analysis_type": analysis_type,
+            "params": params,
+            "versions": versions_hash,
+        })
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """캐시된 응답 (메모리 → 디스크, 없으면 None, 반환값은 수정하지 말 것)"""
+        entry = self._lookup(key)
+        return entry[0] if entry is not None else None
+
+    def put(self, key: str, payload: Dict[str, Any], compute_seconds: float) -> None:
+        """응답 저장 (compute_seconds: 이 응답을 계산하는 데 걸린 시간, 적중 시 절약 시간으로 집계)"""
+        if not self.enabled:
+            return
+        cached_at = time.time()
+        with self._lock:
+            self.compute_seconds += compute_seconds
+            self._remember(key, (payload, compute_seconds, cached_at))
+        self._write_disk(key, payload, compute_seconds, cached_at)
+
+    def get_or_compute(
+        self,
+        key: Optional[str],
+        compute: Callable[[], Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Optional[float]]:
+        """
+        캐시된 응답 또는 계산 후 저장
+
+        Args:
+            key: 캐시 키 (None이면 캐시를 보지 않고 계산만)
+            compute: 응답 계산 함수
+
+        Returns:
+            (응답, 캐시 나이) - 캐시 나이는 적중 시 저장 후 지난 초, 새로 계산했으면 None
+        """
+        if key is None:
+            return compute(), None
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry[0], max(0.0, time.time() - entry[2])
+        start = time.perf_counter()
+        payload = compute()
+        self.put(key, payload, time.perf_counter() - start)
+        return payload, None
+
+    def clear(self) -> None:
+        """메모리 캐시 비우기 (디스크와 통계는 유지)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 (적중률, 절약 시간 등)"""
+        versions = self.versions()
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+                "disk_entries": self._disk_count,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "compute_seconds": self.compute_seconds,
+                "invalidations": self.invalidations,
+                "versions": versions,
+            }
+
+    def _check_versions(self) -> str:
+        """버전 확인 (바뀌었으면 메모리 캐시를 비우고 이전 디스크 파티션 삭제)"""
+        now = time.monotonic()
+        if self._versions_hash is not None and now - self._versions_checked_at < VERSION_CHECK_INTERVAL:
+            return self._versions_hash
+        versions_hash = _hash_json(self.versions())[:16]
+        with self._lock:
+            self._versions_checked_at = now
+            if versions_hash == self._versions_hash:
+                return versions_hash
+            if self._versions_hash is not None:
+                self._entries.clear()
+                self.invalidations += 1
+                print(f"🔄 분석 결과 캐시 무효화: 버전 변경 ({self._versions_hash} → {versions_hash})")
+            self._versions_hash = versions_hash
+            self._disk_count = None
+        if self.disk_dir is not None:
+            self._drop_stale_partitions(versions_hash)
+        return versions_hash
+
+    def _lookup(self, key: str) -> Optional[Tuple[Dict[str, Any], float, float]]:
+        """(응답, 계산 시간, 저장 시각) 조회 (메모리 → 디스크, 적중/미스 집계)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                self.saved_seconds += entry[1]
+                return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self.saved_seconds += entry[1]
+            self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: Tuple[Dict[str, Any], float, float]) -> None:
+        """메모리 LRU에 추가 (lock 안에서 호출)"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ----- 디스크 -----
+
+    def _partition_dir(self) -> Path:
+        return self.disk_dir / f"v{self._versions_hash}"
+
+    def _disk_path(self, key: str) -> Path:
+        return self._partition_dir() / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[Tuple[Dict[str, Any], float, float]]:
+        if self.disk_dir is None or self._versions_hash is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # cached_at이 없는 이전 형식 파일은 파일 수정 시각으로 대신함
+            cached_at = data.get("cached_at")
+            cached_at = float(cached_at) if cached_at is not None else path.stat().st_mtime
+            return data["payload"], float(data.get("compute_seconds", 0.0)), cached_at
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def _write_disk(self, key: str, payload: Dict[str, Any], compute_seconds: float, cached_at: float) -> None:
+        """디스크에 저장 (임시 파일 → rename, 실패해도 메모리 캐시는 유지)"""
+        if self.disk_dir is None or self._versions_hash is None:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"payload": payload, "compute_seconds": compute_seconds, "cached_at": cached_at},
+                    f, default=str, ensure_ascii=False
+                )
+            existed = path.exists()
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️  분석 결과 디스크 캐시 저장 실패: {e}")
+            return
+        if not existed:
+            self._count_disk_entry()
+
+    def _count_disk_entry(self) -> None:
+        """디스크 항목 수 갱신, max_disk_entries를 넘으면 오래된 파일부터 10% 삭제"""
+        with self._lock:
+            if self._disk_count is None:
+                self._disk_count = sum(1 for _ in self._partition_dir().glob("*/*.json"))
+            else:
+                self._disk_count += 1
+            if self._disk_count <= self.max_disk_entries:
+                return
+            files = sorted(self._partition_dir().glob("*/*.json"), key=lambda p: p.stat().st_mtime)
+            excess = len(files) - int(self.max_disk_entries * 0.9)
+            for path in files[:max(0, excess)]:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._disk_count = len(files) - max(0, excess)
+
+    def _drop_stale_partitions(self, versions_hash: str) -> None:
+        """현재 버전이 아닌 디스크 파티션 삭제"""
+        if not self.disk_dir.exists():
+            return
+        for path in self.disk_dir.glob("v*"):
+            if path.is_dir() and path.name != f"v{versions_hash}":
+                shutil.rmtree(path, ignore_errors=True)
+
+
+# 프로세스 공용 결과 캐시 (지연 생성)
+result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> AnalysisResultCache:
+    """공용 분석 결과 캐시 (첫 호출 시 환경 변수 설정으로 생성)"""
+    global result_cache
+    with _result_cache_lock:
+        if result_cache is None:
+            result_cache = AnalysisResultCache.from_env()
+    return result_cache
@@ -0,0 +1,242 @@
+"""
+ImprovedRuleScorer 설정 그리드 탐색
+
+optimize_rule_scorer는 설정(집계 방식 × 보너스 플래그)마다 검증 샘플 전체를 calculate_score로 다시 채점했다.
+calculate_score의 각 항은 설정에 따라 켜고 끄는 것일 뿐 샘플별 값은 변하지 않으므로,
+샘플마다 항별 값(집계 점수 5종 × 축 가중치 유무, 보너스, 컨텍스트/ML 점수, 보정값)을 한 번만 계산해 두고
+설정별 점수는 배열 덧셈과 clip으로 만든다. 덧셈 순서는 calculate_score와 같아 점수가 비트 단위로 일치한다.
+
+임계값은 rule_whatif.sweep_thresholds로 정렬 한 번에 모두 평가하고,
+설정들은 num_workers > 1이면 프로세스 풀로 나눠 평가한다.
+
+사용법:
+    tuner = RuleScorerTuner(val_data)
+    result = tuner.grid_search(num_workers=4)
+    result["best"]       # {"config", "results"}
+    result["surface"]    # 설정별 임계값-지표 곡선 전체
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+from .improved_rule_scorer import ImprovedRuleScorer
+from .rule_whatif import DEFAULT_THRESHOLDS, sweep_thresholds
+
+
+AGGREGATION_METHODS = ["simple_sum", "weighted_sum", "max", "mean", "sqrt_sum"]
+
+# 워커 프로세스에서 공유하는 튜너 (initializer에서 설정)
+_WORKER_TUNER: Optional["RuleScorerTuner"] = None
+
+
+def default_configs() -> List[Dict[str, Any]]:
+    """optimize_rule_scorer의 기존 탐색 순서 (집계 방식 × count × severity × axis)"""
+    return [
+        {
+            "aggregation_method": method,
+            "use_rule_count_bonus": use_count,
+            "use_severity_bonus": use_severity,
+            "use_axis_bonus": use_axis,
+        }
+        for method, use_count, use_severity, use_axis in product(
+            AGGREGATION_METHODS, [True, False], [True, False], [True, False]
+        )
+    ]
+
+
+def item_context(item: Dict[str, Any]) -> Dict[str, Any]:
+    """검증 샘플 → calculate_score에 넘기는 tx_context (optimize_rule_scorer와 동일)"""
+    return {
+        "num_transactions": item.get("num_transactions", 0),
+        "graph_nodes": item.get("graph_nodes", 0),
+        "graph_edges": item.get("graph_edges", 0),
+        "ml_features": item.get("ml_features", {})
+    }
+
+
+def _init_worker(tuner: "RuleScorerTuner") -> None:
+    global _WORKER_TUNER
+    _WORKER_TUNER = tuner
+
+
+def _evaluate_configs(configs: List[Dict[str, Any]], thresholds: Optional[List[float]]) -> List[Dict[str, Any]]:
+    return [_WORKER_TUNER.evaluate(config, thresholds) for config in configs]
+
+
+class RuleScorerTuner:
+    """
+    ImprovedRuleScorer 설정별 점수를 샘플별 항 배열의 조합으로 계산하는 튜너
+    """
+
+    def __init__(self, items: Sequence[Dict[str, Any]]):
+        """
+        Args:
+            items: 검증 샘플 (rule_results, ground_truth_label, num_transactions, graph_nodes, ml_features)
+        """
+        n = len(items)
+        self.labels = np.array(
+            [1 if item.get("ground_truth_label", "normal") == "fraud" else 0 for item in items],
+            dtype=np.int64
+        )
+        self.empty = np.zeros(n, dtype=bool)
+        # (집계 방식, 축 가중치 사용 여부) → 샘플별 집계 점수
+        self.aggregates = {
+            (method, use_axis): np.zeros(n, dtype=np.float64)
+            for method in AGGREGATION_METHODS for use_axis in (True, False)
+        }
+        self.context_scores = np.zeros(n, dtype=np.float64)
+        self.ml_bonus = np.zeros(n, dtype=np.float64)
+        self.pattern_corrections = np.zeros(n, dtype=np.float64)
+        self.count_corrections = np.zeros(n, dtype=np.float64)
+        self.count_bonus = np.zeros(n, dtype=np.float64)
+        self.severity_bonus = np.zeros(n, dtype=np.float64)
+        self.axis_bonus = np.zeros(n, dtype=np.float64)
+        self._precompute(items)
+
+    def _precompute(self, items: Sequence[Dict[str, Any]]) -> None:
+        """샘플마다 설정과 무관한 항을 ImprovedRuleScorer의 메서드로 한 번씩 계산"""
+        scorers = {
+            (method, use_axis): ImprovedRuleScorer(aggregation_method=method, use_axis_bonus=use_axis)
+            for method in AGGREGATION_METHODS for use_axis in (True, False)
+        }
+        base = scorers[("weighted_sum", True)]
+        unweighted = scorers[("weighted_sum", False)]
+
+        for i, item in enumerate(items):
+            rule_results = item.get("rule_results", [])
+            if not rule_results:
+                self.empty[i] = True
+                continue
+            tx_context = item_context(item)
+
+            rule_scores = {
+                True: [base._calculate_rule_score(rule) for rule in rule_results],
+                False: [unweighted._calculate_rule_score(rule) for rule in rule_results],
+            }
+            for (method, use_axis), scorer in scorers.items():
+                self.aggregates[(method, use_axis)][i] = scorer._aggregate_scores(rule_scores[use_axis], rule_results)
+
+            if tx_context:
+                self.context_scores[i] = base._calculate_context_score(tx_context, rule_results)
+            if tx_context and "ml_features" in tx_context:
+                self.ml_bonus[i] = base._calculate_ml_bonus(tx_context["ml_features"])
+            self.pattern_corrections[i], self.count_corrections[i] = base._calculate_corrections(rule_results)
+            self.count_bonus[i] = base._calculate_rule_count_bonus(rule_results)
+            self.severity_bonus[i] = base._calculate_severity_bonus(rule_results)
+            self.axis_bonus[i] = base._calculate_axis_bonus(rule_results)
+
+    def scores(self, config: Dict[str, Any]) -> np.ndarray:
+        """
+        설정 하나의 샘플별 점수 (ImprovedRuleScorer(**config).calculate_score와 동일)
+
+        Args:
+            config: aggregation_method, use_rule_count_bonus, use_severity_bonus, use_axis_bonus
+        """
+        use_axis = config.get("use_axis_bonus", True)
+        base_score = self.aggregates[(config.get("aggregation_method", "weighted_sum"), use_axis)].copy()
+        base_score += self.context_scores
+        base_score += self.ml_bonus
+        base_score += self.pattern_corrections
+        base_score += self.count_corrections
+
+        bonus_score = np.zeros_like(base_score)
+        if config.get("use_rule_count_bonus", True):
+            bonus_score += self.count_bonus
+        if config.get("use_severity_bonus", True):
+            bonus_score += self.severity_bonus
+        if use_axis:
+            bonus_score += self.axis_bonus
+
+        final_score = np.minimum(100.0, np.maximum(0.0, base_score + bonus_score))
+        final_score[self.empty] = 0.0
+        return final_score
+
+    def evaluate(
+        self,
+        config: Dict[str, Any],
+        thresholds: Optional[Sequence[float]] = None
+    ) -> Dict[str, Any]:
+        """
+        설정 하나의 임계값별 지표 곡선과 최적 임계값
+
+        Returns:
+            {"config", "thresholds", "accuracy", "precision", "recall", "f1_score",
+             "best_threshold", "best"} - 곡선은 리스트 (JSON 저장 가능)
+        """
+        sweep = sweep_thresholds(self.scores(config), self.labels, thresholds)
+        f1 = sweep["f1_score"]
+        # F1이 가장 높은 첫 임계값 (모두 0이면 기존과 같이 50)
+        if len(f1) and f1.max() > 0:
+            best_idx = int(np.argmax(f1))
+            best_threshold = float(sweep["thresholds"][best_idx])
+            best = {name: float(sweep[name][best_idx]) for name in ("accuracy", "precision", "recall", "f1_score")}
+        else:
+            best_threshold = 50.0
+            single = sweep_thresholds(self.scores(config), self.labels, [best_threshold])
+            best = {name: float(single[name][0]) for name in ("accuracy", "precision", "recall", "f1_score")}
+
+        return {
+            "config": dict(config),
+            "thresholds": sweep["thresholds"].tolist(),
+            "accuracy": sweep["accuracy"].tolist(),
+            "precision": sweep["precision"].tolist(),
+            "recall": sweep["recall"].tolist(),
+            "f1_score": sweep["f1_score"].tolist(),
+            "best_threshold": best_threshold,
+            "best": best,
+        }
+
+    def grid_search(
+        self,
+        configs: Optional[List[Dict[str, Any]]] = None,
+        thresholds: Optional[Sequence[float]] = None,
+        num_workers: int = 1
+    ) -> Dict[str, Any]:
+        """
+        모든 설정 평가
+
+        Args:
+            configs: 평가할 설정 목록 (기본: default_configs(), 40개)
+            thresholds: 임계값 목록 (기본: 10, 12, ..., 88)
+            num_workers: 프로세스 수 (1이면 현재 프로세스에서 순차 평가)
+
+        Returns:
+            {
+                "surface": 설정별 evaluate() 결과 (configs 순서),
+                "best": {"config": 설정 + threshold, "results": 지표}  # F1 동률이면 앞쪽 설정
+            }
+        """
+        configs = configs if configs is not None else default_configs()
+        thresholds = list(DEFAULT_THRESHOLDS if thresholds is None else thresholds)
+
+        if num_workers > 1 and len(configs) > 1:
+            chunk_size = -(-len(configs) // num_workers)
+            chunks = [configs[start:start + chunk_size] for start in range(0, len(configs), chunk_size)]
+            with ProcessPoolExecutor(
+                max_workers=len(chunks),
+                initializer=_init_worker,
+                initargs=(self,)
+            ) as executor:
+                surface = [
+                    row
+                    for rows in executor.map(_evaluate_configs, chunks, [thresholds] * len(chunks))
+                    for row in rows
+                ]
+        else:
+            surface = [self.evaluate(config, thresholds) for config in configs]
+
+        best_row = None
+        for row in surface:
+            if best_row is None or row["best"]["f1_score"] > best_row["best"]["f1_score"]:
+                best_row = row
+
+        best = None
+        if best_row is not None:
+            best = {
+                "config": {**best_row["config"], "threshold": best_row["best_threshold"]},
+                "results": dict(best_row["best"]),
+            }
+        return {"surface": surface, "best": best}
@@ -0,0 +1,382 @@
+"""
+룰 튜닝용 What-if 재채점 엔진
+
+룰북을 데이터셋에 한 번만 평가해 샘플×룰 희소 발동 행렬(값 = 실제 발동 점수, B-501 같은 동적 점수 포함)을
+만들어 두고, 후보 룰 가중치/축 가중치/룰 부분집합/임계값 조합을 룰 재평가 없이 다시 채점한다.
+
+- 선형 점수 (발동 점수 × 가중치 합): 희소 행렬-벡터 곱 한 번
+- 1단계 점수 (ImprovedRuleScorer + 그래프 점수): 저장된 발동 결과로 룰 결과를 복원해 재계산
+- 임계값 스윕: 점수 정렬 한 번 + 누적 카운트로 모든 임계값의 TP/FP를 동시에 계산
+
+룰 하나를 빼도 나머지 룰의 발동 여부는 바뀌지 않는다고 가정한다
+(룰 평가기는 룰마다 독립적으로 발동을 판정하고 거래 히스토리도 룰셋과 무관하게 쌓인다).
+
+사용법:
+    engine = RuleWhatIfEngine.build(test_data, rules_path="rules/tracex_rules.yaml")
+    scores = engine.linear_scores(axis_weights={"B": 1.2, "C": 1.3, "E": 1.4})
+    best = engine.best_threshold(scores)                 # {"threshold", "f1_score", ...}
+    scores = engine.stage1_scores(removed_rules={"C-003"})
+"""
+
+from typing import Dict, List, Any, Optional, Sequence, Set, Iterable
+
+import numpy as np
+from scipy import sparse
+
+from .stage1_scorer import Stage1Scorer, graph_input_matrix
+from .feature_store import sample_inputs
+
+
+DEFAULT_THRESHOLDS = np.arange(10, 90, 2, dtype=np.float64)
+
+
+def sweep_thresholds(
+    scores: np.ndarray,
+    labels: np.ndarray,
+    thresholds: Optional[Sequence[float]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    모든 임계값(score >= threshold → fraud)의 혼동 행렬 카운트와 지표를 한 번에 계산
+
+    점수를 한 번 정렬하고 양성 수를 뒤에서부터 누적해 두면, 각 임계값의 TP는
+    searchsorted 위치의 누적값이 된다.
+
+    Args:
+        scores: 샘플별 점수
+        labels: 정답 (fraud = 1)
+        thresholds: 임계값 목록 (기본: 10, 12, ..., 88)
+
+    Returns:
+        {"thresholds", "tp", "fp", "fn", "tn", "accuracy", "precision", "recall", "f1_score"}
+    """
+    thresholds = DEFAULT_THRESHOLDS if thresholds is None else np.asarray(thresholds, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    labels = np.asarray(labels, dtype=np.int64)
+
+    order = np.argsort(scores, kind="stable")
+    sorted_scores = scores[order]
+    # 점수 오름차순 기준 뒤에서부터 누적한 양성 수 = 해당 위치 이상 점수의 양성 수
+    cum_pos = np.concatenate([[0], np.cumsum(labels[order][::-1])])[::-1]
+    n = len(scores)
+    n_pos = int(labels.sum())
+
+    start = np.searchsorted(sorted_scores, thresholds, side="left")
+    predicted = n - start
+    tp = cum_pos[start].astype(np.int64)
+    fp = predicted - tp
+    fn = n_pos - tp
+    tn = n - n_pos - fp
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / np.maximum(predicted, 1), 0.0)
+        recall = np.where(n_pos > 0, tp / max(n_pos, 1), 0.0)
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / np.maximum(2 * tp + fp + fn, 1), 0.0)
+    accuracy = (tp + tn) / n if n else np.zeros(len(thresholds))
+
+    return {
+        "thresholds": thresholds,
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "accuracy": accuracy,
+        "precision": precision,
+        "recall": recall,
+        "f1_score": f1,
+    }
+
+
+class RuleWhatIfEngine:
+    """
+    샘플×룰 희소 발동 행렬 기반 재채점 엔진
+    """
+
+    def __init__(
+        self,
+        rule_ids: List[str],
+        rule_meta: Dict[str, Dict[str, Any]],
+        firing: sparse.csr_matrix,
+        labels: np.ndarray,
+        graph_scores: Optional[np.ndarray] = None,
+        contexts: Optional[List[Dict[str, Any]]] = None,
+        stage1_scorer: Optional[Stage1Scorer] = None
+    ):
+        """
+        Args:
+            rule_ids: 행렬 열 순서의 룰 ID
+            rule_meta: 룰 ID → {"axis", "severity", "name"} (발동 결과에서 수집)
+            firing: (샘플 수 × 룰 수) CSR 행렬, 값은 발동 점수 (발동했지만 0점이면 저장된 0)
+            labels: 정답 (fraud = 1)
+            graph_scores: 샘플별 1단계 그래프 통계 점수 (stage1_scores에 필요)
+            contexts: 샘플별 ImprovedRuleScorer용 tx_context (stage1_scores에 필요)
+            stage1_scorer: 1단계 점수 재계산에 쓸 스코어러 (rule_scorer, 가중치 사용)
+        """
+        self.rule_ids = list(rule_ids)
+        self.rule_index = {rule_id: i for i, rule_id in enumerate(self.rule_ids)}
+        self.rule_meta = rule_meta
+        self.firing = firing.tocsr()
+        self.firing.sort_indices()
+        self.labels = np.asarray(labels, dtype=np.int8)
+        self.graph_scores = graph_scores
+        self.contexts = contexts
+        self.stage1_scorer = stage1_scorer
+
+        # 발동 여부 패턴 (0점으로 발동한 룰도 1)
+        self.fired = sparse.csr_matrix(
+            (np.ones(self.firing.nnz, dtype=np.float64), self.firing.indices, self.firing.indptr),
+            shape=self.firing.shape
+        )
+        self.rule_axes = np.array([rule_meta.get(rule_id, {}).get("axis", "B") for rule_id in self.rule_ids])
+
+    @classmethod
+    def build(
+        cls,
+        samples: Iterable[Dict[str, Any]],
+        rules_path: str = "rules/tracex_rules.yaml",
+        stage1_scorer: Optional[Stage1Scorer] = None
+    ) -> "RuleWhatIfEngine":
+        """
+        데이터셋에 룰북을 한 번 평가해 엔진 생성
+
+        Args:
+            samples: 데이터셋 샘플들 (ground_truth_label, tx_context, ml_features 포함)
+            rules_path: 룰북 경로 (stage1_scorer가 없을 때 사용)
+            stage1_scorer: 룰 평가와 1단계 재계산에 쓸 스코어러
+        """
+        stage1_scorer = stage1_scorer or Stage1Scorer(rules_path=rules_path)
+        rule_evaluator = stage1_scorer.rule_evaluator
+        rule_ids = [rule["id"] for rule in rule_evaluator.rule_loader.get_rules() if rule.get("id")]
+        rule_index = {rule_id: i for i, rule_id in enumerate(rule_ids)}
+        rule_meta: Dict[str, Dict[str, Any]] = {}
+
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        labels: List[int] = []
+        ml_features_list: List[Dict[str, Any]] = []
+        tx_context_list: List[Dict[str, Any]] = []
+        contexts: List[Dict[str, Any]] = []
+
+        for sample in samples:
+            labels.append(1 if sample.get("ground_truth_label", "normal") == "fraud" else 0)
+            tx_data, ml_features, tx_context = sample_inputs(sample)
+
+            for result in rule_evaluator.evaluate_single_transaction(tx_data):
+                rule_id = result.get("rule_id", "")
+                if rule_id not in rule_index:
+                    rule_index[rule_id] = len(rule_ids)
+                    rule_ids.append(rule_id)
+                rule_meta.setdefault(rule_id, {
+                    "axis": result.get("axis", "B"),
+                    "severity": result.get("severity", "MEDIUM"),
+                    "name": result.get("name", rule_id),
+                })
+                indices.append(rule_index[rule_id])
+                data.append(float(result.get("score", 0.0) or 0.0))
+            indptr.append(len(indices))
+
+            # Stage1Scorer.calculate_risk_score와 같은 컨텍스트 (ml_features 포함)
+            context = dict(tx_context)
+            if ml_features and "ml_features" not in context:
+                context["ml_features"] = ml_features
+            contexts.append(context)
+            ml_features_list.append(ml_features)
+            tx_context_list.append(tx_context)
+
+        firing = sparse.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(labels), len(rule_ids))
+        )
+        return cls(
+            rule_ids,
+            rule_meta,
+            firing,
+            np.array(labels),
+            graph_scores=stage1_scorer.calculate_graph_scores(
+                graph_input_matrix(ml_features_list, tx_context_list)
+            ),
+            contexts=contexts,
+            stage1_scorer=stage1_scorer
+        )
+
+    # ------------------------------------------------------------------
+    # 재채점
+    # ------------------------------------------------------------------
+
+    def rule_mask(self, removed_rules: Optional[Iterable[str]] = None) -> np.ndarray:
+        """제거할 룰을 0으로 둔 열 마스크"""
+        mask = np.ones(len(self.rule_ids), dtype=np.float64)
+        for rule_id in removed_rules or ():
+            idx = self.rule_index.get(rule_id)
+            if idx is not None:
+                mask[idx] = 0.0
+        return mask
+
+    def linear_scores(
+        self,
+        rule_weights: Optional[Dict[str, float]] = None,
+        axis_weights: Optional[Dict[str, float]] = None,
+        removed_rules: Optional[Iterable[str]] = None,
+        cap: Optional[float] = 100.0
+    ) -> np.ndarray:
+        """
+        선형 점수 = Σ 발동 점수 × 룰 가중치 × 축 가중치 (희소 행렬-벡터 곱)
+
+        Args:
+            rule_weights: 룰 ID → 가중치 (없는 룰은 1.0)
+            axis_weights: 축 → 가중치 (없는 축은 1.0)
+            removed_rules: 제외할 룰 ID
+            cap: 상한 (None이면 자르지 않음)
+
+        Returns:
+            샘플별 점수
+        """
+        weights = self.rule_mask(removed_rules)
+        if axis_weights:
+            weights *= np.array([axis_weights.get(axis, 1.0) for axis in self.rule_axes])
+        if rule_weights:
+            for rule_id, weight in rule_weights.items():
+                idx = self.rule_index.get(rule_id)
+                if idx is not None:
+                    weights[idx] *= weight
+        scores = self.firing @ weights
+        return np.minimum(scores, cap) if cap is not None else scores
+
+    def stage1_scores(self, removed_rules: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        룰을 제외했을 때의 1단계 Risk Score (Stage1Scorer.calculate_risk_score와 같은 결과)
+
+        룰을 다시 평가하지 않고 저장된 발동 결과에서 룰 결과 목록을 복원해
+        ImprovedRuleScorer로 룰 점수만 다시 계산한다.
+
+        Args:
+            removed_rules: 제외할 룰 ID
+        """
+        if self.stage1_scorer is None or self.contexts is None or self.graph_scores is None:
+            raise ValueError("stage1_scores에는 build()로 만든 엔진이 필요합니다 (스코어러/컨텍스트/그래프 점수)")
+
+        removed = set(removed_rules or ())
+        rule_scorer = self.stage1_scorer.rule_scorer
+        indptr, indices, data = self.firing.indptr, self.firing.indices, self.firing.data
+        rule_scores = np.zeros(self.firing.shape[0], dtype=np.float64)
+        for i, context in enumerate(self.contexts):
+            rule_results = []
+            for k in range(indptr[i], indptr[i + 1]):
+                rule_id = self.rule_ids[indices[k]]
+                if rule_id in removed:
+                    continue
+                meta = self.rule_meta.get(rule_id, {})
+                rule_results.append({
+                    "rule_id": rule_id,
+                    "score": float(data[k]),
+                    "axis": meta.get("axis", "B"),
+                    "severity": meta.get("severity", "MEDIUM"),
+                })
+            rule_scores[i] = rule_scorer.calculate_score(rule_results, context)
+
+        scores = self.stage1_scorer.rule_weight * rule_scores + self.stage1_scorer.graph_weight * self.graph_scores
+        return np.clip(scores, 0.0, 100.0)
+
+    # ------------------------------------------------------------------
+    # 임계값 스윕 / 지표
+    # ------------------------------------------------------------------
+
+    def sweep_thresholds(
+        self,
+        scores: np.ndarray,
+        thresholds: Optional[Sequence[float]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        모든 임계값(score >= threshold → fraud)의 혼동 행렬 카운트와 지표를 한 번에 계산
+
+        Args:
+            scores: 샘플별 점수
+            thresholds: 임계값 목록 (기본: 10, 12, ..., 88)
+
+        Returns:
+            {"thresholds", "tp", "fp", "fn", "tn", "accuracy", "precision", "recall", "f1_score"}
+        """
+        return sweep_thresholds(scores, self.labels, thresholds)
+
+    def best_threshold(
+        self,
+        scores: np.ndarray,
+        thresholds: Optional[Sequence[float]] = None,
+        default_threshold: float = 50.0
+    ) -> Dict[str, float]:
+        """
+        F1이 가장 높은 임계값과 그때의 지표 (동률이면 작은 임계값, F1이 모두 0이면 default_threshold)
+
+        Returns:
+            {"accuracy", "precision", "recall", "f1_score", "threshold"}
+        """
+        sweep = self.sweep_thresholds(scores, thresholds)
+        f1 = sweep["f1_score"]
+        if len(f1) and f1.max() > 0:
+            best = int(np.argmax(f1))
+            threshold = float(sweep["thresholds"][best])
+        else:
+            threshold = default_threshold
+        return self.metrics(scores, threshold)
+
+    def metrics(self, scores: np.ndarray, threshold: float) -> Dict[str, float]:
+        """단일 임계값에서의 지표"""
+        sweep = self.sweep_thresholds(scores, [threshold])
+        return {
+            "accuracy": float(sweep["accuracy"][0]),
+            "precision": float(sweep["precision"][0]),
+            "recall": float(sweep["recall"][0]),
+            "f1_score": float(sweep["f1_score"][0]),
+            "threshold": threshold,
+        }
+
+    # ------------------------------------------------------------------
+    # 룰/축 통계
+    # ------------------------------------------------------------------
+
+    def rule_effectiveness(self) -> Dict[str, Dict[str, Any]]:
+        """
+        룰별 발동 통계 (열 합으로 계산)
+
+        Returns:
+            룰 ID → {"fired_count", "fraud_ratio", "fraud_when_fired", "normal_when_fired", "avg_score", "effectiveness"}
+        """
+        fired_count = np.asarray(self.fired.sum(axis=0)).ravel()
+        fraud_fired = np.asarray(self.fired.T @ self.labels.astype(np.float64)).ravel()
+        total_score = np.asarray(self.firing.sum(axis=0)).ravel()
+
+        effectiveness = {}
+        for idx in np.flatnonzero(fired_count):
+            total = int(fired_count[idx])
+            fraud = int(fraud_fired[idx])
+            fraud_ratio = fraud / total
+            avg_score = float(total_score[idx]) / total
+            effectiveness[self.rule_ids[idx]] = {
+                "fired_count": total,
+                "fraud_ratio": fraud_ratio,
+                "fraud_when_fired": fraud,
+                "normal_when_fired": total - fraud,
+                "avg_score": avg_score,
+                "effectiveness": fraud_ratio * avg_score,
+            }
+        return effectiveness
+
+    def axis_effectiveness(self) -> Dict[str, Dict[str, Any]]:
+        """
+        축별 발동 통계
+
+        Returns:
+            축 → {"fired_count", "fraud_ratio", "fraud_when_fired", "normal_when_fired"}
+        """
+        fired_count = np.asarray(self.fired.sum(axis=0)).ravel()
+        fraud_fired = np.asarray(self.fired.T @ self.labels.astype(np.float64)).ravel()
+
+        effectiveness = {}
+        for axis in dict.fromkeys(self.rule_axes[fired_count > 0]):
+            columns = self.rule_axes == axis
+            total = int(fired_count[columns].sum())
+            fraud = int(fraud_fired[columns].sum())
+            effectiveness[str(axis)] = {
+                "fired_count": total,
+                "fraud_ratio": fraud / total,
+                "fraud_when_fired": fraud,
+                "normal_when_fired": total - fraud,
+            }
+        return effectiveness
@@ -4,13 +4,169 @@
 
 Rule-based 점수와 그래프 통계 feature를 결합하여 최종 Risk Score 계산
 """
-from typing import Dict, List, Any, Optional
+import operator
+from dataclasses import dataclass
+from numbers import Real
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 import numpy as np
 
 from ..rules.evaluator import RuleEvaluator
+from ..data.lists import ListLoader
+from ..aggregation.proximity_index import SanctionProximityIndex
 from .improved_rule_scorer import ImprovedRuleScorer
 
 
+@dataclass(frozen=True)
+class GraphScoreTier:
+    """그래프 점수 구간 (입력 op threshold 이면 points 가산)"""
+    op: str
+    threshold: float
+    points: float
+    feature: Optional[str] = None  # features_used 키 (None이면 기록하지 않음)
+    flag: bool = False  # features_used에 값 대신 True 기록
+
+
+_COMPARE = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq}
+
+# 그래프 점수 입력: (이름, 출처, 키, 키가 없을 때 대신 읽을 키, 기본값)
+GRAPH_SCORE_INPUTS = [
+    # 거래별 통계 우선, 없으면 주소 통계
+    ("tx_fan_in_count", "ml", "tx_primary_fan_in_count", "fan_in_count", 0),
+    ("tx_fan_out_count", "ml", "tx_primary_fan_out_count", "fan_out_count", 0),
+    ("tx_fan_in_value", "ml", "tx_primary_fan_in_value", "fan_in_value", 0.0),
+    ("tx_fan_out_value", "ml", "tx_primary_fan_out_value", "fan_out_value", 0.0),
+    ("pattern_score", "ml", "pattern_score", None, 0.0),
+    ("fan_in_detected", "ml", "fan_in_detected", None, 0),
+    ("fan_out_detected", "ml", "fan_out_detected", None, 0),
+    ("gather_scatter_detected", "ml", "gather_scatter_detected", None, 0),
+    ("avg_transaction_value", "ml", "avg_transaction_value", None, 0.0),
+    ("max_transaction_value", "ml", "max_transaction_value", None, 0.0),
+    ("graph_nodes", "ctx", "graph_nodes", None, 0),
+    ("num_transactions", "ctx", "num_transactions", None, 0),
+    ("ppr_score", "ml", "ppr_score", None, 0.0),
+    ("n_theta", "ml", "n_theta", None, 0.0),
+    ("n_omega", "ml", "n_omega", None, 0.0),
+]
+GRAPH_INPUT_NAMES = [name for name, _, _, _, _ in GRAPH_SCORE_INPUTS]
+GRAPH_INPUT_INDEX = {name: i for i, name in enumerate(GRAPH_INPUT_NAMES)}
+
+# 그래프 점수 규칙: 입력별 구간 목록 (if/elif처럼 처음 맞는 구간 하나만 적용)
+GRAPH_SCORE_RULES: List[Tuple[str, List[GraphScoreTier]]] = [
+    # 1. Fan-in/out 통계 (분석 결과: Fraud는 fan_in_count가 낮고 fan_out_count가 높음)
+    # Fan-in이 적으면 (자금 집중 부족) 위험도 증가 - Fraud 평균 8.92, Normal 평균 13.46
+    ("tx_fan_in_count", [
+        GraphScoreTier("<", 5, 10.0, "low_fan_in"),
+        GraphScoreTier("<", 10, 5.0, "medium_low_fan_in"),
+    ]),
+    # Fan-out이 많으면 (자금 분산) 위험도 증가 - Fraud 평균 28.53, Normal 평균 19.91
+    ("tx_fan_out_count", [
+        GraphScoreTier(">=", 25, 12.0, "very_high_fan_out"),
+        GraphScoreTier(">=", 15, 6.0, "high_fan_out"),
+    ]),
+    # Fan-in/out 값 (USD 또는 ETH 단위)
+    ("tx_fan_in_value", [GraphScoreTier(">", 1000.0, 10.0, "high_fan_in_value")]),
+    ("tx_fan_out_value", [GraphScoreTier(">", 1000.0, 10.0, "high_fan_out_value")]),
+    # 2. 패턴 점수 (역방향: Fraud 평균 21.24, Normal 평균 38.40)
+    ("pattern_score", [
+        GraphScoreTier("<=", 0.0, 0.0),  # 패턴 점수 없음 - 반영하지 않음
+        GraphScoreTier("<", 25.0, 15.0, "low_pattern_score"),  # 낮은 패턴 점수 = 높은 위험도
+        GraphScoreTier("<", 30.0, 8.0, "medium_low_pattern_score"),
+        GraphScoreTier(">", 35.0, -5.0, "high_pattern_score"),  # 높은 패턴 점수 = 낮은 위험도
+    ]),
+    # 패턴 탐지 여부
+    ("fan_in_detected", [GraphScoreTier("==", 1, 3.0, "fan_in_detected", flag=True)]),
+    ("fan_out_detected", [GraphScoreTier("==", 1, 3.0, "fan_out_detected", flag=True)]),
+    ("gather_scatter_detected", [GraphScoreTier("==", 1, 5.0, "gather_scatter_detected", flag=True)]),
+    # 3. 거래 금액 통계
+    ("avg_transaction_value", [
+        GraphScoreTier(">", 50000.0, 10.0, "very_high_avg_value"),
+        GraphScoreTier(">", 20000.0, 5.0, "high_avg_value"),
+    ]),
+    ("max_transaction_value", [
+        GraphScoreTier(">", 100000.0, 8.0, "very_high_max_value"),
+        GraphScoreTier(">", 50000.0, 4.0, "high_max_value"),
+    ]),
+    # 4. 그래프 크기 (Fraud 평균 127.04, Normal 평균 83.35)
+    ("graph_nodes", [
+        GraphScoreTier(">", 120, 8.0, "very_large_graph"),
+        GraphScoreTier(">", 90, 4.0, "large_graph"),
+        GraphScoreTier("<", 70, -2.0, "small_graph"),  # 작은 그래프 = 낮은 위험도
+    ]),
+    # 거래 개수는 비슷함 (Fraud 92.87, Normal 98.03) - 약간만 반영
+    ("num_transactions", [GraphScoreTier(">", 100, 2.0, "many_transactions")]),
+    # 5. PPR 점수
+    ("ppr_score", [
+        GraphScoreTier(">", 0.5, 10.0, "high_ppr"),
+        GraphScoreTier(">", 0.3, 5.0, "medium_ppr"),
+    ]),
+    # 6. 정규화 점수: n_theta는 비슷함 (0.82 vs 0.86), n_omega는 Fraud가 낮음 (0.44 vs 0.57)
+    ("n_theta", [
+        GraphScoreTier(">", 0.85, -2.0, "high_n_theta"),
+        GraphScoreTier("<", 0.80, 3.0, "low_n_theta"),
+    ]),
+    ("n_omega", [
+        GraphScoreTier("<", 0.45, 8.0, "low_n_omega"),
+        GraphScoreTier("<", 0.50, 4.0, "medium_low_n_omega"),
+        GraphScoreTier(">", 0.55, -3.0, "high_n_omega"),
+    ]),
+]
+
+_GRAPH_INPUT_SOURCES = {
+    name: (source == "ml", key, fallback, default) for name, source, key, fallback, default in GRAPH_SCORE_INPUTS
+}
+
+# 샘플별 계산용으로 미리 풀어 둔 규칙: (ml 출처 여부, 키, 대체 키, 기본값, [(비교 함수, 임계값, 점수, feature, flag)])
+_GRAPH_SCORE_PLAN = [
+    (
+        *_GRAPH_INPUT_SOURCES[input_name],
+        [(_COMPARE[tier.op], tier.threshold, tier.points, tier.feature, tier.flag) for tier in tiers]
+    )
+    for input_name, tiers in GRAPH_SCORE_RULES
+]
+
+
+# graph_input_matrix에서 isinstance 검사 없이 통과시키는 타입
+_NUMBER_TYPES = (int, float, bool)
+
+
+def graph_input_matrix(
+    ml_features_list: Sequence[Optional[Dict[str, Any]]],
+    tx_context_list: Sequence[Optional[Dict[str, Any]]]
+) -> np.ndarray:
+    """
+    Stage1Scorer.calculate_graph_scores 입력 행렬
+    
+    값은 실수(int/float/bool/NumPy 숫자)만 받는다. NumPy 변환은 None을 NaN으로, "0.3"을 0.3으로
+    바꿔 버리지만 _calculate_graph_score는 같은 값에서 TypeError를 내므로 여기서 미리 거부한다
+    (호출자는 행별 계산으로 폴백해 실패한 행만 제외).
+    
+    Args:
+        ml_features_list: 샘플별 ml_features
+        tx_context_list: 샘플별 tx_context
+    
+    Returns:
+        (n, len(GRAPH_INPUT_NAMES)) float64 행렬
+    
+    Raises:
+        TypeError: 실수가 아닌 값이 있는 경우
+    """
+    n = len(ml_features_list)
+    out = np.empty((n, len(GRAPH_INPUT_NAMES)), dtype=np.float64)
+    ml_features_list = [ml_features or {} for ml_features in ml_features_list]
+    tx_context_list = [tx_context or {} for tx_context in tx_context_list]
+    for j, name in enumerate(GRAPH_INPUT_NAMES):
+        from_ml, key, fallback, default = _GRAPH_INPUT_SOURCES[name]
+        rows = ml_features_list if from_ml else tx_context_list
+        if fallback is None:
+            column = [values.get(key, default) for values in rows]
+        else:
+            column = [values.get(key, values.get(fallback, default)) for values in rows]
+        if not all(type(value) in _NUMBER_TYPES or isinstance(value, Real) for value in column):
+            raise TypeError(f"Graph score input {name} must be a real number")
+        out[:, j] = column
+    return out
+
+
 class Stage1Scorer:
     """
     1단계 스코어러: Rule-Based + 그래프 통계 기반
@@ -32,7 +188,9 @@ class Stage1Scorer:
             rule_weight: Rule-based 점수 가중치 (기본 0.7)
             graph_weight: 그래프 통계 점수 가중치 (기본 0.3)
         """
-        self.rule_evaluator = RuleEvaluator(rules_path)
+        # 스코어러 공유 제재 근접도 인덱스 (E-102 조회 평가, 윈도우 히스토리와 같이 365일 지난 거래는 만료)
+        self.proximity_index = SanctionProximityIndex.from_list_loader(ListLoader())
+        self.rule_evaluator = RuleEvaluator(rules_path, proximity_index=self.proximity_index)
         self.rule_scorer = ImprovedRuleScorer(
             aggregation_method="weighted_sum",
             use_rule_count_bonus=True,
@@ -104,14 +262,93 @@ class Stage1Scorer:
             "graph_features_used": graph_features_used,
             "explanation": explanation
         }
-    
+
+    def calculate_risk_scores(
+        self,
+        inputs: Sequence[Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+        explain: bool = False
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        여러 거래의 1단계 Risk Score 배치 계산 (calculate_risk_score와 같은 점수)
+
+        룰 평가는 윈도우 상태 때문에 입력 순서대로 하고, 그래프 통계 점수는
+        calculate_graph_scores로 한 번에 계산한다. graph_features_used/explanation은
+        explain=True일 때만 만들며, 그 외에는 클라이언트에 반환하는 행만 explain_risk_score()로 채운다.
+
+        Args:
+            inputs: (tx_data, ml_features, tx_context) 시퀀스
+            explain: True면 모든 행에 graph_features_used, explanation 포함
+
+        Returns:
+            입력 순서의 결과 리스트 (계산에 실패한 행은 None)
+        """
+        rule_rows: List[Optional[Tuple[float, List[Dict[str, Any]]]]] = []
+        for tx_data, ml_features, tx_context in inputs:
+            # calculate_risk_score와 달리 호출자의 tx_context는 바꾸지 않음
+            context = dict(tx_context or {})
+            if ml_features and "ml_features" not in context:
+                context["ml_features"] = ml_features
+            try:
+                rule_results = self.rule_evaluator.evaluate_single_transaction(tx_data)
+                rule_rows.append((self.rule_scorer.calculate_score(rule_results, context), rule_results))
+            except Exception:
+                rule_rows.append(None)
+
+        ml_features_list = [ml_features for _, ml_features, _ in inputs]
+        tx_context_list = [tx_context for _, _, tx_context in inputs]
+        graph_scores: List[Optional[float]]
+        try:
+            graph_scores = self.calculate_graph_scores(
+                graph_input_matrix(ml_features_list, tx_context_list)
+            ).tolist()
+        except (TypeError, OverflowError):
+            # 숫자가 아닌 값(또는 float64 범위를 넘는 정수)이 섞인 배치는 행별로 계산해 실패한 행만 제외 (calculate_risk_score와 같은 결과)
+            graph_scores = []
+            for ml_features, tx_context in zip(ml_features_list, tx_context_list):
+                try:
+                    graph_scores.append(self._calculate_graph_score(ml_features or {}, tx_context or {})[0])
+                except (TypeError, ValueError):
+                    graph_scores.append(None)
+
+        results: List[Optional[Dict[str, Any]]] = []
+        for (_, ml_features, tx_context), rule_row, graph_score in zip(inputs, rule_rows, graph_scores):
+            if rule_row is None or graph_score is None:
+                results.append(None)
+                continue
+            rule_score, rule_results = rule_row
+            final_score = self.rule_weight * rule_score + self.graph_weight * graph_score
+            result = {
+                "risk_score": min(100.0, max(0.0, final_score)),
+                "rule_score": rule_score,
+                "graph_score": graph_score,
+                "rule_results": rule_results,
+            }
+            if explain:
+                self.explain_risk_score(result, ml_features, tx_context)
+            results.append(result)
+        return results
+
+    def explain_risk_score(
+        self,
+        result: Dict[str, Any],
+        ml_features: Optional[Dict[str, Any]],
+        tx_context: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """calculate_risk_scores 결과 한 행에 graph_features_used, explanation 추가 (반환하는 행만)"""
+        result["graph_features_used"] = self.graph_features_used(ml_features, tx_context)
+        result["explanation"] = self._generate_explanation(
+            result["rule_score"], result["graph_score"], result["risk_score"],
+            result["rule_results"], result["graph_features_used"]
+        )
+        return result
+
     def _calculate_graph_score(
         self,
         ml_features: Dict[str, Any],
         tx_context: Dict[str, Any]
     ) -> tuple[float, Dict[str, Any]]:
         """
-        그래프 통계 feature 기반 점수 계산
+        그래프 통계 feature 기반 점수 계산 (GRAPH_SCORE_RULES, 샘플 하나)
         
         Args:
             ml_features: 그래프 통계 feature
@@ -123,149 +360,53 @@ class Stage1Scorer:
         score = 0.0
         features_used = {}
         
-        # 1. Fan-in/out 통계 점수
-        fan_in_count = ml_features.get("fan_in_count", 0)
-        fan_out_count = ml_features.get("fan_out_count", 0)
-        fan_in_value = ml_features.get("fan_in_value", 0.0)
-        fan_out_value = ml_features.get("fan_out_value", 0.0)
-        
-        # 거래별 통계 (우선 사용)
-        tx_fan_in_count = ml_features.get("tx_primary_fan_in_count", fan_in_count)
-        tx_fan_out_count = ml_features.get("tx_primary_fan_out_count", fan_out_count)
-        tx_fan_in_value = ml_features.get("tx_primary_fan_in_value", fan_in_value)
-        tx_fan_out_value = ml_features.get("tx_primary_fan_out_value", fan_out_value)
-        
-        # Fan-in/out 점수 계산 (분석 결과 반영)
-        # Fraud는 fan_in_count가 낮고, fan_out_count가 높음
-        # Fan-in이 적으면 (자금 집중 부족) 위험도 증가
-        if tx_fan_in_count < 5:  # Fraud 평균 8.92, Normal 평균 13.46
-            score += 10.0
-            features_used["low_fan_in"] = tx_fan_in_count
-        elif tx_fan_in_count < 10:
-            score += 5.0
-            features_used["medium_low_fan_in"] = tx_fan_in_count
-        
-        # Fan-out이 많으면 (자금 분산) 위험도 증가 (Fraud 평균 28.53)
-        if tx_fan_out_count >= 25:  # Fraud 평균 28.53
-            score += 12.0
-            features_used["very_high_fan_out"] = tx_fan_out_count
-        elif tx_fan_out_count >= 15:  # Normal 평균 19.91
-            score += 6.0
-            features_used["high_fan_out"] = tx_fan_out_count
-        
-        # Fan-in/out 값 기반 점수
-        if tx_fan_in_value > 1000.0:  # USD 또는 ETH 단위
-            score += 10.0
-            features_used["high_fan_in_value"] = tx_fan_in_value
-        if tx_fan_out_value > 1000.0:
-            score += 10.0
-            features_used["high_fan_out_value"] = tx_fan_out_value
-        
-        # 2. 패턴 탐지 점수 (중요: Fraud는 pattern_score가 낮음!)
-        # Fraud 평균 21.24, Normal 평균 38.40
-        pattern_score = ml_features.get("pattern_score", 0.0)
-        if pattern_score > 0:
-            # pattern_score가 낮으면 Fraud일 가능성 높음 (역방향 점수)
-            if pattern_score < 25.0:  # Fraud 평균 21.24
-                score += 15.0  # 낮은 패턴 점수 = 높은 위험도
-                features_used["low_pattern_score"] = pattern_score
-            elif pattern_score < 30.0:
-                score += 8.0
-                features_used["medium_low_pattern_score"] = pattern_score
-            elif pattern_score > 35.0:  # Normal 평균 38.40
-                score -= 5.0  # 높은 패턴 점수 = 낮은 위험도 (페널티)
-                features_used["high_pattern_score"] = pattern_score
-        
-        # 패턴 탐지 여부 (점수 감소)
-        if ml_features.get("fan_in_detected", 0) == 1:
-            score += 3.0
-            features_used["fan_in_detected"] = True
-        if ml_features.get("fan_out_detected", 0) == 1:
-            score += 3.0
-            features_used["fan_out_detected"] = True
-        if ml_features.get("gather_scatter_detected", 0) == 1:
-            score += 5.0
-            features_used["gather_scatter_detected"] = True
-        
-        # 3. 거래 금액 통계 점수
-        avg_value = ml_features.get("avg_transaction_value", 0.0)
-        max_value = ml_features.get("max_transaction_value", 0.0)
-        total_value = ml_features.get("total_transaction_value", 0.0)
-        
-        # 평균 거래 금액이 크면 위험도 증가 (임계값 상향)
-        if avg_value > 50000.0:  # 10000 -> 50000
-            score += 10.0  # 12.0 -> 10.0
-            features_used["very_high_avg_value"] = avg_value
-        elif avg_value > 20000.0:  # 5000 -> 20000
-            score += 5.0  # 6.0 -> 5.0
-            features_used["high_avg_value"] = avg_value
-        
-        # 최대 거래 금액이 크면 위험도 증가 (임계값 상향)
-        if max_value > 100000.0:  # 50000 -> 100000
-            score += 8.0  # 10.0 -> 8.0
-            features_used["very_high_max_value"] = max_value
-        elif max_value > 50000.0:  # 20000 -> 50000
-            score += 4.0  # 5.0 -> 4.0
-            features_used["high_max_value"] = max_value
-        
-        # 4. 그래프 크기 점수 (분석 결과 반영: Fraud가 더 큰 그래프)
-        graph_nodes = tx_context.get("graph_nodes", 0)
-        graph_edges = tx_context.get("graph_edges", 0)
-        num_transactions = tx_context.get("num_transactions", 0)
-        
-        # Fraud 평균 127.04, Normal 평균 83.35
-        if graph_nodes > 120:  # Fraud 평균 127.04
-            score += 8.0  # 큰 그래프 = 위험도 증가
-            features_used["very_large_graph"] = graph_nodes
-        elif graph_nodes > 90:  # Normal 평균 83.35
-            score += 4.0
-            features_used["large_graph"] = graph_nodes
-        elif graph_nodes < 70:  # Normal이 더 작은 그래프
-            score -= 2.0  # 작은 그래프 = 낮은 위험도 (약간의 페널티)
-            features_used["small_graph"] = graph_nodes
-        
-        # 거래 개수는 비슷함 (Fraud 92.87, Normal 98.03) - 약간만 반영
-        if num_transactions > 100:
-            score += 2.0
-            features_used["many_transactions"] = num_transactions
-        
-        # 5. PPR 점수 (선택적)
-        ppr_score = ml_features.get("ppr_score", 0.0)
-        if ppr_score > 0.5:
-            score += 10.0
-            features_used["high_ppr"] = ppr_score
-        elif ppr_score > 0.3:
-            score += 5.0
-            features_used["medium_ppr"] = ppr_score
-        
-        # 6. 정규화 점수 (NTS, NWS) - 분석 결과 반영
-        n_theta = ml_features.get("n_theta", 0.0)
-        n_omega = ml_features.get("n_omega", 0.0)
-        
-        # n_theta는 Fraud와 Normal이 비슷함 (0.82 vs 0.86) - 약간만 반영
-        if n_theta > 0.85:  # Normal이 약간 높음
-            score -= 2.0  # 높은 n_theta = 낮은 위험도 (약간의 페널티)
-            features_used["high_n_theta"] = n_theta
-        elif n_theta < 0.80:  # Fraud가 약간 낮음
-            score += 3.0
-            features_used["low_n_theta"] = n_theta
-        
-        # n_omega는 Fraud가 낮음 (0.44 vs 0.57) - 중요!
-        if n_omega < 0.45:  # Fraud 평균 0.44
-            score += 8.0  # 낮은 n_omega = 높은 위험도
-            features_used["low_n_omega"] = n_omega
-        elif n_omega < 0.50:
-            score += 4.0
-            features_used["medium_low_n_omega"] = n_omega
-        elif n_omega > 0.55:  # Normal 평균 0.57
-            score -= 3.0  # 높은 n_omega = 낮은 위험도 (페널티)
-            features_used["high_n_omega"] = n_omega
+        for from_ml, key, fallback, default, tiers in _GRAPH_SCORE_PLAN:
+            values = ml_features if from_ml else tx_context
+            value = values.get(key, default if fallback is None else values.get(fallback, default))
+            for compare, threshold, points, feature, flag in tiers:
+                if compare(value, threshold):
+                    score += points
+                    if feature:
+                        features_used[feature] = True if flag else value
+                    break
         
         # 최종 점수 (0~100 범위로 제한)
         graph_score = min(100.0, max(0.0, score))
         
         return graph_score, features_used
     
+    def calculate_graph_scores(self, graph_inputs: np.ndarray) -> np.ndarray:
+        """
+        그래프 통계 점수 배치 계산 (_calculate_graph_score와 같은 점수)
+        
+        구간 규칙마다 np.select로 모든 행의 가산점을 한 번에 고른다.
+        features_used 설명은 만들지 않으므로 필요한 행만 graph_features_used()로 계산한다.
+        
+        Args:
+            graph_inputs: graph_input_matrix() 결과 (n, len(GRAPH_INPUT_NAMES))
+        
+        Returns:
+            (n,) 그래프 통계 점수 (0~100)
+        """
+        graph_inputs = np.asarray(graph_inputs, dtype=np.float64)
+        score = np.zeros(len(graph_inputs), dtype=np.float64)
+        for input_name, tiers in GRAPH_SCORE_RULES:
+            values = graph_inputs[:, GRAPH_INPUT_INDEX[input_name]]
+            score += np.select(
+                [_COMPARE[tier.op](values, tier.threshold) for tier in tiers],
+                [tier.points for tier in tiers],
+                default=0.0
+            )
+        return np.clip(score, 0.0, 100.0)
+    
+    def graph_features_used(
+        self,
+        ml_features: Optional[Dict[str, Any]],
+        tx_context: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """그래프 점수에 반영된 feature (배치 결과 중 클라이언트에 반환하는 행의 설명용)"""
+        return self._calculate_graph_score(ml_features or {}, tx_context or {})[1]
+    
     def _generate_explanation(
         self,
         rule_score: float,
@@ -4,16 +4,30 @@
 
 Rule score + 간단한 ML 모델 (LR, RandomForest)
 PPR 기반 feature 추가
+
+sklearn은 학습할 때만 import한다. 트리 모델을 export_compiled()로 .npz로 저장해 두면
+load_model()이 sklearn 없이 NumPy 평가기로 서빙한다.
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 import pickle
 from pathlib import Path
 
 from .stage1_scorer import Stage1Scorer
+from .feature_store import FeatureStore, sample_inputs
+from .compiled_model import CompiledTreeEnsemble, load_compiled_model, save_compiled_model
+from .feature_schema import FeatureSchema, stage2_feature_schema
+
+
+# extract_features가 만드는 feature (선언형 스키마, 모델 파일에 스키마 해시를 기록해 호환성 확인)
+FEATURE_SCHEMAS = {use_ppr: stage2_feature_schema(use_ppr) for use_ppr in (True, False)}
+FEATURE_NAMES = FEATURE_SCHEMAS[True].names
+FEATURE_DIM = FEATURE_SCHEMAS[True].dim
+
+
+def feature_schema_hash(use_ppr_features: bool = True) -> str:
+    """feature 스키마 해시 (모델 레지스트리 매니페스트, 모델 파일에 기록)"""
+    return FEATURE_SCHEMAS[bool(use_ppr_features)].hash()
 
 
 class Stage2Scorer:
@@ -29,20 +43,23 @@ class Stage2Scorer:
         self,
         stage1_scorer: Optional[Stage1Scorer] = None,
         model_type: str = "logistic",  # "logistic", "random_forest", "gradient_boosting"
-        use_ppr_features: bool = True
+        use_ppr_features: bool = True,
+        feature_store_dir: Optional[str] = None
     ):
         """
         Args:
             stage1_scorer: 1단계 스코어러 (기본값: 새로 생성)
             model_type: ML 모델 타입
             use_ppr_features: PPR feature 사용 여부
+            feature_store_dir: 1단계 결과/feature 캐시 디렉토리 (None이면 캐시 없이 매번 계산)
         """
         self.stage1_scorer = stage1_scorer or Stage1Scorer(rule_weight=0.9, graph_weight=0.1)
         self.model_type = model_type
         self.use_ppr_features = use_ppr_features
         self.model = None
-        self.scaler = StandardScaler()
+        self.scaler = None  # train()에서 StandardScaler로 학습
         self.is_trained = False
+        self.feature_store = FeatureStore(feature_store_dir, self) if feature_store_dir else None
     
     def extract_features(
         self,
@@ -59,77 +76,83 @@ class Stage2Scorer:
             tx_context: 거래 컨텍스트
         
         Returns:
-            Feature 벡터
+            Feature 벡터 (FEATURE_DIM차원)
         """
-        features = []
-        
-        # 1. 1단계 점수
-        features.append(stage1_result["rule_score"])
-        features.append(stage1_result["graph_score"])
-        features.append(stage1_result["risk_score"])
-        
-        # 2. Rule-based features
-        rule_results = stage1_result.get("rule_results", [])
-        features.append(len(rule_results))  # 발동된 룰 개수
-        
-        # 룰 축별 분포
-        axes = [r.get("axis", "B") for r in rule_results]
-        features.append(axes.count("A"))  # 금액 관련
-        features.append(axes.count("B"))  # 행동 패턴
-        features.append(axes.count("C"))  # 연결성
-        features.append(axes.count("D"))  # 시간 패턴
-        features.append(axes.count("E"))  # 노출
-        
-        # 심각도 분포
-        severities = [r.get("severity", "MEDIUM") for r in rule_results]
-        features.append(severities.count("CRITICAL"))
-        features.append(severities.count("HIGH"))
-        features.append(severities.count("MEDIUM"))
-        features.append(severities.count("LOW"))
-        
-        # 3. 그래프 통계 features (정규화)
-        features.append(min(100, ml_features.get("fan_in_count", 0)))  # 클리핑
-        features.append(min(100, ml_features.get("fan_out_count", 0)))
-        features.append(min(100, ml_features.get("tx_primary_fan_in_count", 0)))
-        features.append(min(100, ml_features.get("tx_primary_fan_out_count", 0)))
-        features.append(min(100.0, ml_features.get("pattern_score", 0.0)))
-        
-        # 거래 금액은 log 변환 (너무 큰 값 처리)
-        avg_value = ml_features.get("avg_transaction_value", 0.0)
-        max_value = ml_features.get("max_transaction_value", 0.0)
-        if avg_value > 0:
-            features.append(min(20.0, np.log1p(avg_value)))  # log1p로 변환 후 클리핑
-        else:
-            features.append(0.0)
-        if max_value > 0:
-            features.append(min(20.0, np.log1p(max_value)))
-        else:
-            features.append(0.0)
-        
-        features.append(min(200, ml_features.get("graph_nodes", tx_context.get("graph_nodes", 0))))
-        features.append(min(200, ml_features.get("num_transactions", tx_context.get("num_transactions", 0))))
-        
-        # 4. PPR features (선택적, 클리핑)
-        if self.use_ppr_features:
-            features.append(min(1.0, ml_features.get("ppr_score", 0.0)))  # 0~1 범위
-            features.append(min(1.0, ml_features.get("sdn_ppr", 0.0)))
-            features.append(min(1.0, ml_features.get("mixer_ppr", 0.0)))
-        else:
-            features.extend([0.0, 0.0, 0.0])
+        return self._feature_matrix([stage1_result], [ml_features], [tx_context])[0]
+    
+    def extract_features_batch(
+        self,
+        stage1_results: List[Optional[Dict[str, Any]]],
+        ml_features_list: List[Dict[str, Any]],
+        tx_context_list: List[Dict[str, Any]]
+    ) -> np.ndarray:
+        """
+        여러 샘플의 feature를 한 번에 추출
         
-        # 5. 정규화 점수 (이미 0~1 범위)
-        features.append(min(1.0, max(0.0, ml_features.get("n_theta", 0.0))))
-        features.append(min(1.0, max(0.0, ml_features.get("n_omega", 0.0))))
+        1단계 결과가 None이거나 추출에 실패한 행은 0 벡터 (train()의 에러 처리와 동일)
         
-        # 6. 패턴 탐지 여부
-        features.append(ml_features.get("fan_in_detected", 0))
-        features.append(ml_features.get("fan_out_detected", 0))
-        features.append(ml_features.get("gather_scatter_detected", 0))
+        Returns:
+            (샘플 수, FEATURE_DIM) float32 행렬
+        """
+        return self._feature_rows(stage1_results, ml_features_list, tx_context_list)[0]
+    
+    def _feature_rows(
+        self,
+        stage1_results: List[Optional[Dict[str, Any]]],
+        ml_features_list: List[Dict[str, Any]],
+        tx_context_list: List[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        feature 행렬과 행별 성공 여부
         
-        # NaN, Inf 체크 및 클리핑
-        features_array = np.array(features, dtype=np.float32)
-        features_array = np.nan_to_num(features_array, nan=0.0, posinf=100.0, neginf=0.0)
-        return features_array
+        전체를 한 번에 열 단위로 계산하고, 값이 잘못된 샘플이 섞여 실패하면 그때만 행 단위로 다시 계산한다.
+        """
+        n = len(stage1_results)
+        ok = np.array([result is not None for result in stage1_results], dtype=bool)
+        features = np.zeros((n, FEATURE_DIM), dtype=np.float32)
+        rows = np.flatnonzero(ok)
+        if len(rows) == 0:
+            return features, ok
+        
+        try:
+            if len(rows) == n:
+                # 전부 유효하면 미리 할당한 행렬에 바로 채움
+                self._feature_matrix(
+                    stage1_results,
+                    [ml_features or {} for ml_features in ml_features_list],
+                    [tx_context or {} for tx_context in tx_context_list],
+                    out=features
+                )
+            else:
+                features[rows] = self._feature_matrix(
+                    [stage1_results[i] for i in rows],
+                    [ml_features_list[i] or {} for i in rows],
+                    [tx_context_list[i] or {} for i in rows]
+                )
+        except Exception:
+            for i in rows:
+                try:
+                    features[i] = self._feature_matrix(
+                        [stage1_results[i]], [ml_features_list[i] or {}], [tx_context_list[i] or {}]
+                    )[0]
+                except Exception:
+                    ok[i] = False
+        return features, ok
+    
+    @property
+    def feature_schema(self) -> FeatureSchema:
+        """현재 설정(use_ppr_features)의 feature 스키마"""
+        return FEATURE_SCHEMAS[bool(self.use_ppr_features)]
+    
+    def _feature_matrix(
+        self,
+        stage1_results: List[Dict[str, Any]],
+        ml_features_list: List[Dict[str, Any]],
+        tx_context_list: List[Dict[str, Any]],
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """feature 행렬 계산 (스키마 빌더, 값이 잘못된 샘플이 있으면 예외)"""
+        return self.feature_schema.build(stage1_results, ml_features_list, tx_context_list, out=out)
     
     def train(
         self,
@@ -151,45 +174,30 @@ class Stage2Scorer:
         print("=" * 80)
         
         # Feature 추출
-        X_train = []
-        y_train = []
-        
         print("\n📊 Feature 추출 중...")
-        for sample in train_data:
-            label = sample.get("ground_truth_label", "normal")
-            y_train.append(1 if label == "fraud" else 0)
-            
-            tx_data = {
-                "from": sample.get("from", ""),
-                "to": sample.get("to", ""),
-                "usd_value": sample.get("usd_value", 0),
-                "timestamp": sample.get("timestamp", 0),
-                "tx_hash": sample.get("tx_hash", ""),
-                "chain": sample.get("chain", "ethereum"),
-                "is_sanctioned": sample.get("tx_context", {}).get("is_sanctioned", False),
-                "is_mixer": sample.get("tx_context", {}).get("is_mixer", False),
-            }
-            
-            ml_features = sample.get("ml_features", {})
-            tx_context = sample.get("tx_context", {})
-            
-            try:
-                stage1_result = self.stage1_scorer.calculate_risk_score(tx_data, ml_features, tx_context)
-                features = self.extract_features(stage1_result, ml_features, tx_context)
-                X_train.append(features)
-            except Exception as e:
-                # 에러 발생 시 기본 feature 벡터 사용
-                X_train.append(np.zeros(30, dtype=np.float32))
-        
-        X_train = np.array(X_train)
+        if self.feature_store is not None:
+            y_train = [1 if sample.get("ground_truth_label", "normal") == "fraud" else 0 for sample in train_data]
+            X_train = self.feature_store.get(train_data)["features"]
+            print(f"   Feature store: {self.feature_store.stats()}")
+        else:
+            y_train = [1 if sample.get("ground_truth_label", "normal") == "fraud" else 0 for sample in train_data]
+            # 에러가 난 샘플은 기본(0) feature 벡터 사용
+            X_train = self._feature_rows(*self._stage1_batch(train_data))[0]
+        
+        X_train = np.asarray(X_train)
         y_train = np.array(y_train)
         
         print(f"   학습 샘플: {len(X_train)}개")
         print(f"   Feature 차원: {X_train.shape[1]}")
         print(f"   Fraud 비율: {y_train.sum() / len(y_train) * 100:.1f}%")
         
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+        
         # Feature 스케일링
         print("\n🔧 Feature 스케일링 중...")
+        self.scaler = StandardScaler()
         X_train_scaled = self.scaler.fit_transform(X_train)
         
         # 모델 학습
@@ -316,36 +324,12 @@ class Stage2Scorer:
             roc_auc_score, average_precision_score, confusion_matrix
         )
         
-        y_true = []
-        y_pred = []
-        y_pred_scores = []
-        
-        for sample in test_data:
-            label = sample.get("ground_truth_label", "normal")
-            y_true.append(1 if label == "fraud" else 0)
-            
-            tx_data = {
-                "from": sample.get("from", ""),
-                "to": sample.get("to", ""),
-                "usd_value": sample.get("usd_value", 0),
-                "timestamp": sample.get("timestamp", 0),
-                "tx_hash": sample.get("tx_hash", ""),
-                "chain": sample.get("chain", "ethereum"),
-                "is_sanctioned": sample.get("tx_context", {}).get("is_sanctioned", False),
-                "is_mixer": sample.get("tx_context", {}).get("is_mixer", False),
-            }
-            
-            ml_features = sample.get("ml_features", {})
-            tx_context = sample.get("tx_context", {})
-            
-            try:
-                result = self.calculate_risk_score(tx_data, ml_features, tx_context)
-                risk_score = result["risk_score"]
-                y_pred_scores.append(risk_score)
-                y_pred.append(1 if risk_score >= threshold else 0)
-            except Exception as e:
-                y_pred_scores.append(0.0)
-                y_pred.append(0)
+        y_true = [1 if sample.get("ground_truth_label", "normal") == "fraud" else 0 for sample in test_data]
+        if self.feature_store is not None:
+            y_pred_scores = self._stored_risk_scores(test_data).tolist()
+        else:
+            y_pred_scores = self.score_batch(test_data).tolist()
+        y_pred = [1 if score >= threshold else 0 for score in y_pred_scores]
         
         accuracy = accuracy_score(y_true, y_pred)
         precision = precision_score(y_true, y_pred, zero_division=0)
@@ -379,6 +363,88 @@ class Stage2Scorer:
             }
         }
     
+    def score_batch(
+        self,
+        samples: List[Dict[str, Any]],
+        stage1_results: Optional[List[Optional[Dict[str, Any]]]] = None,
+        return_components: bool = False
+    ) -> Any:
+        """
+        여러 샘플의 2단계 Risk Score를 한 번에 계산
+        
+        feature를 하나의 행렬로 추출해 스케일링과 모델 예측을 한 번씩만 수행한다.
+        샘플별 점수는 calculate_risk_score와 같고, 계산에 실패한 샘플은 evaluate()와 같이 0점이다.
+        
+        Args:
+            samples: 데이터셋 형식 샘플 (from, to, usd_value, ..., ml_features, tx_context)
+            stage1_results: 이미 계산한 1단계 결과 (샘플 순서, 실패는 None). 없으면 여기서 계산
+            return_components: True면 risk_score 외에 stage1_score, ml_score 배열도 반환
+        
+        Returns:
+            최종 점수 배열 (샘플 수,) 또는
+            {"risk_score": 배열, "stage1_score": 배열, "ml_score": 배열}
+        """
+        if stage1_results is None:
+            stage1_results, ml_features_list, tx_context_list = self._stage1_batch(samples)
+        else:
+            inputs = [sample_inputs(sample) for sample in samples]
+            ml_features_list = [ml_features for _, ml_features, _ in inputs]
+            tx_context_list = [tx_context for _, _, tx_context in inputs]
+        
+        stage1_scores = np.array(
+            [result["risk_score"] if result is not None else 0.0 for result in stage1_results],
+            dtype=np.float64
+        )
+        if not self.is_trained or len(samples) == 0:
+            # 학습되지 않았으면 1단계 점수만 사용
+            ok = np.array([result is not None for result in stage1_results], dtype=bool)
+            ml_scores = np.zeros(len(samples), dtype=np.float64)
+            scores = stage1_scores
+        else:
+            features, ok = self._feature_rows(stage1_results, ml_features_list, tx_context_list)
+            ml_scores = self.model.predict_proba(self.scaler.transform(features))[:, 1] * 100.0
+            scores = np.clip(0.6 * stage1_scores + 0.4 * ml_scores, 0.0, 100.0)
+        
+        risk_scores = np.where(ok, scores, 0.0)
+        if not return_components:
+            return risk_scores
+        return {
+            "risk_score": risk_scores,
+            "stage1_score": np.where(ok, stage1_scores, 0.0),
+            "ml_score": np.where(ok, ml_scores, 0.0),
+        }
+    
+    def _stage1_batch(
+        self,
+        samples: List[Dict[str, Any]]
+    ) -> Tuple[List[Optional[Dict[str, Any]]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        샘플 순서대로 1단계 점수 배치 계산 (Stage1Scorer.calculate_risk_scores, 설명은 만들지 않음)
+        
+        Returns:
+            (1단계 결과 리스트 - 실패는 None, ml_features 리스트, tx_context 리스트)
+        """
+        inputs = [sample_inputs(sample) for sample in samples]
+        stage1_results = self.stage1_scorer.calculate_risk_scores(inputs)
+        ml_features_list = [ml_features for _, ml_features, _ in inputs]
+        tx_context_list = [tx_context for _, _, tx_context in inputs]
+        return stage1_results, ml_features_list, tx_context_list
+    
+    def _stored_risk_scores(self, samples: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Feature store의 1단계 점수/feature로 calculate_risk_score와 같은 최종 점수를 배치 계산
+        
+        계산에 실패했던 샘플은 evaluate()와 같이 0점으로 둔다.
+        """
+        batch = self.feature_store.get(samples)
+        stage1_scores = batch["stage1"][:, 2]
+        if not self.is_trained or len(samples) == 0:
+            scores = stage1_scores
+        else:
+            ml_scores = self.model.predict_proba(self.scaler.transform(batch["features"]))[:, 1] * 100.0
+            scores = np.clip(0.6 * stage1_scores + 0.4 * ml_scores, 0.0, 100.0)
+        return np.where(batch["ok"], scores, 0.0)
+    
     def save_model(self, model_path: Path):
         """모델 저장"""
         model_path.parent.mkdir(parents=True, exist_ok=True)
@@ -387,16 +453,58 @@ class Stage2Scorer:
                 "model": self.model,
                 "scaler": self.scaler,
                 "model_type": self.model_type,
-                "use_ppr_features": self.use_ppr_features
+                "use_ppr_features": self.use_ppr_features,
+                "feature_schema": self.feature_schema_hash()
             }, f)
     
-    def load_model(self, model_path: Path):
-        """모델 로드"""
-        with open(model_path, 'rb') as f:
-            data = pickle.load(f)
-            self.model = data["model"]
-            self.scaler = data["scaler"]
-            self.model_type = data["model_type"]
-            self.use_ppr_features = data["use_ppr_features"]
-            self.is_trained = True
-
+    def load_model(self, model_path: Path, mmap: bool = False):
+        """
+        모델 로드
+        
+        .npz (export_compiled 결과)는 sklearn 없이 NumPy 평가기로 로드하고, 그 외에는 pickle로 로드한다.
+        
+        Args:
+            model_path: 모델 파일 경로
+            mmap: .npz 노드 배열을 memory-map으로 로드 (pickle은 해당 없음)
+        
+        Raises:
+            ValueError: 모델 파일에 기록된 feature 스키마 해시가 현재 스키마와 다른 경우
+        """
+        model_path = Path(model_path)
+        if model_path.suffix == ".npz":
+            data = load_compiled_model(model_path, mmap=mmap)
+        else:
+            with open(model_path, 'rb') as f:
+                data = pickle.load(f)
+        # 해시가 없는 파일(스키마 기록 이전)은 확인하지 않음
+        FEATURE_SCHEMAS[bool(data["use_ppr_features"])].check(data.get("feature_schema"), model_path.name)
+        self.model = data["model"]
+        self.scaler = data["scaler"]
+        self.model_type = data["model_type"]
+        self.use_ppr_features = data["use_ppr_features"]
+        self.is_trained = True
+    
+    def feature_schema_hash(self) -> str:
+        """이 스코어러가 만드는 feature의 스키마 해시"""
+        return self.feature_schema.hash()
+    
+    def export_compiled(self, model_path: Path):
+        """
+        학습된 트리 모델(random_forest, gradient_boosting)을 .npz 평가기 형식으로 저장
+        
+        Raises:
+            ValueError: 학습되지 않았거나 트리 앙상블이 아닌 모델
+        """
+        if not self.is_trained:
+            raise ValueError("Model is not trained")
+        compiled = self.model if isinstance(self.model, CompiledTreeEnsemble) else CompiledTreeEnsemble.from_sklearn(self.model)
+        save_compiled_model(
+            Path(model_path),
+            compiled,
+            self.scaler,
+            {
+                "model_type": self.model_type,
+                "use_ppr_features": self.use_ppr_features,
+                "feature_schema": self.feature_schema_hash()
+            }
+        )
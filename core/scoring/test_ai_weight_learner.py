@@ -0,0 +1,65 @@
+"""
+룰 가중치 학습기 feature 테스트
+
+rule_weight 스키마로 만든 피처가 이전 룰별 리스트 평균 방식과 같은지,
+발동 룰이 없을 때도 같은 차원인지 확인
+"""
+import random
+
+import numpy as np
+
+from core.scoring.ai_weight_learner import ContextAwareWeightLearner, RuleWeightLearner
+
+
+def _reference_features(learner, rule_results):
+    """이전 구현 (룰마다 Python 리스트를 만들어 평균, 메타데이터에 있는 룰이 없으면 0 벡터)"""
+    vectors = []
+    for rule in rule_results:
+        rule_id = rule.get("rule_id")
+        if rule_id not in learner.rule_features:
+            continue
+        feature = learner.rule_features[rule_id]
+        vectors.append([
+            1.0 if feature.axis == "C" else 0.0,
+            1.0 if feature.axis == "E" else 0.0,
+            1.0 if feature.axis == "B" else 0.0,
+            1.0 if feature.severity == "HIGH" else 0.0,
+            1.0 if feature.severity == "MEDIUM" else 0.0,
+            1.0 if feature.severity == "LOW" else 0.0,
+            feature.base_score / 30.0,
+            1.0 if feature.pattern_type == "single" else 0.0,
+            1.0 if feature.pattern_type == "window" else 0.0,
+            1.0 if feature.pattern_type == "bucket" else 0.0,
+            1.0 if feature.pattern_type == "topology" else 0.0,
+            1.0 if feature.pattern_type == "stats" else 0.0,
+            learner._get_combination_features(rule_id, rule_results),
+        ])
+    return np.mean(vectors, axis=0) if vectors else np.zeros(13)
+
+
+def test_schema_features_match_reference():
+    """무작위 발동 룰 조합 (메타데이터에 없는 룰, 중복 포함)에서 이전 방식과 같은 값"""
+    learner = RuleWeightLearner(use_ai=False)
+    rule_ids = sorted(learner.rule_features) + ["X-999"]
+    rng = random.Random(0)
+    for _ in range(200):
+        picked = rng.sample(rule_ids, rng.randint(1, 6)) + ["C-001", "E-101"][:rng.randint(0, 2)]
+        rule_results = [{"rule_id": rule_id, "score": 10} for rule_id in picked]
+        features = learner.extract_features(rule_results)
+        assert features.shape == (learner.feature_schema.dim,)
+        assert np.array_equal(features, _reference_features(learner, rule_results))
+
+
+def test_empty_features_have_schema_dim():
+    """발동 룰이 없거나 모두 메타데이터에 없으면 스키마 차원의 0 벡터 (학습 행렬 차원이 섞이지 않음)"""
+    learner = RuleWeightLearner(use_ai=False)
+    assert learner.feature_schema.dim == 13
+    assert learner.feature_schema.names[-1] == "combination_score"
+    for rule_results in ([], [{"rule_id": "X-999"}]):
+        features = learner.extract_features(rule_results)
+        assert np.array_equal(features, np.zeros(13))
+
+    context = {"amount_usd": 5000.0, "is_mixer": True, "address_age_days": 30}
+    learner = ContextAwareWeightLearner(use_ai=False)
+    assert learner.extract_features([], context).shape == (17,)
+    assert learner.extract_features([{"rule_id": "C-001"}], context).shape == (17,)
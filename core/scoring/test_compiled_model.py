@@ -0,0 +1,122 @@
+"""
+컴파일된 트리 앙상블 테스트
+
+CompiledTreeEnsemble / CompiledScaler가 sklearn과 비트 단위로 같은 값을 내는지,
+.npz 저장 후 (memory-map 포함) 다시 로드해도 같은지 확인
+"""
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from core.scoring.compiled_model import (
+    CompiledScaler,
+    CompiledTreeEnsemble,
+    load_compiled_model,
+    save_compiled_model,
+)
+from core.scoring.stage2_scorer import Stage2Scorer
+
+
+def _dataset(n: int = 600, n_features: int = 30, seed: int = 0):
+    """30차원 Stage2 feature와 같은 크기의 합성 데이터 (정수/연속 feature 혼합)"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features))
+    X[:, :10] = rng.integers(0, 5, size=(n, 10))
+    y = ((X[:, 0] + X[:, 12] * 0.5 + rng.normal(scale=0.5, size=n)) > 2.0).astype(int)
+    return X.astype(np.float32), y
+
+
+def _is_memory_mapped(array: np.ndarray) -> bool:
+    """배열이 (뷰를 거쳐) 파일 memmap을 그대로 가리키는지"""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def _models():
+    return [
+        RandomForestClassifier(n_estimators=25, max_depth=8, random_state=1),
+        ExtraTreesClassifier(n_estimators=15, random_state=2),
+        GradientBoostingClassifier(n_estimators=30, max_depth=3, random_state=3),
+        GradientBoostingClassifier(n_estimators=20, loss="exponential", random_state=4),
+    ]
+
+
+def test_compiled_ensemble_matches_sklearn():
+    """predict_proba / predict가 sklearn과 비트 단위로 같음"""
+    X, y = _dataset()
+    X_test, _ = _dataset(n=300, seed=9)
+    for model in _models():
+        model.fit(X, y)
+        compiled = CompiledTreeEnsemble.from_sklearn(model)
+        assert np.array_equal(compiled.predict_proba(X_test), model.predict_proba(X_test)), type(model).__name__
+        assert np.array_equal(compiled.predict(X_test), model.predict(X_test)), type(model).__name__
+        # float64 입력도 sklearn과 같은 float32 변환을 거침
+        X64 = X_test.astype(np.float64) + 1e-9
+        assert np.array_equal(compiled.predict_proba(X64), model.predict_proba(X64)), type(model).__name__
+
+
+def test_compiled_forest_missing_values_match_sklearn():
+    """NaN은 학습된 missing_go_to_left 방향으로 내려감"""
+    X, y = _dataset(seed=5)
+    X[::7, 3] = np.nan
+    X_test, _ = _dataset(n=200, seed=6)
+    X_test[::3, 3] = np.nan
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    compiled = CompiledTreeEnsemble.from_sklearn(model)
+    assert np.array_equal(compiled.predict_proba(X_test), model.predict_proba(X_test))
+
+
+def test_compiled_scaler_matches_standard_scaler():
+    """float32/float64 입력 모두 StandardScaler.transform과 같음 (with_mean/with_std 꺼진 경우 포함)"""
+    X, _ = _dataset()
+    for scaler in (StandardScaler(), StandardScaler(with_mean=False), StandardScaler(with_std=False)):
+        scaler.fit(X)
+        compiled = CompiledScaler.from_sklearn(scaler)
+        for data in (X, X.astype(np.float64)):
+            expected = scaler.transform(data)
+            actual = compiled.transform(data)
+            assert actual.dtype == expected.dtype
+            assert np.array_equal(actual, expected)
+
+
+def test_saved_model_matches_sklearn_with_mmap(tmp_path):
+    """.npz 저장 후 로드 (일반/memory-map) 결과가 sklearn 파이프라인과 같음"""
+    X, y = _dataset()
+    X_test, _ = _dataset(n=300, seed=9)
+    scaler = StandardScaler().fit(X)
+    for i, model in enumerate(_models()):
+        model.fit(scaler.transform(X), y)
+        expected = model.predict_proba(scaler.transform(X_test))
+
+        path = tmp_path / f"model_{i}.npz"
+        save_compiled_model(path, CompiledTreeEnsemble.from_sklearn(model), scaler, {"model_type": "test"})
+        for mmap in (False, True):
+            data = load_compiled_model(path, mmap=mmap)
+            assert data["model_type"] == "test"
+            assert _is_memory_mapped(data["model"].threshold) == mmap
+            assert _is_memory_mapped(data["model"].children) == mmap
+            actual = data["model"].predict_proba(data["scaler"].transform(X_test))
+            assert np.array_equal(actual, expected), (type(model).__name__, mmap)
+
+
+def test_stage2_export_compiled_roundtrip(tmp_path):
+    """Stage2Scorer.export_compiled → load_model(mmap=True)가 pickle 모델과 같은 확률"""
+    X, y = _dataset()
+    scorer = Stage2Scorer(model_type="random_forest")
+    scorer.scaler = StandardScaler().fit(X)
+    scorer.model = RandomForestClassifier(n_estimators=20, random_state=0).fit(scorer.scaler.transform(X), y)
+    scorer.is_trained = True
+
+    path = tmp_path / "stage2.npz"
+    scorer.export_compiled(path)
+    loaded = Stage2Scorer(model_type="random_forest")
+    loaded.load_model(path, mmap=True)
+
+    X_test, _ = _dataset(n=200, seed=4)
+    expected = scorer.model.predict_proba(scorer.scaler.transform(X_test))
+    actual = loaded.model.predict_proba(loaded.scaler.transform(X_test))
+    assert np.array_equal(actual, expected)
+    assert loaded.feature_schema_hash() == scorer.feature_schema_hash()
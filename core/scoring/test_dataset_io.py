@@ -0,0 +1,120 @@
+"""
+데이터셋 입출력 계층 테스트
+
+.json / .jsonl / .cols로 저장한 뒤 다시 읽으면 같은 레코드인지 (일부 행에만 있는 필드, 하위 필드,
+타입이 섞인 컬럼 포함), int/float가 섞인 컬럼은 float64 컬럼이 되는지, 필드를 지정하면
+그 필드만 복원하는지 확인
+"""
+import json
+
+import numpy as np
+import pytest
+
+from core.scoring import dataset_io
+from core.scoring.dataset_io import (
+    ColumnarDataset,
+    convert_dataset,
+    dataset_column,
+    dataset_records,
+    iter_dataset,
+    load_dataset,
+    save_dataset,
+)
+
+
+def _records(n: int = 50):
+    """여러 타입/누락 필드가 섞인 레코드"""
+    records = []
+    for i in range(n):
+        record = {
+            "tx_hash": f"0xtx{i}",
+            "from": f"0x{i:040x}",
+            "usd_value": [10, 2.5, 1e6, 0][i % 4],              # int + float
+            "timestamp": 1700000000 + i,
+            "is_fraud": i % 3 == 0,
+            "label": "fraud" if i % 3 == 0 else ("정상" if i % 2 else 7),  # str + int → json
+            "rule_results": [{"rule_id": "C-001", "score": 30}] * (i % 3),
+            "ml_features": {"ppr_score": i / 100, "fan_in_count": i % 5},
+            "tx_context": {"is_mixer": i % 4 == 0, "note": None},
+        }
+        if i % 5 == 0:
+            record["ml_features"]["extra"] = "x"
+            del record["timestamp"]
+        if i % 7 == 0:
+            record["tx_context"] = "missing"                    # dict가 아닌 값이 섞이면 json
+        records.append(record)
+    return records
+
+
+@pytest.mark.parametrize("suffix", ["json", "jsonl", "cols"])
+def test_round_trip(tmp_path, suffix):
+    """저장 후 다시 읽은 레코드 == 원래 레코드 (반복, 인덱싱, 슬라이싱, 스트리밍)"""
+    records = _records()
+    path = save_dataset(records, tmp_path / f"data.{suffix}")
+    data = load_dataset(path)
+    assert len(data) == len(records)
+    assert list(data) == records
+    assert data[3] == records[3] and data[-1] == records[-1]
+    assert list(data[5:17]) == records[5:17]
+    assert list(iter_dataset(path)) == records
+    assert dataset_column(data, "ml_features.fan_in_count") == [r["ml_features"]["fan_in_count"] for r in records]
+    assert dataset_column(data, "timestamp", -1) == [r.get("timestamp", -1) for r in records]
+
+
+def test_columnar_kinds(tmp_path, monkeypatch):
+    """int/float 혼합은 float64 컬럼, 정말 섞인 타입만 json 컬럼 (블록 경계를 넘는 반복 포함)"""
+    monkeypatch.setattr(dataset_io, "ITER_BLOCK_ROWS", 8)
+    records = _records()
+    data = load_dataset(save_dataset(records, tmp_path / "data.cols"))
+    kinds = {column["name"]: column["kind"] for column in data.schema}
+    assert kinds["usd_value"] == "float64"
+    assert kinds["timestamp"] == "int64"
+    assert kinds["is_fraud"] == "bool"
+    assert kinds["ml_features.ppr_score"] == "float64"
+    assert kinds["label"] == "json"
+    assert kinds["tx_context"] == "json"
+    assert kinds["rule_results"] == "json"
+
+    usd = data.column("usd_value")
+    assert usd.dtype == np.float64
+    assert usd.tolist() == [float(r["usd_value"]) for r in records]
+    assert [type(r["usd_value"]) for r in data] == [float] * len(records)
+    assert list(data) == records
+
+    with open(tmp_path / "data.cols" / "schema.json") as f:
+        assert json.load(f)["num_rows"] == len(records)
+
+
+def test_fields_restrict_decoded_columns(tmp_path, monkeypatch):
+    """fields를 지정하면 반복/인덱싱/슬라이싱/records 모두 그 최상위 필드만 복원 (column()은 전체)"""
+    monkeypatch.setattr(dataset_io, "ITER_BLOCK_ROWS", 8)
+    records = _records()
+    path = save_dataset(records, tmp_path / "data.cols")
+    fields = ["from", "ml_features", "timestamp"]
+    expected = [{k: v for k, v in r.items() if k in fields} for r in records]
+
+    data = load_dataset(path, fields)
+    assert isinstance(data, ColumnarDataset)
+    assert list(data) == expected
+    assert data[10] == expected[10]
+    assert data[3:20] == expected[3:20]
+    assert data[::9] == expected[::9]
+    assert dataset_records(data) == expected
+    assert dataset_records(data, ["from"]) == [{"from": r["from"]} for r in records]
+    assert dataset_column(data, "label") == [r["label"] for r in records]
+
+    # 다른 포맷은 fields와 무관하게 전체 레코드
+    assert load_dataset(save_dataset(records, tmp_path / "data.jsonl"), fields) == records
+
+
+def test_convert_dataset(tmp_path):
+    """json → cols → jsonl 변환 후에도 같은 레코드"""
+    records = _records(20)
+    src = save_dataset(records, tmp_path / "data.json")
+    cols = convert_dataset(src, tmp_path / "data.cols")
+    out = convert_dataset(cols, tmp_path / "out.jsonl")
+    assert load_dataset(out) == records
+
+    # 다시 저장하면 기존 디렉토리를 교체
+    save_dataset(records[:5], cols)
+    assert list(load_dataset(cols)) == records[:5]
@@ -0,0 +1,119 @@
+"""
+Feature Store 테스트
+
+캐시 적중, 디스크 재사용, 룰/집계 코드/feature 버전이 바뀔 때 무효화되는지 확인
+"""
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+from core.scoring import feature_store as feature_store_module
+from core.scoring.feature_store import FeatureStore
+from core.scoring.stage1_scorer import Stage1Scorer
+from core.scoring.stage2_scorer import Stage2Scorer
+
+project_root = Path(__file__).parent.parent.parent
+RULES_PATH = project_root / "rules" / "tracex_rules.yaml"
+
+
+def _samples(n: int = 12):
+    """룰 윈도우 히스토리에서 지워지지 않도록 현재 시각 기준 샘플"""
+    now = int(time.time())
+    return [
+        {
+            "from": f"0x{i % 3:040x}",
+            "to": f"0x{(i % 5) + 10:040x}",
+            "usd_value": [50, 2000, 15000, 250000][i % 4],
+            "timestamp": now - 600 + i * 10,
+            "tx_hash": f"0xtx{i}",
+            "chain": "ethereum",
+            "ml_features": {"fan_in_count": i, "fan_out_count": i % 4, "n_omega": 0.4 + 0.01 * i},
+            "tx_context": {"num_transactions": 5, "graph_nodes": 9, "is_mixer": i % 6 == 0},
+        }
+        for i in range(n)
+    ]
+
+
+def _scorer(rules_path: Path = RULES_PATH, **stage1_kwargs) -> Stage2Scorer:
+    return Stage2Scorer(stage1_scorer=Stage1Scorer(rules_path=str(rules_path), **stage1_kwargs))
+
+
+def test_feature_store_hits(tmp_path):
+    """두 번째 조회는 전부 적중하고, 값은 직접 계산한 feature와 같음"""
+    samples = _samples()
+    store = FeatureStore(str(tmp_path), _scorer())
+
+    first = store.get(samples)
+    assert (store.hits, store.misses) == (0, len(samples))
+    second = store.get(samples)
+    assert (store.hits, store.misses) == (len(samples), len(samples))
+    assert np.array_equal(first["features"], second["features"])
+    assert first["ok"].all()
+
+    reference = _scorer()
+    expected = reference.extract_features_batch(*reference._stage1_batch(samples))
+    assert np.array_equal(first["features"], expected)
+
+    # 새 인스턴스도 디스크 청크에서 읽음
+    reopened = FeatureStore(str(tmp_path), _scorer())
+    reopened.get(samples)
+    assert (reopened.hits, reopened.misses) == (len(samples), 0)
+
+
+def test_feature_store_invalidates_on_rules_change(tmp_path):
+    """룰북 내용이 바뀌면 새 파티션을 쓰고 다시 계산"""
+    rules_path = tmp_path / "rules.yaml"
+    shutil.copy(RULES_PATH, rules_path)
+    samples = _samples()
+
+    store = FeatureStore(str(tmp_path / "store"), _scorer(rules_path))
+    store.get(samples)
+
+    rules_path.write_text(rules_path.read_text(encoding="utf-8") + "\n# changed\n", encoding="utf-8")
+    changed = FeatureStore(str(tmp_path / "store"), _scorer(rules_path))
+    assert changed.rules_version != store.rules_version
+    assert changed.partition_dir != store.partition_dir
+    changed.get(samples)
+    assert (changed.hits, changed.misses) == (0, len(samples))
+
+
+def test_feature_store_invalidates_on_aggregation_change(tmp_path, monkeypatch):
+    """집계 코드(core/aggregation 등)가 바뀌면 룰 버전이 바뀜 (테스트 파일은 무시)"""
+    code_dir = tmp_path / "code"
+    code_dir.mkdir()
+    (code_dir / "window.py").write_text("WINDOW = 1\n", encoding="utf-8")
+    monkeypatch.setattr(feature_store_module, "project_root", tmp_path)
+    monkeypatch.setattr(feature_store_module, "RULES_CODE_DIRS", ("code",))
+
+    store = FeatureStore(str(tmp_path / "store"), _scorer())
+    (code_dir / "test_window.py").write_text("def test(): pass\n", encoding="utf-8")
+    assert FeatureStore(str(tmp_path / "store"), _scorer()).rules_version == store.rules_version
+
+    (code_dir / "window.py").write_text("WINDOW = 2\n", encoding="utf-8")
+    changed = FeatureStore(str(tmp_path / "store"), _scorer())
+    assert changed.rules_version != store.rules_version
+    assert changed.partition_dir != store.partition_dir
+
+    monkeypatch.undo()
+    hashed = [path for path, _ in feature_store_module._package_sources(feature_store_module.RULES_CODE_DIRS)]
+    assert "core/aggregation/window.py" in hashed and "core/rules/evaluator.py" in hashed
+    assert not any(path.rsplit("/", 1)[-1].startswith("test_") for path in hashed)
+
+
+def test_feature_store_invalidates_on_feature_version_change(tmp_path):
+    """1단계 가중치나 feature 스키마 설정이 바뀌면 새 파티션을 씀"""
+    samples = _samples()
+    store = FeatureStore(str(tmp_path), _scorer())
+    store.get(samples)
+
+    reweighted = FeatureStore(str(tmp_path), _scorer(rule_weight=0.8, graph_weight=0.2))
+    assert reweighted.feature_version != store.feature_version
+    reweighted.get(samples)
+    assert (reweighted.hits, reweighted.misses) == (0, len(samples))
+
+    no_ppr_scorer = _scorer()
+    no_ppr_scorer.use_ppr_features = False
+    no_ppr = FeatureStore(str(tmp_path), no_ppr_scorer)
+    assert no_ppr.partition_dir not in (store.partition_dir, reweighted.partition_dir)
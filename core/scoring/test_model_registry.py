@@ -0,0 +1,148 @@
+"""
+모델 레지스트리 테스트
+
+체크섬/feature 스키마가 매니페스트와 다른 모델을 거부하는지, fallback 버전으로 서빙하는지,
+워밍업 전후 준비 상태(/ready)가 맞는지 확인
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from core.scoring.model_registry import ModelRegistry
+from core.scoring.stage2_scorer import FEATURE_DIM, Stage2Scorer
+
+project_root = Path(__file__).parent.parent.parent
+
+
+def _save_scorer(path, seed: int = 0):
+    """작은 RF Stage2 모델 저장"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, FEATURE_DIM))
+    y = (X[:, 0] > 0).astype(int)
+    scorer = Stage2Scorer(model_type="random_forest")
+    scorer.scaler = StandardScaler().fit(X)
+    scorer.model = RandomForestClassifier(n_estimators=5, random_state=seed).fit(scorer.scaler.transform(X), y)
+    scorer.is_trained = True
+    scorer.save_model(path)
+    return scorer
+
+
+def test_register_and_get(tmp_path):
+    """등록한 모델은 매니페스트에 체크섬/스키마가 기록되고, 다시 연 레지스트리에서 로드됨"""
+    scorer = _save_scorer(tmp_path / "rf.pkl")
+    registry = ModelRegistry(tmp_path)
+    entry = registry.register("stage2", "rf-v1", "rf.pkl", primary=True)
+    assert entry.feature_schema == scorer.feature_schema_hash()
+    assert entry.model_type == "random_forest"
+
+    reopened = ModelRegistry(tmp_path)
+    assert reopened.serving_version("stage2") == "rf-v1"
+    loaded = reopened.get("stage2")
+    assert loaded is reopened.get("stage2")
+    assert reopened.status()["models"]["stage2@rf-v1"]["state"] == "loaded"
+
+
+def test_checksum_mismatch_rejected(tmp_path):
+    """등록 후 파일이 바뀌면 로드를 거부하고 failed로 기록"""
+    _save_scorer(tmp_path / "rf.pkl")
+    registry = ModelRegistry(tmp_path)
+    registry.register("stage2", "rf-v1", "rf.pkl", primary=True)
+    _save_scorer(tmp_path / "rf.pkl", seed=1)
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        registry.get("stage2")
+    assert registry.status()["models"]["stage2@rf-v1"]["state"] == "failed"
+
+
+def test_feature_schema_mismatch_rejected(tmp_path):
+    """매니페스트의 feature 스키마가 코드가 만드는 스키마와 다르면 로드를 거부"""
+    _save_scorer(tmp_path / "rf.pkl")
+    registry = ModelRegistry(tmp_path)
+    registry.register("stage2", "rf-v1", "rf.pkl", feature_schema="0" * 16, model_type="random_forest", primary=True)
+
+    with pytest.raises(ValueError, match="Feature schema mismatch"):
+        registry.get("stage2")
+
+
+def test_fallback_when_primary_fails(tmp_path):
+    """primary 로드에 실패하면 로드 가능한 다른 버전으로 서빙"""
+    _save_scorer(tmp_path / "good.pkl")
+    _save_scorer(tmp_path / "bad.pkl", seed=1)
+    registry = ModelRegistry(tmp_path)
+    registry.register("stage2", "good-v1", "good.pkl")
+    registry.register("stage2", "bad-v1", "bad.pkl", primary=True)
+    _save_scorer(tmp_path / "bad.pkl", seed=2)
+
+    assert registry.get("stage2") is registry.get("stage2", "good-v1")
+    assert registry.serving_version("stage2") == "good-v1"
+    assert registry.status()["fallback"] == {"stage2": "good-v1"}
+
+
+def test_ready_states(tmp_path):
+    """워밍업 전에는 준비 안 됨, 워밍업 후 ready, 서빙 가능한 버전이 없으면 준비 안 됨"""
+    _save_scorer(tmp_path / "rf.pkl")
+    registry = ModelRegistry(tmp_path)
+    registry.register("stage2", "rf-v1", "rf.pkl", primary=True)
+    registry.warmup_names = ["stage2"]
+    assert registry.status()["ready"] is False
+
+    status = registry.warm_up()
+    assert status["ready"] is True
+    assert status["warmup_done"] is True
+    assert status["models"]["stage2@rf-v1"]["state"] == "ready"
+
+    _save_scorer(tmp_path / "rf.pkl", seed=1)
+    registry.register("stage2", "rf-v1", "rf.pkl", feature_schema="0" * 16, model_type="random_forest")
+    status = registry.warm_up()
+    assert status["ready"] is False
+    assert status["models"]["stage2@rf-v1"]["state"] == "failed"
+
+
+def test_ready_endpoint(tmp_path, monkeypatch):
+    """/ready는 Stage 1 로드와 모델 워밍업이 끝나야 200, 그 전에는 503"""
+    from api.app import app
+    from api.routes import demo_analysis
+
+    _save_scorer(tmp_path / "rf.pkl")
+    registry = ModelRegistry(tmp_path)
+    registry.register("stage2", "rf-v1", "rf.pkl", primary=True)
+    registry.warmup_names = ["stage2"]
+    monkeypatch.setattr(demo_analysis, "model_registry", registry)
+    monkeypatch.setattr(demo_analysis, "stage1_scorer", None)
+
+    client = app.test_client()
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.get_json()["stage1_loaded"] is False
+
+    registry.warm_up()
+    assert client.get("/ready").status_code == 503  # Stage 1 미로드
+
+    monkeypatch.setattr(demo_analysis, "stage1_scorer", object())
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.get_json()["serving"] == {"stage2": "rf-v1"}
+
+
+def test_shipped_primary_is_compiled():
+    """저장소의 매니페스트는 컴파일된 .npz를 서빙하고, sklearn 없이 체크섬 확인 후 로드됨"""
+    registry = ModelRegistry(project_root / "models")
+    entry = registry.entry("stage2", registry.serving_version("stage2"))
+    assert entry.path.endswith(".npz")
+
+    code = (
+        "import sys; sys.modules['sklearn'] = None\n"
+        "from pathlib import Path\n"
+        "from core.scoring.model_registry import ModelRegistry\n"
+        "scorer = ModelRegistry(Path('models')).get('stage2')\n"
+        "print(type(scorer.model).__name__)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "CompiledTreeEnsemble"
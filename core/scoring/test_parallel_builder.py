@@ -0,0 +1,141 @@
+"""
+병렬·재개 가능한 데이터셋 구축기 테스트
+
+샤드 병합 순서, 재개 시 완료 샤드 건너뛰기, 실패 항목이 있던 샤드 재처리, 설정 변경 시 재처리,
+Etherscan 수집 실패가 실패 항목으로 기록되는지, 주소별 rule_results가 샤드 분할과 무관한지 확인
+"""
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from core.scoring.parallel_builder import ParallelDatasetBuilder, _run_shard
+from core.scoring.real_dataset_builder import RealDatasetBuilder
+
+
+def _process(item):
+    """테스트용 항목 처리 (처리 기록을 로그 파일에 남기고, fail 파일이 있으면 일부 항목 실패)"""
+    with open(item["log"], "a") as f:
+        f.write(f"{item['value']}\n")
+    if item["value"] % 7 == 3 and Path(item["fail"]).exists():
+        raise RuntimeError(f"fetch failed: {item['value']}")
+    if item["value"] % 5 == 0:
+        return []
+    return [{"value": item["value"], "copy": c} for c in range(item["value"] % 3 + 1)]
+
+
+def _items(tmp_path, n: int = 40):
+    return [{"value": i, "log": str(tmp_path / "log.txt"), "fail": str(tmp_path / "fail")} for i in range(n)]
+
+
+def _processed(tmp_path):
+    path = tmp_path / "log.txt"
+    values = [int(line) for line in path.read_text().split()] if path.exists() else []
+    path.unlink(missing_ok=True)
+    return values
+
+
+def test_build_merges_in_order_and_resumes(tmp_path):
+    """샤드 순서대로 병합하고, 다시 실행하면 완료된 샤드는 처리하지 않음"""
+    items = _items(tmp_path)
+    expected = [record for item in items for record in _process(item)]
+    _processed(tmp_path)
+
+    builder = ParallelDatasetBuilder(str(tmp_path / "shards"), num_workers=2, shard_size=6)
+    dataset = builder.build(items, _process, output_path=str(tmp_path / "out.jsonl"))
+    assert dataset == expected
+    assert sorted(_processed(tmp_path)) == list(range(40))
+    assert builder.stats() == {"records": len(expected), "skipped": 8, "errors": 0}
+    with open(tmp_path / "out.jsonl") as f:
+        assert [json.loads(line) for line in f] == expected
+
+    again = ParallelDatasetBuilder(str(tmp_path / "shards"), num_workers=2, shard_size=6)
+    assert again.build(items, _process) == expected
+    assert _processed(tmp_path) == []
+
+    # 설정이 바뀌면 완료된 샤드도 다시 처리
+    again.build(items, _process, config={"version": 2})
+    assert sorted(_processed(tmp_path)) == list(range(40))
+
+
+def test_failed_items_retried_on_resume(tmp_path):
+    """실패 항목이 있던 샤드만 다음 실행에서 다시 처리하고, 성공하면 결과에 포함"""
+    items = _items(tmp_path)
+    (tmp_path / "fail").touch()
+    builder = ParallelDatasetBuilder(str(tmp_path / "shards"), num_workers=2, shard_size=6)
+    partial = builder.build(items, _process)
+    failed = [item["value"] for item in items if item["value"] % 7 == 3]
+    assert builder.stats()["errors"] == len(failed)
+    assert not {record["value"] for record in partial} & set(failed)
+    _processed(tmp_path)
+
+    (tmp_path / "fail").unlink()
+    dataset = builder.build(items, _process)
+    retried_shards = {value // 6 for value in failed}
+    assert sorted(_processed(tmp_path)) == [i for i in range(40) if i // 6 in retried_shards]
+    assert builder.stats()["errors"] == 0
+    assert dataset == [record for item in items for record in _process(item)]
+
+
+class _FakeCollector:
+    """RealDataCollector 대체 (주소별 거래 또는 예외)"""
+
+    def __init__(self, transactions):
+        self.transactions = transactions
+
+    def collect_address_transactions(self, address, max_transactions=None, raise_errors=False):
+        result = self.transactions[address]
+        if isinstance(result, Exception):
+            raise result
+        return [dict(tx) for tx in result[:max_transactions]]
+
+
+def _address_transactions(address: str, n: int = 6, to: str = None):
+    """주소의 거래 (to를 주면 그 주소로 보낸 거래 - 다른 수집 대상 주소와 주고받은 거래)"""
+    now = int(time.time())
+    return [
+        {
+            "from": address if to else f"0x{i + 100:040x}",
+            "to": to or address,
+            "amount_usd": 9000.0 + i,
+            "timestamp": now - 600 + i * 30,
+            "tx_hash": f"0x{address[-4:]}{i}",
+            "chain": "ethereum",
+        }
+        for i in range(n)
+    ]
+
+
+def test_collect_errors_recorded_as_failures():
+    """Etherscan 수집 실패는 빈 결과(skipped)가 아니라 실패 항목으로 기록되어 재개 시 다시 처리됨"""
+    builder = RealDatasetBuilder(api_key="test")
+    address = "0x" + "aa" * 20
+    builder.collector = _FakeCollector({address: RuntimeError("API Error: Max rate limit reached")})
+    item = {"address": address, "kind": "known_normal", "max_transactions": 10}
+
+    with pytest.raises(RuntimeError):
+        builder.collect_and_label(item)
+
+    result = _run_shard(builder.collect_and_label, 0, [item], "/dev/null")
+    assert (result["skipped"], result["errors"]) == (0, 1)
+    assert "rate limit" in result["failures"][0]["error"]
+
+
+def test_rule_results_independent_of_preceding_addresses():
+    """같은 주소의 rule_results는 앞서 처리한 주소와 무관 (샤드 분할/재개 순서와 무관)"""
+    first, second = "0x" + "11" * 20, "0x" + "22" * 20
+    # first의 거래는 second로 보낸 거래 (윈도우 히스토리가 second 기준으로 쌓임)
+    transactions = {first: _address_transactions(first, n=20, to=second), second: _address_transactions(second)}
+    item = {"address": second, "kind": "known_normal", "max_transactions": 10}
+
+    alone = RealDatasetBuilder(api_key="test")
+    alone.collector = _FakeCollector(transactions)
+    expected = alone.collect_and_label(item)
+
+    after_other = RealDatasetBuilder(api_key="test")
+    after_other.collector = _FakeCollector(transactions)
+    after_other.collect_and_label({**item, "address": first})
+    after_other.collect_and_label({**item, "address": first})
+    assert after_other.collect_and_label(item) == expected
+    assert any(sample["rule_results"] for sample in expected)
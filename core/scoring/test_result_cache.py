@@ -0,0 +1,137 @@
+"""
+주소 분석 결과 캐시 테스트
+
+MISS → HIT (캐시 나이), 디스크 재사용, 룰/리스트 버전이 바뀌면 무효화되는지,
+주소 분석 API가 X-Cache / X-Cache-Age 헤더를 주는지 확인
+"""
+import time
+
+from core.scoring import result_cache as result_cache_module
+from core.scoring.result_cache import AnalysisResultCache
+
+
+def _sources(tmp_path):
+    """임시 룰/리스트 파일을 버전 입력으로 사용"""
+    rules = tmp_path / "rules.yaml"
+    rules.write_text("rules: []\n", encoding="utf-8")
+    lists = tmp_path / "lists"
+    lists.mkdir()
+    (lists / "sdn.json").write_text('["0xabc"]', encoding="utf-8")
+    return {"rules": [str(rules)], "lists": [str(lists)]}
+
+
+def _transactions():
+    return [{"tx_hash": "0xtx1", "from": "0xa", "to": "0xb", "amount_usd": 1000.0, "timestamp": 1700000000}]
+
+
+def test_miss_then_hit(tmp_path):
+    """처음에는 계산 (나이 None), 같은 키는 계산 없이 같은 응답과 저장 후 지난 시간"""
+    cache = AnalysisResultCache(version_sources=_sources(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(True)
+        return {"risk_score": 42}
+
+    key = cache.key("address", "0xb", _transactions(), "basic", chain="ethereum")
+    payload, age = cache.get_or_compute(key, compute)
+    assert payload == {"risk_score": 42} and age is None
+    time.sleep(0.05)
+    payload, age = cache.get_or_compute(cache.key("address", "0xb", _transactions(), "basic", chain="ethereum"), compute)
+    assert payload == {"risk_score": 42}
+    assert age is not None and age >= 0.05
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+
+    # 요청 파라미터/거래 순서가 다르면 다른 키, key=None이면 캐시를 보지 않음
+    assert cache.key("address", "0xb", _transactions(), "advanced", chain="ethereum") != key
+    assert cache.key("address", "0xb", _transactions() * 2, "basic", chain="ethereum") != key
+    cache.get_or_compute(None, compute)
+    assert len(calls) == 2
+
+
+def test_disk_hit_keeps_cached_at(tmp_path):
+    """새 인스턴스도 디스크에서 읽고, 캐시 나이는 처음 저장한 시각 기준"""
+    sources = _sources(tmp_path)
+    cache = AnalysisResultCache(disk_dir=str(tmp_path / "cache"), version_sources=sources)
+    key = cache.key("address", "0xb", _transactions(), "basic")
+    cache.get_or_compute(key, lambda: {"risk_score": 7})
+    time.sleep(0.05)
+
+    reopened = AnalysisResultCache(disk_dir=str(tmp_path / "cache"), version_sources=sources)
+    reopened_key = reopened.key("address", "0xb", _transactions(), "basic")
+    assert reopened_key == key
+    payload, age = reopened.get_or_compute(reopened_key, lambda: {"risk_score": -1})
+    assert payload == {"risk_score": 7}
+    assert age >= 0.05
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_invalidates_on_version_change(tmp_path, monkeypatch):
+    """룰/리스트 파일이 바뀌면 새 키로 다시 계산하고, 메모리와 이전 디스크 파티션을 비움"""
+    monkeypatch.setattr(result_cache_module, "VERSION_CHECK_INTERVAL", 0.0)
+    sources = _sources(tmp_path)
+    cache = AnalysisResultCache(disk_dir=str(tmp_path / "cache"), version_sources=sources)
+    key = cache.key("address", "0xb", _transactions(), "basic")
+    cache.get_or_compute(key, lambda: {"risk_score": 1})
+    old_versions = cache.versions()
+    assert len(list((tmp_path / "cache").glob("v*"))) == 1
+
+    (tmp_path / "lists" / "sdn.json").write_text('["0xabc", "0xdef"]', encoding="utf-8")
+    new_key = cache.key("address", "0xb", _transactions(), "basic")
+    assert new_key != key
+    assert cache.versions()["lists"] != old_versions["lists"]
+    assert cache.versions()["rules"] == old_versions["rules"]
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["entries"] == 0
+    assert cache.get(key) is None
+
+    payload, age = cache.get_or_compute(new_key, lambda: {"risk_score": 2})
+    assert payload == {"risk_score": 2} and age is None
+    assert [p.name for p in (tmp_path / "cache").glob("v*")] == [f"v{cache._versions_hash}"]
+
+    (tmp_path / "rules.yaml").write_text("rules: []\n# changed\n", encoding="utf-8")
+    assert cache.key("address", "0xb", _transactions(), "basic") not in (key, new_key)
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_address_endpoint_cache_headers(tmp_path, monkeypatch):
+    """주소 분석 API: 첫 요청 MISS, 같은 요청 HIT + X-Cache-Age, cache=false면 캐시 사용 안 함"""
+    from api.app import app
+
+    monkeypatch.setattr(result_cache_module, "result_cache", AnalysisResultCache())
+    body = {
+        "address": "0xabc1234567890abcdef1234567890abcdef12345",
+        "chain_id": 1,
+        "transactions": [{
+            "tx_hash": "0xtx1",
+            "chain_id": 1,
+            "timestamp": "2024-01-01T10:00:00Z",
+            "block_height": 1000,
+            "from": "0xmixer123",
+            "to": "0xabc1234567890abcdef1234567890abcdef12345",
+            "amount_usd": 5000.0,
+            "label": "mixer",
+            "is_sanctioned": False,
+            "is_known_scam": False,
+            "is_mixer": True,
+            "is_bridge": False,
+            "asset_contract": "0xETH",
+        }],
+    }
+    client = app.test_client()
+    first = client.post("/api/analyze/address", json=body)
+    assert first.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    assert "X-Cache-Age" not in first.headers
+
+    second = client.post("/api/analyze/address", json=body)
+    assert second.headers["X-Cache"] == "HIT"
+    assert int(second.headers["X-Cache-Age"]) >= 0
+    assert second.get_json() == first.get_json()
+
+    uncached = client.post("/api/analyze/address", json={**body, "cache": False})
+    assert uncached.headers["X-Cache"] == "MISS"
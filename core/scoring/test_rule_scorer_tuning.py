@@ -0,0 +1,108 @@
+"""
+ImprovedRuleScorer 설정 그리드 탐색 테스트
+
+RuleScorerTuner / optimize_rule_scorer가 설정마다 calculate_score로 다시 채점하던
+기존 루프와 같은 점수, 같은 최적 설정을 내는지 확인
+"""
+import random
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+
+from core.rules.evaluator import RuleEvaluator
+from core.scoring.improved_rule_scorer import ImprovedRuleScorer, optimize_rule_scorer
+from core.scoring.rule_scorer_tuning import RuleScorerTuner, default_configs, item_context
+
+RULES_PATH = Path(__file__).parent.parent.parent / "rules" / "tracex_rules.yaml"
+
+
+def _items(n: int = 250, seed: int = 13):
+    """룰 평가 결과를 담은 검증 샘플 (optimize_rule_based.py가 넘기는 형식)"""
+    rng = random.Random(seed)
+    now = int(time.time())
+    rule_evaluator = RuleEvaluator(str(RULES_PATH))
+    items = []
+    for i in range(n):
+        fraud = rng.random() < 0.4
+        tx_data = {
+            "from": f"0x{rng.randrange(12):040x}",
+            "to": f"0x{rng.randrange(12) + 20:040x}",
+            "usd_value": rng.choice([20, 800, 3000, 12000, 60000, 250000]),
+            "timestamp": now - 2000 + i * 5,
+            "tx_hash": f"0xtx{i}",
+            "chain": "ethereum",
+            "is_mixer": fraud and rng.random() < 0.5,
+            "is_sanctioned": fraud and rng.random() < 0.3,
+        }
+        items.append({
+            "rule_results": rule_evaluator.evaluate_single_transaction(tx_data),
+            "ground_truth_label": "fraud" if fraud else "normal",
+            "num_transactions": rng.randint(0, 40),
+            "graph_nodes": rng.randint(0, 20),
+            "graph_edges": rng.randint(0, 40),
+            "ml_features": {"ppr_score": rng.random() * 0.1, "pattern_score": rng.random() * 80, "n_omega": rng.random()},
+        })
+    return items
+
+
+def _loop_grid_search(items):
+    """optimize_rule_scorer의 기존 구현 (설정마다 전체 재채점 + sklearn 임계값 루프)"""
+    y_true = [1 if item.get("ground_truth_label", "normal") == "fraud" else 0 for item in items]
+    best_score = -1.0
+    best_config = None
+    best_results = None
+    for config in default_configs():
+        scorer = ImprovedRuleScorer(**config)
+        y_pred_scores = [scorer.calculate_score(item.get("rule_results", []), item_context(item)) for item in items]
+
+        best_threshold = 50.0
+        best_f1 = 0.0
+        for threshold in range(10, 90, 2):
+            y_pred = [1 if s >= threshold else 0 for s in y_pred_scores]
+            f1 = f1_score(y_true, y_pred, zero_division=0)
+            if f1 > best_f1:
+                best_f1 = f1
+                best_threshold = threshold
+        y_pred = [1 if s >= best_threshold else 0 for s in y_pred_scores]
+        f1 = f1_score(y_true, y_pred, zero_division=0)
+        if f1 > best_score or best_config is None:
+            best_score = f1
+            best_config = {**config, "threshold": best_threshold}
+            best_results = {
+                "accuracy": accuracy_score(y_true, y_pred),
+                "precision": precision_score(y_true, y_pred, zero_division=0),
+                "recall": recall_score(y_true, y_pred, zero_division=0),
+                "f1_score": f1,
+            }
+    return best_config, best_results
+
+
+def test_tuner_scores_match_calculate_score():
+    """설정별 배열 조합 점수 == ImprovedRuleScorer(**config).calculate_score (비트 단위)"""
+    items = _items()
+    tuner = RuleScorerTuner(items)
+    for config in default_configs():
+        scorer = ImprovedRuleScorer(**config)
+        expected = np.array(
+            [scorer.calculate_score(item.get("rule_results", []), item_context(item)) for item in items],
+            dtype=np.float64
+        )
+        assert np.array_equal(tuner.scores(config), expected), config
+
+
+def test_grid_search_matches_loop():
+    """최적 설정/임계값/지표 == 기존 루프 (병렬 평가도 같은 결과)"""
+    items = _items(seed=21)
+    expected_config, expected_results = _loop_grid_search(items)
+
+    tuner = RuleScorerTuner(items)
+    for num_workers in (1, 2):
+        best = tuner.grid_search(num_workers=num_workers)["best"]
+        assert best["config"] == expected_config
+        for name, value in expected_results.items():
+            assert np.isclose(best["results"][name], value), name
+
+    result = optimize_rule_scorer([], items)
+    assert result["config"] == expected_config
@@ -0,0 +1,150 @@
+"""
+룰 What-if 재채점 엔진 테스트
+
+optimize_rules.py가 예전에 하던 방식(룰북을 고쳐 다시 평가, 샘플마다 가중 합, sklearn 임계값 루프)과
+RuleWhatIfEngine 결과가 같은지 확인
+"""
+import random
+import time
+from pathlib import Path
+
+import numpy as np
+import yaml
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+
+from core.scoring.feature_store import sample_inputs
+from core.scoring.rule_whatif import RuleWhatIfEngine
+from core.scoring.stage1_scorer import Stage1Scorer
+
+project_root = Path(__file__).parent.parent.parent
+RULES_PATH = project_root / "rules" / "tracex_rules.yaml"
+
+
+def _samples(n: int = 300, seed: int = 7):
+    """믹서/제재/고액 룰이 섞여 발동하는 합성 데이터 (윈도우 히스토리 기준 현재 시각)"""
+    rng = random.Random(seed)
+    now = int(time.time())
+    samples = []
+    for i in range(n):
+        fraud = rng.random() < 0.4
+        samples.append({
+            "from": f"0x{rng.randrange(15):040x}",
+            "to": f"0x{rng.randrange(15) + 20:040x}",
+            "usd_value": rng.choice([20, 800, 3000, 12000, 60000, 250000]),
+            "timestamp": now - 3000 + i * 5,
+            "tx_hash": f"0xtx{i}",
+            "chain": "ethereum",
+            "ml_features": {"fan_in_count": rng.randint(0, 15), "n_omega": rng.random()},
+            "tx_context": {
+                "num_transactions": rng.randint(1, 30),
+                "graph_nodes": 9,
+                "is_mixer": fraud and rng.random() < 0.5,
+                "is_sanctioned": fraud and rng.random() < 0.3,
+            },
+            "ground_truth_label": "fraud" if fraud else "normal",
+        })
+    return samples
+
+
+def _loop_best_threshold(y_true, y_pred_scores):
+    """optimize_rules.py의 기존 임계값 탐색 (sklearn, 10~88 step 2)"""
+    best_threshold = 50.0
+    best_f1 = 0.0
+    for threshold in range(10, 90, 2):
+        y_pred = [1 if s >= threshold else 0 for s in y_pred_scores]
+        f1 = f1_score(y_true, y_pred, zero_division=0)
+        if f1 > best_f1:
+            best_f1 = f1
+            best_threshold = threshold
+    y_pred = [1 if s >= best_threshold else 0 for s in y_pred_scores]
+    return {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "precision": precision_score(y_true, y_pred, zero_division=0),
+        "recall": recall_score(y_true, y_pred, zero_division=0),
+        "f1_score": f1_score(y_true, y_pred, zero_division=0),
+        "threshold": best_threshold,
+    }
+
+
+def _assert_metrics_equal(actual, expected):
+    assert actual["threshold"] == expected["threshold"]
+    for name in ("accuracy", "precision", "recall", "f1_score"):
+        assert np.isclose(actual[name], expected[name]), name
+
+
+def test_rule_removal_matches_reevaluation(tmp_path):
+    """룰 제거 재채점 == 룰북에서 룰을 빼고 Stage1Scorer로 다시 평가"""
+    samples = _samples()
+    engine = RuleWhatIfEngine.build(samples, rules_path=str(RULES_PATH))
+    removed = {"C-003", "E-101"}
+
+    with open(RULES_PATH, "r", encoding="utf-8") as f:
+        rules_config = yaml.safe_load(f)
+    rules_config["rules"] = [rule for rule in rules_config["rules"] if rule["id"] not in removed]
+    filtered_path = tmp_path / "rules.yaml"
+    with open(filtered_path, "w", encoding="utf-8") as f:
+        yaml.dump(rules_config, f, allow_unicode=True)
+
+    scorer = Stage1Scorer(rules_path=str(filtered_path))
+    expected = []
+    for sample in samples:
+        tx_data, ml_features, tx_context = sample_inputs(sample)
+        expected.append(scorer.calculate_risk_score(tx_data, ml_features, dict(tx_context))["risk_score"])
+
+    scores = engine.stage1_scores(removed_rules=removed)
+    assert np.allclose(scores, expected, rtol=0, atol=1e-9)
+
+    y_true = [1 if sample["ground_truth_label"] == "fraud" else 0 for sample in samples]
+    _assert_metrics_equal(engine.best_threshold(scores), _loop_best_threshold(y_true, expected))
+
+
+def test_stage1_scores_without_removal_match_scorer():
+    """제거 없는 재채점 == Stage1Scorer.calculate_risk_score"""
+    samples = _samples(seed=11)
+    engine = RuleWhatIfEngine.build(samples, rules_path=str(RULES_PATH))
+    scorer = Stage1Scorer(rules_path=str(RULES_PATH))
+    expected = [
+        scorer.calculate_risk_score(tx_data, ml_features, dict(tx_context))["risk_score"]
+        for tx_data, ml_features, tx_context in map(sample_inputs, samples)
+    ]
+    assert np.allclose(engine.stage1_scores(), expected, rtol=0, atol=1e-9)
+
+
+def test_axis_weights_match_weighted_sum_loop():
+    """축 가중치 재채점 == 샘플마다 발동 점수 × 축 가중치 합 (상한 100)"""
+    samples = _samples(seed=3)
+    engine = RuleWhatIfEngine.build(samples, rules_path=str(RULES_PATH))
+    rule_evaluator = Stage1Scorer(rules_path=str(RULES_PATH)).rule_evaluator
+    y_true = [1 if sample["ground_truth_label"] == "fraud" else 0 for sample in samples]
+
+    rule_results_list = [rule_evaluator.evaluate_single_transaction(sample_inputs(sample)[0]) for sample in samples]
+    for weights in ({"B": 1.0, "C": 1.0, "E": 1.0}, {"B": 1.2, "C": 1.3, "E": 1.4}, {"B": 1.5, "C": 1.0, "E": 1.0}):
+        expected = []
+        for rule_results in rule_results_list:
+            weighted_score = 0.0
+            for rule in rule_results:
+                weighted_score += rule.get("score", 0.0) * weights.get(rule.get("axis", "B"), 1.0)
+            expected.append(min(100.0, weighted_score))
+
+        scores = engine.linear_scores(axis_weights=weights)
+        assert np.allclose(scores, expected, rtol=0, atol=1e-9)
+        _assert_metrics_equal(engine.best_threshold(scores), _loop_best_threshold(y_true, expected))
+
+
+def test_rule_effectiveness_counts():
+    """룰별 발동 수와 fraud 비율 == 발동 결과를 직접 센 값"""
+    samples = _samples(seed=5)
+    engine = RuleWhatIfEngine.build(samples, rules_path=str(RULES_PATH))
+    rule_evaluator = Stage1Scorer(rules_path=str(RULES_PATH)).rule_evaluator
+
+    fired = {}
+    for sample in samples:
+        for result in rule_evaluator.evaluate_single_transaction(sample_inputs(sample)[0]):
+            total, fraud = fired.get(result["rule_id"], (0, 0))
+            fired[result["rule_id"]] = (total + 1, fraud + (sample["ground_truth_label"] == "fraud"))
+
+    effectiveness = engine.rule_effectiveness()
+    assert set(effectiveness) == set(fired)
+    for rule_id, (total, fraud) in fired.items():
+        assert effectiveness[rule_id]["fired_count"] == total
+        assert effectiveness[rule_id]["fraud_when_fired"] == fraud
@@ -0,0 +1,86 @@
+"""
+1단계 스코어러 배치 그래프 점수 테스트
+
+graph_input_matrix + calculate_graph_scores가 행별 _calculate_graph_score와 같은 점수인지,
+숫자가 아닌 값(None, 숫자 문자열 등)이 있는 행은 두 경로 모두에서 실패 행이 되는지 확인
+"""
+import math
+import random
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core.scoring.stage1_scorer import GRAPH_SCORE_INPUTS, Stage1Scorer, graph_input_matrix
+
+project_root = Path(__file__).parent.parent.parent
+RULES_PATH = project_root / "rules" / "tracex_rules.yaml"
+
+
+def _graph_inputs(rng):
+    """구간 경계값, 대체 키, bool/NumPy/NaN 값이 섞인 (ml_features, tx_context)"""
+    ml_features, tx_context = {}, {}
+    for _, source, key, fallback, _ in GRAPH_SCORE_INPUTS:
+        values = ml_features if source == "ml" else tx_context
+        roll = rng.random()
+        if roll < 0.15:
+            continue
+        if fallback is not None and roll < 0.4:
+            key = fallback
+        values[key] = rng.choice([
+            0, 1, 5, 10, 15, 25, 70, 90, 120, 0.3, 0.45, 0.5, 0.55, 0.8, 0.85, 25.0, 30.0, 35.0, 1000.0,
+            20000.0, 50000.0, 100000.0, 1e6, -1, True, False, np.float32(0.5), np.int64(30), math.nan, math.inf,
+        ])
+    return ml_features, tx_context
+
+
+def _scorer():
+    return Stage1Scorer(rules_path=str(RULES_PATH))
+
+
+def test_batch_graph_scores_match_single():
+    """무작위 입력에서 배치 점수 == 행별 점수"""
+    rng = random.Random(3)
+    rows = [_graph_inputs(rng) for _ in range(500)] + [({}, {}), (None, None)]
+    scorer = _scorer()
+    batch = scorer.calculate_graph_scores(
+        graph_input_matrix([ml for ml, _ in rows], [ctx for _, ctx in rows])
+    )
+    expected = [scorer._calculate_graph_score(ml or {}, ctx or {})[0] for ml, ctx in rows]
+    assert batch.tolist() == expected
+
+
+@pytest.mark.parametrize("ml_features", [
+    {"fan_in_count": None, "pattern_score": 20},
+    {"pattern_score": "0.3"},
+    {"n_omega": [0.4]},
+    {"fan_in_detected": "1"},
+])
+def test_non_numeric_rows_fail_in_both_paths(ml_features):
+    """숫자가 아닌 값은 배치 행렬에서 거부되고, calculate_risk_scores는 행별 계산과 같은 결과 (실패 행만 None)"""
+    with pytest.raises(TypeError):
+        graph_input_matrix([ml_features], [{}])
+
+    now = int(time.time())
+    inputs = [
+        (
+            {"from": f"0x{i:040x}", "to": f"0x{i + 50:040x}", "usd_value": 5000, "timestamp": now - 60 + i,
+             "tx_hash": f"0xtx{i}"},
+            ml_features if i == 1 else {"fan_in_count": i, "pattern_score": 20},
+            {"num_transactions": 3},
+        )
+        for i in range(3)
+    ]
+    batch = _scorer().calculate_risk_scores(inputs)
+
+    single_scorer = _scorer()
+    for (tx_data, ml, ctx), result in zip(inputs, batch):
+        try:
+            expected = single_scorer.calculate_risk_score(tx_data, ml, dict(ctx))
+        except TypeError:
+            assert result is None
+            continue
+        assert result is not None
+        assert (result["risk_score"], result["graph_score"]) == (expected["risk_score"], expected["graph_score"])
+    assert batch[0] is not None and batch[2] is not None
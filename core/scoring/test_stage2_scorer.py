@@ -0,0 +1,150 @@
+"""
+Stage2Scorer 배치 추론 테스트
+
+extract_features_batch가 행 단위 feature 추출(리스트에 append 후 변환하던 기존 구현)과 같은 행렬을 내는지
+(클리핑/NaN/Inf/누락 키 포함), score_batch가 샘플별 calculate_risk_score와 같은 점수를 내고
+실패한 샘플만 0점으로 두는지, 학습 전에는 1단계 점수를 그대로 쓰는지 확인
+"""
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core.scoring.feature_store import sample_inputs
+from core.scoring.stage1_scorer import Stage1Scorer
+from core.scoring.stage2_scorer import FEATURE_DIM, Stage2Scorer
+
+project_root = Path(__file__).parent.parent.parent
+RULES_PATH = project_root / "rules" / "tracex_rules.yaml"
+
+
+def _row_features(stage1_result, ml_features, tx_context, use_ppr_features):
+    """행 단위 참조 구현 (Python min/max, append 후 float32 변환)"""
+    features = [stage1_result["rule_score"], stage1_result["graph_score"], stage1_result["risk_score"]]
+    rule_results = stage1_result.get("rule_results", [])
+    axes = [r.get("axis", "B") for r in rule_results]
+    severities = [r.get("severity", "MEDIUM") for r in rule_results]
+    features.append(len(rule_results))
+    features.extend(axes.count(axis) for axis in "ABCDE")
+    features.extend(severities.count(severity) for severity in ("CRITICAL", "HIGH", "MEDIUM", "LOW"))
+
+    for key in ("fan_in_count", "fan_out_count", "tx_primary_fan_in_count", "tx_primary_fan_out_count"):
+        features.append(min(100, ml_features.get(key, 0)))
+    features.append(min(100.0, ml_features.get("pattern_score", 0.0)))
+    for key in ("avg_transaction_value", "max_transaction_value"):
+        value = ml_features.get(key, 0.0)
+        features.append(min(20.0, np.log1p(value)) if value > 0 else 0.0)
+    for key in ("graph_nodes", "num_transactions"):
+        features.append(min(200, ml_features.get(key, tx_context.get(key, 0))))
+
+    for key in ("ppr_score", "sdn_ppr", "mixer_ppr"):
+        features.append(min(1.0, ml_features.get(key, 0.0)) if use_ppr_features else 0.0)
+    for key in ("n_theta", "n_omega"):
+        features.append(min(1.0, max(0.0, ml_features.get(key, 0.0))))
+    for key in ("fan_in_detected", "fan_out_detected", "gather_scatter_detected"):
+        features.append(ml_features.get(key, 0))
+
+    return np.nan_to_num(np.array(features, dtype=np.float32), nan=0.0, posinf=100.0, neginf=0.0)
+
+
+def _samples(n: int = 40):
+    """룰 윈도우 히스토리에서 지워지지 않도록 현재 시각 기준 샘플 (절반은 fraud 라벨)"""
+    now = int(time.time())
+    return [
+        {
+            "from": f"0x{i % 4:040x}",
+            "to": f"0x{(i % 7) + 10:040x}",
+            "usd_value": [50, 2000, 15000, 250000][i % 4],
+            "timestamp": now - 600 + i * 10,
+            "tx_hash": f"0xtx{i}",
+            "chain": "ethereum",
+            "ground_truth_label": "fraud" if i % 4 >= 2 else "normal",
+            "ml_features": {
+                "fan_in_count": i * 7,
+                "fan_out_count": i % 5,
+                "avg_transaction_value": [0.0, 120.0, 5e9][i % 3],
+                "ppr_score": 0.05 * i,
+                "n_theta": 0.1 * (i % 12) - 0.1,
+                "fan_in_detected": i % 2,
+            },
+            "tx_context": {"num_transactions": i * 9, "graph_nodes": 9, "is_mixer": i % 6 == 0},
+        }
+        for i in range(n)
+    ]
+
+
+def _scorer(**kwargs) -> Stage2Scorer:
+    return Stage2Scorer(stage1_scorer=Stage1Scorer(rules_path=str(RULES_PATH)), **kwargs)
+
+
+@pytest.mark.parametrize("use_ppr_features", [True, False])
+def test_feature_matrix_matches_row_extraction(use_ppr_features):
+    """열 단위로 채운 행렬 = 행 단위 참조 구현 (클리핑, NaN/Inf, 누락 키, tx_context fallback)"""
+    scorer = _scorer(use_ppr_features=use_ppr_features)
+    stage1_results, ml_features_list, tx_context_list = scorer._stage1_batch(_samples())
+    ml_features_list[0] = {"pattern_score": float("nan"), "n_omega": float("inf"), "max_transaction_value": float("inf")}
+    ml_features_list[1] = {"fan_out_count": -3, "sdn_ppr": float("-inf"), "gather_scatter_detected": 1}
+    tx_context_list[2] = {}
+    stage1_results[3] = {**stage1_results[3], "rule_results": [{"axis": "Z", "severity": "INFO"}, {}]}
+
+    actual = scorer.extract_features_batch(stage1_results, ml_features_list, tx_context_list)
+    expected = np.stack([
+        _row_features(*row, use_ppr_features) for row in zip(stage1_results, ml_features_list, tx_context_list)
+    ])
+    assert actual.dtype == np.float32 and actual.shape == (len(stage1_results), FEATURE_DIM)
+    assert np.array_equal(actual, expected)
+    assert np.array_equal(scorer.extract_features(stage1_results[0], ml_features_list[0], tx_context_list[0]), expected[0])
+
+
+def test_failed_rows_are_zero():
+    """1단계 결과가 없거나 값이 잘못된 행만 0 벡터 + 실패, 나머지 행은 그대로"""
+    scorer = _scorer()
+    stage1_results, ml_features_list, tx_context_list = scorer._stage1_batch(_samples(6))
+    stage1_results[1] = None
+    ml_features_list[4] = {"fan_in_count": "many"}
+
+    features, ok = scorer._feature_rows(stage1_results, ml_features_list, tx_context_list)
+    assert ok.tolist() == [True, False, True, True, False, True]
+    assert not features[~ok].any()
+    for i in np.flatnonzero(ok):
+        assert np.array_equal(features[i], _row_features(stage1_results[i], ml_features_list[i], tx_context_list[i], True))
+
+
+@pytest.mark.parametrize("model_type", ["logistic", "random_forest"])
+def test_score_batch_matches_per_sample(model_type):
+    """학습된 모델의 score_batch = 새 스코어러로 샘플 순서대로 calculate_risk_score (1단계 결과 재사용 포함)"""
+    samples = _samples()
+    trained = _scorer(model_type=model_type)
+    trained.train(samples)
+
+    def fresh() -> Stage2Scorer:
+        # 룰 윈도우 상태가 같도록 매번 새 1단계 스코어러에 같은 모델
+        scorer = _scorer(model_type=model_type)
+        scorer.model, scorer.scaler, scorer.is_trained = trained.model, trained.scaler, True
+        return scorer
+
+    per_sample = fresh()
+    expected = [per_sample.calculate_risk_score(*sample_inputs(sample)) for sample in samples]
+    batch = fresh().score_batch(samples, return_components=True)
+    for name in ("risk_score", "stage1_score", "ml_score"):
+        assert np.allclose(batch[name], [result[name] for result in expected], rtol=0, atol=1e-9), name
+    assert len(set(np.round(batch["ml_score"], 6))) > 1
+
+    scorer = fresh()
+    stage1_results = scorer._stage1_batch(samples)[0]
+    stage1_results[5] = None
+    reused = scorer.score_batch(samples, stage1_results=stage1_results)
+    assert reused[5] == 0.0
+    assert np.array_equal(np.delete(reused, 5), np.delete(batch["risk_score"], 5))
+
+
+def test_score_batch_untrained_uses_stage1():
+    """학습 전에는 1단계 점수만, ML 점수 0"""
+    samples = _samples(8)
+    batch = _scorer().score_batch(samples, return_components=True)
+    stage1_results = _scorer()._stage1_batch(samples)[0]
+    assert np.array_equal(batch["risk_score"], [result["risk_score"] for result in stage1_results])
+    assert np.array_equal(batch["risk_score"], batch["stage1_score"])
+    assert not batch["ml_score"].any()
+    assert len(_scorer().score_batch([])) == 0
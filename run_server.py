@@ -14,7 +14,7 @@ sys.path.insert(0, str(project_root))
 
 # api.app 모듈 실행
 if __name__ == '__main__':
-    from api.app import app
+    from api.app import app, start_warm_up
     
     # macOS AirPlay가 5000 포트를 사용하므로 기본적으로 5001 사용
     import socket
@@ -49,5 +49,6 @@ if __name__ == '__main__':
     print(f"   http://localhost:{port}/")
     print()
     
+    start_warm_up()  # 모델 워밍업 (백그라운드)
     app.run(host='0.0.0.0', port=port, debug=True)
 
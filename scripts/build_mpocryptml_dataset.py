@@ -10,9 +10,13 @@ MPOCryptoML 학습용 데이터셋 구축
     
     # 샘플 테스트
     python scripts/build_mpocryptml_dataset.py --sample-ratio 0.1 --max-txs-per-contract 50
+    
+    # 전체 거래 그래프의 모든 노드 피처 테이블 (Parquet/npz)
+    python scripts/build_mpocryptml_dataset.py --all-nodes-output data/dataset/mpocryptml_nodes.parquet
 """
 import sys
 import json
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Any, Set, Optional
@@ -24,11 +28,11 @@ import networkx as nx
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from core.aggregation.csr_graph import ColumnarGraph
+from core.aggregation.graph_features import GraphFeatureExtractor
 from core.aggregation.mpocryptml_patterns import MPOCryptoMLPatternDetector
-from core.aggregation.mpocryptml_scorer import MPOCryptoMLScorer
-from core.aggregation.mpocryptml_normalizer import MPOCryptoMLNormalizer
-from core.aggregation.ppr_connector import PPRConnector
 from core.data.lists import ListLoader
+from core.scoring.parallel_builder import ParallelDatasetBuilder
 
 # USD 변환 없이 진행 (Rate limit 이슈로 인해 비활성화)
 # MPOCryptoML 학습은 USD 없이도 가능 (PPR, 패턴, N_theta 사용)
@@ -84,107 +88,237 @@ def extract_mpocryptml_features(
     graph: nx.DiGraph,
     transactions: List[Dict[str, Any]],
     sdn_addresses: Set[str],
-    mixer_addresses: Set[str]
+    mixer_addresses: Set[str],
+    extractor: Optional[GraphFeatureExtractor] = None
 ) -> Dict[str, Any]:
     """
     MPOCryptoML 피처 추출
     
+    GraphFeatureExtractor로 타겟 행만 계산 (노드별 stack/layered 탐색은 타겟에만 수행)
+    
     Args:
         target_address: 타겟 주소
         graph: 3-hop 그래프
         transactions: 거래 리스트
         sdn_addresses: SDN 리스트
         mixer_addresses: 믹서 리스트
+        extractor: 재사용할 GraphFeatureExtractor (None이면 새로 생성)
     
     Returns:
         MPOCryptoML 피처 딕셔너리
     """
+    empty_features = {
+        "ppr_score": 0.0,
+        "sdn_ppr": 0.0,
+        "mixer_ppr": 0.0,
+        "pattern_score": 0.0,
+        "n_theta": 0.0,
+        "n_omega": 0.0,
+        "detected_patterns": [],
+        "fan_in_count": 0,
+        "fan_out_count": 0,
+        "gather_scatter": 0.0
+    }
     if not graph or graph.number_of_nodes() == 0:
-        return {
-            "ppr_score": 0.0,
-            "sdn_ppr": 0.0,
-            "mixer_ppr": 0.0,
-            "pattern_score": 0.0,
-            "n_theta": 0.0,
-            "n_omega": 0.0,
-            "detected_patterns": [],
-            "fan_in_count": 0,
-            "fan_out_count": 0,
-            "gather_scatter": 0.0
-        }
-    
-    # PPR 점수
-    ppr_connector = PPRConnector()
-    sdn_list = [addr for addr in sdn_addresses if addr.lower() in graph]
-    mixer_list = [addr for addr in mixer_addresses if addr.lower() in graph]
+        return empty_features
     
-    sdn_ppr = 0.0
-    mixer_ppr = 0.0
-    if sdn_list:
-        sdn_ppr = ppr_connector.calculate_ppr(target_address, sdn_list, graph)
-    if mixer_list:
-        mixer_ppr = ppr_connector.calculate_ppr(target_address, mixer_list, graph)
+    extractor = extractor or GraphFeatureExtractor()
+    table = extractor.extract(graph, transactions, sdn_addresses, mixer_addresses, addresses=[target_address])
+    features = GraphFeatureExtractor.row(table, target_address) or empty_features
     
-    # Multi-source PPR (소스 노드 자동 탐지)
-    ppr_result = ppr_connector.calculate_multi_source_ppr(target_address, graph)
-    ppr_score = ppr_result["ppr_score"]
-    
-    # 패턴 탐지
-    pattern_detector = MPOCryptoMLPatternDetector()
-    pattern_detector.graph = graph
-    patterns = pattern_detector.analyze_address_patterns(target_address)
+    return {
+        **features,
+        "graph_nodes": graph.number_of_nodes(),
+        "graph_edges": graph.number_of_edges()
+    }
+
+
+def _int_column(values: pd.Series) -> np.ndarray:
+    """정수 컬럼 (결측은 0, 소수는 버림)"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.fillna(0).to_numpy().astype(np.int64)
+    return np.array([int(value) if pd.notna(value) else 0 for value in values], dtype=np.int64)
+
+
+def _wei_weights(values: pd.Series) -> np.ndarray:
+    """Wei 값 컬럼 → 엣지 가중치 (Wei / 1e18, 결측은 0)"""
+    if pd.api.types.is_numeric_dtype(values):
+        return np.trunc(values.fillna(0).to_numpy(dtype=np.float64)) / 1e18
+    # int64 범위를 넘는 값은 문자열로 읽힘
+    return np.array([float(int(value)) / 1e18 if pd.notna(value) else 0.0 for value in values], dtype=np.float64)
+
+
+def build_feature_table(
+    transactions_dir: str,
+    output_path: str,
+    chain: str = "ethereum"
+) -> Dict[str, Any]:
+    """
+    체인의 전체 거래로 그래프 하나를 만들고 모든 노드의 MPOCryptoML 피처 테이블 저장
     
-    # 패턴 점수 계산
-    pattern_score = 0.0
-    detected_patterns = []
+    Args:
+        transactions_dir: 거래 데이터 디렉토리 ({chain}/*.csv)
+        output_path: 출력 경로 (.parquet 또는 .npz)
+        chain: 체인 이름
     
-    if patterns["fan_in"]["pattern"]["is_detected"]:
-        pattern_score += 15.0
-        detected_patterns.append("fan_in")
+    Returns:
+        GraphFeatureExtractor 피처 테이블
+    """
+    print("=" * 60)
+    print("MPOCryptoML 전체 노드 피처 테이블 구축")
+    print("=" * 60)
     
-    if patterns["fan_out"]["pattern"]["is_detected"]:
-        pattern_score += 15.0
-        detected_patterns.append("fan_out")
+    from_columns, to_columns, timestamp_columns, weight_columns = [], [], [], []
+    tx_files = sorted((Path(transactions_dir) / chain).glob("*.csv"))
+    for tx_file in tqdm(tx_files, desc="거래 로드"):
+        df_tx = pd.read_csv(tx_file, usecols=lambda c: c in {"from", "to", "value", "timestamp"})
+        df_tx = df_tx.reindex(columns=["from", "to", "value", "timestamp"])
+        # 주소가 없는 행은 제외 (그래프에 "nan" 노드를 만들지 않음)
+        df_tx = df_tx[df_tx["from"].notna() & df_tx["to"].notna()]
+        from_columns.append(df_tx["from"].astype(str).to_numpy())
+        to_columns.append(df_tx["to"].astype(str).to_numpy())
+        timestamp_columns.append(_int_column(df_tx["timestamp"]))
+        weight_columns.append(_wei_weights(df_tx["value"]))
+    
+    columns = ColumnarGraph.from_arrays(
+        np.concatenate(from_columns) if from_columns else [],
+        np.concatenate(to_columns) if to_columns else [],
+        np.concatenate(timestamp_columns) if timestamp_columns else np.zeros(0, dtype=np.int64),
+        np.concatenate(weight_columns) if weight_columns else np.zeros(0, dtype=np.float64)
+    )
+    print(f"   그래프: {len(columns.nodes)}개 노드, {columns.edges.number_of_edges}개 엣지")
     
-    # Gather-scatter: fan_in과 fan_out이 동시에 있거나, gather_scatter 값 자체가 임계값 이상
-    gather_scatter_value = patterns["gather_scatter"]["value"]
-    gather_scatter_count = patterns["gather_scatter"]["count"]
+    list_loader = ListLoader()
+    table = GraphFeatureExtractor().extract_columns(
+        columns,
+        sdn_addresses=list_loader.get_sdn_list(),
+        mixer_addresses=list_loader.get_mixer_list()
+    )
+    saved_path = GraphFeatureExtractor.save(table, output_path)
+    print(f"\n💾 저장 위치: {saved_path}")
+    return table
+
+
+# 워커 프로세스별 상태 (init_worker에서 한 번 준비)
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def init_worker(transactions_dir: str, max_transactions_per_contract: Optional[int]) -> None:
+    """워커 초기화: SDN/믹서 리스트와 피처 추출기를 프로세스당 한 번만 준비"""
+    list_loader = ListLoader()
+    _WORKER_STATE.update({
+        "transactions_dir": Path(transactions_dir),
+        "max_transactions_per_contract": max_transactions_per_contract,
+        "sdn_addresses": list_loader.get_sdn_list(),
+        "mixer_addresses": list_loader.get_mixer_list(),
+        "extractor": GraphFeatureExtractor()
+    })
+
+
+def process_contract(item: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    컨트랙트 하나의 데이터셋 항목 생성 (ParallelDatasetBuilder 워커에서 실행)
     
-    # 패턴 탐지 기준: fan_in과 fan_out이 동시에 탐지되거나, gather_scatter 값이 충분히 큼
-    if (patterns["fan_in"]["pattern"]["is_detected"] and patterns["fan_out"]["pattern"]["is_detected"]) or \
-       (gather_scatter_value > 0 and gather_scatter_count >= 5):
-        pattern_score += 10.0
-        detected_patterns.append("gather_scatter")
+    Args:
+        item: {"chain", "contract", "label"}
     
-    if patterns["stack_paths"]:
-        pattern_score += 20.0
-        detected_patterns.append("stack")
+    Returns:
+        [dataset_item] (거래 파일이 없거나 그래프가 비면 빈 리스트)
+    """
+    chain = item["chain"]
+    contract = item["contract"]
+    label = item["label"]
+    max_transactions_per_contract = _WORKER_STATE["max_transactions_per_contract"]
+    
+    tx_file = _WORKER_STATE["transactions_dir"] / chain / f"{contract}.csv"
+    if not tx_file.exists():
+        return []
+    
+    # 거래 데이터 로드
+    df_tx = pd.read_csv(tx_file)
+    if max_transactions_per_contract and len(df_tx) > max_transactions_per_contract:
+        df_tx = df_tx.sample(n=max_transactions_per_contract, random_state=42)
+    
+    # 거래 데이터 변환 (USD 변환 없이 진행)
+    # MPOCryptoML 학습은 USD 없이도 가능 (PPR, 패턴, N_theta 사용)
+    transactions = []
+    for _, tx_row in df_tx.iterrows():
+        value_wei = int(tx_row.get("value", 0)) if pd.notna(tx_row.get("value")) else 0
+        
+        # USD 값은 0.0으로 설정 (USD 변환 없이 진행)
+        usd_value = 0.0
+        
+        tx = {
+            "tx_hash": str(tx_row.get("transaction_hash", "")),
+            "from": str(tx_row.get("from", "")),
+            "to": str(tx_row.get("to", "")),
+            "timestamp": int(tx_row.get("timestamp", 0)) if pd.notna(tx_row.get("timestamp")) else 0,
+            "usd_value": usd_value,
+            "value": value_wei,  # 원본 값도 보관
+            "chain": chain,
+            "asset_contract": contract,
+            "block_height": int(tx_row.get("block_number", 0)) if pd.notna(tx_row.get("block_number")) else 0,
+        }
+        transactions.append(tx)
     
-    if patterns["bipartite"]["is_bipartite"]:
-        pattern_score += 15.0
-        detected_patterns.append("bipartite")
+    if not transactions:
+        return []
     
-    # Timestamp 정규화
-    normalizer = MPOCryptoMLNormalizer()
-    n_theta = normalizer.normalize_timestamp(target_address, graph, transactions)
+    # 3-hop 그래프 구축
+    graph, transactions_3hop = build_3hop_graph(contract, transactions)
     
-    # Weight 정규화
-    n_omega = normalizer.normalize_weight(target_address, graph, transactions)
+    if not graph or graph.number_of_nodes() == 0:
+        return []
+    
+    # MPOCryptoML 피처 추출
+    ml_features = extract_mpocryptml_features(
+        contract,
+        graph,
+        transactions_3hop,
+        _WORKER_STATE["sdn_addresses"],
+        _WORKER_STATE["mixer_addresses"],
+        _WORKER_STATE["extractor"]
+    )
     
-    return {
-        "ppr_score": ppr_score,
-        "sdn_ppr": sdn_ppr,
-        "mixer_ppr": mixer_ppr,
-        "pattern_score": min(100.0, pattern_score),
-        "n_theta": n_theta,
-        "n_omega": n_omega,
-        "detected_patterns": detected_patterns,
-        "fan_in_count": patterns["fan_in"]["count"],
-        "fan_out_count": patterns["fan_out"]["count"],
-        "gather_scatter": patterns["gather_scatter"]["value"],
-        "graph_nodes": graph.number_of_nodes(),
-        "graph_edges": graph.number_of_edges()
-    }
+    # Rule-based 피처도 포함 (기존 데이터셋과 호환)
+    # 룰 평가기는 윈도우 히스토리를 쌓으므로 컨트랙트마다 새로 생성
+    from core.scoring.dataset_builder import DatasetBuilder
+    builder = DatasetBuilder()
+    
+    rule_results = []
+    for tx in transactions[:10]:  # 샘플만 평가 (속도 향상)
+        tx_for_eval = builder._convert_transaction(tx)
+        rules = builder.rule_evaluator.evaluate_single_transaction(tx_for_eval)
+        if rules:
+            rule_results.extend(rules)
+    
+    # Rule-based 점수 계산
+    rule_score = sum(r.get("score", 0) for r in rule_results)
+    rule_score = min(100.0, rule_score)
+    
+    # 실제 라벨 점수
+    actual_score = 85.0 if label == 1 else 15.0
+    
+    # 데이터셋 항목 생성
+    return [{
+        "address": contract,
+        "chain": chain,
+        "ground_truth_label": "fraud" if label == 1 else "normal",
+        "actual_risk_score": actual_score,
+        
+        # Rule-based 피처
+        "rule_results": rule_results,
+        "rule_score": rule_score,
+        
+        # MPOCryptoML 피처
+        "ml_features": ml_features,
+        
+        # 메타데이터
+        "num_transactions": len(transactions),
+        "graph_nodes": ml_features.get("graph_nodes", 0),
+        "graph_edges": ml_features.get("graph_edges", 0),
+        "data_source": "legacy_mpocryptml"
+    }]
 
 
 def build_mpocryptml_dataset(
@@ -192,7 +326,10 @@ def build_mpocryptml_dataset(
     transactions_dir: str,
     output_path: str,
     max_transactions_per_contract: Optional[int] = None,
-    sample_ratio: float = 1.0
+    sample_ratio: float = 1.0,
+    num_workers: Optional[int] = None,
+    shard_size: int = 50,
+    work_dir: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     MPOCryptoML 학습용 데이터셋 구축
@@ -203,6 +340,9 @@ def build_mpocryptml_dataset(
         output_path: 출력 JSON 파일 경로
         max_transactions_per_contract: 주소당 최대 거래 수
         sample_ratio: 샘플링 비율
+        num_workers: 워커 프로세스 수 (None이면 CPU 수)
+        shard_size: 샤드당 컨트랙트 수
+        work_dir: 샤드/manifest 디렉토리 (None이면 "{output_path}.shards")
     
     Returns:
         MPOCryptoML 학습 데이터셋
@@ -239,126 +379,36 @@ def build_mpocryptml_dataset(
     print(f"   SDN: {len(sdn_addresses)}개")
     print(f"   Mixer: {len(mixer_addresses)}개")
     
-    dataset = []
-    transactions_dir_path = Path(transactions_dir)
-    processed_count = 0
-    skipped_count = 0
-    error_count = 0
+    contracts = [
+        {
+            "chain": row['Chain'].lower(),
+            "contract": row['Contract'],
+            "label": int(row.get('label', 0))
+        }
+        for _, row in df_eth.iterrows()
+    ]
     
     print(f"\n🔄 MPOCryptoML 피처 추출 중...")
     print(f"   주소당 최대 거래 수: {max_transactions_per_contract or '제한 없음'}")
     
-    for idx, row in tqdm(df_eth.iterrows(), total=len(df_eth), desc="주소 처리"):
-        chain = row['Chain'].lower()
-        contract = row['Contract']
-        label = int(row.get('label', 0))
-        
-        tx_file = transactions_dir_path / chain / f"{contract}.csv"
-        if not tx_file.exists():
-            skipped_count += 1
-            continue
-        
-        try:
-            # 거래 데이터 로드
-            df_tx = pd.read_csv(tx_file)
-            if max_transactions_per_contract and len(df_tx) > max_transactions_per_contract:
-                df_tx = df_tx.sample(n=max_transactions_per_contract, random_state=42)
-            
-            # 거래 데이터 변환 (USD 변환 없이 진행)
-            # MPOCryptoML 학습은 USD 없이도 가능 (PPR, 패턴, N_theta 사용)
-            transactions = []
-            for _, tx_row in df_tx.iterrows():
-                value_wei = int(tx_row.get("value", 0)) if pd.notna(tx_row.get("value")) else 0
-                
-                # USD 값은 0.0으로 설정 (USD 변환 없이 진행)
-                usd_value = 0.0
-                
-                tx = {
-                    "tx_hash": str(tx_row.get("transaction_hash", "")),
-                    "from": str(tx_row.get("from", "")),
-                    "to": str(tx_row.get("to", "")),
-                    "timestamp": int(tx_row.get("timestamp", 0)) if pd.notna(tx_row.get("timestamp")) else 0,
-                    "usd_value": usd_value,
-                    "value": value_wei,  # 원본 값도 보관
-                    "chain": chain,
-                    "asset_contract": contract,
-                    "block_height": int(tx_row.get("block_number", 0)) if pd.notna(tx_row.get("block_number")) else 0,
-                }
-                transactions.append(tx)
-            
-            if not transactions:
-                skipped_count += 1
-                continue
-            
-            # 3-hop 그래프 구축
-            graph, transactions_3hop = build_3hop_graph(contract, transactions)
-            
-            if not graph or graph.number_of_nodes() == 0:
-                skipped_count += 1
-                continue
-            
-            # MPOCryptoML 피처 추출
-            ml_features = extract_mpocryptml_features(
-                contract,
-                graph,
-                transactions_3hop,
-                sdn_addresses,
-                mixer_addresses
-            )
-            
-            # Rule-based 피처도 포함 (기존 데이터셋과 호환)
-            from core.scoring.dataset_builder import DatasetBuilder
-            builder = DatasetBuilder()
-            
-            rule_results = []
-            for tx in transactions[:10]:  # 샘플만 평가 (속도 향상)
-                tx_for_eval = builder._convert_transaction(tx)
-                rules = builder.rule_evaluator.evaluate_single_transaction(tx_for_eval)
-                if rules:
-                    rule_results.extend(rules)
-            
-            # Rule-based 점수 계산
-            rule_score = sum(r.get("score", 0) for r in rule_results)
-            rule_score = min(100.0, rule_score)
-            
-            # 실제 라벨 점수
-            actual_score = 85.0 if label == 1 else 15.0
-            
-            # 데이터셋 항목 생성
-            dataset_item = {
-                "address": contract,
-                "chain": chain,
-                "ground_truth_label": "fraud" if label == 1 else "normal",
-                "actual_risk_score": actual_score,
-                
-                # Rule-based 피처
-                "rule_results": rule_results,
-                "rule_score": rule_score,
-                
-                # MPOCryptoML 피처
-                "ml_features": ml_features,
-                
-                # 메타데이터
-                "num_transactions": len(transactions),
-                "graph_nodes": ml_features.get("graph_nodes", 0),
-                "graph_edges": ml_features.get("graph_edges", 0),
-                "data_source": "legacy_mpocryptml"
-            }
-            
-            dataset.append(dataset_item)
-            processed_count += 1
-            
-        except Exception as e:
-            error_count += 1
-            print(f"\n⚠️  에러 ({contract}): {e}")
-            continue
-    
-    # 결과 저장
-    output_path_obj = Path(output_path)
-    output_path_obj.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, 'w') as f:
-        json.dump(dataset, f, indent=2, ensure_ascii=False)
+    # 샤드 단위 병렬 처리 (중단 후 재실행하면 완료된 샤드는 건너뜀)
+    builder = ParallelDatasetBuilder(
+        work_dir=work_dir or f"{output_path}.shards",
+        num_workers=num_workers,
+        shard_size=shard_size
+    )
+    dataset = builder.build(
+        contracts,
+        process_contract,
+        output_path=output_path,
+        initializer=init_worker,
+        initargs=(transactions_dir, max_transactions_per_contract),
+        config={"max_transactions_per_contract": max_transactions_per_contract}
+    )
+    build_stats = builder.stats()
+    processed_count = build_stats["records"]
+    skipped_count = build_stats["skipped"]
+    error_count = build_stats["errors"]
     
     # 통계 출력
     print("\n" + "=" * 60)
@@ -428,15 +478,50 @@ def main():
         default=1.0,
         help="샘플링 비율 (0.0~1.0)"
     )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=None,
+        help="워커 프로세스 수 (기본: CPU 수)"
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=50,
+        help="샤드당 컨트랙트 수 (완료된 샤드는 재실행 시 건너뜀)"
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=str,
+        default=None,
+        help="샤드/manifest 디렉토리 (기본: {output-path}.shards)"
+    )
+    
+    parser.add_argument(
+        "--all-nodes-output",
+        type=str,
+        default=None,
+        help="지정하면 전체 거래 그래프의 모든 노드 피처 테이블을 저장 (.parquet 또는 .npz)"
+    )
     
     args = parser.parse_args()
     
+    if args.all_nodes_output:
+        build_feature_table(
+            transactions_dir=args.transactions_dir,
+            output_path=args.all_nodes_output
+        )
+        return
+    
     dataset = build_mpocryptml_dataset(
         features_path=args.features_path,
         transactions_dir=args.transactions_dir,
         output_path=args.output_path,
         max_transactions_per_contract=args.max_txs_per_contract,
-        sample_ratio=args.sample_ratio
+        sample_ratio=args.sample_ratio,
+        num_workers=args.num_workers,
+        shard_size=args.shard_size,
+        work_dir=args.work_dir
     )
     
     print("\n✅ 완료!")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+트리 앙상블 모델 파일(.pkl)을 NumPy 평가기 형식(.npz)으로 변환
+
+{"model", "scaler", ...} 형태의 pickle 중 RandomForest/GradientBoosting 모델만 변환하고,
+변환 전후 predict_proba가 비트 단위로 같은지 확인한다.
+Stage2Scorer.load_model()과 데모 API는 같은 이름의 .npz가 있으면 그것을 사용한다.
+
+사용법:
+    python scripts/compile_models.py                      # models/*.pkl 전체
+    python scripts/compile_models.py models/stage2_scorer_random_forest.pkl
+"""
+import argparse
+import json
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.scoring.compiled_model import CompiledTreeEnsemble, load_compiled_model, save_compiled_model
+
+
+def _json_metadata(data: dict) -> dict:
+    """model/scaler를 제외한 JSON 저장 가능한 값"""
+    metadata = {}
+    for key, value in data.items():
+        if key in ("model", "scaler"):
+            continue
+        if isinstance(value, np.generic):
+            value = value.item()
+        try:
+            json.dumps(value)
+        except TypeError:
+            continue
+        metadata[key] = value
+    return metadata
+
+
+def compile_model_file(src: Path, num_check_rows: int = 1000) -> Path:
+    """
+    pickle 모델 파일 하나를 .npz로 변환
+
+    Returns:
+        저장한 .npz 경로
+
+    Raises:
+        ValueError: 트리 앙상블이 아니거나 변환 결과가 다른 경우
+    """
+    with open(src, 'rb') as f:
+        data = pickle.load(f)
+    if not isinstance(data, dict) or "model" not in data:
+        raise ValueError("not a {'model', 'scaler', ...} model file")
+
+    model = data["model"]
+    scaler = data.get("scaler")
+    compiled = CompiledTreeEnsemble.from_sklearn(model)
+    dst = src.with_suffix(".npz")
+    save_compiled_model(dst, compiled, scaler, _json_metadata(data))
+
+    # 임의 입력으로 변환 전후 확률 비교
+    loaded = load_compiled_model(dst)
+    X = np.random.RandomState(0).normal(size=(num_check_rows, compiled.n_features_in_)).astype(np.float32)
+    expected = model.predict_proba(scaler.transform(X) if scaler is not None else X)
+    actual = loaded["model"].predict_proba(loaded["scaler"].transform(X) if loaded["scaler"] is not None else X)
+    if not np.array_equal(expected, actual):
+        dst.unlink()
+        raise ValueError(f"compiled probabilities differ (max diff {np.abs(expected - actual).max():.3g})")
+    return dst
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="트리 앙상블 모델을 .npz로 변환")
+    parser.add_argument("paths", nargs="*", help="변환할 .pkl 파일 (기본: models/*.pkl)")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.paths] or sorted((project_root / "models").glob("*.pkl"))
+    for path in paths:
+        try:
+            dst = compile_model_file(path)
+            print(f"✅ {path.name} → {dst.name}")
+        except Exception as e:
+            print(f"⏭️  {path.name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
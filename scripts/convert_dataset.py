@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+데이터셋 포맷 변환 (.json / .jsonl / .cols)
+
+기존 JSON 데이터셋을 컬럼형(.cols)으로 변환해 두면 학습/평가 스크립트에
+--format cols를 넘겨 mmap 로더로 읽을 수 있다.
+
+사용법:
+    python scripts/convert_dataset.py data/dataset/train.json data/dataset/train.cols
+    python scripts/convert_dataset.py data/dataset/diverse_rules_enhanced.json --to cols
+"""
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.scoring.dataset_io import FORMATS, convert_dataset, load_dataset
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="데이터셋 포맷 변환")
+    parser.add_argument("src", help="원본 데이터셋 경로")
+    parser.add_argument("dst", nargs="?", help="대상 경로 (생략하면 --to 포맷으로 같은 이름에 저장)")
+    parser.add_argument("--to", choices=FORMATS, default="cols", help="dst 생략 시 대상 포맷")
+    args = parser.parse_args()
+
+    src = Path(args.src)
+    dst = Path(args.dst) if args.dst else src.with_suffix(f".{args.to}")
+    if not src.exists():
+        print(f"❌ 원본 파일을 찾을 수 없습니다: {src}")
+        return
+    if src.resolve() == dst.resolve():
+        print("❌ 원본과 대상 경로가 같습니다.")
+        return
+
+    print(f"📂 변환 중: {src.name} → {dst.name}")
+    convert_dataset(src, dst)
+    print(f"✅ 완료: {len(load_dataset(dst))}개 레코드")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 """
 전체 테스트 데이터셋(752개)에서 주요 baseline 모델들 평가
 """
+import argparse
 import sys
 import json
 import numpy as np
@@ -42,26 +43,30 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from core.scoring.stage1_scorer import Stage1Scorer
+from core.scoring.dataset_io import (
+    FORMATS, dataset_column, dataset_records, load_dataset as load_records, resolve_dataset_path
+)
 from scripts.improve_stage2_performance import extract_enhanced_features
 
+# feature 추출에 쓰는 레코드 필드
+RECORD_FIELDS = ["from", "to", "usd_value", "timestamp", "tx_hash", "chain", "ml_features", "tx_context"]
+
 
 def load_dataset(file_path: Path) -> Tuple[List[np.ndarray], List[int]]:
     """데이터셋 로드 및 feature 추출"""
-    with open(file_path, 'r') as f:
-        data = json.load(f)
+    data = load_records(file_path)
     
     stage1_scorer = Stage1Scorer(rule_weight=0.9, graph_weight=0.1)
     
     features = []
-    labels = []
+    # 라벨은 컬럼 하나로, 레코드는 필요한 필드만 컬럼 단위로 읽음 (컬럼형 데이터셋에서 행 단위 복원 회피)
+    labels = [1 if label == "fraud" else 0 for label in dataset_column(data, "ground_truth_label", "normal")]
+    records = dataset_records(data, RECORD_FIELDS)
     
     print(f"   Feature 추출 중... ({len(data)}개 샘플)")
-    for i, item in enumerate(data):
+    for i, item in enumerate(records):
         if (i + 1) % 100 == 0:
-            print(f"      {i + 1}/{len(data)} 처리 중...")
-        
-        label = item.get("ground_truth_label", "normal")
-        labels.append(1 if label == "fraud" else 0)
+            print(f"      {i + 1}/{len(records)} 처리 중...")
         
         tx_data = {
             "from": item.get("from", ""),
@@ -145,11 +150,15 @@ def main():
     print("전체 테스트 데이터셋에서 주요 Baseline 모델 평가")
     print("=" * 80)
     
+    parser = argparse.ArgumentParser(description="전체 테스트 데이터셋 Baseline 평가")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="데이터셋 포맷")
+    args = parser.parse_args()
+    
     dataset_dir = project_root / "data" / "dataset"
-    train_path = dataset_dir / "train.json"
-    test_path = dataset_dir / "test.json"
+    train_path = resolve_dataset_path(dataset_dir / "train.json", fmt=args.format)
+    test_path = resolve_dataset_path(dataset_dir / "test.json", fmt=args.format)
     
-    if not train_path.exists() or not test_path.exists():
+    if train_path is None or test_path is None:
         print("❌ 데이터셋 파일을 찾을 수 없습니다.")
         return
     
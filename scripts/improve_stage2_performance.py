@@ -31,6 +31,9 @@ sys.path.insert(0, str(project_root))
 
 from core.scoring.stage1_scorer import Stage1Scorer
 from core.scoring.stage2_scorer import Stage2Scorer
+from core.scoring.feature_schema import stage2_feature_schema
+
+BASE_FEATURE_SCHEMA = stage2_feature_schema(use_ppr_features=True)
 
 
 def extract_enhanced_features(
@@ -43,64 +46,13 @@ def extract_enhanced_features(
     
     기존 30차원 + 추가 feature
     """
-    features = []
+    # 1~6. 기존 Features (30차원, Stage2Scorer와 같은 스키마)
+    features = list(BASE_FEATURE_SCHEMA.build([stage1_result], [ml_features], [tx_context])[0])
     
-    # 1. Stage 1 features (기존)
-    features.append(stage1_result["rule_score"])
-    features.append(stage1_result["graph_score"])
-    features.append(stage1_result["risk_score"])
-    
-    # 2. Rule-based features (기존)
+    # 추가 Feature 계산에 쓰는 원본 값
     rule_results = stage1_result.get("rule_results", [])
-    features.append(len(rule_results))
-    
-    axes = [r.get("axis", "B") for r in rule_results]
-    features.append(axes.count("A"))
-    features.append(axes.count("B"))
-    features.append(axes.count("C"))
-    features.append(axes.count("D"))
-    features.append(axes.count("E"))
-    
     severities = [r.get("severity", "MEDIUM") for r in rule_results]
-    features.append(severities.count("CRITICAL"))
-    features.append(severities.count("HIGH"))
-    features.append(severities.count("MEDIUM"))
-    features.append(severities.count("LOW"))
-    
-    # 3. Graph statistics features (기존)
-    features.append(min(100, ml_features.get("fan_in_count", 0)))
-    features.append(min(100, ml_features.get("fan_out_count", 0)))
-    features.append(min(100, ml_features.get("tx_primary_fan_in_count", 0)))
-    features.append(min(100, ml_features.get("tx_primary_fan_out_count", 0)))
-    features.append(min(100.0, ml_features.get("pattern_score", 0.0)))
-    
-    avg_value = ml_features.get("avg_transaction_value", 0.0)
     max_value = ml_features.get("max_transaction_value", 0.0)
-    if avg_value > 0:
-        features.append(min(20.0, np.log1p(avg_value)))
-    else:
-        features.append(0.0)
-    if max_value > 0:
-        features.append(min(20.0, np.log1p(max_value)))
-    else:
-        features.append(0.0)
-    
-    features.append(min(200, ml_features.get("graph_nodes", tx_context.get("graph_nodes", 0))))
-    features.append(min(200, ml_features.get("num_transactions", tx_context.get("num_transactions", 0))))
-    
-    # 4. PPR features (기존)
-    features.append(min(1.0, ml_features.get("ppr_score", 0.0)))
-    features.append(min(1.0, ml_features.get("sdn_ppr", 0.0)))
-    features.append(min(1.0, ml_features.get("mixer_ppr", 0.0)))
-    
-    # 5. 정규화 점수 (기존)
-    features.append(min(1.0, max(0.0, ml_features.get("n_theta", 0.0))))
-    features.append(min(1.0, max(0.0, ml_features.get("n_omega", 0.0))))
-    
-    # 6. 패턴 탐지 여부 (기존)
-    features.append(ml_features.get("fan_in_detected", 0))
-    features.append(ml_features.get("fan_out_detected", 0))
-    features.append(ml_features.get("gather_scatter_detected", 0))
     
     # ===== 새로운 Feature 추가 =====
     
@@ -488,7 +440,8 @@ def main():
             "model": ensemble_result["model"],
             "scaler": ensemble_result["scaler"],
             "threshold": best_threshold,
-            "feature_dim": X_train.shape[1]
+            "feature_dim": X_train.shape[1],
+            "base_feature_schema": BASE_FEATURE_SCHEMA.hash()  # 앞 30차원의 스키마
         }, f)
     
     print(f"\n💾 모델 저장: {output_dir / 'improved_stage2_model.pkl'}")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+모델 레지스트리 매니페스트(models/manifest.json) 관리
+
+사용법:
+    python scripts/manage_models.py list
+    python scripts/manage_models.py register stage2 rf-v2 stage2_scorer_random_forest.npz --primary
+    python scripts/manage_models.py register stage2 gb-v1 stage2_scorer_gradient_boosting.pkl \\
+        --model-type gradient_boosting --use-ppr          # 로드하지 않고 등록 (다른 sklearn 버전의 pickle 등)
+    python scripts/manage_models.py serve stage2 --primary rf-v2 --shadow gb-v1
+    python scripts/manage_models.py verify               # 체크섬 확인 + 로드
+"""
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.scoring.model_registry import ModelRegistry, file_sha256
+from core.scoring.stage2_scorer import feature_schema_hash
+
+
+def cmd_list(registry: ModelRegistry, args) -> None:
+    """등록된 모델 목록"""
+    for entry in registry.entries:
+        config = registry.serving.get(entry.name, {})
+        role = "primary" if config.get("primary") == entry.version else (
+            "shadow" if entry.version in config.get("shadow", []) else ""
+        )
+        print(f"{entry.key:<32} {entry.model_type:<18} {entry.path:<42} {entry.sha256[:12]} {role}")
+    print(f"\nwarmup: {registry.warmup_names}")
+
+
+def cmd_register(registry: ModelRegistry, args) -> None:
+    """모델 파일 등록"""
+    feature_schema = feature_schema_hash(args.use_ppr) if args.use_ppr is not None else None
+    entry = registry.register(
+        args.name,
+        args.version,
+        args.path,
+        feature_schema=feature_schema,
+        model_type=args.model_type,
+        primary=args.primary,
+        shadow=args.shadow
+    )
+    if args.warmup and args.name not in registry.warmup_names:
+        registry.warmup_names.append(args.name)
+        registry.save()
+    print(f"✅ 등록: {entry.key} ({entry.path}, {entry.sha256[:12]})")
+
+
+def cmd_serve(registry: ModelRegistry, args) -> None:
+    """서빙 버전 지정"""
+    registry.set_serving(args.name, primary=args.primary, shadow=args.shadow)
+    print(f"✅ {args.name}: {registry.serving[args.name]}")
+
+
+def cmd_verify(registry: ModelRegistry, args) -> None:
+    """체크섬 확인 및 로드"""
+    for entry in registry.entries:
+        path = registry.models_dir / entry.path
+        if not path.exists():
+            print(f"❌ {entry.key}: 파일 없음 ({entry.path})")
+            continue
+        if file_sha256(path) != entry.sha256:
+            print(f"❌ {entry.key}: 체크섬 불일치")
+            continue
+        try:
+            registry.get(entry.name, entry.version)
+            print(f"✅ {entry.key}")
+        except Exception as e:
+            print(f"⚠️  {entry.key}: 체크섬 일치, 로드 실패 ({e})")
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="모델 레지스트리 매니페스트 관리")
+    parser.add_argument("--models-dir", default=str(project_root / "models"), help="모델 디렉토리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="등록된 모델 목록")
+
+    register = subparsers.add_parser("register", help="모델 파일 등록")
+    register.add_argument("name")
+    register.add_argument("version")
+    register.add_argument("path", help="models 디렉토리 기준 경로")
+    register.add_argument("--model-type", help="모델 타입 (생략하면 모델을 로드해 확인)")
+    register.add_argument("--use-ppr", dest="use_ppr", action="store_true", default=None,
+                          help="PPR feature로 학습된 모델 (지정하면 로드하지 않고 스키마 해시 계산)")
+    register.add_argument("--no-ppr", dest="use_ppr", action="store_false")
+    register.add_argument("--primary", action="store_true", help="서빙 버전으로 지정")
+    register.add_argument("--shadow", action="store_true", help="그림자 채점 버전으로 추가")
+    register.add_argument("--warmup", action="store_true", help="서버 시작 시 워밍업 대상에 추가")
+
+    serve = subparsers.add_parser("serve", help="서빙 버전 지정")
+    serve.add_argument("name")
+    serve.add_argument("--primary", help="서빙 버전")
+    serve.add_argument("--shadow", nargs="*", help="그림자 채점 버전 목록 (빈 목록이면 해제)")
+
+    subparsers.add_parser("verify", help="체크섬 확인 및 로드")
+
+    args = parser.parse_args()
+    registry = ModelRegistry(Path(args.models_dir))
+    {
+        "list": cmd_list,
+        "register": cmd_register,
+        "serve": cmd_serve,
+        "verify": cmd_verify,
+    }[args.command](registry, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@
 6. Threshold 최적화
 7. 클래스 불균형 처리 개선
 """
+import argparse
 import sys
 import json
 import pickle
@@ -36,6 +37,8 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from core.scoring.stage1_scorer import Stage1Scorer
+from core.scoring.dataset_io import FORMATS, dataset_column, dataset_records, load_dataset, resolve_dataset_path
+from core.scoring.feature_schema import stage2_feature_schema
 
 # XGBoost, LightGBM 시도
 try:
@@ -50,6 +53,8 @@ try:
 except ImportError:
     LIGHTGBM_AVAILABLE = False
 
+BASE_FEATURE_SCHEMA = stage2_feature_schema(use_ppr_features=True)
+
 
 def extract_advanced_features(
     stage1_result: Dict[str, Any],
@@ -61,71 +66,19 @@ def extract_advanced_features(
     
     기존 30차원 + 추가 feature = 50+ 차원
     """
-    features = []
-    
-    # ===== 기존 Features (30차원) =====
+    # ===== 기존 Features (30차원, Stage2Scorer와 같은 스키마) =====
+    features = list(BASE_FEATURE_SCHEMA.build([stage1_result], [ml_features], [tx_context])[0])
     
-    # 1. Stage 1 features
+    # 고급 Feature 계산에 쓰는 원본 값
     rule_score = stage1_result["rule_score"]
     graph_score = stage1_result["graph_score"]
-    risk_score = stage1_result["risk_score"]
-    features.extend([rule_score, graph_score, risk_score])
-    
-    # 2. Rule-based features
     rule_results = stage1_result.get("rule_results", [])
-    features.append(len(rule_results))
-    
-    axes = [r.get("axis", "B") for r in rule_results]
-    features.append(axes.count("A"))
-    features.append(axes.count("B"))
-    features.append(axes.count("C"))
-    features.append(axes.count("D"))
-    features.append(axes.count("E"))
-    
     severities = [r.get("severity", "MEDIUM") for r in rule_results]
-    features.append(severities.count("CRITICAL"))
-    features.append(severities.count("HIGH"))
-    features.append(severities.count("MEDIUM"))
-    features.append(severities.count("LOW"))
-    
-    # 3. Graph statistics
     fan_in_count = ml_features.get("fan_in_count", 0)
     fan_out_count = ml_features.get("fan_out_count", 0)
-    features.append(min(100, fan_in_count))
-    features.append(min(100, fan_out_count))
-    features.append(min(100, ml_features.get("tx_primary_fan_in_count", 0)))
-    features.append(min(100, ml_features.get("tx_primary_fan_out_count", 0)))
-    features.append(min(100.0, ml_features.get("pattern_score", 0.0)))
-    
     avg_value = ml_features.get("avg_transaction_value", 0.0)
     max_value = ml_features.get("max_transaction_value", 0.0)
-    if avg_value > 0:
-        features.append(min(20.0, np.log1p(avg_value)))
-    else:
-        features.append(0.0)
-    if max_value > 0:
-        features.append(min(20.0, np.log1p(max_value)))
-    else:
-        features.append(0.0)
-    
     graph_nodes = ml_features.get("graph_nodes", tx_context.get("graph_nodes", 0))
-    num_transactions = ml_features.get("num_transactions", tx_context.get("num_transactions", 0))
-    features.append(min(200, graph_nodes))
-    features.append(min(200, num_transactions))
-    
-    # 4. PPR features
-    features.append(min(1.0, ml_features.get("ppr_score", 0.0)))
-    features.append(min(1.0, ml_features.get("sdn_ppr", 0.0)))
-    features.append(min(1.0, ml_features.get("mixer_ppr", 0.0)))
-    
-    # 5. 정규화 점수
-    features.append(min(1.0, max(0.0, ml_features.get("n_theta", 0.0))))
-    features.append(min(1.0, max(0.0, ml_features.get("n_omega", 0.0))))
-    
-    # 6. 패턴 탐지
-    features.append(ml_features.get("fan_in_detected", 0))
-    features.append(ml_features.get("fan_out_detected", 0))
-    features.append(ml_features.get("gather_scatter_detected", 0))
     
     # ===== 고급 Features 추가 (20+ 차원) =====
     
@@ -217,24 +170,26 @@ def extract_advanced_features(
     return features_array
 
 
+# feature 추출에 쓰는 레코드 필드
+RECORD_FIELDS = ["from", "to", "usd_value", "timestamp", "tx_hash", "chain", "ml_features", "tx_context"]
+
+
 def load_full_dataset(file_path: Path) -> Tuple[List[np.ndarray], List[int]]:
     """전체 데이터셋 로드 및 feature 추출"""
     print(f"📂 데이터 로드: {file_path.name}")
-    with open(file_path, 'r') as f:
-        data = json.load(f)
+    data = load_dataset(file_path)
     
     stage1_scorer = Stage1Scorer(rule_weight=0.9, graph_weight=0.1)
     
     features = []
-    labels = []
+    # 라벨은 컬럼 하나로, 레코드는 필요한 필드만 컬럼 단위로 읽음 (컬럼형 데이터셋에서 행 단위 복원 회피)
+    labels = [1 if label == "fraud" else 0 for label in dataset_column(data, "ground_truth_label", "normal")]
+    records = dataset_records(data, RECORD_FIELDS)
     
     print("   Feature 추출 중...")
-    for i, item in enumerate(data):
+    for i, item in enumerate(records):
         if (i + 1) % 1000 == 0:
-            print(f"      {i + 1}/{len(data)} 처리 중...")
-        
-        label = item.get("ground_truth_label", "normal")
-        labels.append(1 if label == "fraud" else 0)
+            print(f"      {i + 1}/{len(records)} 처리 중...")
         
         tx_data = {
             "from": item.get("from", ""),
@@ -512,31 +467,31 @@ def main():
     print("성능 최대화 (목표: 85% 이상)")
     print("=" * 80)
     
+    parser = argparse.ArgumentParser(description="성능 최대화")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="데이터셋 포맷")
+    args = parser.parse_args()
+    
     dataset_dir = project_root / "data" / "dataset"
     
     # 전체 데이터셋 사용 시도
-    full_dataset_path = dataset_dir / "diverse_rules_enhanced.json"
-    sampled_dataset_path = dataset_dir / "diverse_rules_enhanced_sampled.json"
+    full_dataset_path = resolve_dataset_path(dataset_dir / "diverse_rules_enhanced.json", fmt=args.format)
+    sampled_dataset_path = resolve_dataset_path(dataset_dir / "diverse_rules_enhanced_sampled.json", fmt=args.format)
     
-    if full_dataset_path.exists():
-        file_size = full_dataset_path.stat().st_size / (1024 * 1024)  # MB
-        print(f"\n✅ 전체 데이터셋 발견! (약 {file_size:.1f}MB)")
+    if full_dataset_path is not None:
+        print(f"\n✅ 전체 데이터셋 발견! ({full_dataset_path.name})")
         print("   ⚠️  전체 데이터셋은 매우 큽니다. 샘플 데이터셋 사용 권장.")
         print("   전체 데이터셋 사용하려면 주석을 해제하세요.")
         # dataset_path = full_dataset_path  # 주석 해제하여 전체 데이터셋 사용
         dataset_path = sampled_dataset_path  # 샘플 데이터셋 사용 (빠른 테스트)
-    elif sampled_dataset_path.exists():
+    elif sampled_dataset_path is not None:
         print("\n⚠️  전체 데이터셋 없음. 샘플 데이터셋 사용.")
         dataset_path = sampled_dataset_path
     else:
         # train.json 사용
-        dataset_path = dataset_dir / "train.json"
-        if not dataset_path.exists():
-            print(f"❌ 데이터셋 파일을 찾을 수 없습니다.")
-            return
+        dataset_path = resolve_dataset_path(dataset_dir / "train.json", fmt=args.format)
     
-    if not dataset_path.exists():
-        print(f"❌ 데이터셋 파일을 찾을 수 없습니다: {dataset_path}")
+    if dataset_path is None:
+        print(f"❌ 데이터셋 파일을 찾을 수 없습니다.")
         return
     
     # 데이터 로드
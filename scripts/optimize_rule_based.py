@@ -4,6 +4,7 @@ Rule-based 스코어러 최적화 스크립트
 
 다양한 집계 방식과 가중치 조절로 성능 개선
 """
+import os
 import sys
 import json
 from pathlib import Path
@@ -106,7 +107,7 @@ def main():
     
     # 최적화
     print("\n🔍 Rule-based 스코어러 최적화 중...")
-    optimization_result = optimize_rule_scorer(train_data, val_data)
+    optimization_result = optimize_rule_scorer(train_data, val_data, num_workers=os.cpu_count() or 1)
     
     best_config = optimization_result["config"]
     best_scorer = optimization_result["scorer"]
@@ -137,7 +138,8 @@ def main():
         json.dump({
             "config": best_config,
             "validation_results": optimization_result["results"],
-            "test_results": test_results
+            "test_results": test_results,
+            "validation_surface": optimization_result["surface"]
         }, f, indent=2, ensure_ascii=False)
     
     print(f"\n💾 결과 저장: {output_path}")
@@ -6,215 +6,53 @@
 2. 축별 중요도 측정
 3. 룰 제거/수정 실험
 4. 임계값 최적화
+
+사용법:
+    python scripts/optimize_rules.py
+    python scripts/optimize_rules.py --format cols    # test.cols 사용
 """
+import argparse
 import sys
 import json
-import yaml
 from pathlib import Path
-from typing import Dict, List, Any, Set
-from collections import defaultdict
-import numpy as np
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from typing import Dict, Any, Set
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from core.scoring.stage1_scorer import Stage1Scorer
-from core.rules.evaluator import RuleEvaluator
+from core.scoring.dataset_io import FORMATS, dataset_records, load_dataset, resolve_dataset_path
+from core.scoring.rule_whatif import RuleWhatIfEngine
 
 
-def analyze_rule_effectiveness(
-    test_data: List[Dict[str, Any]],
-    rules_path: str = "rules/tracex_rules.yaml"
-) -> Dict[str, Any]:
-    """룰별 효과 분석"""
+def analyze_rule_effectiveness(engine: RuleWhatIfEngine) -> Dict[str, Any]:
+    """룰별 효과 분석 (발동 행렬의 열 합으로 계산)"""
     print("=" * 80)
     print("룰별 효과 분석")
     print("=" * 80)
     
-    rule_evaluator = RuleEvaluator(rules_path)
-    
-    # 룰별 통계
-    rule_stats = defaultdict(lambda: {
-        "fired_count": 0,
-        "fraud_when_fired": 0,
-        "normal_when_fired": 0,
-        "total_score": 0.0
-    })
-    
-    # 축별 통계
-    axis_stats = defaultdict(lambda: {
-        "fired_count": 0,
-        "fraud_when_fired": 0,
-        "normal_when_fired": 0
-    })
-    
-    print("\n📊 룰 발동 통계 수집 중...")
-    for item in test_data:
-        label = item.get("ground_truth_label", "normal")
-        is_fraud = (label == "fraud")
-        
-        tx_data = {
-            "from": item.get("from", ""),
-            "to": item.get("to", ""),
-            "usd_value": item.get("usd_value", 0),
-            "timestamp": item.get("timestamp", 0),
-            "tx_hash": item.get("tx_hash", ""),
-            "chain": item.get("chain", "ethereum"),
-            "is_sanctioned": item.get("tx_context", {}).get("is_sanctioned", False),
-            "is_mixer": item.get("tx_context", {}).get("is_mixer", False),
-        }
-        
-        rule_results = rule_evaluator.evaluate_single_transaction(tx_data)
-        
-        for rule in rule_results:
-            rule_id = rule.get("rule_id", "")
-            axis = rule.get("axis", "B")
-            score = rule.get("score", 0.0)
-            
-            # 룰별 통계
-            rule_stats[rule_id]["fired_count"] += 1
-            rule_stats[rule_id]["total_score"] += score
-            if is_fraud:
-                rule_stats[rule_id]["fraud_when_fired"] += 1
-            else:
-                rule_stats[rule_id]["normal_when_fired"] += 1
-            
-            # 축별 통계
-            axis_stats[axis]["fired_count"] += 1
-            if is_fraud:
-                axis_stats[axis]["fraud_when_fired"] += 1
-            else:
-                axis_stats[axis]["normal_when_fired"] += 1
-    
-    # 룰별 효과 계산
-    rule_effectiveness = {}
-    for rule_id, stats in rule_stats.items():
-        total_fired = stats["fired_count"]
-        if total_fired > 0:
-            fraud_ratio = stats["fraud_when_fired"] / total_fired
-            avg_score = stats["total_score"] / total_fired
-            rule_effectiveness[rule_id] = {
-                "fired_count": total_fired,
-                "fraud_ratio": fraud_ratio,
-                "fraud_when_fired": stats["fraud_when_fired"],
-                "normal_when_fired": stats["normal_when_fired"],
-                "avg_score": avg_score,
-                "effectiveness": fraud_ratio * avg_score  # 효과성 점수
-            }
-    
-    # 축별 효과 계산
-    axis_effectiveness = {}
-    for axis, stats in axis_stats.items():
-        total_fired = stats["fired_count"]
-        if total_fired > 0:
-            fraud_ratio = stats["fraud_when_fired"] / total_fired
-            axis_effectiveness[axis] = {
-                "fired_count": total_fired,
-                "fraud_ratio": fraud_ratio,
-                "fraud_when_fired": stats["fraud_when_fired"],
-                "normal_when_fired": stats["normal_when_fired"]
-            }
-    
     return {
-        "rule_effectiveness": rule_effectiveness,
-        "axis_effectiveness": axis_effectiveness
+        "rule_effectiveness": engine.rule_effectiveness(),
+        "axis_effectiveness": engine.axis_effectiveness()
     }
 
 
 def test_rule_removal(
-    test_data: List[Dict[str, Any]],
-    rules_to_remove: Set[str],
-    rules_path: str = "rules/tracex_rules.yaml"
+    engine: RuleWhatIfEngine,
+    rules_to_remove: Set[str]
 ) -> Dict[str, float]:
-    """특정 룰 제거 시 성능 측정"""
-    # 룰 파일 로드
-    with open(rules_path, 'r') as f:
-        rules_config = yaml.safe_load(f)
-    
-    # 룰 제거
-    original_rules = rules_config["rules"]
-    filtered_rules = [r for r in original_rules if r["id"] not in rules_to_remove]
-    rules_config["rules"] = filtered_rules
-    
-    # 임시 룰 파일 생성
-    temp_rules_path = project_root / "rules" / "temp_rules.yaml"
-    with open(temp_rules_path, 'w') as f:
-        yaml.dump(rules_config, f)
+    """특정 룰 제거 시 성능 측정 (룰 재평가 없이 1단계 점수만 다시 계산)"""
+    y_pred_scores = engine.stage1_scores(removed_rules=rules_to_remove)
     
-    try:
-        # Stage 1 스코어러로 평가
-        stage1_scorer = Stage1Scorer(rules_path=str(temp_rules_path))
-        
-        y_true = []
-        y_pred_scores = []
-        
-        for item in test_data:
-            label = item.get("ground_truth_label", "normal")
-            y_true.append(1 if label == "fraud" else 0)
-            
-            tx_data = {
-                "from": item.get("from", ""),
-                "to": item.get("to", ""),
-                "usd_value": item.get("usd_value", 0),
-                "timestamp": item.get("timestamp", 0),
-                "tx_hash": item.get("tx_hash", ""),
-                "chain": item.get("chain", "ethereum"),
-                "is_sanctioned": item.get("tx_context", {}).get("is_sanctioned", False),
-                "is_mixer": item.get("tx_context", {}).get("is_mixer", False),
-            }
-            
-            ml_features = item.get("ml_features", {})
-            tx_context = item.get("tx_context", {})
-            
-            result = stage1_scorer.calculate_risk_score(tx_data, ml_features, tx_context)
-            y_pred_scores.append(result["risk_score"])
-        
-        # Threshold 최적화
-        best_threshold = 50.0
-        best_f1 = 0.0
-        
-        for threshold in range(10, 90, 2):
-            y_pred = [1 if s >= threshold else 0 for s in y_pred_scores]
-            f1 = f1_score(y_true, y_pred, zero_division=0)
-            if f1 > best_f1:
-                best_f1 = f1
-                best_threshold = threshold
-        
-        y_pred = [1 if s >= best_threshold else 0 for s in y_pred_scores]
-        
-        accuracy = accuracy_score(y_true, y_pred)
-        precision = precision_score(y_true, y_pred, zero_division=0)
-        recall = recall_score(y_true, y_pred, zero_division=0)
-        f1 = f1_score(y_true, y_pred, zero_division=0)
-        
-        return {
-            "accuracy": accuracy,
-            "precision": precision,
-            "recall": recall,
-            "f1_score": f1,
-            "threshold": best_threshold
-        }
-    finally:
-        # 임시 파일 삭제
-        if temp_rules_path.exists():
-            temp_rules_path.unlink()
+    # Threshold 최적화 (10, 12, ..., 88)
+    return engine.best_threshold(y_pred_scores)
 
 
-def optimize_axis_weights(
-    test_data: List[Dict[str, Any]],
-    rules_path: str = "rules/tracex_rules.yaml"
-) -> Dict[str, Any]:
-    """축별 가중치 최적화"""
+def optimize_axis_weights(engine: RuleWhatIfEngine) -> Dict[str, Any]:
+    """축별 가중치 최적화 (가중치 조합마다 희소 행렬-벡터 곱 한 번)"""
     print("=" * 80)
     print("축별 가중치 최적화")
     print("=" * 80)
     
-    from core.scoring.improved_rule_scorer import ImprovedRuleScorer
-    from core.rules.evaluator import RuleEvaluator
-    
-    rule_evaluator = RuleEvaluator(rules_path)
-    
     # 가중치 조합 테스트
     weight_combinations = [
         {"B": 1.0, "C": 1.0, "E": 1.0},  # 균등
@@ -231,74 +69,19 @@ def optimize_axis_weights(
     
     print("\n🔍 가중치 조합 테스트 중...")
     for weights in weight_combinations:
-        # ImprovedRuleScorer에 가중치 적용 (수동으로)
-        # 실제로는 ImprovedRuleScorer를 수정해야 함
-        # 여기서는 간단히 테스트
-        
-        scorer = ImprovedRuleScorer(use_axis_bonus=True)
-        # 가중치를 직접 수정할 수 없으므로, 결과만 출력
-        
-        y_true = []
-        y_pred_scores = []
-        
-        for item in test_data:
-            label = item.get("ground_truth_label", "normal")
-            y_true.append(1 if label == "fraud" else 0)
-            
-            tx_data = {
-                "from": item.get("from", ""),
-                "to": item.get("to", ""),
-                "usd_value": item.get("usd_value", 0),
-                "timestamp": item.get("timestamp", 0),
-                "tx_hash": item.get("tx_hash", ""),
-                "chain": item.get("chain", "ethereum"),
-                "is_sanctioned": item.get("tx_context", {}).get("is_sanctioned", False),
-                "is_mixer": item.get("tx_context", {}).get("is_mixer", False),
-            }
-            
-            rule_results = rule_evaluator.evaluate_single_transaction(tx_data)
-            
-            # 가중치 적용 (간단한 방법)
-            weighted_score = 0.0
-            for rule in rule_results:
-                axis = rule.get("axis", "B")
-                score = rule.get("score", 0.0)
-                weight = weights.get(axis, 1.0)
-                weighted_score += score * weight
-            
-            y_pred_scores.append(min(100.0, weighted_score))
-        
-        # Threshold 최적화
-        best_threshold = 50.0
-        best_f1_local = 0.0
-        
-        for threshold in range(10, 90, 2):
-            y_pred = [1 if s >= threshold else 0 for s in y_pred_scores]
-            f1 = f1_score(y_true, y_pred, zero_division=0)
-            if f1 > best_f1_local:
-                best_f1_local = f1
-                best_threshold = threshold
-        
-        y_pred = [1 if s >= best_threshold else 0 for s in y_pred_scores]
-        
-        accuracy = accuracy_score(y_true, y_pred)
-        precision = precision_score(y_true, y_pred, zero_division=0)
-        recall = recall_score(y_true, y_pred, zero_division=0)
-        f1 = f1_score(y_true, y_pred, zero_division=0)
+        # 발동 점수 × 축 가중치 합 (100점 상한)
+        y_pred_scores = engine.linear_scores(axis_weights=weights)
+        results = engine.best_threshold(y_pred_scores)
+        f1 = results["f1_score"]
         
         print(f"\n가중치: B={weights.get('B', 1.0):.1f}, C={weights.get('C', 1.0):.1f}, E={weights.get('E', 1.0):.1f}")
-        print(f"  F1: {f1:.4f}, Acc: {accuracy:.4f}, Prec: {precision:.4f}, Rec: {recall:.4f}")
+        print(f"  F1: {f1:.4f}, Acc: {results['accuracy']:.4f}, "
+              f"Prec: {results['precision']:.4f}, Rec: {results['recall']:.4f}")
         
         if f1 > best_f1:
             best_f1 = f1
             best_weights = weights
-            best_results = {
-                "accuracy": accuracy,
-                "precision": precision,
-                "recall": recall,
-                "f1_score": f1,
-                "threshold": best_threshold
-            }
+            best_results = results
     
     print(f"\n✅ 최적 가중치:")
     print(f"   B: {best_weights.get('B', 1.0):.1f}")
@@ -314,22 +97,30 @@ def optimize_axis_weights(
 
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description="룰 최적화 실험")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="데이터셋 포맷")
+    args = parser.parse_args()
+    
     dataset_dir = project_root / "data" / "dataset"
-    test_path = dataset_dir / "test.json"
+    test_path = resolve_dataset_path(dataset_dir / "test.json", fmt=args.format)
     
-    if not test_path.exists():
+    if test_path is None:
         print("❌ 테스트 데이터셋 파일을 찾을 수 없습니다.")
         return
     
     print("📂 테스트 데이터 로드 중...")
-    with open(test_path, 'r') as f:
-        test_data = json.load(f)
+    test_data = dataset_records(load_dataset(test_path))
     
     print(f"   테스트 샘플: {len(test_data)}개")
     
+    # 룰북은 여기서 한 번만 평가하고, 이후 실험은 발동 행렬로 재채점
+    print("\n📊 룰 발동 행렬 생성 중...")
+    engine = RuleWhatIfEngine.build(test_data)
+    print(f"   {engine.firing.shape[0]}개 샘플 × {engine.firing.shape[1]}개 룰, 발동 {engine.firing.nnz}건")
+    
     # 1. 룰별 효과 분석
     print("\n" + "=" * 80)
-    effectiveness = analyze_rule_effectiveness(test_data)
+    effectiveness = analyze_rule_effectiveness(engine)
     
     print("\n📊 룰별 효과 (상위 10개):")
     rule_eff = effectiveness["rule_effectiveness"]
@@ -361,7 +152,7 @@ def main():
         print(f"\n효과성이 낮은 룰: {ineffective_rules}")
         print("이 룰들을 제거하고 성능 측정 중...")
         
-        removal_results = test_rule_removal(test_data, set(ineffective_rules))
+        removal_results = test_rule_removal(engine, set(ineffective_rules))
         print(f"\n룰 제거 후 성능:")
         print(f"   Accuracy: {removal_results['accuracy']:.4f}")
         print(f"   F1-Score: {removal_results['f1_score']:.4f}")
@@ -370,7 +161,7 @@ def main():
     
     # 3. 축별 가중치 최적화
     print("\n" + "=" * 80)
-    weight_results = optimize_axis_weights(test_data)
+    weight_results = optimize_axis_weights(engine)
     
     # 결과 저장
     output_dir = project_root / "data" / "dataset"
@@ -4,8 +4,10 @@
 
 사용법:
     python scripts/split_dataset.py
+    python scripts/split_dataset.py --formats cols      # 컬럼형(.cols)만 저장
+    python scripts/split_dataset.py --input-format cols # 원본도 컬럼형에서 읽기
 """
-import json
+import argparse
 import sys
 from pathlib import Path
 
@@ -14,10 +16,27 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from core.scoring.dataset_builder import DatasetBuilder
+from core.scoring.dataset_io import (
+    FORMATS, dataset_column, dataset_records, load_dataset, resolve_dataset_path, save_dataset
+)
 
 
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description="데이터셋을 학습/검증/테스트로 분할")
+    parser.add_argument(
+        "--formats",
+        default="json,cols",
+        help=f"저장 포맷 (쉼표 구분, {'/'.join(FORMATS)}). json은 기존 스크립트 호환용"
+    )
+    parser.add_argument("--input-format", choices=FORMATS, default="json", help="원본 데이터셋 포맷")
+    args = parser.parse_args()
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if not formats or unknown:
+        print(f"❌ 지원하지 않는 포맷: {', '.join(unknown) or '(없음)'}")
+        return
+    
     builder = DatasetBuilder()
     
     # 데이터셋 파일 찾기
@@ -25,30 +44,33 @@ def main():
     
     # diverse_rules_enhanced_sampled.json 우선 선택 (그래프 통계 Feature 강화 버전)
     dataset_file = None
-    if (dataset_dir / "diverse_rules_enhanced_sampled.json").exists():
-        dataset_file = dataset_dir / "diverse_rules_enhanced_sampled.json"
-    elif (dataset_dir / "diverse_rules_fixed_sampled.json").exists():
-        dataset_file = dataset_dir / "diverse_rules_fixed_sampled.json"
-    elif (dataset_dir / "diverse_rules_optimized_sampled.json").exists():
-        dataset_file = dataset_dir / "diverse_rules_optimized_sampled.json"
-    elif (dataset_dir / "diverse_rules_sampled.json").exists():
-        dataset_file = dataset_dir / "diverse_rules_sampled.json"
+    for name in [
+        "diverse_rules_enhanced_sampled",
+        "diverse_rules_fixed_sampled",
+        "diverse_rules_optimized_sampled",
+        "diverse_rules_sampled",
+    ]:
+        dataset_file = resolve_dataset_path(dataset_dir / f"{name}.json", fmt=args.input_format)
+        if dataset_file is not None:
+            break
     
     if dataset_file is None:
-        dataset_files = list(dataset_dir.glob("*.json"))
-    if not dataset_files:
-        print("❌ 데이터셋 파일을 찾을 수 없습니다.")
-        print(f"   경로: {dataset_dir}")
-        return
-    # 가장 최근 파일 선택
-    dataset_file = max(dataset_files, key=lambda p: p.stat().st_mtime)
+        dataset_files = [
+            p for p in dataset_dir.glob(f"*.{args.input_format}")
+            if p.stem not in ("train", "val", "test")
+        ]
+        if not dataset_files:
+            print("❌ 데이터셋 파일을 찾을 수 없습니다.")
+            print(f"   경로: {dataset_dir}")
+            return
+        # 가장 최근 파일 선택
+        dataset_file = max(dataset_files, key=lambda p: p.stat().st_mtime)
     
     print(f"📂 데이터셋 파일: {dataset_file.name}")
     
     # 데이터셋 로드
     try:
-        with open(dataset_file, 'r') as f:
-            dataset = json.load(f)
+        dataset = load_dataset(dataset_file)
     except Exception as e:
         print(f"❌ 데이터셋 로드 실패: {e}")
         return
@@ -60,7 +82,7 @@ def main():
     print(f"📊 총 {len(dataset)}개 샘플")
     
     # 라벨 분포 확인
-    labels = [item.get("ground_truth_label", "unknown") for item in dataset]
+    labels = dataset_column(dataset, "ground_truth_label", "unknown")
     label_counts = {}
     for label in labels:
         label_counts[label] = label_counts.get(label, 0) + 1
@@ -72,7 +94,7 @@ def main():
     # 분할
     print("\n데이터셋 분할 중...")
     train, val, test = builder.split_dataset(
-        dataset,
+        list(dataset_records(dataset)),
         train_ratio=0.7,
         val_ratio=0.15,
         test_ratio=0.15,
@@ -83,21 +105,18 @@ def main():
     output_dir = dataset_dir
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    with open(output_dir / "train.json", 'w') as f:
-        json.dump(train, f, indent=2, ensure_ascii=False)
-    with open(output_dir / "val.json", 'w') as f:
-        json.dump(val, f, indent=2, ensure_ascii=False)
-    with open(output_dir / "test.json", 'w') as f:
-        json.dump(test, f, indent=2, ensure_ascii=False)
+    saved = []
+    for name, split in [("train", train), ("val", val), ("test", test)]:
+        for fmt in formats:
+            saved.append(save_dataset(split, output_dir / f"{name}.{fmt}").name)
     
     print(f"\n✅ 분할 완료!")
     print(f"   학습: {len(train)}개 ({len(train)/len(dataset)*100:.1f}%)")
     print(f"   검증: {len(val)}개 ({len(val)/len(dataset)*100:.1f}%)")
     print(f"   테스트: {len(test)}개 ({len(test)/len(dataset)*100:.1f}%)")
     print(f"\n저장 위치: {output_dir}")
-    print("  - train.json")
-    print("  - val.json")
-    print("  - test.json")
+    for name in saved:
+        print(f"  - {name}")
 
 
 if __name__ == "__main__":
@@ -9,83 +9,14 @@ from pathlib import Path
 from typing import Dict, List, Any
 import numpy as np
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
-from sklearn.preprocessing import StandardScaler
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from core.scoring.stage1_scorer import Stage1Scorer
 from core.scoring.stage2_scorer import Stage2Scorer
-
-
-def extract_features_for_stage2(
-    stage1_result: Dict[str, Any],
-    ml_features: Dict[str, Any],
-    tx_context: Dict[str, Any]
-) -> np.ndarray:
-    """Stage 2용 feature 추출 (기존 30차원)"""
-    features = []
-    
-    # Stage 1 features
-    features.append(stage1_result["rule_score"])
-    features.append(stage1_result["graph_score"])
-    features.append(stage1_result["risk_score"])
-    
-    # Rule-based features
-    rule_results = stage1_result.get("rule_results", [])
-    features.append(len(rule_results))
-    
-    axes = [r.get("axis", "B") for r in rule_results]
-    features.append(axes.count("A"))
-    features.append(axes.count("B"))
-    features.append(axes.count("C"))
-    features.append(axes.count("D"))
-    features.append(axes.count("E"))
-    
-    severities = [r.get("severity", "MEDIUM") for r in rule_results]
-    features.append(severities.count("CRITICAL"))
-    features.append(severities.count("HIGH"))
-    features.append(severities.count("MEDIUM"))
-    features.append(severities.count("LOW"))
-    
-    # Graph statistics
-    features.append(min(100, ml_features.get("fan_in_count", 0)))
-    features.append(min(100, ml_features.get("fan_out_count", 0)))
-    features.append(min(100, ml_features.get("tx_primary_fan_in_count", 0)))
-    features.append(min(100, ml_features.get("tx_primary_fan_out_count", 0)))
-    features.append(min(100.0, ml_features.get("pattern_score", 0.0)))
-    
-    avg_value = ml_features.get("avg_transaction_value", 0.0)
-    max_value = ml_features.get("max_transaction_value", 0.0)
-    if avg_value > 0:
-        features.append(min(20.0, np.log1p(avg_value)))
-    else:
-        features.append(0.0)
-    if max_value > 0:
-        features.append(min(20.0, np.log1p(max_value)))
-    else:
-        features.append(0.0)
-    
-    features.append(min(200, ml_features.get("graph_nodes", tx_context.get("graph_nodes", 0))))
-    features.append(min(200, ml_features.get("num_transactions", tx_context.get("num_transactions", 0))))
-    
-    # PPR features
-    features.append(min(1.0, ml_features.get("ppr_score", 0.0)))
-    features.append(min(1.0, ml_features.get("sdn_ppr", 0.0)))
-    features.append(min(1.0, ml_features.get("mixer_ppr", 0.0)))
-    
-    # 정규화 점수
-    features.append(min(1.0, max(0.0, ml_features.get("n_theta", 0.0))))
-    features.append(min(1.0, max(0.0, ml_features.get("n_omega", 0.0))))
-    
-    # 패턴 탐지
-    features.append(ml_features.get("fan_in_detected", 0))
-    features.append(ml_features.get("fan_out_detected", 0))
-    features.append(ml_features.get("gather_scatter_detected", 0))
-    
-    features_array = np.array(features, dtype=np.float32)
-    features_array = np.nan_to_num(features_array, nan=0.0, posinf=100.0, neginf=0.0)
-    return features_array
+from core.scoring.feature_schema import stage2_feature_schema
+from core.scoring.feature_store import sample_inputs
 
 
 def test_full_system():
@@ -119,9 +50,10 @@ def test_full_system():
     # Stage 1 스코어러 (수정된 룰 사용)
     stage1_scorer = Stage1Scorer(rule_weight=0.9, graph_weight=0.1)
     
-    # Stage 2 모델 로드
+    # Stage 2 모델 로드 (모델 파일의 feature 스키마 해시와 현재 스키마가 같아야 함)
     stage2_model = None
     scaler = None
+    feature_schema = None
     if use_stage2:
         try:
             with open(model_path, 'rb') as f:
@@ -131,53 +63,46 @@ def test_full_system():
                 if stage2_model is None or scaler is None:
                     print("⚠️  모델 데이터 형식이 올바르지 않습니다.")
                     use_stage2 = False
+                else:
+                    feature_schema = stage2_feature_schema(model_data.get("use_ppr_features", True))
+                    feature_schema.check(model_data.get("feature_schema"), model_path.name)
         except Exception as e:
             print(f"⚠️  모델 로드 실패: {e}")
             use_stage2 = False
     
     print("\n🔍 평가 중...")
-    y_true = []
-    y_pred_scores = []
-    
-    for item in test_data:
-        label = item.get("ground_truth_label", "normal")
-        y_true.append(1 if label == "fraud" else 0)
-        
-        tx_data = {
-            "from": item.get("from", ""),
-            "to": item.get("to", ""),
-            "usd_value": item.get("usd_value", 0),
-            "timestamp": item.get("timestamp", 0),
-            "tx_hash": item.get("tx_hash", ""),
-            "chain": item.get("chain", "ethereum"),
-            "is_sanctioned": item.get("tx_context", {}).get("is_sanctioned", False),
-            "is_mixer": item.get("tx_context", {}).get("is_mixer", False),
-        }
-        
-        ml_features = item.get("ml_features", {})
-        tx_context = item.get("tx_context", {})
-        
-        # Stage 1
-        stage1_result = stage1_scorer.calculate_risk_score(tx_data, ml_features, tx_context)
-        stage1_score = stage1_result["risk_score"]
-        
-        # Stage 2 (if available)
-        if use_stage2 and stage2_model and scaler:
-            try:
-                features = extract_features_for_stage2(stage1_result, ml_features, tx_context)
-                features_scaled = scaler.transform(features.reshape(1, -1))
-                ml_proba = stage2_model.predict_proba(features_scaled)[0]
-                ml_score = ml_proba[1] * 100.0
-                
-                # Stage 1과 Stage 2 결합 (기존 가중치: 0.6, 0.4)
-                final_score = 0.6 * stage1_score + 0.4 * ml_score
-            except Exception as e:
-                print(f"⚠️  Stage 2 예측 실패: {e}, Stage 1 점수만 사용")
-                final_score = stage1_score
-        else:
-            final_score = stage1_score
-        
-        y_pred_scores.append(final_score)
+    y_true = [1 if item.get("ground_truth_label", "normal") == "fraud" else 0 for item in test_data]
+    inputs = [sample_inputs(item) for item in test_data]
+    
+    # Stage 1 (전체 배치, 룰 평가 순서는 데이터 순서)
+    stage1_results = stage1_scorer.calculate_risk_scores(inputs)
+    failed = sum(1 for result in stage1_results if result is None)
+    if failed:
+        print(f"⚠️  Stage 1 계산 실패 {failed}개 (0점 처리)")
+    stage1_scores = np.array(
+        [result["risk_score"] if result is not None else 0.0 for result in stage1_results],
+        dtype=np.float64
+    )
+    y_pred_scores = stage1_scores
+    
+    # Stage 2 (if available): Stage2Scorer와 같은 스키마로 feature 행렬을 한 번에 만듦
+    if use_stage2 and stage2_model and scaler:
+        try:
+            rows = [i for i, result in enumerate(stage1_results) if result is not None]
+            features = feature_schema.build(
+                [stage1_results[i] for i in rows],
+                [inputs[i][1] or {} for i in rows],
+                [inputs[i][2] or {} for i in rows]
+            )
+            ml_scores = np.zeros(len(test_data), dtype=np.float64)
+            if rows:
+                ml_scores[rows] = stage2_model.predict_proba(scaler.transform(features))[:, 1] * 100.0
+            
+            # Stage 1과 Stage 2 결합 (기존 가중치: 0.6, 0.4, 실패한 행은 둘 다 0점)
+            y_pred_scores = 0.6 * stage1_scores + 0.4 * ml_scores
+        except Exception as e:
+            print(f"⚠️  Stage 2 예측 실패: {e}, Stage 1 점수만 사용")
+    y_pred_scores = y_pred_scores.tolist()
     
     # Threshold 최적화
     print("\n🎯 Threshold 최적화 중...")
@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 """
 2단계 스코어러 학습 스크립트
+
+사용법:
+    python scripts/train_stage2_scorer.py
+    python scripts/train_stage2_scorer.py --format cols    # train.cols / val.cols 사용
 """
+import argparse
 import sys
 import json
 from pathlib import Path
@@ -10,26 +15,30 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from core.scoring.stage2_scorer import Stage2Scorer
+from core.scoring.dataset_io import FORMATS, load_dataset, resolve_dataset_path
+from core.scoring.feature_store import SAMPLE_FIELDS
 
 
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description="2단계 스코어러 학습")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="데이터셋 포맷")
+    args = parser.parse_args()
+    
     dataset_dir = project_root / "data" / "dataset"
-    train_path = dataset_dir / "train.json"
-    val_path = dataset_dir / "val.json"
+    train_path = resolve_dataset_path(dataset_dir / "train.json", fmt=args.format)
+    val_path = resolve_dataset_path(dataset_dir / "val.json", fmt=args.format)
     
-    if not train_path.exists():
+    if train_path is None:
         print("❌ 학습 데이터셋 파일을 찾을 수 없습니다.")
         return
     
     print("📂 데이터 로드 중...")
-    with open(train_path, 'r') as f:
-        train_data = json.load(f)
-    
-    val_data = None
-    if val_path.exists():
-        with open(val_path, 'r') as f:
-            val_data = json.load(f)
+    # 컬럼형은 레코드 전체를 메모리에 복원하지 않고, 1단계 입력과 라벨 필드만 블록 단위로 읽는다
+    # (1단계 결과/feature는 feature store에 있으므로 모델 타입마다 다시 순회해도 룰 평가는 한 번)
+    fields = SAMPLE_FIELDS + ("ground_truth_label",)
+    train_data = load_dataset(train_path, fields)
+    val_data = load_dataset(val_path, fields) if val_path is not None else None
     
     print(f"   Train: {len(train_data)}개")
     if val_data:
@@ -44,7 +53,12 @@ def main():
         print(f"{model_type.upper()} 모델 학습")
         print(f"{'=' * 80}")
         
-        scorer = Stage2Scorer(model_type=model_type, use_ppr_features=True)
+        # 1단계 결과/feature는 캐시해 두고 모델 타입끼리, 그리고 다음 실행에서 재사용
+        scorer = Stage2Scorer(
+            model_type=model_type,
+            use_ppr_features=True,
+            feature_store_dir=str(dataset_dir / ".feature_store")
+        )
         train_results = scorer.train(train_data, val_data)
         
         results[model_type] = train_results